@@ -0,0 +1,159 @@
+"""flight observation composite indexes and optional daily partitions
+
+Revision ID: 5d2e7a41c9b3
+Revises: 8c998de89757
+Create Date: 2026-10-18
+
+Adds (session_id, created_at DESC) and (icao_address, created_at DESC) indexes on
+flight_feed_operations_flightobservation. The initial revision builds tables from the current models,
+so on a fresh database the indexes may already exist; they are created with IF NOT EXISTS.
+
+On Postgres with FLIGHT_OBSERVATION_PARTITIONING_ENABLED the table is rebuilt as a range-partitioned
+table with one partition per UTC day of created_at and a default partition for anything outside the
+premade range. Existing rows are copied across. The primary key becomes (id, created_at), because
+Postgres requires the partition key in every unique constraint. Two functions are installed for the
+maintenance run by the ``maintain_flight_observation_partitions`` task:
+flight_observation_create_partitions(first_day, last_day) and flight_observation_drop_partitions(before_day).
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+
+from alembic import op
+from flight_blender.config import settings
+
+revision: str = "5d2e7a41c9b3"
+down_revision: str | Sequence[str] | None = "8c998de89757"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+TABLE = "flight_feed_operations_flightobservation"
+CREATED_AT_INDEX = "ix_flight_feed_operations_flightobservation_created_at"
+SESSION_INDEX = "ix_flightobservation_session_id_created_at"
+ICAO_INDEX = "ix_flightobservation_icao_address_created_at"
+
+# Partitions are named <table>_pYYYYMMDD and cover one UTC day. A partition is built detached, takes
+# over any rows the default partition caught for its day, and is then attached, so creating a day that
+# already received writes does not fail the default partition's constraint check.
+CREATE_PARTITIONS_FUNCTION = f"""
+CREATE OR REPLACE FUNCTION flight_observation_create_partitions(first_day date, last_day date) RETURNS integer
+LANGUAGE plpgsql AS $$
+DECLARE
+    day date := first_day;
+    lower_bound timestamptz;
+    upper_bound timestamptz;
+    partition_name text;
+    created integer := 0;
+BEGIN
+    WHILE day <= last_day LOOP
+        partition_name := '{TABLE}_p' || to_char(day, 'YYYYMMDD');
+        IF to_regclass(partition_name) IS NULL THEN
+            lower_bound := day::timestamp AT TIME ZONE 'UTC';
+            upper_bound := (day + 1)::timestamp AT TIME ZONE 'UTC';
+            EXECUTE format('CREATE TABLE %I (LIKE {TABLE} INCLUDING DEFAULTS)', partition_name);
+            EXECUTE format(
+                'WITH moved AS (DELETE FROM {TABLE}_default WHERE created_at >= %L AND created_at < %L RETURNING *) '
+                'INSERT INTO %I SELECT * FROM moved',
+                lower_bound, upper_bound, partition_name
+            );
+            EXECUTE format(
+                'ALTER TABLE {TABLE} ATTACH PARTITION %I FOR VALUES FROM (%L) TO (%L)',
+                partition_name, lower_bound, upper_bound
+            );
+            created := created + 1;
+        END IF;
+        day := day + 1;
+    END LOOP;
+    RETURN created;
+END;
+$$
+"""
+
+DROP_PARTITIONS_FUNCTION = f"""
+CREATE OR REPLACE FUNCTION flight_observation_drop_partitions(before_day date) RETURNS integer
+LANGUAGE plpgsql AS $$
+DECLARE
+    partition_name text;
+    dropped integer := 0;
+BEGIN
+    FOR partition_name IN
+        SELECT child.relname
+        FROM pg_inherits
+        JOIN pg_class child ON child.oid = pg_inherits.inhrelid
+        JOIN pg_class parent ON parent.oid = pg_inherits.inhparent
+        WHERE parent.relname = '{TABLE}'
+          AND child.relname ~ '_p[0-9]{{8}}$'
+          AND to_date(right(child.relname, 8), 'YYYYMMDD') < before_day
+    LOOP
+        EXECUTE format('DROP TABLE %I', partition_name);
+        dropped := dropped + 1;
+    END LOOP;
+    RETURN dropped;
+END;
+$$
+"""
+
+UTC_TODAY = "(now() AT TIME ZONE 'UTC')::date"
+
+
+def _create_composite_indexes() -> None:
+    op.create_index(SESSION_INDEX, TABLE, ["session_id", sa.text("created_at DESC")], if_not_exists=True)
+    op.create_index(ICAO_INDEX, TABLE, ["icao_address", sa.text("created_at DESC")], if_not_exists=True)
+
+
+def _is_partitioned(bind) -> bool:
+    if op.get_context().as_sql:
+        return False
+    return bool(bind.execute(sa.text(f"SELECT EXISTS (SELECT 1 FROM pg_partitioned_table WHERE partrelid = to_regclass('{TABLE}'))")).scalar())
+
+
+def _partition_by_day() -> None:
+    premake_days = int(settings.FLIGHT_OBSERVATION_PARTITION_PREMAKE_DAYS)
+    op.execute(f"ALTER TABLE {TABLE} RENAME TO {TABLE}_unpartitioned")
+    op.execute(f"CREATE TABLE {TABLE} (LIKE {TABLE}_unpartitioned INCLUDING DEFAULTS) PARTITION BY RANGE (created_at)")
+    op.execute(f"CREATE TABLE {TABLE}_default PARTITION OF {TABLE} DEFAULT")
+    op.execute(CREATE_PARTITIONS_FUNCTION)
+    op.execute(DROP_PARTITIONS_FUNCTION)
+    op.execute(
+        f"SELECT flight_observation_create_partitions("
+        f"COALESCE((SELECT min(created_at AT TIME ZONE 'UTC')::date FROM {TABLE}_unpartitioned), {UTC_TODAY}), "
+        f"{UTC_TODAY} + {premake_days})"
+    )
+    op.execute(f"INSERT INTO {TABLE} SELECT * FROM {TABLE}_unpartitioned")
+    # Dropping the old table frees its constraint and index names for the partitioned table.
+    op.execute(f"DROP TABLE {TABLE}_unpartitioned")
+    op.execute(f"ALTER TABLE {TABLE} ADD PRIMARY KEY (id, created_at)")
+    op.create_index(CREATED_AT_INDEX, TABLE, ["created_at"])
+    _create_composite_indexes()
+
+
+def _unpartition() -> None:
+    op.execute(f"ALTER TABLE {TABLE} RENAME TO {TABLE}_partitioned")
+    op.execute(f"ALTER TABLE {TABLE}_partitioned DROP CONSTRAINT {TABLE}_pkey")
+    for index_name in (CREATED_AT_INDEX, SESSION_INDEX, ICAO_INDEX):
+        op.execute(f"DROP INDEX IF EXISTS {index_name}")
+    op.execute(f"CREATE TABLE {TABLE} (LIKE {TABLE}_partitioned INCLUDING DEFAULTS)")
+    op.execute(f"INSERT INTO {TABLE} SELECT * FROM {TABLE}_partitioned")
+    op.execute(f"DROP TABLE {TABLE}_partitioned CASCADE")
+    op.execute("DROP FUNCTION IF EXISTS flight_observation_create_partitions(date, date)")
+    op.execute("DROP FUNCTION IF EXISTS flight_observation_drop_partitions(date)")
+    op.execute(f"ALTER TABLE {TABLE} ADD PRIMARY KEY (id)")
+    op.create_index(CREATED_AT_INDEX, TABLE, ["created_at"])
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    if bind.dialect.name == "postgresql" and settings.FLIGHT_OBSERVATION_PARTITIONING_ENABLED and not _is_partitioned(bind):
+        _partition_by_day()
+    else:
+        _create_composite_indexes()
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+    if bind.dialect.name == "postgresql" and _is_partitioned(bind):
+        _unpartition()
+    else:
+        op.drop_index(ICAO_INDEX, table_name=TABLE, if_exists=True)
+        op.drop_index(SESSION_INDEX, table_name=TABLE, if_exists=True)
@@ -0,0 +1,47 @@
+"""flight observation rollups
+
+Revision ID: 9b4f1e2c6a8d
+Revises: 5d2e7a41c9b3
+Create Date: 2026-10-18
+
+Adds flight_feed_operations_flightobservationrollup, the per-track, per-minute summaries the
+retention job writes before deleting raw flight observations (RETENTION_ROLLUP_OBSERVATIONS).
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+
+from alembic import op
+
+revision: str = "9b4f1e2c6a8d"
+down_revision: str | Sequence[str] | None = "5d2e7a41c9b3"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+TABLE = "flight_feed_operations_flightobservationrollup"
+
+
+def upgrade() -> None:
+    op.create_table(
+        TABLE,
+        sa.Column("id", sa.Uuid(), primary_key=True),
+        sa.Column("session_id", sa.Uuid(), nullable=True),
+        sa.Column("icao_address", sa.Text(), nullable=False),
+        sa.Column("minute_start", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("observation_count", sa.Integer(), nullable=False),
+        sa.Column("first_observed_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("last_observed_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("latitude_dd_avg", sa.Float(), nullable=False),
+        sa.Column("longitude_dd_avg", sa.Float(), nullable=False),
+        sa.Column("altitude_mm_min", sa.Float(), nullable=False),
+        sa.Column("altitude_mm_max", sa.Float(), nullable=False),
+        sa.UniqueConstraint("session_id", "icao_address", "minute_start", name="uq_flightobservationrollup_track_minute"),
+        if_not_exists=True,
+    )
+    op.create_index(f"ix_{TABLE}_minute_start", TABLE, ["minute_start"], if_not_exists=True)
+
+
+def downgrade() -> None:
+    op.drop_index(f"ix_{TABLE}_minute_start", table_name=TABLE)
+    op.drop_table(TABLE)
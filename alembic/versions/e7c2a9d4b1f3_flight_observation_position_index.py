@@ -0,0 +1,29 @@
+"""flight observation position index
+
+Revision ID: e7c2a9d4b1f3
+Revises: 9b4f1e2c6a8d
+Create Date: 2026-10-18
+
+Adds a (latitude_dd, longitude_dd) index on flight_feed_operations_flightobservation for the
+bounding-box prefilter of viewport queries.
+"""
+
+from collections.abc import Sequence
+
+from alembic import op
+
+revision: str = "e7c2a9d4b1f3"
+down_revision: str | Sequence[str] | None = "9b4f1e2c6a8d"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+TABLE = "flight_feed_operations_flightobservation"
+INDEX = "ix_flightobservation_latitude_dd_longitude_dd"
+
+
+def upgrade() -> None:
+    op.create_index(INDEX, TABLE, ["latitude_dd", "longitude_dd"], if_not_exists=True)
+
+
+def downgrade() -> None:
+    op.drop_index(INDEX, table_name=TABLE, if_exists=True)
@@ -0,0 +1,47 @@
+"""surveillance metrics rollups
+
+Revision ID: f4a8c3e1d925
+Revises: e7c2a9d4b1f3
+Create Date: 2026-10-18
+
+Adds surveillance_monitoring_operations_surveillancemetricsrollup, the per-session, per-minute
+heartbeat and track tick counts that get_service_metrics reads with
+SURVEILLANCE_METRICS_ROLLUP_ENABLED.
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+
+from alembic import op
+
+revision: str = "f4a8c3e1d925"
+down_revision: str | Sequence[str] | None = "e7c2a9d4b1f3"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+TABLE = "surveillance_monitoring_operations_surveillancemetricsrollup"
+INDEX = "ix_surveillancemetricsrollup_minute_start"
+
+
+def upgrade() -> None:
+    op.create_table(
+        TABLE,
+        sa.Column("id", sa.Uuid(), primary_key=True),
+        sa.Column("session_id", sa.Uuid(), nullable=False),
+        sa.Column("minute_start", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("heartbeat_count", sa.Integer(), nullable=False),
+        sa.Column("heartbeats_on_time", sa.Integer(), nullable=False),
+        sa.Column("first_heartbeat_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("last_heartbeat_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("track_ticks", sa.Integer(), nullable=False),
+        sa.Column("track_ticks_with_active_tracks", sa.Integer(), nullable=False),
+        sa.UniqueConstraint("session_id", "minute_start", name="uq_surveillancemetricsrollup_session_minute"),
+        if_not_exists=True,
+    )
+    op.create_index(INDEX, TABLE, ["minute_start"], if_not_exists=True)
+
+
+def downgrade() -> None:
+    op.drop_index(INDEX, table_name=TABLE)
+    op.drop_table(TABLE)
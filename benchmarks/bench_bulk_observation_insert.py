@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""Benchmark persisting flight observations: one ORM object per row vs the Core bulk insert.
+
+Usage:
+    uv run python benchmarks/bench_bulk_observation_insert.py [--observations 100000] [--batch-size 1000]
+
+Both paths write the same observations into a fresh SQLite file, one transaction per batch, the
+way the ingest tasks and the air traffic persister do. The ORM path is the previous
+``bulk_write_flight_observations``: build a FlightObservationORM per observation, ``add_all`` and
+flush. The Core path is the current one, an executemany INSERT of column-keyed rows (on Postgres the
+repository uses COPY instead, which this benchmark does not cover).
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import tempfile
+import time
+import uuid
+from pathlib import Path
+
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from flight_blender.db.session import Base
+from flight_blender.domain_types.flight_feed import SingleAirtrafficObservation
+from flight_blender.models.flight_feed_orm import FlightObservationORM
+from flight_blender.repositories.flight_feed_repo import SQLAlchemyFlightFeedRepository
+
+
+def _observations(count: int) -> list[SingleAirtrafficObservation]:
+    session_id = str(uuid.uuid4())
+    return [
+        SingleAirtrafficObservation(
+            lat_dd=46.0 + (i % 1000) / 10000,
+            lon_dd=7.0 + (i % 977) / 10000,
+            altitude_mm=100_000.0,
+            traffic_source=11,
+            source_type=1,
+            icao_address=f"ICAO{i % 5000:05d}",
+            timestamp=1_775_001_600_000 + i,
+            metadata={"seq": i},
+            session_id=session_id,
+        )
+        for i in range(count)
+    ]
+
+
+async def _orm_write(db, observations: list[SingleAirtrafficObservation]) -> None:
+    db.add_all(
+        [
+            FlightObservationORM(
+                session_id=uuid.UUID(o.session_id),
+                latitude_dd=o.lat_dd,
+                longitude_dd=o.lon_dd,
+                altitude_mm=o.altitude_mm,
+                traffic_source=o.traffic_source,
+                source_type=o.source_type,
+                icao_address=o.icao_address,
+                raw_metadata=json.dumps(o.metadata),
+            )
+            for o in observations
+        ]
+    )
+    await db.flush()
+
+
+async def _core_write(db, observations: list[SingleAirtrafficObservation]) -> None:
+    await SQLAlchemyFlightFeedRepository(db).bulk_write_flight_observations(observations)
+
+
+async def _run(label: str, write, observations: list[SingleAirtrafficObservation], batch_size: int, workdir: Path) -> float:
+    engine = create_async_engine(f"sqlite+aiosqlite:///{workdir / f'{label}.sqlite3'}")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    session_factory = async_sessionmaker(engine, expire_on_commit=False)
+
+    started = time.perf_counter()
+    for i in range(0, len(observations), batch_size):
+        async with session_factory() as db:
+            await write(db, observations[i : i + batch_size])
+            await db.commit()
+    elapsed = time.perf_counter() - started
+
+    async with session_factory() as db:
+        written = (await db.execute(select(func.count()).select_from(FlightObservationORM))).scalar_one()
+    await engine.dispose()
+    assert written == len(observations), f"{label} wrote {written} rows"
+    print(f"{label:<24} {elapsed:>9.2f} {len(observations) / elapsed:>12,.0f}")
+    return elapsed
+
+
+async def _main(args: argparse.Namespace) -> None:
+    observations = _observations(args.observations)
+    print(f"{args.observations:,} observations in batches of {args.batch_size}")
+    print(f"{'path':<24} {'seconds':>9} {'rows/s':>12}")
+    with tempfile.TemporaryDirectory() as workdir:
+        orm = await _run("ORM add_all", _orm_write, observations, args.batch_size, Path(workdir))
+        core = await _run("Core executemany", _core_write, observations, args.batch_size, Path(workdir))
+    print(f"speedup: {orm / core:.1f}x")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--observations", type=int, default=100_000, help="Observations to insert per path")
+    parser.add_argument("--batch-size", type=int, default=1000, help="Observations per transaction")
+    asyncio.run(_main(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
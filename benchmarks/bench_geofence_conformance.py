@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""Benchmark the C8 geofence check: per-check JSON parse and polygon scan vs the STRtree geofence index.
+
+Usage:
+    uv run python benchmarks/bench_geofence_conformance.py [--geofences 100 1000 10000] [--checks 200]
+
+The per-check baseline parses every active geofence's ``raw_geo_fence`` and tests the aircraft
+position against each polygon, which is what FlightBlenderConformanceEngine did for every
+telemetry point before the ActiveGeofenceIndex existed.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import time
+import uuid
+from types import SimpleNamespace
+
+import arrow
+from shapely.geometry import Point, Polygon
+
+from flight_blender.services.conformance_svc import ActiveGeofenceIndex
+
+
+def _make_geofences(count: int) -> list[SimpleNamespace]:
+    rng = random.Random(count)
+    now = arrow.utcnow()
+    geofences = []
+    for _ in range(count):
+        lng, lat, size = 6.0 + rng.random() * 4, 46.0 + rng.random() * 2, 0.001 + rng.random() * 0.01
+        ring = [[lng, lat], [lng + size, lat], [lng + size, lat + size], [lng, lat + size], [lng, lat]]
+        geofences.append(
+            SimpleNamespace(
+                id=uuid.uuid4(),
+                raw_geo_fence=json.dumps(
+                    {"type": "FeatureCollection", "features": [{"type": "Feature", "geometry": {"type": "Polygon", "coordinates": [ring]}}]}
+                ),
+                lower_limit=0,
+                upper_limit=120,
+                start_datetime=now.shift(hours=-1).datetime,
+                end_datetime=now.shift(hours=1).datetime,
+                updated_at=now.datetime,
+            )
+        )
+    return geofences
+
+
+def _per_check_breach(geofences: list[SimpleNamespace], lng: float, lat: float) -> bool:
+    """The previous C8 loop, kept here as the baseline."""
+    rid_location = Point(lng, lat)
+    for geofence in geofences:
+        for feature in json.loads(geofence.raw_geo_fence).get("features", []):
+            geometry = feature.get("geometry", {})
+            if geometry.get("type") == "Polygon" and rid_location.within(Polygon(geometry["coordinates"][0])):
+                return True
+    return False
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--geofences", type=int, nargs="+", default=[100, 1000, 10000])
+    parser.add_argument("--checks", type=int, default=200, help="Telemetry points checked per run")
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    points = [(6.0 + rng.random() * 4, 46.0 + rng.random() * 2) for _ in range(args.checks)]
+    now = arrow.utcnow()
+
+    print(f"{'geofences':>10} {'build ms':>10} {'per-check us':>14} {'indexed us':>12} {'speedup':>9}")
+    for count in args.geofences:
+        geofences = _make_geofences(count)
+
+        started = time.perf_counter()
+        index = ActiveGeofenceIndex()
+        index.sync(None, {str(g.id): g.updated_at for g in geofences}, geofences)
+        build = time.perf_counter() - started
+
+        started = time.perf_counter()
+        baseline = [_per_check_breach(geofences, lng, lat) for lng, lat in points]
+        per_check = (time.perf_counter() - started) / len(points)
+
+        started = time.perf_counter()
+        indexed = [bool(index.breached_geofences(lng, lat, at_time=now)) for lng, lat in points]
+        per_indexed = (time.perf_counter() - started) / len(points)
+
+        assert baseline == indexed, "indexed C8 result differs from the per-check scan"
+        print(f"{count:>10} {build * 1000:>10.1f} {per_check * 1e6:>14.0f} {per_indexed * 1e6:>12.1f} {per_check / per_indexed:>8.0f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""Benchmark SCDOperations.get_nearby_operational_intents against the local mock DSS / peer USS.
+
+Usage:
+    uv run python benchmarks/bench_nearby_operational_intents.py [--intents 50] [--volumes 3] [--latency-ms 25] [--repeat 3]
+
+Starts benchmarks/mock_uss_network.py in-process and compares the previous sequential flow (one
+blocking DSS query per volume, one DSS GET per reference and one peer GET per accumulated
+reference) with the concurrent, de-duplicated implementation.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import socket
+import threading
+import time
+from dataclasses import asdict
+from unittest.mock import patch
+
+import arrow
+import requests
+import uvicorn
+from mock_uss_network import create_app, make_peer_intents
+
+from flight_blender.clients.dss_scd_client import SCDOperations
+from flight_blender.config import settings
+from flight_blender.domain_types.scd import Altitude, LatLngPoint, Polygon, QueryOperationalIntentPayload, Time, Volume3D, Volume4D
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _start_server(app, port: int) -> uvicorn.Server:
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.01)
+    return server
+
+
+def _volumes(count: int) -> list[Volume4D]:
+    now = arrow.utcnow()
+    vertices = [LatLngPoint(lat=46.90, lng=7.40), LatLngPoint(lat=46.90, lng=7.50), LatLngPoint(lat=47.0, lng=7.50), LatLngPoint(lat=47.0, lng=7.40)]
+    return [
+        Volume4D(
+            volume=Volume3D(
+                outline_polygon=Polygon(vertices=vertices),
+                altitude_lower=Altitude(value=0, reference="W84", units="M"),
+                altitude_upper=Altitude(value=120, reference="W84", units="M"),
+            ),
+            time_start=Time(format="RFC3339", value=now.shift(minutes=i).isoformat()),
+            time_end=Time(format="RFC3339", value=now.shift(minutes=30 + i).isoformat()),
+        )
+        for i in range(count)
+    ]
+
+
+def _sequential_baseline(dss_base_url: str, volumes: list[Volume4D]) -> int:
+    """Request pattern of the previous implementation, kept here as the baseline. Returns the intents collected."""
+    headers = {"Content-Type": "application/json", "Authorization": "Bearer bench"}
+    all_references = []
+    collected = 0
+    for volume in volumes:
+        payload = json.loads(json.dumps(asdict(QueryOperationalIntentPayload(area_of_interest=volume))))
+        references = requests.post(dss_base_url + "dss/v1/operational_intent_references/query", json=payload, headers=headers, timeout=30).json()
+        for reference in references["operational_intent_references"]:
+            detail = requests.get(dss_base_url + "dss/v1/operational_intent_references/" + reference["id"], headers=headers, timeout=30).json()
+            all_references.append(detail["operational_intent_reference"])
+        for reference in all_references:
+            requests.get(reference["uss_base_url"] + "/uss/v1/operational_intents/" + reference["id"], headers=headers, timeout=30).json()
+            collected += 1
+    return collected
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--intents", type=int, default=50)
+    parser.add_argument("--volumes", type=int, default=3)
+    parser.add_argument("--latency-ms", type=float, default=25.0)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    port = _free_port()
+    base_url = f"http://127.0.0.1:{port}"
+    _start_server(create_app(make_peer_intents(args.intents, uss_base_url=base_url), args.latency_ms), port)
+
+    volumes = _volumes(args.volumes)
+    ops = SCDOperations()
+    ops.dss_base_url = base_url + "/"
+
+    timings = {"sequential": [], "concurrent": []}
+    results = {}
+    with patch.object(SCDOperations, "get_auth_token", lambda self, audience="": {"access_token": "bench"}):
+        for _ in range(args.repeat):
+            started = time.perf_counter()
+            results["sequential"] = _sequential_baseline(ops.dss_base_url, volumes)
+            timings["sequential"].append(time.perf_counter() - started)
+
+            started = time.perf_counter()
+            results["concurrent"] = len(asyncio.run(ops.get_nearby_operational_intents(volumes=volumes)))
+            timings["concurrent"].append(time.perf_counter() - started)
+
+    print(f"{args.intents} peer intents, {args.volumes} volumes, {args.latency_ms:.0f} ms simulated latency")
+    print(f"per-host limit {settings.SCD_PEER_MAX_CONCURRENCY_PER_HOST}, deadline {settings.SCD_PEER_REQUEST_DEADLINE_SECS}s")
+    print(f"{'flow':<12} {'intents':>8} {'best s':>8}")
+    for label, values in timings.items():
+        print(f"{label:<12} {results[label]:>8} {min(values):>8.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""Benchmark air traffic stream ingest: per-message XADD + PEXPIRE vs pipelined batch XADD.
+
+Usage:
+    uv run python benchmarks/bench_redis_stream_ingest.py [--redis-url redis://localhost:6379/15] [--chunks 40] [--chunk-size 250]
+
+Without ``--redis-url`` the benchmark runs against fakeredis, which shows the
+round-trip reduction but understates the latency win of a real network hop.
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+
+import fakeredis
+import redis
+
+from flight_blender.clients.redis_client import RedisStreamOperations
+
+STREAM_NAME = "bench_air_traffic_stream"
+
+
+class RoundTripCounter:
+    """Proxy around a Redis client that counts round trips (direct commands and pipeline executions)."""
+
+    def __init__(self, client: redis.Redis):
+        self._client = client
+        self.round_trips = 0
+
+    def pipeline(self, *args, **kwargs):
+        pipeline = self._client.pipeline(*args, **kwargs)
+        execute = pipeline.execute
+
+        def _counted_execute(*a, **kw):
+            self.round_trips += 1
+            return execute(*a, **kw)
+
+        pipeline.execute = _counted_execute
+        return pipeline
+
+    def __getattr__(self, name):
+        attr = getattr(self._client, name)
+        if not callable(attr):
+            return attr
+
+        def _counted(*args, **kwargs):
+            self.round_trips += 1
+            return attr(*args, **kwargs)
+
+        return _counted
+
+
+def _make_chunk(chunk_index: int, chunk_size: int) -> list[dict]:
+    return [
+        {
+            "session_id": "bench-session",
+            "icao_address": f"{chunk_index:04X}{i:04X}",
+            "lat_dd": 46.97 + i * 1e-5,
+            "lon_dd": 7.47 + i * 1e-5,
+            "altitude_mm": 120000.0,
+            "traffic_source": 1,
+            "source_type": 1,
+            "timestamp": 1700000000 + chunk_index,
+            "metadata": {"velocity": 12.5},
+        }
+        for i in range(chunk_size)
+    ]
+
+
+def _legacy_add(ops: RedisStreamOperations, observation: dict, ttl_ms: int) -> None:
+    """The previous per-observation write: one XADD followed by one PEXPIRE on the stream key."""
+    ops.redis.xadd(STREAM_NAME, ops._serialize_observation(observation))
+    ops.redis.pexpire(STREAM_NAME, ttl_ms)
+
+
+def run(client: redis.Redis, chunks: int, chunk_size: int, ttl_ms: int) -> None:
+    total = chunks * chunk_size
+    results = {}
+
+    for label in ("per-message", "batch"):
+        client.delete(STREAM_NAME)
+        counter = RoundTripCounter(client)
+        ops = RedisStreamOperations.__new__(RedisStreamOperations)
+        ops.redis = counter
+        payloads = [_make_chunk(c, chunk_size) for c in range(chunks)]
+
+        started = time.perf_counter()
+        for chunk in payloads:
+            if label == "per-message":
+                for observation in chunk:
+                    _legacy_add(ops, observation, ttl_ms)
+            else:
+                ops.add_air_traffic_data_batch(STREAM_NAME, chunk)
+        elapsed = time.perf_counter() - started
+        results[label] = (counter.round_trips, elapsed)
+
+    client.delete(STREAM_NAME)
+    print(f"{total} observations in {chunks} chunks of {chunk_size}")
+    print(f"{'path':<12} {'round trips':>12} {'seconds':>10} {'obs/s':>12}")
+    for label, (round_trips, elapsed) in results.items():
+        print(f"{label:<12} {round_trips:>12} {elapsed:>10.3f} {total / elapsed:>12.0f}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--redis-url", default=None, help="Redis URL to benchmark against, defaults to fakeredis")
+    parser.add_argument("--chunks", type=int, default=40)
+    parser.add_argument("--chunk-size", type=int, default=250)
+    parser.add_argument("--ttl-ms", type=int, default=4000)
+    args = parser.parse_args()
+
+    if args.redis_url:
+        client = redis.Redis.from_url(args.redis_url, decode_responses=True)
+    else:
+        client = fakeredis.FakeRedis(decode_responses=True)
+
+    run(client, args.chunks, args.chunk_size, args.ttl_ms)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""Benchmark track message generation: per-track kinematics loop vs the columnar NumPy path.
+
+Usage:
+    uv run python benchmarks/bench_track_kinematics.py [--tracks 100 1000 10000] [--history 10] [--repeat 5]
+
+The per-track baseline rebuilds a SingleAirtrafficObservation for every stored
+observation, parses both timestamps with arrow and calls Geod.inv once per track,
+which is what BaseTrafficDataFuser._generate_track_messages_impl used to do.
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import time
+from dataclasses import asdict
+from unittest.mock import MagicMock
+
+import arrow
+
+from flight_blender.domain_types.flight_feed import SingleAirtrafficObservation
+from flight_blender.domain_types.surveillance import ActiveTrack, AircraftPosition, AircraftState, LatLangAltPoint, SpeedAccuracy, TrackMessage
+from flight_blender.services.surveillance_svc import TrafficDataFuser
+
+
+def _make_tracks(count: int, history: int) -> list[ActiveTrack]:
+    rng = random.Random(count)
+    tracks = []
+    for i in range(count):
+        lat, lon, alt_mm = 46.0 + rng.random(), 7.0 + rng.random(), 100000.0
+        observations = []
+        for step in range(history):
+            observations.append(
+                asdict(
+                    SingleAirtrafficObservation(
+                        icao_address=f"{i:06X}",
+                        traffic_source=1,
+                        source_type=1,
+                        lat_dd=lat + step * 1e-4,
+                        lon_dd=lon + step * 1e-4,
+                        altitude_mm=alt_mm + step * 500,
+                        timestamp=1700000000 + step,
+                        metadata={},
+                    )
+                )
+            )
+        tracks.append(ActiveTrack(session_id="bench", unique_aircraft_identifier=f"{i:06X}", last_updated_timestamp="", observations=observations))
+    return tracks
+
+
+def _per_track_messages(fuser: TrafficDataFuser, active_tracks: list[ActiveTrack]) -> list[TrackMessage]:
+    """The previous row-at-a-time implementation, kept here as the baseline."""
+    all_track_data = []
+    for track in active_tracks:
+        fused_observations = [SingleAirtrafficObservation(**obs) for obs in track.observations]
+        latest = fused_observations[-1]
+        previous = fused_observations[-2] if len(fused_observations) > 1 else latest
+        speed_mps, bearing_degrees, vertical_speed_mps = fuser._generate_flight_speed_bearing(
+            adjacent_points=[
+                LatLangAltPoint(lat=previous.lat_dd, lng=-previous.lon_dd, alt=previous.altitude_mm / 1000.0),
+                LatLangAltPoint(lat=latest.lat_dd, lng=-latest.lon_dd, alt=latest.altitude_mm / 1000.0),
+            ],
+            delta_time_secs=(arrow.get(latest.timestamp) - arrow.get(previous.timestamp)).total_seconds(),
+        )
+        aircraft_state = AircraftState(
+            position=AircraftPosition(
+                lat=latest.lat_dd,
+                lng=-latest.lon_dd,
+                alt=latest.altitude_mm,
+                accuracy_h="SA1mps",
+                accuracy_v="SA3mps",
+                extrapolated=True,
+                pressure_altitude=latest.altitude_mm,
+            ),
+            speed=speed_mps,
+            track=bearing_degrees,
+            vertical_speed=vertical_speed_mps,
+            speed_accuracy=SpeedAccuracy("SA1mps"),
+        )
+        all_track_data.append(
+            TrackMessage(
+                sdsdp_identifier=fuser.SDSP_IDENTIFIER,
+                unique_aircraft_identifier=track.unique_aircraft_identifier,
+                state=aircraft_state,
+                timestamp=arrow.utcnow().isoformat(),
+                source="FusedSource",
+                track_state="Active",
+            )
+        )
+    return all_track_data
+
+
+def _best_of(repeat: int, fn) -> float:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tracks", type=int, nargs="+", default=[100, 1000, 10000])
+    parser.add_argument("--history", type=int, default=10, help="Stored observations per track")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    fuser = TrafficDataFuser(session_id="bench", raw_observations=[], track_store=MagicMock())
+    print(f"{'tracks':>8} {'per-track ms':>14} {'columnar ms':>13} {'speedup':>9}")
+    for count in args.tracks:
+        tracks = _make_tracks(count, args.history)
+        per_track = _best_of(args.repeat, lambda: _per_track_messages(fuser, tracks))
+        columnar = _best_of(args.repeat, lambda: fuser._generate_track_messages_impl(tracks))
+        print(f"{count:>8} {per_track * 1000:>14.1f} {columnar * 1000:>13.1f} {per_track / columnar:>8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""Benchmark viewport queries on flight observations: Python-side filtering vs the SQL bounding-box prefilter.
+
+Usage:
+    uv run python benchmarks/bench_view_port_prefilter.py [--observations 1000000] [--repeat 3]
+
+A fresh SQLite file is seeded with observations spread over a 3 by 5 degree area, all inside the
+query's time window, the way a busy feed looks to ``get_air_traffic``. Each viewport is queried two
+ways. The Python path is the previous one: load every row in the window and test each with
+``shapely.contains(box, Point(lat, lon))``. The prefilter path is the current one: pass the box's
+bounds to the repository so SQL only returns rows in the bounding rectangle, found through the
+(latitude_dd, longitude_dd) index, then run the exact test once with ``shapely.contains_xy``.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import sqlite3
+import tempfile
+import time
+from datetime import datetime, timezone
+from operator import attrgetter
+from pathlib import Path
+
+import shapely
+from shapely.geometry import Point, box
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from flight_blender.db.session import Base
+from flight_blender.models.flight_feed_orm import FlightObservationORM
+from flight_blender.repositories.flight_feed_repo import SQLAlchemyFlightFeedRepository
+from flight_blender.services.flight_feed_svc import _in_view_port
+
+TABLE = FlightObservationORM.__tablename__
+FIRST_CREATED_AT = 1_775_001_600
+
+# latitude min, longitude min, latitude max, longitude max; latitude is x in viewport boxes
+VIEW_PORTS = {
+    "small (0.05 x 0.05 deg)": (46.50, 7.50, 46.55, 7.55),
+    "large (1.5 x 2.5 deg)": (45.50, 6.00, 47.00, 8.50),
+}
+
+SEED_SQL = """
+WITH RECURSIVE seq(n) AS (SELECT 0 UNION ALL SELECT n + 1 FROM seq WHERE n < {last})
+INSERT INTO {table} (
+    id, session_id, latitude_dd, longitude_dd, altitude_mm, traffic_source, source_type,
+    icao_address, metadata, sensor_timestamp, created_at, updated_at
+)
+SELECT
+    printf('%032x', n + 1), printf('%032x', n % 100), 45.0 + ((n * 7919) % 30000) / 10000.0,
+    5.0 + ((n * 104729) % 50000) / 10000.0, 100000.0, 1, 1, printf('ICAO%05d', n % 5000), '{{}}', NULL,
+    strftime('%Y-%m-%d %H:%M:%f000', {first} + n % 20, 'unixepoch'),
+    strftime('%Y-%m-%d %H:%M:%f000', {first} + n % 20, 'unixepoch')
+FROM seq
+"""
+
+
+def _seed(path: Path, count: int) -> None:
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(engine, tables=[FlightObservationORM.__table__])
+    engine.dispose()
+    with sqlite3.connect(path) as conn:
+        conn.execute(SEED_SQL.format(last=count - 1, table=TABLE, first=FIRST_CREATED_AT))
+        conn.execute("ANALYZE")
+
+
+async def _python_filter(repo: SQLAlchemyFlightFeedRepository, after: datetime, view_port: tuple) -> int:
+    view_port_box = box(*view_port)
+    rows = await repo.get_recent_flight_observations(after_datetime=after)
+    return sum(1 for row in rows if shapely.contains(view_port_box, Point(row.latitude_dd, row.longitude_dd)))
+
+
+async def _sql_prefilter(repo: SQLAlchemyFlightFeedRepository, after: datetime, view_port: tuple) -> int:
+    view_port_box = box(*view_port)
+    rows = await repo.get_recent_flight_observations(after_datetime=after, bounds=view_port_box.bounds)
+    return len(_in_view_port(view_port_box, rows, attrgetter("latitude_dd", "longitude_dd")))
+
+
+async def _time(session_factory, query, view_port: tuple, repeat: int) -> tuple[float, int]:
+    after = datetime.fromtimestamp(FIRST_CREATED_AT, tz=timezone.utc)
+    best, matched = float("inf"), 0
+    for _ in range(repeat):
+        async with session_factory() as db:
+            started = time.perf_counter()
+            matched = await query(SQLAlchemyFlightFeedRepository(db), after, view_port)
+            best = min(best, time.perf_counter() - started)
+    return best, matched
+
+
+async def _main(args: argparse.Namespace) -> None:
+    with tempfile.TemporaryDirectory() as workdir:
+        path = Path(workdir) / "observations.sqlite3"
+        started = time.perf_counter()
+        _seed(path, args.observations)
+        print(f"seeded {args.observations:,} observations in {time.perf_counter() - started:.1f} s, best of {args.repeat}")
+
+        engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+        session_factory = async_sessionmaker(engine, expire_on_commit=False)
+        print(f"{'viewport':<26} {'matched':>9} {'python s':>9} {'prefilter s':>12} {'speedup':>8}")
+        for label, view_port in VIEW_PORTS.items():
+            python_s, python_matched = await _time(session_factory, _python_filter, view_port, args.repeat)
+            prefilter_s, prefilter_matched = await _time(session_factory, _sql_prefilter, view_port, args.repeat)
+            assert python_matched == prefilter_matched, f"{label}: {python_matched} != {prefilter_matched}"
+            print(f"{label:<26} {prefilter_matched:>9,} {python_s:>9.2f} {prefilter_s:>12.2f} {python_s / prefilter_s:>7.1f}x")
+        await engine.dispose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--observations", type=int, default=1_000_000, help="Observations to seed")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per viewport and path; the fastest is reported")
+    asyncio.run(_main(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""Local mock of a DSS and peer USSs for benchmarking strategic deconfliction planning latency.
+
+Usage:
+    uv run python benchmarks/mock_uss_network.py [--port 8085] [--intents 50] [--latency-ms 25]
+
+Serves, on one port:
+    POST /dss/v1/operational_intent_references/query    every mock intent, whatever the area of interest
+    GET  /dss/v1/operational_intent_references/{id}     the DSS reference of one intent
+    GET  /uss/v1/operational_intents/{id}               the peer USS details of one intent
+
+Each response is delayed by ``--latency-ms`` to stand in for a network round trip. Peer intents
+advertise ``http://<host>:<port>`` as their ``uss_base_url`` so SCDOperations calls back into this
+server for the details.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import uuid
+
+import arrow
+import uvicorn
+from fastapi import FastAPI, HTTPException
+
+
+def _volume(index: int, start: str, end: str) -> dict:
+    lng, lat = 7.40 + index * 1e-3, 46.90 + index * 1e-3
+    return {
+        "volume": {
+            "outline_polygon": {
+                "vertices": [
+                    {"lat": lat, "lng": lng},
+                    {"lat": lat, "lng": lng + 1e-3},
+                    {"lat": lat + 1e-3, "lng": lng + 1e-3},
+                    {"lat": lat + 1e-3, "lng": lng},
+                ]
+            },
+            "outline_circle": None,
+            "altitude_lower": {"value": 0, "reference": "W84", "units": "M"},
+            "altitude_upper": {"value": 120, "reference": "W84", "units": "M"},
+        },
+        "time_start": {"format": "RFC3339", "value": start},
+        "time_end": {"format": "RFC3339", "value": end},
+    }
+
+
+def make_peer_intents(count: int, uss_base_url: str) -> dict[str, dict]:
+    """``{id: {"reference": ..., "details": ...}}`` for ``count`` peer operational intents."""
+    now = arrow.utcnow()
+    start, end = now.shift(minutes=5).isoformat(), now.shift(minutes=35).isoformat()
+    intents = {}
+    for index in range(count):
+        intent_id = str(uuid.UUID(int=index + 1))
+        reference = {
+            "id": intent_id,
+            "manager": "mock-peer-uss",
+            "uss_availability": "Normal",
+            "version": 1,
+            "state": "Accepted",
+            "ovn": f"ovn-{index}",
+            "time_start": {"format": "RFC3339", "value": start},
+            "time_end": {"format": "RFC3339", "value": end},
+            "uss_base_url": uss_base_url,
+            "subscription_id": str(uuid.uuid4()),
+        }
+        details = {"volumes": [_volume(index, start, end)], "off_nominal_volumes": [], "priority": 0}
+        intents[intent_id] = {"reference": reference, "details": details}
+    return intents
+
+
+def create_app(intents: dict[str, dict], latency_ms: float = 0.0) -> FastAPI:
+    app = FastAPI(title="Mock DSS and peer USS")
+    delay = latency_ms / 1000
+
+    @app.post("/dss/v1/operational_intent_references/query")
+    async def query_operational_intent_references(body: dict):
+        await asyncio.sleep(delay)
+        return {"operational_intent_references": [intent["reference"] for intent in intents.values()]}
+
+    @app.get("/dss/v1/operational_intent_references/{entity_id}")
+    async def get_operational_intent_reference(entity_id: str):
+        await asyncio.sleep(delay)
+        if entity_id not in intents:
+            raise HTTPException(status_code=404)
+        return {"operational_intent_reference": intents[entity_id]["reference"]}
+
+    @app.get("/uss/v1/operational_intents/{entity_id}")
+    async def get_operational_intent_details(entity_id: str):
+        await asyncio.sleep(delay)
+        if entity_id not in intents:
+            raise HTTPException(status_code=404)
+        return {"operational_intent": intents[entity_id]}
+
+    return app
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8085)
+    parser.add_argument("--intents", type=int, default=50)
+    parser.add_argument("--latency-ms", type=float, default=25.0)
+    args = parser.parse_args()
+
+    intents = make_peer_intents(args.intents, uss_base_url=f"http://{args.host}:{args.port}")
+    uvicorn.run(create_app(intents, args.latency_ms), host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
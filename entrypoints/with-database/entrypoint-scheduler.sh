@@ -0,0 +1,12 @@
+#!/bin/bash
+
+set -e
+
+source .venv/bin/activate
+
+echo Waiting for DBs...
+if ! wait-for-it --parallel --service $REDIS_HOST:$REDIS_PORT --service $POSTGRES_HOST:$POSTGRES_PORT; then
+    exit 1
+fi
+
+python -m flight_blender.tasks.tick_scheduler
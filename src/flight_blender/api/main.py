@@ -1,3 +1,5 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 
 from flight_blender.api.routers import (
@@ -15,10 +17,24 @@ from flight_blender.api.routers import (
     uss_api,
     weather_api,
 )
+from flight_blender.auth.token_cache import redis_registry
+from flight_blender.config import settings
+from flight_blender.plugins.registry import plugin_instances
+from flight_blender.services import deconfliction_engine, realtime_svc
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    if settings.FLIGHT_BLENDER_PLUGIN_DECONFLICTION_ENGINE == "flight_blender.services.deconfliction_engine.DefaultDeconflictionEngine":
+        await deconfliction_engine.warm_load_deconfliction_index()
+    yield
+    plugin_instances.teardown()
+    await realtime_svc.realtime_hub.close()
+    await redis_registry.aclose()
 
 
 def create_fastapi_app() -> FastAPI:
-    app = FastAPI(title="Flight Blender")
+    app = FastAPI(title="Flight Blender", lifespan=lifespan)
     app.include_router(misc_api.router)
     app.include_router(geo_fence_api.router)
     app.include_router(weather_api.router)
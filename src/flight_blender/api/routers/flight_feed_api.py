@@ -9,6 +9,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from flight_blender.api.dependencies import require_scopes
 from flight_blender.auth.pki import MessageVerifier, ResponseSigningOperations
 from flight_blender.auth.token_cache import get_redis
+from flight_blender.config import settings
 from flight_blender.db.session import async_get_db
 from flight_blender.domain_types.common import FLIGHTBLENDER_READ_SCOPE, FLIGHTBLENDER_WRITE_SCOPE
 from flight_blender.repositories.flight_feed_repo import SQLAlchemyFlightFeedRepository
@@ -30,6 +31,11 @@ async def _ops(db: AsyncSession = Depends(async_get_db)) -> FlightFeedOperations
     )
 
 
+def _ingest_response(result: dict, status_code: int) -> JSONResponse:
+    headers = {"Retry-After": str(settings.FLIGHT_FEED_INGEST_RETRY_AFTER_SECS)} if status_code in (429, 503) else None
+    return JSONResponse(result, status_code=status_code, headers=headers)
+
+
 # ── Air Traffic ───────────────────────────────────────────────────────────────
 
 
@@ -41,7 +47,7 @@ async def set_air_traffic(
     _auth: Any = Depends(require_scopes([FLIGHTBLENDER_WRITE_SCOPE])),
 ):
     result, status_code = await ops.set_air_traffic(session_id=session_id, body=body)
-    return JSONResponse(result, status_code=status_code)
+    return _ingest_response(result, status_code)
 
 
 @router.post("/bulk_set_air_traffic/{session_id}", status_code=201)
@@ -52,17 +58,18 @@ async def bulk_set_air_traffic(
     _auth: Any = Depends(require_scopes([FLIGHTBLENDER_WRITE_SCOPE])),
 ):
     result, status_code = await ops.bulk_set_air_traffic(session_id=session_id, body=body)
-    return JSONResponse(result, status_code=status_code)
+    return _ingest_response(result, status_code)
 
 
 @router.get("/get_air_traffic/{session_id}")
 async def get_air_traffic(
     session_id: uuid.UUID,
     view: str | None = None,
+    cursor: str | None = None,
     ops: FlightFeedOperations = Depends(_ops),
     _auth: Any = Depends(require_scopes([FLIGHTBLENDER_READ_SCOPE])),
 ):
-    result, status_code = await ops.get_air_traffic(session_id=session_id, view=view)
+    result, status_code = await ops.get_air_traffic(session_id=session_id, view=view, cursor=cursor)
     return JSONResponse(result, status_code=status_code)
 
 
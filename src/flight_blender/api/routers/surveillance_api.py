@@ -8,7 +8,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from flight_blender.api.dependencies import require_scopes
 from flight_blender.db.session import async_get_db
 from flight_blender.domain_types.common import FLIGHTBLENDER_READ_SCOPE, FLIGHTBLENDER_WRITE_SCOPE
-from flight_blender.repositories.flight_feed_repo import SQLAlchemyFlightFeedRepository
+from flight_blender.domain_types.surveillance import SurveillanceSubscription
 from flight_blender.repositories.surveillance_repo import SQLAlchemySurveillanceRepository
 from flight_blender.schemas.surveillance import SensorHealthUpdate, SurveillanceSessionAction
 from flight_blender.services.surveillance_svc import SurveillanceOperations
@@ -18,9 +18,7 @@ router = APIRouter(prefix="/surveillance_monitoring_ops")
 
 
 async def _ops(db: AsyncSession = Depends(async_get_db)) -> SurveillanceOperations:
-    surveillance_repo = SQLAlchemySurveillanceRepository(db)
-    flight_feed_repo = SQLAlchemyFlightFeedRepository(db)
-    return SurveillanceOperations(repo=surveillance_repo, scheduler=TaskSchedulerService, flight_feed_repo=flight_feed_repo)
+    return SurveillanceOperations(repo=SQLAlchemySurveillanceRepository(db), scheduler=TaskSchedulerService)
 
 
 @router.get("/health/")
@@ -38,7 +36,8 @@ async def start_stop_surveillance_heartbeat_track(
     ops: SurveillanceOperations = Depends(_ops),
     _auth: Any = Depends(require_scopes([FLIGHTBLENDER_WRITE_SCOPE])),
 ):
-    result, status_code = await ops.start_stop_surveillance_session(session_id=surveillance_session_id, action=body.action)
+    subscription = SurveillanceSubscription.from_dict(body.model_dump(exclude={"action"}))
+    result, status_code = await ops.start_stop_surveillance_session(session_id=surveillance_session_id, action=body.action, subscription=subscription)
     return JSONResponse(result, status_code=status_code)
 
 
@@ -1,4 +1,9 @@
+import asyncio
 import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Any
 from urllib.parse import urlparse
 
 import httpx
@@ -21,6 +26,137 @@ async def _fetch_jwks(url: str) -> dict:
             return {}
 
 
+class JWKSCache:
+    """Process-wide cache of the parsed public keys from the Passport and DSS JWKS endpoints.
+
+    Keys are refetched once they are older than ``ttl_secs`` and immediately when a token names a
+    ``kid`` that is not cached, so a key rotation is picked up on the first request that needs it.
+    Concurrent callers on the same event loop share one in-flight refresh, and refresh attempts are
+    spaced at least ``min_refresh_interval_secs`` apart so unknown or forged ``kid`` values, or an
+    unreachable JWKS endpoint, cannot turn every request into an outbound fetch. A failed refresh
+    keeps serving the previous keys. ``RSAAlgorithm.from_jwk`` only runs for JWKs that changed.
+    """
+
+    def __init__(self, ttl_secs: float, min_refresh_interval_secs: float):
+        self.ttl_secs = ttl_secs
+        self.min_refresh_interval_secs = min_refresh_interval_secs
+        self._keys: dict[str, Any] = {}
+        self._parsed: dict[str, tuple[str, Any]] = {}
+        self._loaded_at: float | None = None
+        self._attempted_at: float | None = None
+        self._inflight: tuple[asyncio.AbstractEventLoop, asyncio.Task] | None = None
+
+    @property
+    def has_keys(self) -> bool:
+        return bool(self._keys)
+
+    def _needs_refresh(self, kid: str | None) -> bool:
+        now = time.monotonic()
+        if self._attempted_at is not None and now - self._attempted_at < self.min_refresh_interval_secs:
+            return False
+        if self._loaded_at is None or now - self._loaded_at >= self.ttl_secs:
+            return True
+        return bool(kid) and kid not in self._keys
+
+    async def get_key(self, kid: str | None) -> Any | None:
+        if self._needs_refresh(kid):
+            await self.refresh()
+        return self._keys.get(kid) if kid else None
+
+    def current_key(self, kid: str | None) -> Any | None:
+        """The cached key for ``kid`` without triggering a refresh."""
+        return self._keys.get(kid) if kid else None
+
+    async def refresh(self) -> None:
+        loop = asyncio.get_running_loop()
+        if self._inflight is not None and self._inflight[0] is loop and not self._inflight[1].done():
+            task = self._inflight[1]
+        else:
+            task = loop.create_task(self._refresh())
+            self._inflight = (loop, task)
+        await asyncio.shield(task)
+
+    async def _refresh(self) -> None:
+        self._attempted_at = time.monotonic()
+        urls = list(dict.fromkeys([settings.PASSPORT_JWKS_URL, settings.DSS_AUTH_JWKS_ENDPOINT]))
+        responses = await asyncio.gather(*(_fetch_jwks(url) for url in urls))
+        all_keys = [jwk for jwks in responses for jwk in jwks.get("keys", [])]
+        if not all_keys:
+            if self._keys:
+                logger.warning("JWKS refresh returned no keys, keeping {} cached keys", len(self._keys))
+            return
+
+        parsed: dict[str, tuple[str, Any]] = {}
+        for jwk in all_keys:
+            kid = jwk.get("kid")
+            fingerprint = json.dumps(jwk, sort_keys=True)
+            previous = self._parsed.get(kid)
+            if previous is not None and previous[0] == fingerprint:
+                parsed[kid] = previous
+                continue
+            try:
+                parsed[kid] = (fingerprint, RSAAlgorithm.from_jwk(fingerprint))
+            except Exception as exc:
+                logger.warning("Skipping malformed JWK kid={}: {}", kid, exc)
+
+        self._parsed = parsed
+        self._keys = {kid: key for kid, (_fingerprint, key) in parsed.items()}
+        self._loaded_at = time.monotonic()
+
+    def clear(self) -> None:
+        self._keys = {}
+        self._parsed = {}
+        self._loaded_at = None
+        self._attempted_at = None
+        self._inflight = None
+
+
+class VerifiedTokenCache:
+    """Bounded LRU of tokens whose signature and claims have already been verified.
+
+    An entry is only served until the token's ``exp`` and while the JWKS cache still holds the key
+    that verified it, so expired tokens and tokens signed by a rotated-out key are verified again
+    (and rejected) instead of being answered from the cache. Scopes are checked on every request.
+    """
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: OrderedDict[str, tuple[float, Any, dict]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, token: str, key: Any) -> dict | None:
+        with self._lock:
+            cached = self._entries.get(token)
+            if cached is None:
+                return None
+            expires_at, verified_with, decoded = cached
+            if time.time() >= expires_at or verified_with is not key:
+                del self._entries[token]
+                return None
+            self._entries.move_to_end(token)
+            return decoded
+
+    def put(self, token: str, key: Any, decoded: dict) -> None:
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            self._entries[token] = (float(decoded["exp"]), key, decoded)
+            self._entries.move_to_end(token)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+jwks_cache = JWKSCache(ttl_secs=settings.JWKS_CACHE_TTL_SECS, min_refresh_interval_secs=settings.JWKS_MIN_REFRESH_INTERVAL_SECS)
+verified_token_cache = VerifiedTokenCache(max_entries=settings.VERIFIED_TOKEN_CACHE_MAX_ENTRIES)
+
+
 def _check_scopes(decoded: dict, required_scopes: list[str], allow_any: bool = False) -> bool:
     granted = set(decoded.get("scope", "").split())
     if allow_any:
@@ -55,53 +191,44 @@ def _validate_bypass_token(token: str, required_scopes: list[str], allow_any: bo
 async def validate_token(token: str, required_scopes: list[str], allow_any: bool = False) -> dict:
     """Validate JWT and check scopes. Returns decoded payload."""
     try:
-        jwt.get_unverified_header(token)
+        unverified_header = jwt.get_unverified_header(token)
     except jwt.DecodeError:
         raise HTTPException(status.HTTP_401_UNAUTHORIZED, detail="Bearer token could not be decoded")
 
     if settings.BYPASS_AUTH_TOKEN_VERIFICATION:
         return _validate_bypass_token(token, required_scopes, allow_any)
 
-    passport_jwks = await _fetch_jwks(settings.PASSPORT_JWKS_URL)
-    dss_jwks = await _fetch_jwks(settings.DSS_AUTH_JWKS_ENDPOINT)
-
-    all_keys = passport_jwks.get("keys", []) + dss_jwks.get("keys", [])
-    if not all_keys:
-        raise HTTPException(status.HTTP_400_BAD_REQUEST, detail="Could not fetch public keys for token validation")
-
-    public_keys = {}
-    for jwk in all_keys:
-        try:
-            public_keys[jwk["kid"]] = RSAAlgorithm.from_jwk(json.dumps(jwk))
-        except Exception as exc:
-            logger.warning("Skipping malformed JWK kid={}: {}", jwk.get("kid"), exc)
-
-    unverified_header = jwt.get_unverified_header(token)
     kid = unverified_header.get("kid")
-    if not kid or kid not in public_keys:
+    public_key = await jwks_cache.get_key(kid)
+    if not jwks_cache.has_keys:
+        raise HTTPException(status.HTTP_400_BAD_REQUEST, detail="Could not fetch public keys for token validation")
+    if public_key is None:
         raise HTTPException(status.HTTP_401_UNAUTHORIZED, detail=f"Signing key id {kid} not found in JWKS")
 
-    try:
-        decoded = jwt.decode(
-            token,
-            public_keys[kid],
-            audience=settings.PASSPORT_AUDIENCE,
-            algorithms=["RS256"],
-            options={"require": ["exp", "iss", "aud"]},
-        )
-    except (
-        jwt.ImmatureSignatureError,
-        jwt.ExpiredSignatureError,
-        jwt.InvalidAudienceError,
-        jwt.InvalidIssuerError,
-        jwt.InvalidSignatureError,
-        jwt.DecodeError,
-        jwt.exceptions.MissingRequiredClaimError,
-    ) as e:
-        logger.error(f"Token verification failed: {e}")
-        raise HTTPException(status.HTTP_401_UNAUTHORIZED, detail=f"Invalid token: {e}")
+    decoded = verified_token_cache.get(token, public_key)
+    if decoded is None:
+        try:
+            decoded = jwt.decode(
+                token,
+                public_key,
+                audience=settings.PASSPORT_AUDIENCE,
+                algorithms=["RS256"],
+                options={"require": ["exp", "iss", "aud"]},
+            )
+        except (
+            jwt.ImmatureSignatureError,
+            jwt.ExpiredSignatureError,
+            jwt.InvalidAudienceError,
+            jwt.InvalidIssuerError,
+            jwt.InvalidSignatureError,
+            jwt.DecodeError,
+            jwt.exceptions.MissingRequiredClaimError,
+        ) as e:
+            logger.error(f"Token verification failed: {e}")
+            raise HTTPException(status.HTTP_401_UNAUTHORIZED, detail=f"Invalid token: {e}")
+        verified_token_cache.put(token, public_key, decoded)
 
     if not _check_scopes(decoded, required_scopes, allow_any):
         raise HTTPException(status.HTTP_403_FORBIDDEN, detail="Insufficient scope")
 
-    return decoded
+    return dict(decoded)
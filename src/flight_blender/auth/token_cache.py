@@ -1,40 +1,168 @@
+import asyncio
+import os
+import threading
+
 import redis
 import redis.asyncio as aioredis
 from loguru import logger
 
 from flight_blender.config import settings
 
+DEFAULT_POOL = "default"
+PUBSUB_POOL = "pubsub"
+STREAM_POOL = "stream"
+
+
+class RedisConnectionRegistry:
+    """Process-wide Redis connection pools, one sync and one async pool per purpose.
+
+    ``default`` serves ordinary commands. ``pubsub`` points at ``REDIS_BROKER_URL``, where the
+    realtime channels live, and is kept apart so long-lived subscriptions never take connections
+    from ordinary commands. ``stream`` serves blocking stream reads (``XREADGROUP ... BLOCK``),
+    which hold their connection for the whole block time.
+
+    The pools are blocking: when every connection is in use a caller waits up to
+    ``REDIS_POOL_TIMEOUT_SECS`` for one to be released instead of opening another. A forked child
+    (Celery prefork workers) drops the pools it inherited without touching the parent's sockets and
+    builds its own on first use. Async connections belong to the event loop that opened them, so an
+    async pool is replaced when it is asked for from a different loop, and the replaced pool is
+    disconnected on its own loop.
+    """
+
+    def __init__(self, connection_kwargs: dict | None = None, async_connection_kwargs: dict | None = None):
+        self._connection_kwargs = connection_kwargs or {}
+        self._async_connection_kwargs = async_connection_kwargs or {}
+        self._lock = threading.Lock()
+        self._pid = os.getpid()
+        self._sync_pools: dict[str, redis.ConnectionPool] = {}
+        self._async_pools: dict[str, tuple[asyncio.AbstractEventLoop | None, aioredis.ConnectionPool]] = {}
+
+    def _pool_kwargs(self, purpose: str, extra: dict) -> dict:
+        max_connections = {
+            PUBSUB_POOL: settings.REDIS_PUBSUB_POOL_MAX_CONNECTIONS,
+            STREAM_POOL: settings.REDIS_STREAM_POOL_MAX_CONNECTIONS,
+        }.get(purpose, settings.REDIS_POOL_MAX_CONNECTIONS)
+        kwargs = {
+            "max_connections": max_connections,
+            "timeout": settings.REDIS_POOL_TIMEOUT_SECS,
+            "health_check_interval": settings.REDIS_HEALTH_CHECK_INTERVAL_SECS,
+            "socket_keepalive": True,
+            "decode_responses": True,
+        }
+        if purpose != PUBSUB_POOL:
+            kwargs.update(host=settings.REDIS_HOST, port=settings.REDIS_PORT)
+            if settings.REDIS_PASSWORD:
+                kwargs["password"] = settings.REDIS_PASSWORD
+        kwargs.update(extra)
+        return kwargs
+
+    def _build_pool(self, pool_class, purpose: str, extra: dict):
+        kwargs = self._pool_kwargs(purpose, extra)
+        if purpose == PUBSUB_POOL:
+            return pool_class.from_url(settings.REDIS_BROKER_URL, **kwargs)
+        return pool_class(**kwargs)
+
+    def _check_pid(self) -> None:
+        if self._pid != os.getpid():
+            self._after_fork_in_child()
+
+    def _after_fork_in_child(self) -> None:
+        # The parent may have held the lock mid-update, and its sockets are not ours to close.
+        self._lock = threading.Lock()
+        self._pid = os.getpid()
+        self._sync_pools = {}
+        self._async_pools = {}
+
+    def sync_pool(self, purpose: str = DEFAULT_POOL) -> redis.ConnectionPool:
+        self._check_pid()
+        pool = self._sync_pools.get(purpose)
+        if pool is None:
+            with self._lock:
+                pool = self._sync_pools.get(purpose)
+                if pool is None:
+                    pool = self._sync_pools[purpose] = self._build_pool(redis.BlockingConnectionPool, purpose, self._connection_kwargs)
+        return pool
+
+    def async_pool(self, purpose: str = DEFAULT_POOL) -> aioredis.ConnectionPool:
+        self._check_pid()
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            loop = None
+        replaced = None
+        with self._lock:
+            entry = self._async_pools.get(purpose)
+            if entry is None or (loop is not None and entry[0] is not loop):
+                replaced = entry
+                entry = self._async_pools[purpose] = (loop, self._build_pool(aioredis.BlockingConnectionPool, purpose, self._async_connection_kwargs))
+        if replaced is not None:
+            self._retire_async_pool(replaced[0] or loop, replaced[1])
+        return entry[1]
+
+    @staticmethod
+    def _retire_async_pool(loop: asyncio.AbstractEventLoop, pool: aioredis.ConnectionPool) -> None:
+        if loop.is_closed():
+            # Nothing can run on a closed loop; its connections are released once the pool is collected.
+            return
+        asyncio.run_coroutine_threadsafe(_disconnect_replaced_pool(pool), loop)
+
+    def client(self, purpose: str = DEFAULT_POOL) -> redis.Redis:
+        return redis.Redis(connection_pool=self.sync_pool(purpose))
+
+    def async_client(self, purpose: str = DEFAULT_POOL) -> aioredis.Redis:
+        return aioredis.Redis(connection_pool=self.async_pool(purpose))
+
+    def close(self) -> None:
+        """Disconnect the sync pools."""
+        with self._lock:
+            pools, self._sync_pools = list(self._sync_pools.values()), {}
+        for pool in pools:
+            pool.disconnect()
+
+    async def aclose(self) -> None:
+        """Disconnect the async pools opened on the running event loop."""
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            owned = [purpose for purpose, (pool_loop, _) in self._async_pools.items() if pool_loop in (loop, None)]
+            pools = [self._async_pools.pop(purpose)[1] for purpose in owned]
+        for pool in pools:
+            await pool.disconnect()
+
+
+async def _disconnect_replaced_pool(pool: aioredis.ConnectionPool) -> None:
+    try:
+        await pool.disconnect()
+    except Exception as exc:
+        logger.warning(f"Could not disconnect a replaced async Redis pool: {exc}")
+
+
+redis_registry = RedisConnectionRegistry()
+os.register_at_fork(after_in_child=redis_registry._after_fork_in_child)
+
 
 def get_redis() -> redis.Redis:
-    """Get a Redis instance with the configured connection parameters."""
-    if settings.REDIS_PASSWORD:
-        return redis.Redis(
-            host=settings.REDIS_HOST,
-            port=settings.REDIS_PORT,
-            password=settings.REDIS_PASSWORD,
-            decode_responses=True,
-        )
-    return redis.Redis(
-        host=settings.REDIS_HOST,
-        port=settings.REDIS_PORT,
-        decode_responses=True,
-    )
+    """Get a Redis client on the process-wide default connection pool."""
+    return redis_registry.client(DEFAULT_POOL)
 
 
 def get_async_redis() -> aioredis.Redis:
-    """Return an async Redis client with configured connection parameters."""
-    if settings.REDIS_PASSWORD:
-        return aioredis.Redis(
-            host=settings.REDIS_HOST,
-            port=settings.REDIS_PORT,
-            password=settings.REDIS_PASSWORD,
-            decode_responses=True,
-        )
-    return aioredis.Redis(
-        host=settings.REDIS_HOST,
-        port=settings.REDIS_PORT,
-        decode_responses=True,
-    )
+    """Return an async Redis client on the process-wide default connection pool."""
+    return redis_registry.async_client(DEFAULT_POOL)
+
+
+def get_pubsub_redis() -> redis.Redis:
+    """Get a Redis client on the pub/sub pool, for publishing to the realtime channels."""
+    return redis_registry.client(PUBSUB_POOL)
+
+
+def get_async_pubsub_redis() -> aioredis.Redis:
+    """Return an async Redis client on the pub/sub pool, for subscribing to the realtime channels."""
+    return redis_registry.async_client(PUBSUB_POOL)
+
+
+def get_stream_redis() -> redis.Redis:
+    """Get a Redis client on the pool reserved for blocking stream reads."""
+    return redis_registry.client(STREAM_POOL)
 
 
 class RedisHelper:
@@ -44,19 +172,8 @@ class RedisHelper:
         self.redis_password: str | None = settings.REDIS_PASSWORD
 
     def _get_redis_instance(self) -> redis.Redis:
-        """Get a Redis instance with the configured connection parameters."""
-        if self.redis_password:
-            return redis.Redis(
-                host=self.redis_host,
-                port=self.redis_port,
-                password=self.redis_password,
-                decode_responses=True,
-            )
-        return redis.Redis(
-            host=self.redis_host,
-            port=self.redis_port,
-            decode_responses=True,
-        )
+        """Get a Redis client on the process-wide default connection pool."""
+        return get_redis()
 
     def flush_db(self) -> None:
         """Flush the entire Redis database."""
@@ -1,4 +1,5 @@
 from celery import Celery
+from celery.schedules import crontab
 
 from flight_blender.config import settings
 
@@ -13,6 +14,7 @@ app = Celery(
         "flight_blender.tasks.flight_declarations_task",
         "flight_blender.tasks.conformance_task",
         "flight_blender.tasks.rid_task",
+        "flight_blender.tasks.retention_task",
     ],
 )
 
@@ -24,6 +26,17 @@ app.conf.update(
     enable_utc=True,
 )
 
+app.conf.beat_schedule = {
+    "run-data-retention": {"task": "run_data_retention", "schedule": crontab(hour=3, minute=0)},
+}
+if settings.FLIGHT_OBSERVATION_PARTITIONING_ENABLED:
+    app.conf.beat_schedule["maintain-flight-observation-partitions"] = {"task": "maintain_flight_observation_partitions", "schedule": 3600.0}
+if settings.SURVEILLANCE_METRICS_ROLLUP_ENABLED:
+    app.conf.beat_schedule["rollup-surveillance-metrics"] = {
+        "task": "rollup_surveillance_metrics",
+        "schedule": settings.SURVEILLANCE_METRICS_ROLLUP_INTERVAL_SECS,
+    }
+
 
 @app.task(bind=True)
 def debug_task(self):
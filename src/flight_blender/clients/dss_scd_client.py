@@ -1,13 +1,14 @@
+import asyncio
 import json
 import uuid
 from dataclasses import asdict
 from datetime import datetime
 
 import arrow
+import httpx
 import requests
 import shapely.geometry
 import tldextract
-import urllib3
 from loguru import logger
 from pyproj import Proj
 from shapely.geometry import Point, Polygon
@@ -601,222 +602,231 @@ class OperationalIntentReferenceHelper:
 
 
 class SCDOperations:
-    def __init__(self):
+    def __init__(self, http_transport: httpx.AsyncBaseTransport | None = None):
         self.dss_base_url = settings.DSS_BASE_URL
         self.r = get_redis()
         self.constraints_helper = ConstraintOperations()
+        self.http_transport = http_transport
 
     async def get_nearby_operational_intents(self, volumes: list[Volume4D]) -> list[OperationalIntentDetailsUSSResponse]:
-        # This method checks the USS network for any other volume in the airspace and queries the individual USS for data
+        """Query the DSS for operational intents intersecting ``volumes`` and fetch their details.
 
-        nearby_operational_intents = []
+        The DSS is queried for every volume concurrently and the returned references are de-duplicated by
+        entity id, so an operational intent that intersects several volumes is resolved once. Intents
+        managed by Flight Blender are read from the database in a single session; peer USS details are
+        fetched concurrently, with at most ``SCD_PEER_MAX_CONCURRENCY_PER_HOST`` requests in flight per
+        host and each request bounded by ``SCD_PEER_REQUEST_DEADLINE_SECS``.
+
+        Raises:
+            ConnectionError: if a peer USS cannot be reached within the deadline.
+        """
         auth_token = self.get_auth_token()
-        # Query the DSS for operational intentns
-        query_op_int_url = self.dss_base_url + "dss/v1/operational_intent_references/query"
         headers = {
             "Content-Type": "application/json",
             "Authorization": "Bearer " + auth_token["access_token"],
         }
-
         flight_blender_base_url = settings.FLIGHTBLENDER_FQDN
-        my_op_int_ref_helper = OperationalIntentReferenceHelper()
-        all_uss_operational_intent_details = []
+        deadline = settings.SCD_PEER_REQUEST_DEADLINE_SECS
 
-        for volume in volumes:
-            op_int_details_retrieved = False
-            operational_intent_references = []
-            area_of_interest = QueryOperationalIntentPayload(area_of_interest=volume)
-            logger.info("Querying DSS for operational intents in the area..")
-            logger.debug(f"Area of interest {json.dumps(asdict(area_of_interest))}")
-            try:
-                operational_intent_ref_response = requests.post(
-                    query_op_int_url,
-                    json=json.loads(json.dumps(asdict(area_of_interest))),
-                    headers=headers,
-                    timeout=30,
-                )
-            except Exception as re:
-                logger.error("Error in getting operational intent for the volume %s " % re)
-            else:
-                # The DSS returned operational intent references as a list
-                dss_operational_intent_references = operational_intent_ref_response.json()
-                logger.debug(f"DSS Response {dss_operational_intent_references}")
-                operational_intent_references = dss_operational_intent_references["operational_intent_references"]
-
-            # Query the operational intent reference details
-            for operational_intent_reference_detail in operational_intent_references:
-                # Get the USS URL endpoint
-                dss_op_int_details_url = self.dss_base_url + "dss/v1/operational_intent_references/" + operational_intent_reference_detail["id"]
-                # get new auth token for USS
-                try:
-                    op_int_uss_details = requests.get(dss_op_int_details_url, headers=headers, timeout=30)
-                except Exception as e:
-                    logger.error("Error in getting operational intent details %s" % e)
-                else:
-                    operational_intent_reference = op_int_uss_details.json()
-                    o_i_r = operational_intent_reference["operational_intent_reference"]
-                    o_i_r_formatted = OperationalIntentReferenceDSSResponse(
-                        id=o_i_r["id"],
-                        manager=o_i_r["manager"],
-                        uss_availability=o_i_r["uss_availability"],
-                        version=o_i_r["version"],
-                        state=o_i_r["state"],
-                        ovn=o_i_r["ovn"],
-                        time_start=o_i_r["time_start"],
-                        time_end=o_i_r["time_end"],
-                        uss_base_url=o_i_r["uss_base_url"],
-                        subscription_id=o_i_r["subscription_id"],
-                    )
-                    # if o_i_r_formatted.uss_base_url != flight_blender_base_url:
-                    all_uss_operational_intent_details.append(o_i_r_formatted)
+        async with httpx.AsyncClient(timeout=deadline, transport=self.http_transport) as client:
+            volume_results = await asyncio.gather(*(self._query_operational_intent_reference_ids(client, headers, volume) for volume in volumes))
+            reference_ids = list(dict.fromkeys(ref_id for ids in volume_results for ref_id in ids))
 
-            for current_uss_operational_intent_detail in all_uss_operational_intent_details:
-                logger.info("All Operational intents in the area..")
+            references = await asyncio.gather(*(self._get_dss_operational_intent_reference(client, headers, ref_id) for ref_id in reference_ids))
+            references = [r for r in references if r is not None]
+            logger.info(f"{len(references)} operational intents in the area..")
 
-                # check the USS for flight volume by using the URL to see if this is stored in Flight Blender, DSS will return all intent details including our own
-                current_uss_base_url = current_uss_operational_intent_detail.uss_base_url
-                op_int_det = {}
-                op_int_ref = {}
-                if current_uss_base_url == flight_blender_base_url:
-                    # The opint is from Flight Blender itself
-                    # No need to query peer USS, just update the ovn and process the volume locally
+            own_references = [r for r in references if r.uss_base_url == flight_blender_base_url]
+            peer_references = [r for r in references if r.uss_base_url != flight_blender_base_url]
 
-                    async with async_task_session() as db:
-                        fd_repo = SQLAlchemyFlightDeclarationRepository(db)
-                        flight_operational_intent_reference = await fd_repo.get_opint_reference_by_id(
-                            uuid.UUID(str(current_uss_operational_intent_detail.id))
-                        )
-                        flight_operational_intent_reference_exists = flight_operational_intent_reference is not None
-
-                        if flight_operational_intent_reference_exists:
-                            flight_declaration_id = flight_operational_intent_reference.declaration_id
-                            flight_operational_intent_detail = await fd_repo.get_opint_detail_by_declaration_id(flight_declaration_id)
-                            await fd_repo.update_opint_reference_ovn(
-                                ref_id=flight_operational_intent_reference.id,
-                                ovn=current_uss_operational_intent_detail.ovn,
-                            )
-                            _op_int_ref = OperationalIntentReferenceDSSResponse(
-                                subscription_id=current_uss_operational_intent_detail.subscription_id,
-                                id=str(flight_operational_intent_reference.id),
-                                uss_base_url=flight_operational_intent_reference.uss_base_url,
-                                manager=flight_operational_intent_reference.manager,
-                                uss_availability=flight_operational_intent_reference.uss_availability,
-                                version=flight_operational_intent_reference.version,
-                                state=flight_operational_intent_reference.state,
-                                ovn=flight_operational_intent_reference.ovn,
-                                time_start=Time(
-                                    format="RFC3339",
-                                    value=flight_operational_intent_reference.time_start,
-                                ),
-                                time_end=Time(
-                                    format="RFC3339",
-                                    value=flight_operational_intent_reference.time_end,
-                                ),
-                            )
-                            op_int_ref = asdict(_op_int_ref)
-                            op_int_det = {
-                                "volumes": json.loads(flight_operational_intent_detail.volumes),
-                                "off_nominal_volumes": json.loads(flight_operational_intent_detail.off_nominal_volumes),
-                                "priority": flight_operational_intent_detail.priority,
-                            }
-                        else:
-                            logger.warning(
-                                "Flight operational intent reference not found in the database, this is a new operational intent with id: {uss_op_int_id}".format(
-                                    uss_op_int_id=current_uss_operational_intent_detail.id
-                                )
-                            )
-                    op_int_details_retrieved = True
-
-                else:  # This operational intent details is from a peer uss, need to query peer USS
-                    uss_audience = generate_audience_from_base_url(base_url=current_uss_base_url)
-                    uss_auth_token = self.get_auth_token(audience=uss_audience)
-                    logger.info(f"Auth Token {uss_auth_token}")
-
-                    uss_headers = {
-                        "Content-Type": "application/json",
-                        "Authorization": "Bearer " + uss_auth_token["access_token"],
-                    }
-                    uss_operational_intent_url = current_uss_base_url + "/uss/v1/operational_intents/" + current_uss_operational_intent_detail.id
-
-                    logger.debug(f"Querying USS: {current_uss_base_url}")
-                    try:
-                        uss_operational_intent_request = requests.get(uss_operational_intent_url, headers=uss_headers, timeout=30)
-                    except urllib3.exceptions.NameResolutionError:
-                        logger.info("URLLIB error")
-                        raise ConnectionError("Could not reach peer USS.. ")
-
-                    except (
-                        requests.exceptions.ConnectTimeout,
-                        requests.exceptions.HTTPError,
-                        requests.exceptions.ReadTimeout,
-                        requests.exceptions.Timeout,
-                        requests.exceptions.ConnectionError,
-                    ) as e:
-                        logger.error("Connection error details..")
-                        logger.error(e)
-                        logger.error(
-                            "Error in getting operational intent id {uss_op_int_id} details from uss with base url {uss_base_url}".format(
-                                uss_op_int_id=current_uss_operational_intent_detail.id,
-                                uss_base_url=current_uss_base_url,
-                            )
+            own_details = await self._resolve_own_operational_intents(own_references)
+            peer_details = await self._fetch_peer_operational_intents(client, peer_references, deadline)
+
+        nearby_operational_intents = []
+        for reference in references:
+            details = own_details.get(reference.id) or peer_details.get(reference.id)
+            if details is None:
+                continue
+            op_int_ref, op_int_det = details
+            nearby_operational_intents.append(self._build_operational_intent_details(op_int_ref, op_int_det))
+        return nearby_operational_intents
+
+    async def _query_operational_intent_reference_ids(self, client: httpx.AsyncClient, headers: dict, volume: Volume4D) -> list[str]:
+        query_op_int_url = self.dss_base_url + "dss/v1/operational_intent_references/query"
+        area_of_interest = QueryOperationalIntentPayload(area_of_interest=volume)
+        logger.info("Querying DSS for operational intents in the area..")
+        logger.debug(f"Area of interest {json.dumps(asdict(area_of_interest))}")
+        try:
+            operational_intent_ref_response = await client.post(
+                query_op_int_url,
+                json=json.loads(json.dumps(asdict(area_of_interest))),
+                headers=headers,
+            )
+            dss_operational_intent_references = operational_intent_ref_response.json()
+        except Exception as re:
+            logger.error("Error in getting operational intent for the volume %s " % re)
+            return []
+        logger.debug(f"DSS Response {dss_operational_intent_references}")
+        return [o_i_r["id"] for o_i_r in dss_operational_intent_references["operational_intent_references"]]
+
+    async def _get_dss_operational_intent_reference(
+        self, client: httpx.AsyncClient, headers: dict, reference_id: str
+    ) -> OperationalIntentReferenceDSSResponse | None:
+        dss_op_int_details_url = self.dss_base_url + "dss/v1/operational_intent_references/" + reference_id
+        try:
+            op_int_uss_details = await client.get(dss_op_int_details_url, headers=headers)
+            o_i_r = op_int_uss_details.json()["operational_intent_reference"]
+        except Exception as e:
+            logger.error("Error in getting operational intent details %s" % e)
+            return None
+        return OperationalIntentReferenceDSSResponse(
+            id=o_i_r["id"],
+            manager=o_i_r["manager"],
+            uss_availability=o_i_r["uss_availability"],
+            version=o_i_r["version"],
+            state=o_i_r["state"],
+            ovn=o_i_r["ovn"],
+            time_start=o_i_r["time_start"],
+            time_end=o_i_r["time_end"],
+            uss_base_url=o_i_r["uss_base_url"],
+            subscription_id=o_i_r["subscription_id"],
+        )
+
+    async def _resolve_own_operational_intents(self, references: list[OperationalIntentReferenceDSSResponse]) -> dict[str, tuple[dict, dict]]:
+        """Read operational intents managed by Flight Blender from the database and refresh their stored OVN.
+
+        DSS returns all intents including our own, there is no need to query a peer USS for these.
+        """
+        resolved: dict[str, tuple[dict, dict]] = {}
+        if not references:
+            return resolved
+        async with async_task_session() as db:
+            fd_repo = SQLAlchemyFlightDeclarationRepository(db)
+            for current_uss_operational_intent_detail in references:
+                flight_operational_intent_reference = await fd_repo.get_opint_reference_by_id(
+                    uuid.UUID(str(current_uss_operational_intent_detail.id))
+                )
+                if flight_operational_intent_reference is None:
+                    logger.warning(
+                        "Flight operational intent reference not found in the database, this is a new operational intent with id: {uss_op_int_id}".format(
+                            uss_op_int_id=current_uss_operational_intent_detail.id
                         )
-                        op_int_details_retrieved = False
-                        logger.info("Raising connection Error 1")
-                        raise ConnectionError("Could not reach peer USS..")
-
-                    else:
-                        # Verify status of the response from the USS
-                        if uss_operational_intent_request.status_code == 200:
-                            # Request was successful
-                            operational_intent_details_json = uss_operational_intent_request.json()
-                            op_int_details_retrieved = True
-                            # outline_polygon = None
-                            # outline_circle = None
-
-                            op_int_det = operational_intent_details_json["operational_intent"]["details"]
-                            op_int_ref = operational_intent_details_json["operational_intent"]["reference"]
-                        # The attempt to get data from the USS in the network failed
-                        elif uss_operational_intent_request.status_code in [
-                            401,
-                            400,
-                            404,
-                            500,
-                        ]:
-                            logger.debug(f"Response: {uss_operational_intent_request.json()}")
-                            logger.error(
-                                "Error in querying peer USS about operational intent (ID: {uss_op_int_id}) details from uss with base url {uss_base_url}".format(
-                                    uss_op_int_id=current_uss_operational_intent_detail.id,
-                                    uss_base_url=current_uss_base_url,
-                                )
-                            )
+                    )
+                    continue
+                flight_declaration_id = flight_operational_intent_reference.declaration_id
+                flight_operational_intent_detail = await fd_repo.get_opint_detail_by_declaration_id(flight_declaration_id)
+                await fd_repo.update_opint_reference_ovn(
+                    ref_id=flight_operational_intent_reference.id,
+                    ovn=current_uss_operational_intent_detail.ovn,
+                )
+                _op_int_ref = OperationalIntentReferenceDSSResponse(
+                    subscription_id=current_uss_operational_intent_detail.subscription_id,
+                    id=str(flight_operational_intent_reference.id),
+                    uss_base_url=flight_operational_intent_reference.uss_base_url,
+                    manager=flight_operational_intent_reference.manager,
+                    uss_availability=flight_operational_intent_reference.uss_availability,
+                    version=flight_operational_intent_reference.version,
+                    state=flight_operational_intent_reference.state,
+                    ovn=flight_operational_intent_reference.ovn,
+                    time_start=Time(
+                        format="RFC3339",
+                        value=flight_operational_intent_reference.time_start,
+                    ),
+                    time_end=Time(
+                        format="RFC3339",
+                        value=flight_operational_intent_reference.time_end,
+                    ),
+                )
+                resolved[current_uss_operational_intent_detail.id] = (
+                    asdict(_op_int_ref),
+                    {
+                        "volumes": json.loads(flight_operational_intent_detail.volumes),
+                        "off_nominal_volumes": json.loads(flight_operational_intent_detail.off_nominal_volumes),
+                        "priority": flight_operational_intent_detail.priority,
+                    },
+                )
+        return resolved
 
-                if op_int_details_retrieved:
-                    op_int_reference: OperationalIntentReferenceDSSResponse = my_op_int_ref_helper.parse_operational_intent_reference_from_dss(
-                        operational_intent_reference=op_int_ref
+    async def _fetch_peer_operational_intents(
+        self,
+        client: httpx.AsyncClient,
+        references: list[OperationalIntentReferenceDSSResponse],
+        deadline: float,
+    ) -> dict[str, tuple[dict, dict]]:
+        host_limits: dict[str, asyncio.Semaphore] = {}
+        uss_headers_by_base_url: dict[str, dict] = {}
+        for reference in references:
+            if reference.uss_base_url not in uss_headers_by_base_url:
+                uss_audience = generate_audience_from_base_url(base_url=reference.uss_base_url)
+                uss_auth_token = self.get_auth_token(audience=uss_audience)
+                uss_headers_by_base_url[reference.uss_base_url] = {
+                    "Content-Type": "application/json",
+                    "Authorization": "Bearer " + uss_auth_token["access_token"],
+                }
+                host = httpx.URL(reference.uss_base_url).host
+                host_limits.setdefault(host, asyncio.Semaphore(settings.SCD_PEER_MAX_CONCURRENCY_PER_HOST))
+
+        async def _fetch(reference: OperationalIntentReferenceDSSResponse) -> tuple[dict, dict] | None:
+            current_uss_base_url = reference.uss_base_url
+            uss_operational_intent_url = current_uss_base_url + "/uss/v1/operational_intents/" + reference.id
+            logger.debug(f"Querying USS: {current_uss_base_url}")
+            async with host_limits[httpx.URL(current_uss_base_url).host]:
+                try:
+                    uss_operational_intent_request = await asyncio.wait_for(
+                        client.get(uss_operational_intent_url, headers=uss_headers_by_base_url[current_uss_base_url]),
+                        timeout=deadline,
+                    )
+                except (httpx.TransportError, asyncio.TimeoutError) as e:
+                    logger.error("Connection error details..")
+                    logger.error(e)
+                    logger.error(
+                        "Error in getting operational intent id {uss_op_int_id} details from uss with base url {uss_base_url}".format(
+                            uss_op_int_id=reference.id,
+                            uss_base_url=current_uss_base_url,
+                        )
                     )
-                    my_opint_ref_helper = OperationalIntentReferenceHelper()
-                    all_volumes = op_int_det["volumes"]
-                    all_v4d = []
-                    for cur_volume in all_volumes:
-                        cur_v4d = my_opint_ref_helper.parse_volume_to_volume4D(volume=cur_volume)
-                        all_v4d.append(cur_v4d)
-
-                    all_off_nominal_volumes = op_int_det["off_nominal_volumes"]
-                    all_off_nominal_v4d = []
-                    for cur_off_nominal_volume in all_off_nominal_volumes:
-                        cur_off_nominal_v4d = my_opint_ref_helper.parse_volume_to_volume4D(volume=cur_off_nominal_volume)
-                        all_off_nominal_v4d.append(cur_off_nominal_v4d)
-
-                    op_int_detail = OperationalIntentUSSDetails(
-                        volumes=all_v4d,
-                        priority=op_int_det["priority"],
-                        off_nominal_volumes=all_off_nominal_v4d,
+                    raise ConnectionError("Could not reach peer USS..") from e
+
+            # Verify status of the response from the USS
+            if uss_operational_intent_request.status_code == 200:
+                operational_intent_details_json = uss_operational_intent_request.json()
+                return (
+                    operational_intent_details_json["operational_intent"]["reference"],
+                    operational_intent_details_json["operational_intent"]["details"],
+                )
+            # The attempt to get data from the USS in the network failed
+            if uss_operational_intent_request.status_code in [401, 400, 404, 500]:
+                logger.debug(f"Response: {uss_operational_intent_request.text}")
+                logger.error(
+                    "Error in querying peer USS about operational intent (ID: {uss_op_int_id}) details from uss with base url {uss_base_url}".format(
+                        uss_op_int_id=reference.id,
+                        uss_base_url=current_uss_base_url,
                     )
+                )
+            return None
 
-                    uss_op_int_details = OperationalIntentDetailsUSSResponse(reference=op_int_reference, details=op_int_detail)
-                    nearby_operational_intents.append(uss_op_int_details)
+        results = await asyncio.gather(*(_fetch(reference) for reference in references), return_exceptions=True)
+        for result in results:
+            if isinstance(result, BaseException):
+                raise result
+        return {reference.id: result for reference, result in zip(references, results) if result is not None}
 
-        return nearby_operational_intents
+    def _build_operational_intent_details(self, op_int_ref: dict, op_int_det: dict) -> OperationalIntentDetailsUSSResponse:
+        my_opint_ref_helper = OperationalIntentReferenceHelper()
+        op_int_reference: OperationalIntentReferenceDSSResponse = my_opint_ref_helper.parse_operational_intent_reference_from_dss(
+            operational_intent_reference=op_int_ref
+        )
+        all_v4d = [my_opint_ref_helper.parse_volume_to_volume4D(volume=cur_volume) for cur_volume in op_int_det["volumes"]]
+        all_off_nominal_v4d = [
+            my_opint_ref_helper.parse_volume_to_volume4D(volume=cur_off_nominal_volume)
+            for cur_off_nominal_volume in op_int_det["off_nominal_volumes"]
+        ]
+        op_int_detail = OperationalIntentUSSDetails(
+            volumes=all_v4d,
+            priority=op_int_det["priority"],
+            off_nominal_volumes=all_off_nominal_v4d,
+        )
+        return OperationalIntentDetailsUSSResponse(reference=op_int_reference, details=op_int_detail)
 
     def get_auth_token(self, audience: str = ""):
         return get_dss_auth_token(audience=audience, token_type="scd")  # nosec B106
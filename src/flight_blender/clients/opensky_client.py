@@ -0,0 +1,166 @@
+"""OpenSky Network state vectors: a polling client for the live API, a replay source for recorded
+responses, and the conversion of a response's states into air traffic observations.
+
+Both sources answer ``fetch_states(lat_min, lng_min, lat_max, lng_max)`` with an OpenSky
+``/states/all`` response (``{"time": ..., "states": [[icao24, callsign, ...], ...]}``) or ``None``
+when there is nothing new to ingest.
+"""
+
+import json
+from pathlib import Path
+
+import pandas as pd
+import requests
+from loguru import logger
+
+from flight_blender.config import settings
+
+OPENSKY_STATE_COLUMNS = [
+    "icao24",
+    "callsign",
+    "origin_country",
+    "time_position",
+    "last_contact",
+    "long",
+    "lat",
+    "baro_altitude",
+    "on_ground",
+    "velocity",
+    "true_track",
+    "vertical_rate",
+    "sensors",
+    "geo_altitude",
+    "squawk",
+    "spi",
+    "position_source",
+]
+
+OPENSKY_TRAFFIC_SOURCE = 2
+
+
+def opensky_states_to_observations(states: list[list], session_id: str) -> list[dict]:
+    """Observation dicts (``asdict(SingleAirtrafficObservation)`` shaped) for the states that carry a position.
+
+    The conversion works column by column on a DataFrame; states without a latitude or longitude are
+    dropped, and a missing barometric altitude falls back to the geometric one, then to 0.
+    """
+    if not states:
+        return []
+    # Extended responses append a category column; only the documented columns are used
+    flights = pd.DataFrame(states).rename(columns=dict(enumerate(OPENSKY_STATE_COLUMNS))).reindex(columns=OPENSKY_STATE_COLUMNS)
+    flights["lat"] = pd.to_numeric(flights["lat"], errors="coerce")
+    flights["long"] = pd.to_numeric(flights["long"], errors="coerce")
+    flights = flights.dropna(subset=["lat", "long"])
+    if flights.empty:
+        return []
+
+    altitude = pd.to_numeric(flights["baro_altitude"], errors="coerce")
+    altitude = altitude.fillna(pd.to_numeric(flights["geo_altitude"], errors="coerce")).fillna(0.0)
+    timestamp = pd.to_numeric(flights["time_position"], errors="coerce").fillna(0).astype("int64")
+    velocity = pd.to_numeric(flights["velocity"], errors="coerce").astype(object)
+    velocity = velocity.where(velocity.notna(), None)
+
+    return pd.DataFrame(
+        {
+            "lat_dd": flights["lat"].astype(float),
+            "lon_dd": flights["long"].astype(float),
+            "altitude_mm": altitude.astype(float),
+            "traffic_source": OPENSKY_TRAFFIC_SOURCE,
+            "source_type": 1,
+            "icao_address": flights["icao24"].astype(str),
+            "timestamp": timestamp,
+            "metadata": [{"velocity": v} for v in velocity],
+            "session_id": session_id,
+            "ingested_at_ms": 0,
+        }
+    ).to_dict("records")
+
+
+class OpenSkyClient:
+    """Polls ``/states/all`` over one reused HTTP session.
+
+    Polls are conditional: ``ETag`` and ``Last-Modified`` from the previous response go back as
+    ``If-None-Match`` and ``If-Modified-Since``, and a 304, or a 200 whose snapshot ``time`` has not
+    moved on, is reported as nothing new.
+    """
+
+    def __init__(self, url: str | None = None, auth: tuple[str, str] | None = None, session: requests.Session | None = None, timeout: float = 30):
+        self.url = url or settings.OPENSKY_NETWORK_API_URL
+        self.session = session or requests.Session()
+        self.session.auth = auth or (settings.OPENSKY_NETWORK_USERNAME, settings.OPENSKY_NETWORK_PASSWORD)
+        self.timeout = timeout
+        self._validators: dict[tuple, dict[str, str]] = {}
+        self._snapshot_times: dict[tuple, int] = {}
+
+    def fetch_states(self, lat_min: float, lng_min: float, lat_max: float, lng_max: float) -> dict | None:
+        bbox = (lat_min, lng_min, lat_max, lng_max)
+        params = {"lamin": lat_min, "lomin": lng_min, "lamax": lat_max, "lomax": lng_max}
+        response = self.session.get(self.url, params=params, headers=self._validators.get(bbox, {}), timeout=self.timeout)
+        if response.status_code == 304:
+            return None
+        if response.status_code != 200:
+            logger.warning(f"OpenSky Network returned {response.status_code} for {response.url}")
+            return None
+
+        validators = {}
+        if etag := response.headers.get("ETag"):
+            validators["If-None-Match"] = etag
+        if last_modified := response.headers.get("Last-Modified"):
+            validators["If-Modified-Since"] = last_modified
+        self._validators[bbox] = validators
+
+        data = response.json()
+        snapshot_time = data.get("time")
+        if snapshot_time is not None and self._snapshot_times.get(bbox) == snapshot_time:
+            return None
+        self._snapshot_times[bbox] = snapshot_time
+        return data
+
+    def close(self) -> None:
+        self.session.close()
+
+
+class OpenSkyReplaySource:
+    """Replays recorded ``/states/all`` responses, one per poll, for offline load tests.
+
+    ``path`` is a JSON file holding one response or a list of them, a JSON Lines file with one
+    response per line, or a directory of such files read in name order. States outside the polled
+    box are dropped, as the API would. After the last response the replay starts over when
+    ``loop`` is set, otherwise every further poll returns ``None``.
+    """
+
+    def __init__(self, path: str | Path, loop: bool = True):
+        self.snapshots = self._load(Path(path))
+        self.loop = loop
+        self._next = 0
+
+    @staticmethod
+    def _load(path: Path) -> list[dict]:
+        files = sorted(p for p in path.iterdir() if p.is_file()) if path.is_dir() else [path]
+        snapshots = []
+        for file in files:
+            text = file.read_text()
+            try:
+                content = json.loads(text)
+            except json.JSONDecodeError:
+                content = [json.loads(line) for line in text.splitlines() if line.strip()]
+            snapshots.extend(content if isinstance(content, list) else [content])
+        return snapshots
+
+    def fetch_states(self, lat_min: float, lng_min: float, lat_max: float, lng_max: float) -> dict | None:
+        if self._next >= len(self.snapshots):
+            if not self.loop or not self.snapshots:
+                return None
+            self._next = 0
+        snapshot = self.snapshots[self._next]
+        self._next += 1
+
+        states = [
+            state
+            for state in snapshot.get("states") or []
+            if state[6] is not None and state[5] is not None and lat_min <= state[6] <= lat_max and lng_min <= state[5] <= lng_max
+        ]
+        return {**snapshot, "states": states}
+
+    def close(self) -> None:
+        pass
@@ -1,16 +1,31 @@
 import json
+import os
+import socket
+import time
 import uuid
 from typing import List, Optional
 
 import arrow
 from loguru import logger
 
-from flight_blender.auth.token_cache import get_redis
+from flight_blender.auth.token_cache import get_redis, get_stream_redis
 from flight_blender.config import settings
 from flight_blender.domain_types.flight_feed import SingleAirtrafficObservation
-from flight_blender.domain_types.surveillance import ActiveTrack
+from flight_blender.domain_types.surveillance import ActiveTrack, StreamLagMetrics
+from flight_blender.utils.air_traffic_shards import AIR_TRAFFIC_STREAM, AirTrafficShardMap, shard_stream_name
 
 AIR_TRAFFIC_STREAM_TTL_MS = settings.AIR_TRAFFIC_STREAM_TTL_MS
+AIR_TRAFFIC_STREAM_MAX_LEN = settings.AIR_TRAFFIC_STREAM_MAX_LEN
+ACTIVE_TRACK_MAX_OBSERVATIONS = settings.ACTIVE_TRACK_MAX_OBSERVATIONS
+ACTIVE_TRACK_IDLE_TIMEOUT_SECS = settings.ACTIVE_TRACK_IDLE_TIMEOUT_SECS
+
+# Per-session ICAO -> latest position hashes behind cursor reads of the air traffic stream expire after this idle time.
+AIR_TRAFFIC_LATEST_STATE_TTL_SECS = 300
+AIR_TRAFFIC_LATEST_STATE_KEY = "air_traffic_latest"
+
+# Consumer group of the batched writer that persists directly ingested observations to the database.
+AIR_TRAFFIC_PERSISTER_GROUP = "air_traffic_persisters"
+AIR_TRAFFIC_PERSIST_STREAM = "air_traffic_persist_stream"
 
 
 class RedisStreamOperations:
@@ -18,6 +33,8 @@ class RedisStreamOperations:
 
     def __init__(self):
         self.redis = get_redis()
+        # Blocking XREADGROUP calls hold their connection for the whole block time, so they get their own pool.
+        self.stream_reader = get_stream_redis()
 
     def create_air_traffic_stream(self, stream_name: str, max_len: int = 10000) -> None:
         """
@@ -34,6 +51,25 @@ class RedisStreamOperations:
         except Exception as e:
             logger.error(f"Error creating Redis stream '{stream_name}': {e}")
 
+    @staticmethod
+    def _stream_trim_kwargs() -> dict:
+        """
+        Build the XADD trimming arguments for the air traffic stream.
+
+        Entries older than ``AIR_TRAFFIC_STREAM_TTL_MS`` are trimmed with an approximate ``MINID``.
+        If no TTL is configured the stream is capped with an approximate ``MAXLEN`` instead.
+        """
+        if AIR_TRAFFIC_STREAM_TTL_MS:
+            return {"minid": max(int(arrow.utcnow().float_timestamp * 1000) - AIR_TRAFFIC_STREAM_TTL_MS, 0), "approximate": True}
+        return {"maxlen": AIR_TRAFFIC_STREAM_MAX_LEN, "approximate": True}
+
+    @staticmethod
+    def _serialize_observation(observation: dict) -> dict:
+        """Serialize metadata to a JSON string so the observation can be stored as stream fields."""
+        if "metadata" in observation and isinstance(observation["metadata"], dict):
+            observation["metadata"] = json.dumps(observation["metadata"])
+        return observation
+
     def add_air_traffic_data(self, stream_name: str, observation: dict) -> None:
         """
         Add air traffic data to the Redis stream.
@@ -43,18 +79,86 @@ class RedisStreamOperations:
             observation (dict): The air traffic data to add to the stream, a dict representation of SingleAirtrafficObservation.
         """
         try:
-            # Serialize metadata to JSON string if it exists
-            if "metadata" in observation and isinstance(observation["metadata"], dict):
-                observation["metadata"] = json.dumps(observation["metadata"])
-
-            self.redis.xadd(stream_name, observation)
-            if AIR_TRAFFIC_STREAM_TTL_MS is not None:
-                self.redis.pexpire(stream_name, AIR_TRAFFIC_STREAM_TTL_MS)  # TTL is already in milliseconds
+            pipeline = self.redis.pipeline(transaction=False)
+            self.queue_air_traffic_data_batch(pipeline, stream_name, [observation])
+            pipeline.execute()
             logger.info(f"Data added to Redis stream '{stream_name}' successfully.")
             logger.debug(f"Data added to Redis stream '{stream_name}': {observation}")
         except Exception as e:
             logger.error(f"Error adding data to Redis stream '{stream_name}': {e}")
 
+    def add_air_traffic_data_batch(self, stream_name: str, observations: List[dict]) -> List[str]:
+        """
+        Add a batch of air traffic data to the Redis stream in a single pipelined round trip.
+
+        Args:
+            stream_name (str): The name of the Redis stream.
+            observations (List[dict]): The air traffic data to add, dict representations of SingleAirtrafficObservation.
+
+        Returns:
+            List[str]: The stream message IDs of the added entries, empty on error.
+        """
+        if not observations:
+            return []
+        try:
+            pipeline = self.redis.pipeline(transaction=False)
+            self.queue_air_traffic_data_batch(pipeline, stream_name, observations)
+            # Copies routed to the shard streams come after the entries of stream_name
+            message_ids = pipeline.execute()[: len(observations)]
+            logger.info(f"Added {len(message_ids)} entries to Redis stream '{stream_name}' successfully.")
+            return message_ids
+        except Exception as e:
+            logger.error(f"Error adding batch to Redis stream '{stream_name}': {e}")
+            return []
+
+    @classmethod
+    def queue_air_traffic_data_batch(cls, pipeline, stream_name: str, observations: List[dict]) -> None:
+        """
+        Queue the XADDs for a batch of air traffic data on a caller's pipeline, which may belong to a sync or an async client.
+
+        Observations written to ``air_traffic_stream`` also replace the positions of their aircraft in the
+        ICAO -> latest position hash read by ``get_air_traffic_latest_state``. When the air traffic
+        stream is sharded, each of them is also queued, after the whole batch, on the stream of its shard.
+
+        Args:
+            pipeline: A non-transactional Redis pipeline.
+            stream_name (str): The name of the Redis stream.
+            observations (List[dict]): The air traffic data to add, dict representations of SingleAirtrafficObservation.
+        """
+        trim_kwargs = cls._stream_trim_kwargs()
+        # Built before serialization, which turns the metadata of the observations into JSON strings
+        latest_state = cls._air_traffic_latest_state_fields(observations) if stream_name == AIR_TRAFFIC_STREAM else {}
+        entries = [cls._serialize_observation(observation) for observation in observations]
+        for entry in entries:
+            pipeline.xadd(stream_name, entry, **trim_kwargs)
+        if latest_state:
+            pipeline.hset(AIR_TRAFFIC_LATEST_STATE_KEY, mapping=latest_state)
+            pipeline.expire(AIR_TRAFFIC_LATEST_STATE_KEY, AIR_TRAFFIC_LATEST_STATE_TTL_SECS)
+        shard_map = AirTrafficShardMap.from_settings()
+        if stream_name == AIR_TRAFFIC_STREAM and shard_map.enabled:
+            for observation, entry in zip(observations, entries):
+                pipeline.xadd(shard_stream_name(shard_map.shard_of(observation)), entry, **trim_kwargs)
+
+    @classmethod
+    def queue_air_traffic_persist_batch(cls, pipeline, observations: list[dict]) -> None:
+        """
+        Queue the XADDs of a batch on the persistence stream read by the air traffic persister.
+
+        Unlike the air traffic stream, it is trimmed by length only, to ``FLIGHT_FEED_PERSIST_STREAM_MAX_LEN``
+        entries, so entries wait for a lagging persister instead of expiring with the fusion TTL.
+
+        Args:
+            pipeline: A non-transactional Redis pipeline.
+            observations (list[dict]): The air traffic data, dict representations of SingleAirtrafficObservation.
+        """
+        for observation in observations:
+            pipeline.xadd(
+                AIR_TRAFFIC_PERSIST_STREAM,
+                cls._serialize_observation(observation),
+                maxlen=settings.FLIGHT_FEED_PERSIST_STREAM_MAX_LEN,
+                approximate=True,
+            )
+
     def create_consumer_group(self, stream_name: str, group_name: str) -> bool:
         """
         Create a consumer group for the Redis stream.
@@ -154,6 +258,77 @@ class RedisStreamOperations:
             logger.error(f"Error clearing Redis stream '{stream_name}': {e}")
             return False
 
+    @staticmethod
+    def _active_track_key(session_id: str, unique_aircraft_identifier: str) -> str:
+        return f"active_track:{session_id}:{unique_aircraft_identifier}"
+
+    @staticmethod
+    def _active_track_observations_key(session_id: str, unique_aircraft_identifier: str) -> str:
+        return f"active_track_observations:{session_id}:{unique_aircraft_identifier}"
+
+    @classmethod
+    def active_track_keys(cls, session_id: str, unique_aircraft_identifier: str) -> tuple[str, str]:
+        """The keys holding one track: its metadata hash and its observation list, e.g. to WATCH before moving it."""
+        track_key = cls._active_track_key(session_id, unique_aircraft_identifier)
+        return track_key, cls._active_track_observations_key(session_id, unique_aircraft_identifier)
+
+    @staticmethod
+    def _active_track_index_key(session_id: str) -> str:
+        return f"active_tracks:{session_id}"
+
+    @staticmethod
+    def _decode_fields(raw: dict) -> dict:
+        """Convert Redis bytes keys and values to strings."""
+        field_data = {}
+        for key, value in raw.items():
+            if isinstance(key, bytes):
+                key = key.decode("utf-8")
+            if isinstance(value, bytes):
+                value = value.decode("utf-8")
+            field_data[key] = value
+        return field_data
+
+    def _build_active_track(self, track_data: dict, raw_observations: list) -> ActiveTrack:
+        """Build an ActiveTrack from its metadata hash and its newest-first observation list."""
+        field_data = self._decode_fields(track_data)
+        observations = [json.loads(obs.decode("utf-8") if isinstance(obs, bytes) else obs) for obs in reversed(raw_observations)]
+        return ActiveTrack(
+            session_id=field_data.get("session_id", ""),
+            unique_aircraft_identifier=field_data.get("unique_aircraft_identifier", ""),
+            last_updated_timestamp=field_data.get("last_updated_timestamp", ""),
+            observations=observations,
+        )
+
+    def _queue_active_track_write(self, pipeline, session_id: str, active_track: ActiveTrack, new_observations: list[dict], replace: bool) -> None:
+        """
+        Queue the commands that write one track onto ``pipeline``.
+
+        Observations are kept newest-first in a capped list (LPUSH + LTRIM), so the per-track history never
+        grows beyond ``ACTIVE_TRACK_MAX_OBSERVATIONS``. The session index scores each track by its last update
+        so idle tracks can be expired without scanning the keyspace.
+        """
+        track_key = self._active_track_key(session_id, active_track.unique_aircraft_identifier)
+        observations_key = self._active_track_observations_key(session_id, active_track.unique_aircraft_identifier)
+        index_key = self._active_track_index_key(session_id)
+        pipeline.hset(
+            track_key,
+            mapping={
+                "session_id": active_track.session_id,
+                "unique_aircraft_identifier": active_track.unique_aircraft_identifier,
+                "last_updated_timestamp": active_track.last_updated_timestamp,
+            },
+        )
+        if replace:
+            pipeline.delete(observations_key)
+        latest_observations = new_observations[-ACTIVE_TRACK_MAX_OBSERVATIONS:]
+        if latest_observations:
+            pipeline.lpush(observations_key, *[json.dumps(obs) for obs in latest_observations])
+            pipeline.ltrim(observations_key, 0, ACTIVE_TRACK_MAX_OBSERVATIONS - 1)
+        pipeline.zadd(index_key, {active_track.unique_aircraft_identifier: int(arrow.utcnow().float_timestamp * 1000)})
+        pipeline.expire(track_key, ACTIVE_TRACK_IDLE_TIMEOUT_SECS)
+        pipeline.expire(observations_key, ACTIVE_TRACK_IDLE_TIMEOUT_SECS)
+        pipeline.expire(index_key, ACTIVE_TRACK_IDLE_TIMEOUT_SECS)
+
     def check_active_track_exists(self, session_id: str, unique_aircraft_identifier: str) -> bool:
         """
         Check if an active track exists for a given session ID and unique aircraft identifier.
@@ -165,7 +340,7 @@ class RedisStreamOperations:
         Returns:
             bool: True if the active track exists, False otherwise.
         """
-        track_key = f"active_track:{session_id}:{unique_aircraft_identifier}"
+        track_key = self._active_track_key(session_id, unique_aircraft_identifier)
         exists = self.redis.exists(track_key)
         logger.debug(f"Active track check for key '{track_key}': {'exists' if exists else 'does not exist'}")
         return exists == 1
@@ -178,31 +353,17 @@ class RedisStreamOperations:
             session_id (str): The session ID.
             unique_aircraft_identifier (str): The unique aircraft identifier (e.g., ICAO address).
         Returns:
-            Optional[ActiveTrack]: The active track if found, None otherwise.
+            Optional[ActiveTrack]: The active track if found, None otherwise. Observations are oldest first.
         """
-        track_key = f"active_track:{session_id}:{unique_aircraft_identifier}"
-        track_data = self.redis.hgetall(track_key)
+        track_key = self._active_track_key(session_id, unique_aircraft_identifier)
+        pipeline = self.redis.pipeline(transaction=False)
+        pipeline.hgetall(track_key)
+        pipeline.lrange(self._active_track_observations_key(session_id, unique_aircraft_identifier), 0, -1)
+        track_data, raw_observations = pipeline.execute()
         if not track_data:
             logger.debug(f"No active track found for key '{track_key}'")
             return None
-
-        # Convert Redis bytes to appropriate types
-        field_data = {}
-        for key, value in track_data.items():
-            if isinstance(key, bytes):
-                key = key.decode("utf-8")
-            if isinstance(value, bytes):
-                value = value.decode("utf-8")
-            field_data[key] = value
-
-        active_track = ActiveTrack(
-            session_id=field_data.get("session_id", ""),
-            unique_aircraft_identifier=field_data.get("unique_aircraft_identifier", ""),
-            last_updated_timestamp=field_data.get("last_updated_timestamp", ""),
-            observations=json.loads(field_data.get("observations", "[]")),
-        )
-        # logger.debug(f"Retrieved active track for key '{track_key}': {active_track}")
-        return active_track
+        return self._build_active_track(track_data, raw_observations)
 
     def add_active_track_to_session(self, session_id: str, active_track: ActiveTrack) -> None:
         """
@@ -212,64 +373,130 @@ class RedisStreamOperations:
             session_id (str): The session ID.
             active_track (ActiveTrack): The active track to add.
         """
-        track_key = f"active_track:{session_id}:{active_track.unique_aircraft_identifier}"
-        track_data = {
-            "session_id": active_track.session_id,
-            "unique_aircraft_identifier": active_track.unique_aircraft_identifier,
-            "last_updated_timestamp": active_track.last_updated_timestamp,
-            "observations": json.dumps(active_track.observations),
-        }
-        self.redis.hmset(track_key, track_data)
-        logger.info(f"Added active track to Redis with key '{track_key}': {active_track}")
+        pipeline = self.redis.pipeline(transaction=False)
+        self._queue_active_track_write(pipeline, session_id, active_track, active_track.observations, replace=True)
+        pipeline.execute()
+        logger.info(f"Added active track to Redis with key '{self._active_track_key(session_id, active_track.unique_aircraft_identifier)}'")
 
     def update_active_track(self, session_id: str, active_track: ActiveTrack) -> None:
         """
-        Update an existing active track in Redis for a given session ID.
+        Update an existing active track in Redis for a given session ID, replacing its stored observations.
 
         Args:
             session_id (str): The session ID.
             active_track (ActiveTrack): The active track to update.
         """
-        track_key = f"active_track:{session_id}:{active_track.unique_aircraft_identifier}"
-        track_data = {
-            "session_id": active_track.session_id,
-            "unique_aircraft_identifier": active_track.unique_aircraft_identifier,
-            "last_updated_timestamp": active_track.last_updated_timestamp,
-            "observations": json.dumps(active_track.observations),
-        }
-        self.redis.hmset(track_key, track_data)
-        # logger.info(f"Updated active track in Redis with key '{track_key}': {active_track}")
+        pipeline = self.redis.pipeline(transaction=False)
+        self._queue_active_track_write(pipeline, session_id, active_track, active_track.observations, replace=True)
+        pipeline.execute()
+
+    def queue_active_track_move(
+        self, pipeline, from_session_id: str, to_session_id: str, active_track: ActiveTrack | None, unique_aircraft_identifier: str
+    ) -> None:
+        """
+        Queue the commands that move one track, with its observation history, from one session's track store to another's.
+
+        Args:
+            pipeline: A Redis pipeline, usually a MULTI transaction.
+            from_session_id (str): The session the track is taken from.
+            to_session_id (str): The session the track is moved to.
+            active_track (ActiveTrack | None): The track as read from ``from_session_id``; ``None`` only removes it there.
+            unique_aircraft_identifier (str): The unique aircraft identifier of the track.
+        """
+        if active_track is not None:
+            moved = ActiveTrack(
+                session_id=to_session_id,
+                unique_aircraft_identifier=unique_aircraft_identifier,
+                last_updated_timestamp=active_track.last_updated_timestamp,
+                observations=active_track.observations,
+            )
+            self._queue_active_track_write(pipeline, to_session_id, moved, moved.observations, replace=True)
+        pipeline.delete(
+            self._active_track_key(from_session_id, unique_aircraft_identifier),
+            self._active_track_observations_key(from_session_id, unique_aircraft_identifier),
+        )
+        pipeline.zrem(self._active_track_index_key(from_session_id), unique_aircraft_identifier)
+
+    def append_active_track_observations(self, session_id: str, observations_by_track: dict[str, list[dict]]) -> None:
+        """
+        Append new observations to the active tracks of a session in a single pipelined round trip.
+
+        Tracks that do not exist yet are created. Only the last ``ACTIVE_TRACK_MAX_OBSERVATIONS`` observations
+        are retained per track, so the cost of a fusion tick depends on the tracks touched, not on their history.
+
+        Args:
+            session_id (str): The session ID.
+            observations_by_track (dict[str, list[dict]]): New observations (oldest first) keyed by unique aircraft identifier.
+        """
+        if not observations_by_track:
+            return
+        last_updated_timestamp = arrow.utcnow().isoformat()
+        pipeline = self.redis.pipeline(transaction=False)
+        for unique_aircraft_identifier, observations in observations_by_track.items():
+            active_track = ActiveTrack(
+                session_id=session_id,
+                unique_aircraft_identifier=unique_aircraft_identifier,
+                last_updated_timestamp=last_updated_timestamp,
+                observations=observations,
+            )
+            self._queue_active_track_write(pipeline, session_id, active_track, observations, replace=False)
+        pipeline.execute()
+        logger.debug(f"Appended observations to {len(observations_by_track)} active tracks for session_id '{session_id}'")
+
+    def expire_idle_active_tracks(self, session_id: str) -> int:
+        """
+        Remove tracks that have not been updated within ``ACTIVE_TRACK_IDLE_TIMEOUT_SECS`` from a session.
+
+        Args:
+            session_id (str): The session ID.
+
+        Returns:
+            int: The number of tracks removed.
+        """
+        index_key = self._active_track_index_key(session_id)
+        cutoff_ms = int(arrow.utcnow().float_timestamp * 1000) - ACTIVE_TRACK_IDLE_TIMEOUT_SECS * 1000
+        idle_tracks = self.redis.zrangebyscore(index_key, "-inf", cutoff_ms)
+        if not idle_tracks:
+            return 0
+        pipeline = self.redis.pipeline(transaction=False)
+        for unique_aircraft_identifier in idle_tracks:
+            if isinstance(unique_aircraft_identifier, bytes):
+                unique_aircraft_identifier = unique_aircraft_identifier.decode("utf-8")
+            pipeline.delete(
+                self._active_track_key(session_id, unique_aircraft_identifier),
+                self._active_track_observations_key(session_id, unique_aircraft_identifier),
+            )
+        pipeline.zrem(index_key, *idle_tracks)
+        pipeline.execute()
+        logger.debug(f"Expired {len(idle_tracks)} idle active tracks for session_id '{session_id}'")
+        return len(idle_tracks)
 
     def get_all_active_tracks_in_session(self, session_id: str) -> List[ActiveTrack]:
         """
         Retrieve all active tracks for a given session ID.
 
+        Idle tracks are expired first, then the live tracks listed in the session index are fetched in one pipeline.
+
         Args:
             session_id (str): The session ID.
         Returns:
             List[ActiveTrack]: A list of active tracks for the session.
         """
-        pattern = f"active_track:{session_id}:*"
-        track_keys = self.redis.keys(pattern)
+        self.expire_idle_active_tracks(session_id)
+        track_identifiers = self.redis.zrange(self._active_track_index_key(session_id), 0, -1)
+        if not track_identifiers:
+            return []
+        track_identifiers = [i.decode("utf-8") if isinstance(i, bytes) else i for i in track_identifiers]
+        pipeline = self.redis.pipeline(transaction=False)
+        for unique_aircraft_identifier in track_identifiers:
+            pipeline.hgetall(self._active_track_key(session_id, unique_aircraft_identifier))
+            pipeline.lrange(self._active_track_observations_key(session_id, unique_aircraft_identifier), 0, -1)
+        results = pipeline.execute()
+
         active_tracks = []
-        for track_key in track_keys:
-            track_data = self.redis.hgetall(track_key)
+        for track_data, raw_observations in zip(results[::2], results[1::2]):
             if track_data:
-                # Convert Redis bytes to appropriate types
-                field_data = {}
-                for key, value in track_data.items():
-                    if isinstance(key, bytes):
-                        key = key.decode("utf-8")
-                    if isinstance(value, bytes):
-                        value = value.decode("utf-8")
-                    field_data[key] = value
-                active_track = ActiveTrack(
-                    session_id=field_data.get("session_id", ""),
-                    unique_aircraft_identifier=field_data.get("unique_aircraft_identifier", ""),
-                    last_updated_timestamp=field_data.get("last_updated_timestamp", ""),
-                    observations=json.loads(field_data.get("observations", "[]")),
-                )
-                active_tracks.append(active_track)
+                active_tracks.append(self._build_active_track(track_data, raw_observations))
         logger.debug(f"Retrieved {len(active_tracks)} active tracks for session_id '{session_id}'")
         return active_tracks
 
@@ -317,7 +544,7 @@ class RedisStreamOperations:
                 return []
 
             # Read messages from the stream using consumer group
-            messages = self.redis.xreadgroup(
+            messages = self.stream_reader.xreadgroup(
                 consumer_group,
                 consumer_id,
                 {stream_name: ">"},
@@ -356,6 +583,280 @@ class RedisStreamOperations:
             logger.error(f"Error reading from Redis stream '{stream_name}' with consumer '{consumer_id}': {e}")
             return []
 
+    @staticmethod
+    def get_worker_consumer_name() -> str:
+        """
+        Return a consumer name that is stable for the lifetime of this worker process.
+
+        Reusing the same consumer name across ticks means entries delivered to this worker but not acknowledged
+        stay attributed to it instead of being orphaned under a throwaway consumer.
+        """
+        return f"{socket.gethostname()}-{os.getpid()}"
+
+    def _parse_and_acknowledge(self, stream_name: str, consumer_group: str, stream_messages: list) -> list[SingleAirtrafficObservation]:
+        """Parse stream entries into observations and acknowledge every entry, including ones that fail to parse."""
+        observations = []
+        message_ids_to_ack = []
+        for message_id, fields in stream_messages:
+            message_ids_to_ack.append(message_id)
+            if not fields:
+                # Entry was trimmed from the stream while pending
+                continue
+            observation = self._parse_stream_message_to_observation(fields, message_id=message_id)
+            if observation:
+                observations.append(observation)
+        if message_ids_to_ack:
+            try:
+                self.redis.xack(stream_name, consumer_group, *message_ids_to_ack)
+            except Exception as e:
+                logger.error(f"Error acknowledging messages from stream '{stream_name}': {e}")
+        return observations
+
+    def drain_air_traffic_data(
+        self,
+        stream_name: str,
+        consumer_group: str = "air_traffic_readers",
+        consumer_id: Optional[str] = None,
+        max_messages: int = 5000,
+        budget_ms: int = 500,
+        batch_size: int = 500,
+        block_ms: int = 200,
+        claim_min_idle_ms: int = 30000,
+    ) -> list[SingleAirtrafficObservation]:
+        """
+        Drain the Redis stream for this consumer until it is empty or the size or time budget is used up.
+
+        Stale pending entries left behind by other consumers (idle for at least ``claim_min_idle_ms``) are
+        reclaimed first with XAUTOCLAIM. The first XREADGROUP blocks for up to ``block_ms`` so an idle stream
+        does not spin; follow-up reads do not block and stop as soon as the stream is drained.
+
+        Args:
+            stream_name (str): The name of the Redis stream.
+            consumer_group (str): The name of the consumer group. Defaults to "air_traffic_readers".
+            consumer_id (str): The consumer name. Defaults to the stable per-worker consumer name.
+            max_messages (int): Maximum number of entries to consume in this call.
+            budget_ms (int): Maximum wall-clock time to spend reading, in milliseconds.
+            batch_size (int): Number of entries requested per XREADGROUP call.
+            block_ms (int): Time the first read blocks waiting for new entries, in milliseconds.
+            claim_min_idle_ms (int): Minimum idle time before another consumer's pending entry is reclaimed.
+
+        Returns:
+            List[SingleAirtrafficObservation]: List of air traffic observations.
+        """
+        if consumer_id is None:
+            consumer_id = self.get_worker_consumer_name()
+        try:
+            if not self.create_consumer_group(stream_name, consumer_group):
+                logger.error(f"Failed to create consumer group '{consumer_group}' for stream '{stream_name}'")
+                return []
+
+            deadline = time.monotonic() + budget_ms / 1000.0
+            observations: list[SingleAirtrafficObservation] = []
+            consumed = 0
+
+            _next_id, claimed, *_ = self.redis.xautoclaim(
+                stream_name, consumer_group, consumer_id, min_idle_time=claim_min_idle_ms, start_id="0-0", count=batch_size
+            )
+            if claimed:
+                logger.info(f"Reclaimed {len(claimed)} stale pending entries from stream '{stream_name}' for consumer '{consumer_id}'")
+                observations.extend(self._parse_and_acknowledge(stream_name, consumer_group, claimed))
+                consumed += len(claimed)
+
+            first_read = True
+            while consumed < max_messages:
+                remaining_ms = int((deadline - time.monotonic()) * 1000)
+                if remaining_ms <= 0:
+                    break
+                messages = self.stream_reader.xreadgroup(
+                    consumer_group,
+                    consumer_id,
+                    {stream_name: ">"},
+                    count=min(batch_size, max_messages - consumed),
+                    block=min(block_ms, remaining_ms) if first_read else None,
+                )
+                first_read = False
+                stream_messages = [entry for _stream, entries in messages for entry in entries] if messages else []
+                if not stream_messages:
+                    break
+                observations.extend(self._parse_and_acknowledge(stream_name, consumer_group, stream_messages))
+                consumed += len(stream_messages)
+
+            logger.info(f"Drained {consumed} entries ({len(observations)} observations) from stream '{stream_name}' for consumer '{consumer_id}'")
+            return observations
+
+        except Exception as e:
+            logger.error(f"Error draining Redis stream '{stream_name}' with consumer '{consumer_id}': {e}")
+            return []
+
+    def read_air_traffic_batch(
+        self,
+        stream_name: str,
+        consumer_group: str,
+        consumer_id: Optional[str] = None,
+        count: int = 1000,
+        block_ms: int = 1000,
+        claim_min_idle_ms: int = 30000,
+    ) -> tuple[list[str], list[SingleAirtrafficObservation]]:
+        """
+        Read one batch of entries for this consumer without acknowledging them.
+
+        Entries left pending by a consumer that stopped (idle for at least ``claim_min_idle_ms``) are
+        reclaimed before new entries are read. The caller acknowledges the returned message IDs with
+        ``acknowledge_air_traffic_entries`` once it has handled them, so a crash in between leaves the
+        entries pending for the next reader instead of losing them.
+
+        Args:
+            stream_name (str): The name of the Redis stream.
+            consumer_group (str): The name of the consumer group.
+            consumer_id (str): The consumer name. Defaults to the stable per-worker consumer name.
+            count (int): Maximum number of entries to read.
+            block_ms (int): Time to block waiting for new entries, in milliseconds.
+            claim_min_idle_ms (int): Minimum idle time before a pending entry is reclaimed.
+
+        Returns:
+            tuple[list[str], list[SingleAirtrafficObservation]]: The message IDs read, including entries that
+            could not be parsed or were trimmed while pending, and the parsed observations.
+        """
+        if consumer_id is None:
+            consumer_id = self.get_worker_consumer_name()
+        if not self.create_consumer_group(stream_name, consumer_group):
+            logger.error(f"Failed to create consumer group '{consumer_group}' for stream '{stream_name}'")
+            return [], []
+
+        _next_id, stream_messages, *_ = self.redis.xautoclaim(
+            stream_name, consumer_group, consumer_id, min_idle_time=claim_min_idle_ms, start_id="0-0", count=count
+        )
+        if stream_messages:
+            logger.info(f"Reclaimed {len(stream_messages)} stale pending entries from stream '{stream_name}' for consumer '{consumer_id}'")
+        else:
+            messages = self.stream_reader.xreadgroup(consumer_group, consumer_id, {stream_name: ">"}, count=count, block=block_ms)
+            stream_messages = [entry for _stream, entries in messages for entry in entries] if messages else []
+
+        message_ids = []
+        observations = []
+        trimmed = 0
+        for message_id, fields in stream_messages:
+            message_ids.append(message_id)
+            if not fields:
+                trimmed += 1
+                continue
+            observation = self._parse_stream_message_to_observation(fields, message_id=message_id)
+            if observation:
+                observations.append(observation)
+        if trimmed:
+            logger.warning(f"{trimmed} pending entries of stream '{stream_name}' were trimmed before consumer '{consumer_id}' could read them")
+        return message_ids, observations
+
+    def acknowledge_air_traffic_entries(self, stream_name: str, consumer_group: str, message_ids: list[str]) -> None:
+        """Acknowledge handled entries so they leave the consumer group's pending list."""
+        if message_ids:
+            self.redis.xack(stream_name, consumer_group, *message_ids)
+
+    @staticmethod
+    def stream_id_key(message_id: str) -> tuple[int, int]:
+        """Sortable form of a stream ID ('<ms>-<seq>'); a bare millisecond timestamp counts as sequence 0."""
+        ms, _, seq = str(message_id).partition("-")
+        return int(ms), int(seq or 0)
+
+    def _air_traffic_stream_info(self, stream_name: str) -> dict:
+        return self._decode_fields(self.redis.xinfo_stream(stream_name)) if self.redis.exists(stream_name) else {}
+
+    def air_traffic_stream_head(self, stream_name: str) -> str:
+        """The ID of the last entry ever added to the stream, "0-0" if the stream does not exist."""
+        return self._air_traffic_stream_info(stream_name).get("last-generated-id") or "0-0"
+
+    def read_air_traffic_since(
+        self, stream_name: str, last_id: str, count: int = 5000
+    ) -> tuple[list[tuple[str, SingleAirtrafficObservation]], str, bool]:
+        """
+        Read the entries after ``last_id`` with a non-blocking XREAD, outside any consumer group.
+
+        Args:
+            stream_name (str): The name of the Redis stream.
+            last_id (str): The last stream ID the caller has seen, "0-0" for everything the stream retains.
+            count (int): Maximum number of entries to read; the returned ID continues from there.
+
+        Returns:
+            tuple: The parsed ``(message_id, observation)`` pairs in stream order, the ID to continue from
+            next time, and whether entries after ``last_id`` were trimmed before they could be read. On a
+            gap nothing is read and the returned ID is the stream head, so the caller can resync from there.
+        """
+        info = self._air_traffic_stream_info(stream_name)
+        max_deleted_id = info.get("max-deleted-entry-id") or "0-0"
+        if self.stream_id_key(last_id) < self.stream_id_key(max_deleted_id):
+            return [], max(last_id, info.get("last-generated-id") or last_id, key=self.stream_id_key), True
+
+        messages = self.redis.xread({stream_name: last_id}, count=count)
+        stream_messages = [entry for _stream, entries in messages for entry in entries] if messages else []
+        entries = []
+        for message_id, fields in stream_messages:
+            message_id = message_id.decode("utf-8") if isinstance(message_id, bytes) else message_id
+            observation = self._parse_stream_message_to_observation(fields, message_id=message_id)
+            if observation:
+                entries.append((message_id, observation))
+
+        next_id = stream_messages[-1][0] if stream_messages else last_id
+        next_id = next_id.decode("utf-8") if isinstance(next_id, bytes) else next_id
+        return entries, next_id, False
+
+    @staticmethod
+    def _air_traffic_latest_state_fields(observations: List[dict]) -> dict[str, str]:
+        """Latest-state hash fields for a batch: the last observation of each ICAO address in it."""
+        now_ms = int(arrow.utcnow().float_timestamp * 1000)
+        return {observation["icao_address"]: json.dumps({"updated_at_ms": now_ms, "observation": observation}) for observation in observations}
+
+    def get_air_traffic_latest_state(self, max_age_ms: int) -> list[SingleAirtrafficObservation]:
+        """Latest observation per ICAO address, dropping (and deleting) positions older than ``max_age_ms``."""
+        cutoff_ms = int(arrow.utcnow().float_timestamp * 1000) - max_age_ms
+        observations = []
+        expired = []
+        for icao_address, raw in self._decode_fields(self.redis.hgetall(AIR_TRAFFIC_LATEST_STATE_KEY)).items():
+            state = json.loads(raw)
+            if state["updated_at_ms"] < cutoff_ms:
+                expired.append(icao_address)
+                continue
+            observations.append(SingleAirtrafficObservation(**state["observation"]))
+        if expired:
+            self.redis.hdel(AIR_TRAFFIC_LATEST_STATE_KEY, *expired)
+        return observations
+
+    def get_stream_lag_metrics(self, stream_name: str, consumer_group: str = "air_traffic_readers") -> StreamLagMetrics:
+        """
+        Measure how far a consumer group is behind the head of a Redis stream.
+
+        Args:
+            stream_name (str): The name of the Redis stream.
+            consumer_group (str): The name of the consumer group.
+
+        Returns:
+            StreamLagMetrics: Stream length, pending count, undelivered count and the age of the oldest
+            entry that has not been acknowledged yet (pending or undelivered).
+        """
+        now_ms = int(arrow.utcnow().float_timestamp * 1000)
+        metrics = StreamLagMetrics(stream_name=stream_name, consumer_group=consumer_group)
+        try:
+            metrics.stream_length = self.redis.xlen(stream_name)
+            groups = [self._decode_fields(g) for g in self.redis.xinfo_groups(stream_name)]
+            group_info = next((g for g in groups if g.get("name") == consumer_group), None)
+            if group_info is None:
+                return metrics
+            metrics.pending_count = int(group_info.get("pending") or 0)
+            metrics.undelivered_count = int(group_info.get("lag") or 0)
+
+            oldest_id = None
+            if metrics.pending_count:
+                oldest_id = self.redis.xpending(stream_name, consumer_group).get("min")
+            else:
+                last_delivered_id = group_info.get("last-delivered-id")
+                next_entries = self.redis.xrange(stream_name, min=f"({last_delivered_id}", count=1) if last_delivered_id else []
+                if next_entries:
+                    oldest_id = next_entries[0][0]
+            if oldest_id:
+                metrics.oldest_entry_age_ms = max(now_ms - self._extract_message_id_timestamp(oldest_id), 0)
+        except Exception as e:
+            logger.error(f"Error collecting lag metrics for Redis stream '{stream_name}': {e}")
+        return metrics
+
     def _parse_stream_message_to_observation(self, fields: dict, message_id: str | bytes | None = None) -> SingleAirtrafficObservation | None:
         """
         Parse Redis stream message fields into a SingleAirtrafficObservation instance.
@@ -11,12 +11,20 @@ class FlightBlenderSettings(BaseSettings):
     REDIS_PORT: int = 6379
     REDIS_PASSWORD: str | None = None
     AIR_TRAFFIC_STREAM_TTL_MS: int = 4000
+    AIR_TRAFFIC_STREAM_MAX_LEN: int = 10000
     SECRET_KEY: str = "changeme"
     IS_DEBUG: bool = False
     DISABLE_JSON_LOGGING: bool = False
     AMQP_URL: str = ""
     AMQP_RECREATE_MISMATCHED_EXCHANGE: bool = False
 
+    # ── Redis connection pools ─────────────────────────────────────────────
+    REDIS_POOL_MAX_CONNECTIONS: int = 64
+    REDIS_PUBSUB_POOL_MAX_CONNECTIONS: int = 8
+    REDIS_STREAM_POOL_MAX_CONNECTIONS: int = 16
+    REDIS_POOL_TIMEOUT_SECS: float = 5.0
+    REDIS_HEALTH_CHECK_INTERVAL_SECS: int = 30
+
     # ── Auth ───────────────────────────────────────────────────────────────
     BYPASS_AUTH_TOKEN_VERIFICATION: bool = False
     PASSPORT_AUDIENCE: str = "testflight.flightblender.com"
@@ -35,6 +43,9 @@ class FlightBlenderSettings(BaseSettings):
     AUTH_DSS_CLIENT_SECRET: str | None = None
     FLIGHTBLENDER_READ_SCOPE: str = "flightblender.read"
     FLIGHTBLENDER_WRITE_SCOPE: str = "flightblender.write"
+    JWKS_CACHE_TTL_SECS: int = 300
+    JWKS_MIN_REFRESH_INTERVAL_SECS: float = 10.0
+    VERIFIED_TOKEN_CACHE_MAX_ENTRIES: int = 4096
 
     # ── DSS ────────────────────────────────────────────────────────────────
     USSP_NETWORK_ENABLED: bool = False
@@ -43,22 +54,90 @@ class FlightBlenderSettings(BaseSettings):
     FLIGHTBLENDER_FQDN: str = "http://flight-blender:8000"
     UTM_ZONE: str = "54N"
     AUTO_SUBMIT_TO_DSS: bool = True
+    SCD_PEER_REQUEST_DEADLINE_SECS: float = 10.0
+    SCD_PEER_MAX_CONCURRENCY_PER_HOST: int = 8
 
     # ── Surveillance / heartbeat ───────────────────────────────────────────
     HEARTBEAT_RATE_SECS: int = 5
     HEARTBEAT_MAX_LATENCY_SECS: float = 1.5
     HEARTBEAT_RETENTION_DAYS: int = 30
     ENABLE_CONFORMANCE_MONITORING: bool = False
+    ACTIVE_TRACK_MAX_OBSERVATIONS: int = 10
+    ACTIVE_TRACK_IDLE_TIMEOUT_SECS: int = 60
+    SURVEILLANCE_STREAM_DRAIN_MAX_MESSAGES: int = 5000
+    SURVEILLANCE_STREAM_DRAIN_BUDGET_MS: int = 500
+    SURVEILLANCE_STREAM_READ_BATCH_SIZE: int = 500
+    SURVEILLANCE_STREAM_BLOCK_MS: int = 200
+    SURVEILLANCE_STREAM_CLAIM_IDLE_MS: int = 30000
+    # One fusion job drains the air traffic stream into the track picture that every session filters
+    SURVEILLANCE_FUSION_INTERVAL_SECS: float = 1.0
+    SURVEILLANCE_FUSION_PICTURE_TTL_SECS: int = 30
+    REALTIME_CLIENT_QUEUE_SIZE: int = 8
+    # Heartbeat and track events are written in batches of FLUSH_SIZE rows or every FLUSH_INTERVAL_SECS
+    SURVEILLANCE_EVENT_BUFFER_FLUSH_SIZE: int = 500
+    SURVEILLANCE_EVENT_BUFFER_FLUSH_INTERVAL_SECS: float = 2.0
+    SURVEILLANCE_EVENT_BUFFER_MAX_QUEUED: int = 20000
+    SURVEILLANCE_SENSOR_CACHE_TTL_SECS: float = 30.0
+    # Serve get_service_metrics from per-minute rollups kept by the rollup_surveillance_metrics task
+    SURVEILLANCE_METRICS_ROLLUP_ENABLED: bool = False
+    SURVEILLANCE_METRICS_ROLLUP_INTERVAL_SECS: float = 60.0
+
+    # ── Air traffic ingest ─────────────────────────────────────────────────
+    # "celery", or "direct": the API writes to the stream and flight_blender.tasks.air_traffic_persister persists
+    FLIGHT_FEED_INGEST_MODE: str = "celery"
+    FLIGHT_FEED_INGEST_MAX_IN_FLIGHT: int = 20000
+    FLIGHT_FEED_INGEST_MAX_PERSIST_DELAY_MS: int = 2000
+    FLIGHT_FEED_INGEST_RETRY_AFTER_SECS: int = 1
+    FLIGHT_FEED_PERSIST_BATCH_SIZE: int = 1000
+    FLIGHT_FEED_PERSIST_BLOCK_MS: int = 1000
+    # The persister reads its own stream, capped by length only so the fusion stream's TTL cannot trim unpersisted entries
+    FLIGHT_FEED_PERSIST_STREAM_MAX_LEN: int = 1_000_000
+    # get_air_traffic with a cursor: entries read per poll, and the age limit of positions in a resync snapshot
+    AIR_TRAFFIC_CURSOR_READ_COUNT: int = 5000
+    AIR_TRAFFIC_CURSOR_SNAPSHOT_WINDOW_SECS: int = 20
+    # Above 1, observations are also routed to air_traffic_stream:{shard} by "tile" or "icao", one fusion job per shard
+    AIR_TRAFFIC_STREAM_SHARDS: int = 1
+    AIR_TRAFFIC_SHARD_KEY: str = "tile"
+    AIR_TRAFFIC_SHARD_TILE_DEG: float = 1.0
+
+    # ── Flight observation storage ─────────────────────────────────────────
+    # Postgres only, read by the alembic migration: store observations in daily range partitions on created_at
+    FLIGHT_OBSERVATION_PARTITIONING_ENABLED: bool = False
+    FLIGHT_OBSERVATION_PARTITION_PREMAKE_DAYS: int = 3
+
+    # ── Data retention ─────────────────────────────────────────────────────
+    # Days each table is kept, 0 (the default for observations and conformance records) keeps everything; heartbeat and track events follow HEARTBEAT_RETENTION_DAYS
+    FLIGHT_OBSERVATION_RETENTION_DAYS: int = 0
+    CONFORMANCE_RECORD_RETENTION_DAYS: int = 0
+    SURVEILLANCE_METRICS_ROLLUP_RETENTION_DAYS: int = 90
+    RETENTION_BATCH_SIZE: int = 5000
+    RETENTION_DRY_RUN: bool = False
+    # Summarise expired flight observations per track and minute before deleting them
+    RETENTION_ROLLUP_OBSERVATIONS: bool = False
+    # Directory for gzipped JSON Lines copies of expired rows; empty disables archiving
+    RETENTION_ARCHIVE_DIR: str = ""
+
+    # ── Tick scheduler ─────────────────────────────────────────────────────
+    # Needs the tick scheduler service (python -m flight_blender.tasks.tick_scheduler) running; otherwise jobs run as Celery tasks
+    TICK_SCHEDULER_ENABLED: bool = False
+    TICK_SCHEDULER_RESOLUTION_MS: int = 50
+    TICK_SCHEDULER_SYNC_INTERVAL_SECS: float = 1.0
+    TICK_SCHEDULER_LEASE_TTL_SECS: float = 10.0
 
     # ── Plugins ────────────────────────────────────────────────────────────
     FLIGHT_BLENDER_PLUGIN_DECONFLICTION_ENGINE: str = "flight_blender.services.deconfliction_engine.DefaultDeconflictionEngine"
     FLIGHT_BLENDER_PLUGIN_TRAFFIC_DATA_FUSER: str = ""
     FLIGHT_BLENDER_PLUGIN_VOLUME_4D_GENERATOR: str = ""
+    DECONFLICTION_INDEX_REBUILD_INTERVAL_SECS: int = 300
 
     # ── External services ──────────────────────────────────────────────────
     WEATHER_API_BASE_URL: str = "https://api.open-meteo.com/v1/forecast"
     OPENSKY_NETWORK_USERNAME: str = "opensky"
     OPENSKY_NETWORK_PASSWORD: str = "opensky"
+    OPENSKY_NETWORK_API_URL: str = "https://opensky-network.org/api/states/all"
+    # Recorded /states/all responses (file or directory) to replay instead of polling the live API
+    OPENSKY_REPLAY_PATH: str = ""
+    OPENSKY_INGEST_CHUNK_SIZE: int = 1000
 
     # ── UAV defaults ───────────────────────────────────────────────────────
     DEFAULT_UAV_SPEED_M_PER_S: float = 5.5
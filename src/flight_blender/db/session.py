@@ -1,8 +1,9 @@
+import asyncio
 from collections.abc import AsyncGenerator, Iterator
 from contextlib import asynccontextmanager, contextmanager
 
 from sqlalchemy import create_engine
-from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import DeclarativeBase, Session, sessionmaker
 from sqlalchemy.pool import NullPool
 
@@ -25,6 +26,33 @@ AsyncSessionLocal = async_sessionmaker(async_engine, expire_on_commit=False)
 _task_async_engine = create_async_engine(_async_url, poolclass=NullPool)
 _TaskAsyncSessionLocal = async_sessionmaker(_task_async_engine, expire_on_commit=False)
 
+# A process that keeps one event loop alive (Celery worker bootstrap, tick scheduler) binds a pooled
+# engine to that loop; async_task_session only uses it from that loop and falls back to NullPool elsewhere.
+_pooled_task_sessions: tuple[asyncio.AbstractEventLoop, AsyncEngine, async_sessionmaker[AsyncSession]] | None = None
+
+
+def create_pooled_task_engine() -> AsyncEngine:
+    return create_async_engine(_async_url, pool_pre_ping=True)
+
+
+def bind_task_sessions_to_loop(loop: asyncio.AbstractEventLoop, task_engine: AsyncEngine) -> None:
+    """Serve async_task_session from ``task_engine``'s connection pool while running on ``loop``."""
+    global _pooled_task_sessions
+    _pooled_task_sessions = (loop, task_engine, async_sessionmaker(task_engine, expire_on_commit=False))
+
+
+def unbind_task_sessions() -> AsyncEngine | None:
+    """Drop the loop binding and return the engine so the caller can dispose of it on its loop."""
+    global _pooled_task_sessions
+    bound, _pooled_task_sessions = _pooled_task_sessions, None
+    return bound[1] if bound is not None else None
+
+
+def _task_session_factory() -> async_sessionmaker[AsyncSession]:
+    if _pooled_task_sessions is not None and _pooled_task_sessions[0] is asyncio.get_running_loop():
+        return _pooled_task_sessions[2]
+    return _TaskAsyncSessionLocal
+
 
 class Base(DeclarativeBase):
     pass
@@ -57,7 +85,7 @@ async def async_get_db() -> AsyncGenerator[AsyncSession, None]:
 @asynccontextmanager
 async def async_task_session() -> AsyncGenerator[AsyncSession, None]:
     """Async session for Celery tasks / non-DI contexts. Commit on success, rollback on error."""
-    async with _TaskAsyncSessionLocal() as db:
+    async with _task_session_factory()() as db:
         try:
             yield db
             await db.commit()
@@ -1,4 +1,5 @@
 from dataclasses import dataclass, field
+from datetime import datetime
 
 from marshmallow import Schema
 from marshmallow import fields as ma_fields
@@ -59,6 +60,32 @@ class FlightObservationsProcessingResponse:
     status: int
 
 
+@dataclass
+class IngestLatencyMetrics:
+    """Time from an observation entering the air traffic stream (``ingested_at_ms``) to it being persisted."""
+
+    persisted_count: int = 0
+    p50_ms: int = 0
+    p95_ms: int = 0
+    max_ms: int = 0
+
+
+@dataclass
+class FlightObservationRollup:
+    """Flight observations of one track (session and ICAO address) within one UTC minute."""
+
+    session_id: str
+    icao_address: str
+    minute_start: datetime
+    observation_count: int
+    first_observed_at: datetime
+    last_observed_at: datetime
+    latitude_dd_avg: float
+    longitude_dd_avg: float
+    altitude_mm_min: float
+    altitude_mm_max: float
+
+
 class ObservationSchema(Schema):
     lat_dd = ma_fields.Float(required=True)
     lon_dd = ma_fields.Float(required=True)
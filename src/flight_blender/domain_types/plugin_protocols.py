@@ -50,3 +50,44 @@ class Volume4DGeneratorProtocol(Protocol):
     ) -> list[Volume4D]:
         """Convert a GeoJSON FeatureCollection into a list of Volume4D objects."""
         ...
+
+
+@runtime_checkable
+class ReusableTrafficDataFuserProtocol(Protocol):
+    """Structural interface for traffic data fusers kept alive between fusion cycles.
+
+    A fuser class with ``fuse`` is constructed once per fusion shard and worker process, without
+    arguments, and given each cycle's observations, so it can keep state between cycles.
+    """
+
+    def fuse(
+        self,
+        *,
+        session_id: str,
+        raw_observations: list[SingleAirtrafficObservation],
+        track_store: RedisStreamOperations,
+    ) -> list[TrackMessage]:
+        """Run one fusion cycle and return track messages."""
+        ...
+
+
+@runtime_checkable
+class PluginLifecycleProtocol(Protocol):
+    """Optional hooks of a plugin instance kept in ``plugins.registry.plugin_instances``."""
+
+    def setup(self) -> None:
+        """Called once, when the instance is created."""
+        ...
+
+    def teardown(self) -> None:
+        """Called once, when the process shuts down."""
+        ...
+
+
+@runtime_checkable
+class SessionAwarePluginProtocol(Protocol):
+    """Optional per-session hooks of a plugin instance kept in ``plugins.registry.plugin_instances``."""
+
+    def on_session_start(self, session_id: str) -> None: ...
+
+    def on_session_stop(self, session_id: str) -> None: ...
@@ -0,0 +1,17 @@
+from dataclasses import dataclass
+
+
+@dataclass
+class RetentionStats:
+    """Progress of one retention pass over one table; ``expired_rows`` is only counted in dry-run mode."""
+
+    table: str
+    cutoff: str
+    dry_run: bool = False
+    expired_rows: int = 0
+    deleted_rows: int = 0
+    batches: int = 0
+    partitions_dropped: int = 0
+    archived_rows: int = 0
+    rollup_rows: int = 0
+    elapsed_ms: int = 0
@@ -1,4 +1,5 @@
 from dataclasses import dataclass
+from datetime import datetime
 from enum import Enum
 
 FLIGHT_OBSERVATION_TRAFFIC_SOURCE = (
@@ -56,6 +57,38 @@ class SurveillanceSensorDetail:
     updated_at: str
 
 
+@dataclass(frozen=True)
+class ActiveSurveillanceSensor:
+    id: str
+    sensor_identifier: str
+    expected_latency_ms: int
+    horizontal_accuracy_m: float
+
+
+@dataclass(frozen=True)
+class SurveillanceSubscription:
+    """What a surveillance session receives from the shared track picture.
+
+    ``area_of_interest`` is ``(lat_min, lng_min, lat_max, lng_max)``; ``traffic_sources`` keeps tracks
+    whose latest observation came from one of the listed traffic sources. ``None`` applies no filter.
+    """
+
+    area_of_interest: tuple[float, float, float, float] | None = None
+    update_interval_secs: float = 1.0
+    traffic_sources: tuple[int, ...] | None = None
+
+    @classmethod
+    def from_dict(cls, data: dict | None) -> "SurveillanceSubscription":
+        data = data or {}
+        area_of_interest = data.get("area_of_interest")
+        traffic_sources = data.get("traffic_sources")
+        return cls(
+            area_of_interest=tuple(area_of_interest) if area_of_interest is not None else None,
+            update_interval_secs=data.get("update_interval_secs", 1.0),
+            traffic_sources=tuple(traffic_sources) if traffic_sources is not None else None,
+        )
+
+
 @dataclass
 class HeartbeatRateMetric:
     measured_rate_hz: float
@@ -136,6 +169,19 @@ class SurveillanceMetrics:
     window_end: str
 
 
+@dataclass
+class SessionMetricCounts:
+    """Heartbeat and track tick counts of one surveillance session over a window, from events or per-minute rollups."""
+
+    session_id: str
+    heartbeat_count: int = 0
+    heartbeats_on_time: int = 0
+    first_heartbeat_at: datetime | None = None
+    last_heartbeat_at: datetime | None = None
+    track_ticks: int = 0
+    track_ticks_with_active_tracks: int = 0
+
+
 class SpeedAccuracy(str, Enum):
     SAUnknown = "SAUnknown"
     SA10mpsPlus = "SA10mpsPlus"
@@ -220,3 +266,13 @@ class ActiveTrack:
     unique_aircraft_identifier: str
     last_updated_timestamp: str
     observations: list[dict]
+
+
+@dataclass
+class StreamLagMetrics:
+    stream_name: str
+    consumer_group: str
+    stream_length: int = 0
+    pending_count: int = 0
+    undelivered_count: int = 0
+    oldest_entry_age_ms: int = 0
@@ -11,12 +11,13 @@ from flight_blender.models.flight_declarations_orm import (  # noqa: F401
     PeerOperationalIntentReferenceORM,
     SubscriberORM,
 )
-from flight_blender.models.flight_feed_orm import FlightObservationORM, SignedTelmetryPublicKeyORM  # noqa: F401
+from flight_blender.models.flight_feed_orm import FlightObservationORM, FlightObservationRollupORM, SignedTelmetryPublicKeyORM  # noqa: F401
 from flight_blender.models.geo_fence_orm import GeoFenceORM  # noqa: F401
 from flight_blender.models.notifications_orm import OperatorRIDNotificationORM  # noqa: F401
 from flight_blender.models.rid_orm import ISASubscriptionORM, RIDFlightDetailORM  # noqa: F401
 from flight_blender.models.surveillance_orm import (  # noqa: F401
     SurveillanceHeartbeatEventORM,
+    SurveillanceMetricsRollupORM,
     SurveillanceSensorFailureNotificationORM,
     SurveillanceSensorHealthORM,
     SurveillanceSensorHealthTrackingORM,
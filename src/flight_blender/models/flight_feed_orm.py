@@ -1,7 +1,7 @@
 import uuid
 from datetime import datetime, timezone
 
-from sqlalchemy import Boolean, DateTime, Float, Integer, String, Text
+from sqlalchemy import Boolean, DateTime, Float, Index, Integer, String, Text, UniqueConstraint
 from sqlalchemy.orm import Mapped, mapped_column
 
 from flight_blender.db.session import Base
@@ -26,6 +26,33 @@ class FlightObservationORM(Base):
     )
 
 
+# Latest-first lookups per session and per aircraft; the descending key lets ``ORDER BY created_at DESC LIMIT n``
+# read the newest entries straight off the index.
+Index("ix_flightobservation_session_id_created_at", FlightObservationORM.session_id, FlightObservationORM.created_at.desc())
+Index("ix_flightobservation_icao_address_created_at", FlightObservationORM.icao_address, FlightObservationORM.created_at.desc())
+# Viewport prefilter: a latitude range scan, with longitude checked from the index entries.
+Index("ix_flightobservation_latitude_dd_longitude_dd", FlightObservationORM.latitude_dd, FlightObservationORM.longitude_dd)
+
+
+class FlightObservationRollupORM(Base):
+    """Per-track, per-minute summary of flight observations, written by the retention job before it deletes them."""
+
+    __tablename__ = "flight_feed_operations_flightobservationrollup"
+    __table_args__ = (UniqueConstraint("session_id", "icao_address", "minute_start", name="uq_flightobservationrollup_track_minute"),)
+
+    id: Mapped[uuid.UUID] = mapped_column(primary_key=True, default=uuid.uuid4)
+    session_id: Mapped[uuid.UUID | None] = mapped_column(nullable=True)
+    icao_address: Mapped[str] = mapped_column(Text, nullable=False)
+    minute_start: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False, index=True)
+    observation_count: Mapped[int] = mapped_column(Integer, nullable=False)
+    first_observed_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    last_observed_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    latitude_dd_avg: Mapped[float] = mapped_column(Float, nullable=False)
+    longitude_dd_avg: Mapped[float] = mapped_column(Float, nullable=False)
+    altitude_mm_min: Mapped[float] = mapped_column(Float, nullable=False)
+    altitude_mm_max: Mapped[float] = mapped_column(Float, nullable=False)
+
+
 class SignedTelmetryPublicKeyORM(Base):
     # Note: table name uses Django's typo "Telmetry" not "Telemetry"
     __tablename__ = "flight_feed_operations_signedtelmetrypublickey"
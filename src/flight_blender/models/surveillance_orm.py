@@ -1,7 +1,7 @@
 import uuid
 from datetime import datetime, timezone
 
-from sqlalchemy import Boolean, DateTime, Float, ForeignKey, Integer, String, Text
+from sqlalchemy import Boolean, DateTime, Float, ForeignKey, Index, Integer, String, Text, UniqueConstraint
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from flight_blender.db.session import Base
@@ -109,6 +109,26 @@ class SurveillanceTrackEventORM(Base):
     session: Mapped["SurveillanceSessionORM"] = relationship(back_populates="track_events")
 
 
+class SurveillanceMetricsRollupORM(Base):
+    """Per-session, per-minute heartbeat and track tick counts, kept up to date by the rollup_surveillance_metrics task."""
+
+    __tablename__ = "surveillance_monitoring_operations_surveillancemetricsrollup"
+    __table_args__ = (
+        UniqueConstraint("session_id", "minute_start", name="uq_surveillancemetricsrollup_session_minute"),
+        Index("ix_surveillancemetricsrollup_minute_start", "minute_start"),
+    )
+
+    id: Mapped[uuid.UUID] = mapped_column(primary_key=True, default=uuid.uuid4)
+    session_id: Mapped[uuid.UUID] = mapped_column(nullable=False)
+    minute_start: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    heartbeat_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    heartbeats_on_time: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    first_heartbeat_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    last_heartbeat_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    track_ticks: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    track_ticks_with_active_tracks: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+
+
 class SurveillanceSensorFailureNotificationORM(Base):
     __tablename__ = "surveillance_monitoring_operations_surveillancesensorfailur2a6d"
 
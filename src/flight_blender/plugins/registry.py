@@ -0,0 +1,98 @@
+"""Long-lived plugin instances for Flight Blender.
+
+``load_plugin`` caches plugin classes; ``plugin_instances`` caches one instance of a plugin per
+dotted path and scope for the life of the process (a Celery worker process or the API server), so
+a stateful plugin — a Kalman-filter fuser, an indexed de-confliction engine — keeps its caches
+between calls instead of being rebuilt on every one.
+
+Instances may implement the optional hooks of ``PluginLifecycleProtocol`` and
+``SessionAwarePluginProtocol``: ``setup()`` runs once when the instance is created,
+``teardown()`` when the process shuts down, and ``on_session_start(session_id)`` /
+``on_session_stop(session_id)`` when a surveillance session starts or stops: in the API process
+that starts or stops it, and in every tick scheduler instance, where fusion runs.
+
+Usage::
+
+    from flight_blender.plugins.registry import plugin_instances
+
+    engine = plugin_instances.get(
+        settings.FLIGHT_BLENDER_PLUGIN_DECONFLICTION_ENGINE,
+        expected_protocol=DeconflictionEngineProtocol,
+    )
+    result = await engine.check_deconfliction(request, db)
+"""
+
+import threading
+from typing import Any
+
+from loguru import logger
+
+from flight_blender.domain_types.plugin_protocols import PluginLifecycleProtocol, SessionAwarePluginProtocol
+from flight_blender.plugins.loader import load_plugin
+
+
+class PluginInstanceRegistry:
+    """The plugin instances of one process, keyed by dotted path and scope."""
+
+    def __init__(self):
+        self._instances: dict[tuple[str, str], Any] = {}
+        self._lock = threading.Lock()
+
+    def get(self, dotted_path: str, *, expected_protocol: Any = None, scope: str = "", **init_kwargs: Any) -> Any:
+        """Return the instance of the plugin at ``dotted_path`` for ``scope``, creating it on first use.
+
+        Args:
+            dotted_path: Fully qualified class path, as for ``load_plugin``.
+            expected_protocol: An optional ``@runtime_checkable`` Protocol the class must satisfy.
+            scope: Callers that use an instance from several threads at once take one scope each,
+                e.g. one per fusion shard.
+            **init_kwargs: Constructor arguments, only used when the instance is created.
+
+        Raises:
+            ImportError, AttributeError, TypeError: As ``load_plugin``.
+        """
+        key = (dotted_path, scope)
+        instance = self._instances.get(key)
+        if instance is not None:
+            return instance
+        with self._lock:
+            instance = self._instances.get(key)
+            if instance is None:
+                cls = load_plugin(dotted_path, expected_protocol=expected_protocol)
+                instance = cls(**init_kwargs)
+                # A plugin whose setup fails is not kept, so the next call tries again
+                if isinstance(instance, PluginLifecycleProtocol):
+                    instance.setup()
+                self._instances[key] = instance
+                logger.info(f"Created plugin instance {dotted_path!r} (scope {scope!r})")
+        return instance
+
+    def start_session(self, session_id: str) -> None:
+        self._notify_sessions("on_session_start", session_id)
+
+    def stop_session(self, session_id: str) -> None:
+        self._notify_sessions("on_session_stop", session_id)
+
+    def _notify_sessions(self, hook: str, session_id: str) -> None:
+        for (dotted_path, _), instance in list(self._instances.items()):
+            if not isinstance(instance, SessionAwarePluginProtocol):
+                continue
+            try:
+                getattr(instance, hook)(session_id)
+            except Exception as exc:
+                logger.warning(f"Plugin {dotted_path!r} {hook} failed for session {session_id}: {exc}")
+
+    def teardown(self) -> None:
+        """Tear down and forget every instance; the next ``get`` creates a new one."""
+        with self._lock:
+            instances, self._instances = self._instances, {}
+        for (dotted_path, _), instance in instances.items():
+            if not isinstance(instance, PluginLifecycleProtocol):
+                continue
+            try:
+                instance.teardown()
+            except Exception as exc:
+                logger.warning(f"Plugin {dotted_path!r} teardown failed: {exc}")
+
+
+plugin_instances = PluginInstanceRegistry()
@@ -1,7 +1,7 @@
 import uuid
 from datetime import datetime
 
-from sqlalchemy import select
+from sqlalchemy import func, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from flight_blender.models.conformance_orm import ConformanceRecordORM
@@ -51,5 +51,21 @@ class SQLAlchemyConformanceRepository:
         result = await self.db.execute(select(GeoFenceORM).where(GeoFenceORM.status == 0))
         return list(result.scalars().all())
 
+    async def get_active_geofences_fingerprint(self) -> tuple[int, datetime | None]:
+        """Count and latest ``updated_at`` of the active geofences; changes whenever one is created, updated or deleted."""
+        result = await self.db.execute(select(func.count(GeoFenceORM.id), func.max(GeoFenceORM.updated_at)).where(GeoFenceORM.status == 0))
+        count, latest_update = result.one()
+        return count, latest_update
+
+    async def get_active_geofence_versions(self) -> dict[uuid.UUID, datetime | None]:
+        result = await self.db.execute(select(GeoFenceORM.id, GeoFenceORM.updated_at).where(GeoFenceORM.status == 0))
+        return {fence_id: updated_at for fence_id, updated_at in result.all()}
+
+    async def get_geofences_by_ids(self, geofence_ids: list[uuid.UUID]) -> list[GeoFenceORM]:
+        if not geofence_ids:
+            return []
+        result = await self.db.execute(select(GeoFenceORM).where(GeoFenceORM.id.in_(geofence_ids)))
+        return list(result.scalars().all())
+
 
 AsyncConformanceRepository = SQLAlchemyConformanceRepository
@@ -77,6 +77,14 @@ class SQLAlchemyFlightDeclarationRepository:
         result = await self.db.execute(stmt)
         return list(result.scalars().all())
 
+    async def get_active_declarations_ending_after(self, moment) -> list[FlightDeclarationORM]:
+        stmt = select(FlightDeclarationORM).where(
+            FlightDeclarationORM.state.in_(ACTIVE_OPERATIONAL_STATES),
+            FlightDeclarationORM.end_datetime >= moment,
+        )
+        result = await self.db.execute(stmt)
+        return list(result.scalars().all())
+
     async def create(self, **kwargs) -> FlightDeclarationORM:
         obj = FlightDeclarationORM(**kwargs)
         self.db.add(obj)
@@ -111,6 +119,8 @@ class SQLAlchemyFlightDeclarationRepository:
             return None
         for key, value in fields.items():
             setattr(obj, key, value)
+        if "updated_at" not in fields:
+            obj.updated_at = datetime.now(timezone.utc)
         await self.db.flush()
         await self.db.refresh(obj)
         return obj
@@ -1,16 +1,18 @@
 import json
 import uuid
-from datetime import datetime, timezone
+from dataclasses import fields
+from datetime import date, datetime, timezone
 from typing import Optional
 
 import arrow
 from loguru import logger
-from sqlalchemy import and_, delete, select
+from sqlalchemy import and_, delete, insert, select, text
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from flight_blender.domain_types.flight_feed import SingleAirtrafficObservation
+from flight_blender.domain_types.flight_feed import FlightObservationRollup, SingleAirtrafficObservation
 from flight_blender.models.flight_declarations_orm import FlightDeclarationORM
-from flight_blender.models.flight_feed_orm import FlightObservationORM, SignedTelmetryPublicKeyORM
+from flight_blender.models.flight_feed_orm import FlightObservationORM, FlightObservationRollupORM, SignedTelmetryPublicKeyORM
+from flight_blender.utils.datetime_utils import as_utc
 
 
 def _normalize_timestamp(ts) -> Optional[datetime]:
@@ -32,12 +34,57 @@ def _normalize_timestamp(ts) -> Optional[datetime]:
         return None
 
 
+def _session_uuid(session_id) -> uuid.UUID:
+    """Observations carry their session ID as a string; the column stores a UUID."""
+    if isinstance(session_id, uuid.UUID):
+        return session_id
+    return uuid.UUID(str(session_id or "00000000-0000-0000-0000-000000000000"))
+
+
+def _within_bounds(statement, bounds: Optional[tuple[float, float, float, float]]):
+    """Restrict an observation query to ``bounds`` (min latitude, min longitude, max latitude, max longitude), inclusive."""
+    if bounds is None:
+        return statement
+    lat_min, lon_min, lat_max, lon_max = bounds
+    return statement.where(
+        FlightObservationORM.latitude_dd.between(lat_min, lat_max),
+        FlightObservationORM.longitude_dd.between(lon_min, lon_max),
+    )
+
+
+_OBSERVATION_COLUMNS = tuple(column.name for column in FlightObservationORM.__table__.columns)
+
+_ROLLUP_FIELDS = tuple(f.name for f in fields(FlightObservationRollup) if f.name != "session_id")
+
+
+def _observation_rows(observations: list[SingleAirtrafficObservation]) -> list[dict]:
+    """Column-keyed rows for a Core insert, with the defaults the ORM would otherwise fill in."""
+    now = datetime.now(timezone.utc)
+    return [
+        {
+            "id": uuid.uuid4(),
+            "session_id": _session_uuid(o.session_id),
+            "latitude_dd": o.lat_dd,
+            "longitude_dd": o.lon_dd,
+            "altitude_mm": o.altitude_mm,
+            "traffic_source": o.traffic_source,
+            "source_type": o.source_type,
+            "icao_address": o.icao_address,
+            "metadata": json.dumps(o.metadata),
+            "sensor_timestamp": _normalize_timestamp(o.timestamp),
+            "created_at": now,
+            "updated_at": now,
+        }
+        for o in observations
+    ]
+
+
 class SQLAlchemyFlightFeedRepository:
     def __init__(self, db: AsyncSession):
         self.db = db
 
     async def write_flight_observation(self, single_observation: SingleAirtrafficObservation) -> bool:
-        session_id = single_observation.session_id or "00000000-0000-0000-0000-000000000000"
+        session_id = _session_uuid(single_observation.session_id)
         sensor_timestamp = _normalize_timestamp(single_observation.timestamp)
         obs = FlightObservationORM(
             session_id=session_id,
@@ -54,25 +101,35 @@ class SQLAlchemyFlightFeedRepository:
         await self.db.flush()
         return True
 
-    async def bulk_write_flight_observations(self, observations: list[SingleAirtrafficObservation]) -> bool:
-        objs = []
-        for o in observations:
-            session_id = o.session_id or "00000000-0000-0000-0000-000000000000"
-            objs.append(
-                FlightObservationORM(
-                    session_id=session_id,
-                    latitude_dd=o.lat_dd,
-                    longitude_dd=o.lon_dd,
-                    altitude_mm=o.altitude_mm,
-                    traffic_source=o.traffic_source,
-                    source_type=o.source_type,
-                    icao_address=o.icao_address,
-                    raw_metadata=json.dumps(o.metadata),
-                )
+    async def bulk_write_flight_observations(self, observations: list[SingleAirtrafficObservation]) -> list[uuid.UUID]:
+        """
+        Insert a batch of observations with one Core statement instead of one ORM object each.
+
+        Postgres gets the rows through asyncpg's binary COPY; other databases get an executemany
+        ``INSERT``, which SQLAlchemy sends as multi-row ``VALUES``. Every column is written, including
+        ``sensor_timestamp``. On Postgres the COPY always runs inside the session's transaction, so it
+        commits or rolls back with the rest of the unit of work.
+
+        Returns:
+            list[uuid.UUID]: The IDs of the inserted rows, in the order of ``observations``.
+        """
+        if not observations:
+            return []
+        rows = _observation_rows(observations)
+        if self.db.get_bind().dialect.name == "postgresql":
+            connection = await self.db.connection()
+            # The asyncpg adapter only issues BEGIN before its first statement; without one, the COPY
+            # on the driver connection below would autocommit outside the session's transaction.
+            await connection.exec_driver_sql("SELECT 1")
+            raw_connection = await connection.get_raw_connection()
+            await raw_connection.driver_connection.copy_records_to_table(
+                FlightObservationORM.__tablename__,
+                records=[tuple(row[column] for column in _OBSERVATION_COLUMNS) for row in rows],
+                columns=list(_OBSERVATION_COLUMNS),
             )
-        self.db.add_all(objs)
-        await self.db.flush()
-        return True
+        else:
+            await self.db.execute(insert(FlightObservationORM.__table__), rows)
+        return [row["id"] for row in rows]
 
     async def get_flight_observations(self, after_datetime: arrow.Arrow) -> list[FlightObservationORM]:
         result = await self.db.execute(
@@ -80,23 +137,25 @@ class SQLAlchemyFlightFeedRepository:
         )
         return list(result.scalars().all())
 
-    async def get_recent_flight_observations(self, after_datetime: arrow.Arrow | datetime) -> list[FlightObservationORM]:
+    async def get_recent_flight_observations(
+        self, after_datetime: arrow.Arrow | datetime, bounds: Optional[tuple[float, float, float, float]] = None
+    ) -> list[FlightObservationORM]:
         cutoff = after_datetime.datetime if hasattr(after_datetime, "datetime") else after_datetime
-        result = await self.db.execute(
-            select(FlightObservationORM).where(FlightObservationORM.created_at >= cutoff).order_by(FlightObservationORM.created_at)
-        )
+        statement = select(FlightObservationORM).where(FlightObservationORM.created_at >= cutoff).order_by(FlightObservationORM.created_at)
+        result = await self.db.execute(_within_bounds(statement, bounds))
         return list(result.scalars().all())
 
-    async def get_closest_flight_observation_for_now(self, now: arrow.Arrow) -> list[FlightObservationORM]:
+    async def get_closest_flight_observation_for_now(
+        self, now: arrow.Arrow, bounds: Optional[tuple[float, float, float, float]] = None
+    ) -> list[FlightObservationORM]:
         one_second_before = now.shift(seconds=-1)
-        result = await self.db.execute(
-            select(FlightObservationORM).where(
-                and_(
-                    FlightObservationORM.created_at >= one_second_before.datetime,
-                    FlightObservationORM.created_at <= now.datetime,
-                )
+        statement = select(FlightObservationORM).where(
+            and_(
+                FlightObservationORM.created_at >= one_second_before.datetime,
+                FlightObservationORM.created_at <= now.datetime,
             )
         )
+        result = await self.db.execute(_within_bounds(statement, bounds))
         return list(result.scalars().all())
 
     async def get_flight_observations_by_session(self, session_id: str, after_datetime: arrow.Arrow) -> list[FlightObservationORM]:
@@ -133,6 +192,83 @@ class SQLAlchemyFlightFeedRepository:
         )
         return result.scalars().first()
 
+    async def get_latest_flight_observation_by_icao_address(self, icao_address: str) -> Optional[FlightObservationORM]:
+        result = await self.db.execute(
+            select(FlightObservationORM)
+            .where(FlightObservationORM.icao_address == icao_address)
+            .order_by(FlightObservationORM.created_at.desc())
+            .limit(1)
+        )
+        return result.scalars().first()
+
+    async def _flight_observations_partitioned(self) -> bool:
+        """True on Postgres migrated with FLIGHT_OBSERVATION_PARTITIONING_ENABLED."""
+        if self.db.get_bind().dialect.name != "postgresql":
+            return False
+        result = await self.db.execute(
+            text("SELECT EXISTS (SELECT 1 FROM pg_partitioned_table WHERE partrelid = to_regclass(:table_name))"),
+            {"table_name": FlightObservationORM.__tablename__},
+        )
+        return bool(result.scalar())
+
+    async def create_flight_observation_partitions(self, first_day: date, last_day: date) -> Optional[int]:
+        """Create the missing daily partitions from ``first_day`` to ``last_day``; None when the table is not partitioned."""
+        if not await self._flight_observations_partitioned():
+            return None
+        result = await self.db.execute(
+            text("SELECT flight_observation_create_partitions(:first_day, :last_day)"), {"first_day": first_day, "last_day": last_day}
+        )
+        return result.scalar_one()
+
+    async def drop_flight_observation_partitions(self, before_day: date) -> Optional[int]:
+        """Drop the daily partitions for days before ``before_day``; None when the table is not partitioned."""
+        if not await self._flight_observations_partitioned():
+            return None
+        result = await self.db.execute(text("SELECT flight_observation_drop_partitions(:before_day)"), {"before_day": before_day})
+        return result.scalar_one()
+
+    async def merge_flight_observation_rollups(self, rollups: list[FlightObservationRollup]) -> int:
+        """Add per-track, per-minute rollups, folding them into rows already stored for the same track and minute.
+
+        A minute can be split across retention batches, so counts and extremes are combined and the
+        averages weighted by observation count. Returns the number of rollup rows written.
+        """
+        if not rollups:
+            return 0
+        result = await self.db.execute(
+            select(FlightObservationRollupORM).where(
+                FlightObservationRollupORM.minute_start.in_({r.minute_start for r in rollups}),
+                FlightObservationRollupORM.icao_address.in_({r.icao_address for r in rollups}),
+            )
+        )
+        existing = {(row.session_id, row.icao_address, as_utc(row.minute_start)): row for row in result.scalars()}
+
+        new_rows = []
+        for rollup in rollups:
+            session_id = _session_uuid(rollup.session_id)
+            row = existing.get((session_id, rollup.icao_address, rollup.minute_start))
+            if row is None:
+                new_rows.append(
+                    {
+                        "id": uuid.uuid4(),
+                        "session_id": session_id,
+                        **{f: getattr(rollup, f) for f in _ROLLUP_FIELDS},
+                    }
+                )
+                continue
+            total = row.observation_count + rollup.observation_count
+            row.latitude_dd_avg = (row.latitude_dd_avg * row.observation_count + rollup.latitude_dd_avg * rollup.observation_count) / total
+            row.longitude_dd_avg = (row.longitude_dd_avg * row.observation_count + rollup.longitude_dd_avg * rollup.observation_count) / total
+            row.observation_count = total
+            row.first_observed_at = min(as_utc(row.first_observed_at), rollup.first_observed_at)
+            row.last_observed_at = max(as_utc(row.last_observed_at), rollup.last_observed_at)
+            row.altitude_mm_min = min(row.altitude_mm_min, rollup.altitude_mm_min)
+            row.altitude_mm_max = max(row.altitude_mm_max, rollup.altitude_mm_max)
+        if new_rows:
+            await self.db.execute(insert(FlightObservationRollupORM.__table__), new_rows)
+        await self.db.flush()
+        return len(rollups)
+
     async def list_signed_telemetry_public_keys(self) -> list[SignedTelmetryPublicKeyORM]:
         result = await self.db.execute(select(SignedTelmetryPublicKeyORM))
         return list(result.scalars().all())
@@ -193,8 +329,8 @@ class SQLAlchemyFlightFeedRepository:
 
     # ─── Phase 1C additions ───────────────────────────────────────────────────
 
-    async def get_flight_observation_dicts(self) -> list[dict]:
-        result = await self.db.execute(select(FlightObservationORM).order_by(FlightObservationORM.created_at))
+    async def get_flight_observation_dicts(self, bounds: Optional[tuple[float, float, float, float]] = None) -> list[dict]:
+        result = await self.db.execute(_within_bounds(select(FlightObservationORM).order_by(FlightObservationORM.created_at), bounds))
         rows = list(result.scalars().all())
         return [
             {
@@ -213,9 +349,11 @@ class SQLAlchemyFlightFeedRepository:
             for row in rows
         ]
 
-    async def get_temporal_flight_observations_by_session_dicts(self, session_id: str, after_datetime) -> list[dict]:
+    async def get_temporal_flight_observations_by_session_dicts(
+        self, session_id: str, after_datetime, bounds: Optional[tuple[float, float, float, float]] = None
+    ) -> list[dict]:
         cutoff = after_datetime.datetime if hasattr(after_datetime, "datetime") else after_datetime
-        result = await self.db.execute(
+        statement = (
             select(FlightObservationORM)
             .where(
                 FlightObservationORM.session_id == uuid.UUID(session_id),
@@ -223,6 +361,7 @@ class SQLAlchemyFlightFeedRepository:
             )
             .order_by(FlightObservationORM.created_at)
         )
+        result = await self.db.execute(_within_bounds(statement, bounds))
         rows = list(result.scalars().all())
         return [
             {
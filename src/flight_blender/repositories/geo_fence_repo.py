@@ -24,6 +24,10 @@ class SQLAlchemyGeoFenceRepository:
         result = await self.db.execute(stmt)
         return list(result.scalars().all())
 
+    async def get_geofences_ending_after(self, moment: datetime) -> list[GeoFenceORM]:
+        result = await self.db.execute(select(GeoFenceORM).where(GeoFenceORM.end_datetime >= moment))
+        return list(result.scalars().all())
+
     async def get_geofences_by_date_range(
         self,
         start: datetime,
@@ -0,0 +1,38 @@
+import uuid
+from datetime import datetime
+
+from sqlalchemy import delete, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import InstrumentedAttribute
+
+
+class SQLAlchemyRetentionRepository:
+    """Expired-row lookups and batched deletes for the retention job.
+
+    Every method takes the timestamp column that decides expiry (``FlightObservationORM.created_at``,
+    ``SurveillanceHeartbeatEventORM.dispatched_at``, ...); the table is the column's model. Batches are
+    selected by primary key and deleted by primary key, so each statement touches at most ``limit`` rows.
+    """
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def count_expired(self, column: InstrumentedAttribute, cutoff: datetime) -> int:
+        result = await self.db.execute(select(func.count()).select_from(column.class_).where(column < cutoff))
+        return result.scalar_one()
+
+    async def get_expired_ids(self, column: InstrumentedAttribute, cutoff: datetime, limit: int) -> list[uuid.UUID]:
+        model = column.class_
+        result = await self.db.execute(select(model.id).where(column < cutoff).limit(limit))
+        return list(result.scalars().all())
+
+    async def get_expired_rows(self, column: InstrumentedAttribute, cutoff: datetime, limit: int) -> list:
+        result = await self.db.execute(select(column.class_).where(column < cutoff).limit(limit))
+        return list(result.scalars().all())
+
+    async def delete_by_ids(self, column: InstrumentedAttribute, ids: list[uuid.UUID]) -> int:
+        if not ids:
+            return 0
+        model = column.class_
+        result = await self.db.execute(delete(model).where(model.id.in_(ids)).execution_options(synchronize_session=False))
+        return result.rowcount
@@ -1,13 +1,16 @@
 import uuid
+from collections import defaultdict
 from datetime import datetime, timezone
 from typing import Optional
 
 from loguru import logger
-from sqlalchemy import and_, select
+from sqlalchemy import and_, case, delete, func, insert, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from flight_blender.domain_types.surveillance import SessionMetricCounts
 from flight_blender.models.surveillance_orm import (
     SurveillanceHeartbeatEventORM,
+    SurveillanceMetricsRollupORM,
     SurveillanceSensorFailureNotificationORM,
     SurveillanceSensorHealthORM,
     SurveillanceSensorHealthTrackingORM,
@@ -15,6 +18,25 @@ from flight_blender.models.surveillance_orm import (
     SurveillanceSessionORM,
     SurveillanceTrackEventORM,
 )
+from flight_blender.repositories.retention_repo import SQLAlchemyRetentionRepository
+from flight_blender.utils.datetime_utils import as_utc
+
+
+def _in_window(column, start_time: datetime, end_time: datetime, include_end: bool = True) -> list:
+    return [column >= start_time, column <= end_time if include_end else column < end_time]
+
+
+def _bucket_datetime(value) -> datetime:
+    """Minute buckets come back as datetimes from Postgres and as text from SQLite."""
+    return as_utc(datetime.fromisoformat(value) if isinstance(value, str) else value)
+
+
+def _as_uuid(value) -> uuid.UUID:
+    return value if isinstance(value, uuid.UUID) else uuid.UUID(str(value))
+
+
+_HEARTBEAT_COUNT_FIELDS = ("heartbeat_count", "heartbeats_on_time", "first_heartbeat_at", "last_heartbeat_at")
+_TRACK_COUNT_FIELDS = ("track_ticks", "track_ticks_with_active_tracks")
 
 
 class SQLAlchemySurveillanceRepository:
@@ -247,3 +269,176 @@ class SQLAlchemySurveillanceRepository:
         self.db.add(event)
         await self.db.flush()
         return True
+
+    async def record_surveillance_events(self, heartbeat_events: list[dict], track_events: list[dict]) -> tuple[int, int]:
+        """Insert batches of heartbeat and track event rows with one statement per table.
+
+        Rows are ``SurveillanceHeartbeatEventORM`` / ``SurveillanceTrackEventORM`` column dicts without
+        ``id``; rows of sessions that no longer exist are dropped. Returns the rows written per table.
+        """
+        session_ids = {row["session_id"] for row in heartbeat_events} | {row["session_id"] for row in track_events}
+        if not session_ids:
+            return 0, 0
+        result = await self.db.execute(select(SurveillanceSessionORM.id).where(SurveillanceSessionORM.id.in_(session_ids)))
+        missing = session_ids - set(result.scalars())
+        if missing:
+            logger.error(f"record_surveillance_events: dropping events of unknown sessions {sorted(map(str, missing))}")
+
+        written = []
+        for orm_class, rows in ((SurveillanceHeartbeatEventORM, heartbeat_events), (SurveillanceTrackEventORM, track_events)):
+            rows = [{**row, "id": uuid.uuid4()} for row in rows if row["session_id"] not in missing]
+            if rows:
+                await self.db.execute(insert(orm_class.__table__), rows)
+            written.append(len(rows))
+        return written[0], written[1]
+
+    # ─── Service metrics ──────────────────────────────────────────────────────
+
+    def _minute_bucket(self, column):
+        """The UTC minute of a timestamp column, as a datetime on Postgres and as text elsewhere."""
+        if self.db.get_bind().dialect.name == "postgresql":
+            return func.date_trunc("minute", column)
+        return func.strftime("%Y-%m-%d %H:%M:00", column)
+
+    def _heartbeat_counts(self, *group_by):
+        hb = SurveillanceHeartbeatEventORM
+        return select(
+            *group_by,
+            func.count(),
+            func.sum(case((hb.delivered_on_time, 1), else_=0)),
+            func.min(hb.dispatched_at),
+            func.max(hb.dispatched_at),
+        ).group_by(*group_by)
+
+    def _track_counts(self, *group_by):
+        tr = SurveillanceTrackEventORM
+        return select(*group_by, func.count(), func.sum(case((tr.had_active_tracks, 1), else_=0))).group_by(*group_by)
+
+    async def get_session_metric_counts(
+        self,
+        start_time: datetime,
+        end_time: datetime,
+        session_ids: Optional[list[uuid.UUID]] = None,
+        include_end: bool = True,
+    ) -> dict[str, SessionMetricCounts]:
+        """Heartbeat and track tick counts per session over the window, one GROUP BY query per event table."""
+        hb, tr = SurveillanceHeartbeatEventORM, SurveillanceTrackEventORM
+        hb_stmt = self._heartbeat_counts(hb.session_id).where(*_in_window(hb.dispatched_at, start_time, end_time, include_end))
+        tr_stmt = self._track_counts(tr.session_id).where(*_in_window(tr.dispatched_at, start_time, end_time, include_end))
+        if session_ids is not None:
+            hb_stmt = hb_stmt.where(hb.session_id.in_(session_ids))
+            tr_stmt = tr_stmt.where(tr.session_id.in_(session_ids))
+
+        counts: dict[str, SessionMetricCounts] = {}
+        for session_id, *values in await self.db.execute(hb_stmt):
+            entry = counts.setdefault(str(session_id), SessionMetricCounts(session_id=str(session_id)))
+            entry.heartbeat_count, entry.heartbeats_on_time = values[0], values[1] or 0
+            entry.first_heartbeat_at, entry.last_heartbeat_at = as_utc(values[2]), as_utc(values[3])
+        for session_id, ticks, active in await self.db.execute(tr_stmt):
+            entry = counts.setdefault(str(session_id), SessionMetricCounts(session_id=str(session_id)))
+            entry.track_ticks, entry.track_ticks_with_active_tracks = ticks, active or 0
+        return counts
+
+    async def get_session_metric_rollup_counts(
+        self, from_minute: datetime, to_minute: datetime, session_ids: Optional[list[uuid.UUID]] = None
+    ) -> dict[str, SessionMetricCounts]:
+        """Per-session totals of the rollups for the minutes in ``[from_minute, to_minute)``."""
+        r = SurveillanceMetricsRollupORM
+        stmt = (
+            select(
+                r.session_id,
+                func.sum(r.heartbeat_count),
+                func.sum(r.heartbeats_on_time),
+                func.min(r.first_heartbeat_at),
+                func.max(r.last_heartbeat_at),
+                func.sum(r.track_ticks),
+                func.sum(r.track_ticks_with_active_tracks),
+            )
+            .where(*_in_window(r.minute_start, from_minute, to_minute, include_end=False))
+            .group_by(r.session_id)
+        )
+        if session_ids is not None:
+            stmt = stmt.where(r.session_id.in_(session_ids))
+        return {
+            str(session_id): SessionMetricCounts(
+                session_id=str(session_id),
+                heartbeat_count=hb_count,
+                heartbeats_on_time=on_time,
+                first_heartbeat_at=as_utc(first),
+                last_heartbeat_at=as_utc(last),
+                track_ticks=ticks,
+                track_ticks_with_active_tracks=active,
+            )
+            for session_id, hb_count, on_time, first, last, ticks, active in await self.db.execute(stmt)
+        }
+
+    async def get_latest_session_metric_rollup_minute(self) -> Optional[datetime]:
+        result = await self.db.execute(select(func.max(SurveillanceMetricsRollupORM.minute_start)))
+        return as_utc(result.scalar())
+
+    async def rebuild_session_metric_rollups(self, from_minute: datetime, to_minute: datetime) -> int:
+        """Recompute the rollups of the minutes in ``[from_minute, to_minute)`` from the events; returns the rows written."""
+        hb, tr = SurveillanceHeartbeatEventORM, SurveillanceTrackEventORM
+        hb_minute, tr_minute = self._minute_bucket(hb.dispatched_at), self._minute_bucket(tr.dispatched_at)
+        hb_stmt = self._heartbeat_counts(hb.session_id, hb_minute).where(*_in_window(hb.dispatched_at, from_minute, to_minute, include_end=False))
+        tr_stmt = self._track_counts(tr.session_id, tr_minute).where(*_in_window(tr.dispatched_at, from_minute, to_minute, include_end=False))
+
+        rows: dict[tuple, dict] = defaultdict(dict)
+        for session_id, minute, *values in await self.db.execute(hb_stmt):
+            rows[(session_id, _bucket_datetime(minute))].update(
+                zip(_HEARTBEAT_COUNT_FIELDS, [values[0], values[1], as_utc(values[2]), as_utc(values[3])])
+            )
+        for session_id, minute, *values in await self.db.execute(tr_stmt):
+            rows[(session_id, _bucket_datetime(minute))].update(zip(_TRACK_COUNT_FIELDS, values))
+
+        r = SurveillanceMetricsRollupORM
+        await self.db.execute(delete(r).where(*_in_window(r.minute_start, from_minute, to_minute, include_end=False)))
+        if rows:
+            defaults = {"heartbeat_count": 0, "heartbeats_on_time": 0, "first_heartbeat_at": None, "last_heartbeat_at": None}
+            defaults |= {"track_ticks": 0, "track_ticks_with_active_tracks": 0}
+            await self.db.execute(
+                insert(r.__table__),
+                [
+                    {**defaults, **values, "id": uuid.uuid4(), "session_id": _as_uuid(session_id), "minute_start": minute}
+                    for (session_id, minute), values in rows.items()
+                ],
+            )
+        return len(rows)
+
+    async def get_health_tracking_records_for_sensors(
+        self, sensor_ids: list[uuid.UUID], start_time: datetime, end_time: datetime
+    ) -> dict[uuid.UUID, list[SurveillanceSensorHealthTrackingORM]]:
+        """Health tracking records of every sensor in the window, in one query, per sensor in recorded order."""
+        t = SurveillanceSensorHealthTrackingORM
+        result = await self.db.execute(
+            select(t).where(t.sensor_id.in_(sensor_ids), *_in_window(t.recorded_at, start_time, end_time)).order_by(t.sensor_id, t.recorded_at)
+        )
+        records: dict[uuid.UUID, list[SurveillanceSensorHealthTrackingORM]] = defaultdict(list)
+        for record in result.scalars():
+            records[record.sensor_id].append(record)
+        return records
+
+    async def get_sensor_statuses_before_time(self, sensor_ids: list[uuid.UUID], before_time: datetime) -> dict[uuid.UUID, str]:
+        """The last status each sensor recorded before ``before_time``, for every sensor in one query."""
+        t = SurveillanceSensorHealthTrackingORM
+        latest = (
+            select(t.sensor_id, func.max(t.recorded_at).label("recorded_at"))
+            .where(t.sensor_id.in_(sensor_ids), t.recorded_at < before_time)
+            .group_by(t.sensor_id)
+            .subquery()
+        )
+        result = await self.db.execute(
+            select(t.sensor_id, t.status).join(latest, and_(t.sensor_id == latest.c.sensor_id, t.recorded_at == latest.c.recorded_at))
+        )
+        return {sensor_id: status for sensor_id, status in result}
+
+    async def cleanup_old_events(self, cutoff: datetime, batch_size: int = 5000) -> tuple[int, int]:
+        """Delete heartbeat and track events dispatched before ``cutoff``, ``batch_size`` rows per statement."""
+        retention = SQLAlchemyRetentionRepository(self.db)
+        deleted = []
+        for column in (SurveillanceHeartbeatEventORM.dispatched_at, SurveillanceTrackEventORM.dispatched_at):
+            count = 0
+            while ids := await retention.get_expired_ids(column, cutoff, batch_size):
+                count += await retention.delete_by_ids(column, ids)
+            deleted.append(count)
+        return deleted[0], deleted[1]
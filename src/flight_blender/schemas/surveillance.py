@@ -2,7 +2,7 @@ from dataclasses import dataclass
 from enum import Enum
 from typing import Literal
 
-from pydantic import BaseModel
+from pydantic import BaseModel, Field, field_validator
 
 FLIGHT_OBSERVATION_TRAFFIC_SOURCE = (
     (0, "1090ES"),
@@ -227,6 +227,17 @@ class ActiveTrack:
 
 class SurveillanceSessionAction(BaseModel):
     action: Literal["start", "stop"]
+    # Subscription of a started session: [lat_min, lng_min, lat_max, lng_max], track rate and traffic sources
+    area_of_interest: list[float] | None = Field(default=None, min_length=4, max_length=4)
+    update_interval_secs: float = Field(default=1.0, gt=0)
+    traffic_sources: list[int] | None = None
+
+    @field_validator("area_of_interest")
+    @classmethod
+    def _check_area_of_interest(cls, value: list[float] | None) -> list[float] | None:
+        if value is not None and (value[0] > value[2] or value[1] > value[3]):
+            raise ValueError("area_of_interest must be [lat_min, lng_min, lat_max, lng_max]")
+        return value
 
 
 class SensorHealthUpdate(BaseModel):
@@ -783,12 +783,14 @@ def process_flight_operational_intent_reference_non_conformance_message(sender,
 # ── Conformance engine (from conformance/utils.py) ────────────────────────────
 
 import json as _json  # noqa: E402
+import threading  # noqa: E402
+from collections import OrderedDict  # noqa: E402
 
+import numpy as np  # noqa: E402
+import shapely  # noqa: E402
 from shapely.geometry import Point as _Point  # noqa: E402
 from shapely.geometry import Polygon as _Plgn  # noqa: E402
 
-from flight_blender.domain_types.conformance import PolygonAltitude  # noqa: E402
-
 
 def is_time_between(begin_time, end_time, check_time=None):
     check_time = check_time or arrow.now()
@@ -798,6 +800,193 @@ def is_time_between(begin_time, end_time, check_time=None):
         return check_time >= begin_time or check_time <= end_time
 
 
+# ── Compiled operational intent geometry cache ────────────────────────────────
+
+
+class CompiledOperationalIntentGeometry:
+    """Operational intent volumes pre-processed for repeated telemetry conformance checks.
+
+    Holds the prepared union of the volume outlines (for a single point-in-polygon test), per-volume
+    altitude and time bounds as NumPy arrays, and an STRtree over the individual volume outlines.
+    """
+
+    def __init__(self, volumes: list[Volume4D]):
+        self.polygons = [_Plgn([(vertex.lng, vertex.lat) for vertex in v.volume.outline_polygon.vertices]) for v in volumes]
+        self.altitude_lower = np.array([v.volume.altitude_lower.value for v in volumes], dtype=float)
+        self.altitude_upper = np.array([v.volume.altitude_upper.value for v in volumes], dtype=float)
+        self.time_start = np.array([arrow.get(v.time_start.value).float_timestamp for v in volumes], dtype=float)
+        self.time_end = np.array([arrow.get(v.time_end.value).float_timestamp for v in volumes], dtype=float)
+        self.union = shapely.union_all(self.polygons)
+        shapely.prepare(self.union)
+        self.tree = shapely.STRtree(self.polygons)
+
+    @classmethod
+    def from_operational_intent(cls, operational_intent_raw: str) -> "CompiledOperationalIntentGeometry":
+        operational_intent_details = _json.loads(operational_intent_raw)
+        return cls([cast_to_volume4d(v) for v in operational_intent_details["volumes"]])
+
+    def contains(self, lng: float, lat: float) -> bool:
+        """True if the location lies inside any volume outline.
+
+        As with a per-volume ``within`` check, a point on an outline is outside, even on an edge two
+        volumes share: the union only rules points out, and the tree decides the rest.
+        """
+        if not shapely.contains_xy(self.union, lng, lat):
+            return False
+        return len(self.tree.query(_Point(lng, lat), predicate="within")) > 0
+
+    def altitude_within_any_volume(self, altitude_m: float) -> bool:
+        """True if the altitude lies between the lower and upper bound of any volume."""
+        return bool(np.any((self.altitude_lower <= altitude_m) & (altitude_m <= self.altitude_upper)))
+
+    def volumes_at(self, lng: float, lat: float, at_time: Optional[arrow.Arrow] = None) -> list[int]:
+        """Indices of the volumes whose outline contains the location, optionally limited to volumes active at ``at_time``."""
+        indices = self.tree.query(_Point(lng, lat), predicate="within")
+        if at_time is not None:
+            ts = at_time.float_timestamp
+            indices = indices[(self.time_start[indices] <= ts) & (ts <= self.time_end[indices])]
+        return sorted(int(i) for i in indices)
+
+
+class OperationalIntentGeometryCache:
+    """Process-local LRU cache of compiled operational intent geometry.
+
+    Entries are keyed by ``(flight_declaration_id, updated_at)``: any write to the declaration bumps
+    ``updated_at``, so a changed declaration or operational intent is recompiled on its next check even
+    when the write happened in another process. ``invalidate`` drops an entry eagerly in this process.
+    """
+
+    def __init__(self, max_entries: int = 1024):
+        self.max_entries = max_entries
+        self._entries: OrderedDict[str, tuple[Optional[datetime], CompiledOperationalIntentGeometry]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, flight_declaration) -> CompiledOperationalIntentGeometry:
+        flight_declaration_id = str(flight_declaration.id)
+        updated_at = flight_declaration.updated_at
+        with self._lock:
+            cached = self._entries.get(flight_declaration_id)
+            if cached is not None and cached[0] == updated_at:
+                self._entries.move_to_end(flight_declaration_id)
+                return cached[1]
+
+        compiled = CompiledOperationalIntentGeometry.from_operational_intent(flight_declaration.operational_intent)
+        with self._lock:
+            self._entries[flight_declaration_id] = (updated_at, compiled)
+            self._entries.move_to_end(flight_declaration_id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return compiled
+
+    def invalidate(self, flight_declaration_id: str) -> None:
+        with self._lock:
+            self._entries.pop(str(flight_declaration_id), None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+operational_intent_geometry_cache = OperationalIntentGeometryCache()
+
+
+# ── Active geofence index ─────────────────────────────────────────────────────
+
+
+class CompiledGeofence:
+    """Outline polygons of one active geofence with the time window it is in effect.
+
+    C8 is a lateral check, so the geofence's altitude limits are not compiled.
+    """
+
+    def __init__(self, geofence):
+        self.geofence_id = str(geofence.id)
+        self.updated_at = geofence.updated_at
+        self.start_timestamp = arrow.get(geofence.start_datetime).float_timestamp
+        self.end_timestamp = arrow.get(geofence.end_datetime).float_timestamp
+        self.polygons: list[_Plgn] = []
+
+        geofence_geojson = _json.loads(geofence.raw_geo_fence) if geofence.raw_geo_fence else {}
+        for feature in geofence_geojson.get("features", []):
+            geometry = feature.get("geometry", {})
+            geofence_type = geometry.get("type")
+            coordinates = geometry.get("coordinates", [])
+            if geofence_type == "Polygon":
+                self.polygons.append(_Plgn(coordinates[0]))
+            elif geofence_type == "MultiPolygon":
+                self.polygons.extend(_Plgn(polygon_coords[0]) for polygon_coords in coordinates)
+
+
+class ActiveGeofenceIndex:
+    """Process-local STRtree over the prepared outlines of all active geofences.
+
+    ``sync`` is given the ``(id, updated_at)`` versions of the active geofences and the rows that changed
+    since the last sync. Unchanged geofences keep their compiled polygons; only the tree is rebuilt.
+    ``version`` increments on every rebuild and ``fingerprint`` records the repository fingerprint the
+    index was built from, so callers can skip the sync while it still matches.
+    """
+
+    def __init__(self):
+        self.version = 0
+        self.fingerprint: Optional[tuple] = None
+        self._geofences: dict[str, CompiledGeofence] = {}
+        self._tree: Optional[shapely.STRtree] = None
+        self._owners: list[CompiledGeofence] = []
+        self._start = np.empty(0)
+        self._end = np.empty(0)
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._geofences)
+
+    def stale_ids(self, versions: dict[str, Optional[datetime]]) -> list[str]:
+        """Ids of active geofences that are new or whose ``updated_at`` differs from the compiled copy."""
+        return [
+            geofence_id
+            for geofence_id, updated_at in versions.items()
+            if geofence_id not in self._geofences or self._geofences[geofence_id].updated_at != updated_at
+        ]
+
+    def sync(self, fingerprint: Optional[tuple], versions: dict[str, Optional[datetime]], changed_geofences: list) -> None:
+        geofences = {geofence_id: compiled for geofence_id, compiled in self._geofences.items() if geofence_id in versions}
+        for geofence in changed_geofences:
+            compiled = CompiledGeofence(geofence)
+            geofences[compiled.geofence_id] = compiled
+
+        polygons: list[_Plgn] = []
+        owners: list[CompiledGeofence] = []
+        for compiled in geofences.values():
+            for polygon in compiled.polygons:
+                shapely.prepare(polygon)
+                polygons.append(polygon)
+                owners.append(compiled)
+
+        with self._lock:
+            self._geofences = geofences
+            self._tree = shapely.STRtree(polygons) if polygons else None
+            self._owners = owners
+            self._start = np.array([o.start_timestamp for o in owners], dtype=float)
+            self._end = np.array([o.end_timestamp for o in owners], dtype=float)
+            self.fingerprint = fingerprint
+            self.version += 1
+
+    def breached_geofences(self, lng: float, lat: float, at_time: Optional[arrow.Arrow] = None) -> list[CompiledGeofence]:
+        """Geofences whose outline contains the location, limited to those in effect at ``at_time`` when given."""
+        with self._lock:
+            tree, owners, start, end = self._tree, self._owners, self._start, self._end
+        if tree is None:
+            return []
+        indices = tree.query(_Point(lng, lat), predicate="within")
+        if at_time is not None:
+            ts = at_time.float_timestamp
+            indices = indices[(start[indices] <= ts) & (ts <= end[indices])]
+        breached = {owners[i].geofence_id: owners[i] for i in sorted(indices)}
+        return list(breached.values())
+
+
+active_geofence_index = ActiveGeofenceIndex()
+
+
 class FlightBlenderConformanceEngine:
     def __init__(self, db: AsyncSession):
         self.db: AsyncSession = db
@@ -808,8 +997,18 @@ class FlightBlenderConformanceEngine:
     async def _get_opint_reference(self, flight_declaration_id: str):
         return await SQLAlchemyFlightDeclarationRepository(self.db).get_opint_reference_by_declaration_id(uuid.UUID(flight_declaration_id))
 
-    async def _get_active_geofences(self):
-        return await SQLAlchemyConformanceRepository(self.db).get_active_geofences()
+    async def _get_active_geofence_index(self) -> ActiveGeofenceIndex:
+        repo = SQLAlchemyConformanceRepository(self.db)
+        fingerprint = await repo.get_active_geofences_fingerprint()
+        if fingerprint != active_geofence_index.fingerprint:
+            versions = {str(geofence_id): updated_at for geofence_id, updated_at in (await repo.get_active_geofence_versions()).items()}
+            stale_ids = active_geofence_index.stale_ids(versions)
+            changed_geofences = await repo.get_geofences_by_ids([uuid.UUID(geofence_id) for geofence_id in stale_ids])
+            active_geofence_index.sync(fingerprint, versions, changed_geofences)
+            logger.debug(
+                f"Rebuilt active geofence index v{active_geofence_index.version}: {len(active_geofence_index)} geofences, {len(stale_ids)} recompiled"
+            )
+        return active_geofence_index
 
     async def is_operation_conformant_via_telemetry(
         self,
@@ -835,9 +1034,6 @@ class FlightBlenderConformanceEngine:
             logger.error("Conformance check failed, flight authorization not found, raising code {ConformanceChecksList.C2}")
             return ConformanceChecksList.C2
 
-        operational_intent_details_raw = flight_declaration.operational_intent
-        operational_intent_details = _json.loads(operational_intent_details_raw)
-
         operation_start_time = arrow.get(flight_declaration.start_datetime)
         operation_end_time = arrow.get(flight_declaration.end_datetime)
 
@@ -867,43 +1063,15 @@ class FlightBlenderConformanceEngine:
             logger.error(f"Raising Error code {ConformanceChecksList.C6}")
             return ConformanceChecksList.C6
 
-        all_volumes = operational_intent_details["volumes"]
+        compiled_geometry = operational_intent_geometry_cache.get(flight_declaration)
 
         lng = float(telemetry_location.lng)
         lat = float(telemetry_location.lat)
-        rid_location = _Point(lng, lat)
-        logger.info(f"Checking C7 Conformance for location {rid_location.wkt}...")
-        all_polygon_altitudes: list[PolygonAltitude] = []
-
-        for v in all_volumes:
-            v4d = cast_to_volume4d(v)
-            altitude_lower = v4d.volume.altitude_lower.value
-            altitude_upper = v4d.volume.altitude_upper.value
-            outline_polygon = v4d.volume.outline_polygon
-            point_list = [_Point(vertex.lng, vertex.lat) for vertex in outline_polygon.vertices]
-            outline_polygon = _Plgn([[p.x, p.y] for p in point_list])
-
-            pa = PolygonAltitude(
-                polygon=outline_polygon,
-                altitude_upper=altitude_upper,
-                altitude_lower=altitude_lower,
-            )
-            all_polygon_altitudes.append(pa)
-
-        rid_obs_within_all_volumes = []
-        rid_obs_within_altitudes = []
+        logger.info(f"Checking C7 Conformance for location POINT ({lng} {lat})...")
 
-        for p in all_polygon_altitudes:
-            is_within = rid_location.within(p.polygon)
-            logger.debug(f"Altitude Check: {altitude_m_wgs_84} between {p.altitude_lower} and {p.altitude_upper}")
-            altitude_conformant = p.altitude_lower <= altitude_m_wgs_84 <= p.altitude_upper
-            rid_obs_within_all_volumes.append(is_within)
-            rid_obs_within_altitudes.append(altitude_conformant)
-
-        logger.debug(f"Polygon conformity results: {rid_obs_within_all_volumes}")
-        logger.debug(f"Altitude conformity results: {rid_obs_within_altitudes}")
-        aircraft_bounds_conformant = any(rid_obs_within_all_volumes)
-        aircraft_altitude_conformant = any(rid_obs_within_altitudes)
+        aircraft_bounds_conformant = compiled_geometry.contains(lng, lat)
+        aircraft_altitude_conformant = compiled_geometry.altitude_within_any_volume(altitude_m_wgs_84)
+        logger.debug(f"Polygon conformity result: {aircraft_bounds_conformant}, altitude conformity result: {aircraft_altitude_conformant}")
 
         if not aircraft_altitude_conformant:
             logger.error(f"Aircraft altitude is not conformant for {flight_declaration_id}, C7b Check failed.")
@@ -915,34 +1083,14 @@ class FlightBlenderConformanceEngine:
             logger.error(f"Raising Error code {ConformanceChecksList.C7a}")
             return ConformanceChecksList.C7a
 
-        geofences = await self._get_active_geofences()
-        for geofence in geofences:
-            geofence_geojson = _json.loads(geofence.raw_geo_fence)
-            features = geofence_geojson.get("features", [])
-            for feature in features:
-                geometry = feature.get("geometry", {})
-                geofence_type = geometry.get("type")
-                coordinates = geometry.get("coordinates", [])
-
-                if geofence_type == "Polygon":
-                    if self._is_within_geofence(rid_location, coordinates[0]):
-                        logger.error(f"Aircraft is breaching an active GeoFence for {flight_declaration_id}, C8 Check failed.")
-                        logger.error(f"Raising Error code {ConformanceChecksList.C8}")
-                        return ConformanceChecksList.C8
-
-                elif geofence_type == "MultiPolygon":
-                    for polygon_coords in coordinates:
-                        if self._is_within_geofence(rid_location, polygon_coords[0]):
-                            logger.error(f"Aircraft is breaching an active GeoFence for {flight_declaration_id}, C8 Check failed.")
-                            logger.error(f"Raising Error code {ConformanceChecksList.C8}")
-                            return ConformanceChecksList.C8
+        geofence_index = await self._get_active_geofence_index()
+        if geofence_index.breached_geofences(lng, lat, at_time=now):
+            logger.error(f"Aircraft is breaching an active GeoFence for {flight_declaration_id}, C8 Check failed.")
+            logger.error(f"Raising Error code {ConformanceChecksList.C8}")
+            return ConformanceChecksList.C8
 
         return 100
 
-    def _is_within_geofence(self, rid_location: _Point, coordinates: list) -> bool:
-        geofence_polygon = _Plgn(coordinates)
-        return rid_location.within(geofence_polygon)
-
     async def check_flight_operational_intent_reference_conformance(self, flight_declaration_id: str) -> int:
         now = arrow.now()
         flight_declaration = await self._get_flight_declaration(flight_declaration_id=flight_declaration_id)
@@ -1,16 +1,138 @@
 """Built-in RTree bounding-box de-confliction engine."""
 
-import asyncio
-import uuid
+from datetime import datetime, timezone
 
+from loguru import logger
+from redis.exceptions import RedisError
+from sqlalchemy import event, inspect
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
 
-from flight_blender.domain_types.common import FLIGHT_DECLARATION_INDEX_BASEPATH, GEOFENCE_INDEX_BASEPATH
+from flight_blender.auth.token_cache import get_async_redis, get_redis
+from flight_blender.config import settings
+from flight_blender.db.session import AsyncSessionLocal
 from flight_blender.domain_types.flight_declarations import DeconflictionRequest, DeconflictionResult
+from flight_blender.models.flight_declarations_orm import FlightDeclarationORM
+from flight_blender.models.geo_fence_orm import GeoFenceORM
 from flight_blender.repositories.flight_declarations_repo import SQLAlchemyFlightDeclarationRepository
 from flight_blender.repositories.geo_fence_repo import SQLAlchemyGeoFenceRepository
-from flight_blender.utils import spatial_geo_fence as rtree_geo_fence_helper
-from flight_blender.utils.spatial_flight_declarations import FlightDeclarationRTreeIndexFactory
+from flight_blender.utils.spatial_deconfliction import DeconflictionIndex, deconfliction_index, snapshot_flight_declaration, snapshot_geo_fence
+
+_PENDING_INDEX_WRITES = "deconfliction_index_writes"
+_INDEX_TABLES_CHANGED = "deconfliction_index_tables_changed"
+# Incremented by every process after it commits a geofence or flight declaration write
+DECONFLICTION_INDEX_VERSION_KEY = "deconfliction_index:version"
+
+
+async def _source_version() -> str | None:
+    """The shared write version, or None when Redis cannot be reached; the rebuild interval then still applies."""
+    try:
+        return await get_async_redis().get(DECONFLICTION_INDEX_VERSION_KEY)
+    except RedisError as exc:
+        logger.warning(f"Could not read the de-confliction index version: {exc}")
+        return None
+
+
+async def rebuild_deconfliction_index(db: AsyncSession, target: DeconflictionIndex | None = None, source_version: str | None = None) -> None:
+    """Reload the index from the database: geofences and active declarations that have not ended yet."""
+    target = deconfliction_index if target is None else target
+    token = target.begin_rebuild()
+    try:
+        # Read before the snapshot, so a write landing in between makes the next check rebuild again
+        if source_version is None:
+            source_version = await _source_version()
+        now = datetime.now(timezone.utc)
+        geo_fences = await SQLAlchemyGeoFenceRepository(db).get_geofences_ending_after(now)
+        declarations = await SQLAlchemyFlightDeclarationRepository(db).get_active_declarations_ending_after(now)
+    except Exception:
+        target.abort_rebuild()
+        raise
+    target.rebuild(
+        [snapshot_geo_fence(f) for f in geo_fences],
+        [snapshot_flight_declaration(d) for d in declarations],
+        token=token,
+        source_version=source_version,
+    )
+    logger.info(f"Rebuilt de-confliction index with {len(geo_fences)} geofences and {len(declarations)} flight declarations")
+
+
+async def ensure_deconfliction_index(db: AsyncSession, target: DeconflictionIndex | None = None) -> DeconflictionIndex:
+    """Rebuild from the database when it changed since the index was loaded, or the index is older than the rebuild interval.
+
+    Every call reads the shared write version from Redis, which any process bumps when it commits a
+    geofence or flight declaration write, so writes made by other processes (API workers, state changes
+    in Celery workers) are picked up by the next check without querying the tables. Writes from this
+    process are also applied to the index as they commit; the periodic rebuild heals any drift.
+    """
+    target = deconfliction_index if target is None else target
+    source_version = await _source_version()
+    if source_version != target.source_version or target.age_seconds() >= settings.DECONFLICTION_INDEX_REBUILD_INTERVAL_SECS:
+        await rebuild_deconfliction_index(db, target, source_version)
+    return target
+
+
+async def warm_load_deconfliction_index() -> None:
+    """Startup hook: load the index once so the first request does not pay for it."""
+    try:
+        async with AsyncSessionLocal() as db:
+            await rebuild_deconfliction_index(db)
+    except Exception:
+        logger.exception("Could not warm-load the de-confliction index, it will be loaded on first use")
+
+
+# ── Keep the index in step with committed writes ─────────────────────────────
+
+
+def _loaded_snapshot(obj, snapshot):
+    """Snapshot ``obj`` from its loaded attributes only; lazy loads are not possible inside a flush on an async session."""
+    loaded = inspect(obj).dict
+    if not all(key in loaded for key in ("id", "bounds", "start_datetime", "end_datetime")):
+        return None
+    return snapshot(obj)
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_index_writes(session: Session, flush_context) -> None:
+    writes = session.info.setdefault(_PENDING_INDEX_WRITES, [])
+    for obj in list(session.new) + list(session.dirty):
+        if isinstance(obj, GeoFenceORM):
+            op, snapshot = "upsert_geo_fence", _loaded_snapshot(obj, snapshot_geo_fence)
+        elif isinstance(obj, FlightDeclarationORM):
+            op, snapshot = "upsert_flight_declaration", _loaded_snapshot(obj, snapshot_flight_declaration)
+        else:
+            continue
+        session.info[_INDEX_TABLES_CHANGED] = True
+        if snapshot is None:
+            deconfliction_index.mark_stale()
+        else:
+            writes.append((op, snapshot))
+    for obj in session.deleted:
+        if isinstance(obj, (GeoFenceORM, FlightDeclarationORM)):
+            op = "remove_geo_fence" if isinstance(obj, GeoFenceORM) else "remove_flight_declaration"
+            writes.append((op, str(inspect(obj).identity[0])))
+            session.info[_INDEX_TABLES_CHANGED] = True
+
+
+@event.listens_for(Session, "after_commit")
+def _apply_index_writes(session: Session) -> None:
+    for op, payload in session.info.pop(_PENDING_INDEX_WRITES, []):
+        getattr(deconfliction_index, op)(payload)
+    if session.info.pop(_INDEX_TABLES_CHANGED, False):
+        try:
+            get_redis().incr(DECONFLICTION_INDEX_VERSION_KEY)
+        except RedisError as exc:
+            logger.warning(f"Could not bump the de-confliction index version, other processes catch up on their next rebuild: {exc}")
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_index_writes(session: Session) -> None:
+    session.info.pop(_PENDING_INDEX_WRITES, None)
+    session.info.pop(_INDEX_TABLES_CHANGED, None)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_index_writes(session: Session) -> None:
+    session.info.pop(_PENDING_INDEX_WRITES, None)
 
 
 class DefaultDeconflictionEngine:
@@ -19,6 +141,9 @@ class DefaultDeconflictionEngine:
     1. Check geofence bbox conflicts (RTree).
     2. Check active flight declaration bbox conflicts (RTree).
     3. Any intersection → rejected (state 8).
+
+    Both checks query the process-wide 3D (lng, lat, time) index in
+    ``utils.spatial_deconfliction``, so request latency does not grow with the table sizes.
     """
 
     async def check_deconfliction(self, request: DeconflictionRequest, db: AsyncSession) -> DeconflictionResult:
@@ -27,55 +152,30 @@ class DefaultDeconflictionEngine:
         end_datetime = request.end_datetime
         ussp_network_enabled = request.ussp_network_enabled
 
-        all_relevant_fences: list = []
-        all_relevant_declarations: list = []
         is_approved = True
         declaration_state = 0 if ussp_network_enabled else 1
 
-        fence_repo = SQLAlchemyGeoFenceRepository(db)
-        all_fences = await fence_repo.get_geofences_overlapping_time_window(
-            start=start_datetime,
-            end=end_datetime,
-        )
+        index = await ensure_deconfliction_index(db)
+        # Declarations and geofences flushed earlier in this transaction (e.g. a bulk create) are not
+        # committed yet, so they are passed alongside the index rather than applied to it.
+        pending = list(db.sync_session.info.get(_PENDING_INDEX_WRITES, []))
+
+        all_relevant_fences = index.geo_fences_covering(view_box=view_box, start_datetime=start_datetime, end_datetime=end_datetime, pending=pending)
+        if all_relevant_fences:
+            is_approved = False
+            declaration_state = 8
 
-        if all_fences:
-            geo_fence_index = rtree_geo_fence_helper.GeoFenceRTreeIndexFactory(
-                index_name=GEOFENCE_INDEX_BASEPATH,
-            )
-            try:
-                geo_fence_index.generate_geo_fence_index(all_fences=all_fences)
-                all_relevant_fences = geo_fence_index.check_box_intersection(view_box=view_box)
-                if all_relevant_fences:
-                    is_approved = False
-                    declaration_state = 8
-            finally:
-                geo_fence_index.clear_rtree_index(all_fences=all_fences)
-
-        fd_repo = SQLAlchemyFlightDeclarationRepository(db)
         current_declaration_id = request.declaration_id
-        exclude_id = uuid.UUID(str(current_declaration_id)) if current_declaration_id is not None else None
-        declaration_list = await fd_repo.get_active_declarations_overlapping_time_window(
+        all_relevant_declarations = index.flight_declarations_overlapping(
+            view_box=view_box,
             start_datetime=start_datetime,
             end_datetime=end_datetime,
-            exclude_declaration_id=exclude_id,
+            exclude_declaration_id=str(current_declaration_id) if current_declaration_id is not None else None,
+            pending=pending,
         )
-
-        if declaration_list:
-            fd_rtree_helper = FlightDeclarationRTreeIndexFactory(
-                index_name=FLIGHT_DECLARATION_INDEX_BASEPATH,
-            )
-            try:
-                fd_rtree_helper.generate_flight_declaration_index(
-                    all_flight_declarations=declaration_list,
-                )
-                all_relevant_declarations = fd_rtree_helper.check_flight_declaration_box_intersection(
-                    view_box=view_box,
-                )
-                if all_relevant_declarations:
-                    is_approved = False
-                    declaration_state = 8
-            finally:
-                asyncio.run(fd_rtree_helper.clear_rtree_index(declaration_list))
+        if all_relevant_declarations:
+            is_approved = False
+            declaration_state = 8
 
         return DeconflictionResult(
             all_relevant_fences=all_relevant_fences,
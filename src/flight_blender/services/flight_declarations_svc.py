@@ -42,7 +42,7 @@ from flight_blender.domain_types.scd import (
     Volume4D,
 )
 from flight_blender.domain_types.scd import Polygon as Plgn
-from flight_blender.plugins.loader import load_plugin
+from flight_blender.plugins.registry import plugin_instances
 from flight_blender.repositories.flight_declarations_repo import SQLAlchemyFlightDeclarationRepository
 from flight_blender.tasks.flight_declarations_task import CelerySCDNotifier
 
@@ -172,11 +172,9 @@ class OperationalIntentsConverter:
 
     def convert_geo_json_to_volume_4_d(self, geo_json_fc: FeatureCollection, start_datetime: str, end_datetime: str) -> list[Volume4D]:
         if FLIGHT_BLENDER_PLUGIN_VOLUME_4D_GENERATOR:
-            CustomVolumeGenerator = load_plugin(
+            custom_volume_generator = plugin_instances.get(
                 FLIGHT_BLENDER_PLUGIN_VOLUME_4D_GENERATOR,
                 expected_protocol=Volume4DGeneratorProtocol,
-            )
-            custom_volume_generator = CustomVolumeGenerator(
                 default_uav_speed_m_per_s=DEFAULT_UAV_SPEED_M_PER_S,
                 default_uav_climb_rate_m_per_s=DEFAULT_UAV_CLIMB_RATE_M_PER_S,
                 default_uav_descent_rate_m_per_s=DEFAULT_UAV_DESCENT_RATE_M_PER_S,
@@ -313,7 +311,7 @@ def _get_deconfliction_engine():
     engine_path = settings.FLIGHT_BLENDER_PLUGIN_DECONFLICTION_ENGINE
     if not engine_path:
         return None
-    return load_plugin(engine_path, expected_protocol=DeconflictionEngineProtocol)
+    return plugin_instances.get(engine_path, expected_protocol=DeconflictionEngineProtocol)
 
 
 def _validate_geojson(fc: dict) -> tuple[bool, str | None]:
@@ -505,11 +503,10 @@ class FlightDeclarationOperations:
                 type_of_operation=fd.type_of_operation,
                 priority=0,
             )
-            engine_cls = _get_deconfliction_engine()
-            if engine_cls is None:
+            engine = _get_deconfliction_engine()
+            if engine is None:
                 logger.warning("No deconfliction engine configured; skipping deconfliction for %s", fd.id)
                 continue
-            engine = engine_cls()
             result = await engine.check_deconfliction(request, self.repo.db)
             results[str(fd.id)] = result
         return results
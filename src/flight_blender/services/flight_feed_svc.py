@@ -1,20 +1,27 @@
 import asyncio
+import base64
+import binascii
 import json
+import time
 import uuid
 from dataclasses import asdict
 from enum import Enum
 from itertools import zip_longest
-from typing import Any, Optional
+from operator import attrgetter, itemgetter
+from typing import Any, Callable, Optional
 
 import arrow
 import dacite
 import dacite.exceptions
+import numpy as np
 import shapely
 from dacite import from_dict
 from loguru import logger
-from shapely.geometry import Point
+from redis.exceptions import RedisError
 from shapely.geometry import box as shapely_box
 
+from flight_blender.auth.token_cache import get_async_redis
+from flight_blender.clients.redis_client import AIR_TRAFFIC_PERSIST_STREAM, AIR_TRAFFIC_PERSISTER_GROUP, RedisStreamOperations
 from flight_blender.config import settings
 from flight_blender.domain_types.flight_feed import (
     FlightObservationSchema,
@@ -52,6 +59,139 @@ def _build_view_port_box(view_port_coords: list[float]):
     )
 
 
+def _in_view_port(view_port_box, rows: list, position: Callable[[Any], tuple[float, float]]) -> list:
+    """The rows whose ``position`` (latitude, longitude) lies inside the viewport box, tested in one vectorized call.
+
+    Viewport boxes are built with latitude as x and longitude as y. Queries that take ``bounds``
+    have already cut the rows down to the box's bounding rectangle in SQL; this is the exact test.
+    """
+    if not rows:
+        return []
+    latitudes, longitudes = np.array([position(row) for row in rows], dtype=float).T
+    inside = shapely.contains_xy(view_port_box, latitudes, longitudes)
+    return [row for row, keep in zip(rows, inside) if keep]
+
+
+_orm_position = attrgetter("latitude_dd", "longitude_dd")
+_dict_position = itemgetter("latitude_dd", "longitude_dd")
+
+
+class DirectAirTrafficIngestor:
+    """Writes observations straight to the air traffic stream from the API process, bypassing Celery.
+
+    A request's observations go out as one pipelined batch of XADDs, to the air traffic stream for
+    fusion and to the persistence stream for the batched writer in ``tasks/air_traffic_persister.py``,
+    which reads them with its own consumer group and persists them. The
+    work is bounded per process: while ``max_in_flight`` observations are being written, further
+    requests are turned away with 429. A 503 means the stream cannot take more right now, either
+    because Redis is failing or because the persister is more than ``max_persist_delay_ms`` behind
+    and the persistence stream is filling up.
+    """
+
+    def __init__(
+        self,
+        redis_factory: Callable[[], Any] | None = None,
+        stream_ops_factory: Callable[[], RedisStreamOperations] | None = None,
+        max_in_flight: int | None = None,
+        max_persist_delay_ms: int | None = None,
+        persist_delay_check_interval_secs: float = 1.0,
+    ):
+        self._redis_factory = redis_factory or get_async_redis
+        self._stream_ops_factory = stream_ops_factory or RedisStreamOperations
+        self.max_in_flight = settings.FLIGHT_FEED_INGEST_MAX_IN_FLIGHT if max_in_flight is None else max_in_flight
+        self.max_persist_delay_ms = settings.FLIGHT_FEED_INGEST_MAX_PERSIST_DELAY_MS if max_persist_delay_ms is None else max_persist_delay_ms
+        self.persist_delay_check_interval_secs = persist_delay_check_interval_secs
+        self.in_flight = 0
+        self._persist_delay_ms = 0
+        self._persist_delay_checked_at = float("-inf")
+
+    async def _persist_delay(self) -> int:
+        """Age of the oldest entry the persister has not finished with, refreshed at most once per check interval."""
+        now = time.monotonic()
+        if now - self._persist_delay_checked_at >= self.persist_delay_check_interval_secs:
+            self._persist_delay_checked_at = now
+            stream_ops = self._stream_ops_factory()
+            metrics = await asyncio.to_thread(stream_ops.get_stream_lag_metrics, AIR_TRAFFIC_PERSIST_STREAM, AIR_TRAFFIC_PERSISTER_GROUP)
+            self._persist_delay_ms = metrics.oldest_entry_age_ms
+        return self._persist_delay_ms
+
+    async def ingest(self, observations: list[dict]) -> tuple[dict, int]:
+        if self.in_flight and self.in_flight + len(observations) > self.max_in_flight:
+            op = FlightObservationsProcessingResponse(message="Too many observations are being ingested, retry later", status=429)
+            return asdict(op), 429
+
+        self.in_flight += len(observations)
+        try:
+            if await self._persist_delay() > self.max_persist_delay_ms:
+                op = FlightObservationsProcessingResponse(message="Air traffic persistence is falling behind, retry later", status=503)
+                return asdict(op), 503
+            pipeline = self._redis_factory().pipeline(transaction=False)
+            RedisStreamOperations.queue_air_traffic_data_batch(pipeline, "air_traffic_stream", observations)
+            RedisStreamOperations.queue_air_traffic_persist_batch(pipeline, observations)
+            await pipeline.execute()
+        except RedisError as e:
+            logger.error(f"Error writing {len(observations)} observations to the air traffic stream: {e}")
+            op = FlightObservationsProcessingResponse(message="Air traffic stream is unavailable, retry later", status=503)
+            return asdict(op), 503
+        finally:
+            self.in_flight -= len(observations)
+
+        op = FlightObservationsProcessingResponse(message="OK", status=201)
+        return asdict(op), 201
+
+
+air_traffic_ingestor = DirectAirTrafficIngestor()
+
+
+def encode_stream_cursor(stream_id: str) -> str:
+    return base64.urlsafe_b64encode(stream_id.encode()).decode().rstrip("=")
+
+
+def decode_stream_cursor(cursor: str) -> str:
+    """Stream ID behind an opaque cursor; raises ValueError for anything that is not one."""
+    try:
+        stream_id = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        RedisStreamOperations.stream_id_key(stream_id)
+    except (binascii.Error, UnicodeDecodeError, ValueError) as exc:
+        raise ValueError(f"Invalid air traffic cursor {cursor!r}") from exc
+    return stream_id
+
+
+class AirTrafficCursorReader:
+    """Incremental reads of the air traffic stream behind ``get_air_traffic?cursor=``.
+
+    The cursor is an opaque encoding of the last stream ID a client has seen. A poll runs XREAD on the
+    stream from that ID and returns only the latest position per aircraft among the new entries,
+    without touching the database. An empty cursor, or a cursor whose following entries have already
+    been trimmed from the stream, gets a resync instead: every position from the last
+    ``AIR_TRAFFIC_CURSOR_SNAPSHOT_WINDOW_SECS`` in the ICAO -> latest position hash, which is written
+    alongside the stream on ingest, and a cursor at the stream head rather than wherever a replay stopped.
+    """
+
+    def __init__(self, stream_ops: RedisStreamOperations | None = None, count: int | None = None, snapshot_window_secs: int | None = None):
+        self.stream_ops = stream_ops or RedisStreamOperations()
+        self.count = settings.AIR_TRAFFIC_CURSOR_READ_COUNT if count is None else count
+        self.snapshot_window_secs = settings.AIR_TRAFFIC_CURSOR_SNAPSHOT_WINDOW_SECS if snapshot_window_secs is None else snapshot_window_secs
+
+    def poll(self, cursor: str) -> tuple[list[SingleAirtrafficObservation], str, bool]:
+        """Return ``(observations, next_cursor, resync)``; ``resync`` means the observations are a full snapshot."""
+        if not cursor:
+            return self._resync(self.stream_ops.air_traffic_stream_head("air_traffic_stream"))
+        entries, next_id, gap = self.stream_ops.read_air_traffic_since("air_traffic_stream", decode_stream_cursor(cursor), count=self.count)
+        if gap:
+            return self._resync(next_id)
+
+        latest: dict[str, SingleAirtrafficObservation] = {}
+        for _message_id, observation in entries:
+            latest[observation.icao_address] = observation
+        return list(latest.values()), encode_stream_cursor(next_id), False
+
+    def _resync(self, head_id: str) -> tuple[list[SingleAirtrafficObservation], str, bool]:
+        # ``head_id`` is read before the snapshot, so anything published in between is replayed by the next poll
+        snapshot = self.stream_ops.get_air_traffic_latest_state(max_age_ms=self.snapshot_window_secs * 1000)
+        return snapshot, encode_stream_cursor(head_id), True
+
+
 class FlightFeedOperations:
     def __init__(
         self,
@@ -59,11 +199,15 @@ class FlightFeedOperations:
         dispatcher: CeleryFlightFeedTaskDispatcher,
         telemetry_validator: "FlightBlenderTelemetryValidator",
         redis: Any,
+        ingestor: DirectAirTrafficIngestor | None = None,
+        cursor_reader: AirTrafficCursorReader | None = None,
     ):
         self.repo = repo
         self.dispatcher = dispatcher
         self.telemetry_validator = telemetry_validator
         self.redis = redis
+        self.ingestor = ingestor or air_traffic_ingestor
+        self.cursor_reader = cursor_reader
 
     @staticmethod
     def _to_observations(session_id: uuid.UUID, body: ObservationRequest) -> list[SingleAirtrafficObservation]:
@@ -83,19 +227,22 @@ class FlightFeedOperations:
             for obs in body.observations
         ]
 
-    async def set_air_traffic(self, session_id: uuid.UUID, body: ObservationRequest) -> tuple[dict, int]:
-        all_parsed = [asdict(so) for so in self._to_observations(session_id, body)]
+    async def _accept_observations(self, all_parsed: list[dict]) -> tuple[dict, int]:
+        if settings.FLIGHT_FEED_INGEST_MODE == "direct":
+            return await self.ingestor.ingest(all_parsed)
         asyncio.create_task(asyncio.to_thread(self.dispatcher.dispatch_observations, all_parsed))
         op = FlightObservationsProcessingResponse(message="OK", status=201)
         return asdict(op), 201
 
+    async def set_air_traffic(self, session_id: uuid.UUID, body: ObservationRequest) -> tuple[dict, int]:
+        all_parsed = [asdict(so) for so in self._to_observations(session_id, body)]
+        return await self._accept_observations(all_parsed)
+
     async def bulk_set_air_traffic(self, session_id: uuid.UUID, body: ObservationRequest) -> tuple[dict, int]:
         all_parsed = [asdict(so) for so in self._to_observations(session_id, body)]
-        asyncio.create_task(asyncio.to_thread(self.dispatcher.dispatch_observations, all_parsed))
-        op = FlightObservationsProcessingResponse(message="OK", status=201)
-        return asdict(op), 201
+        return await self._accept_observations(all_parsed)
 
-    async def get_air_traffic(self, session_id: uuid.UUID, view: Optional[str]) -> tuple[dict, int]:
+    async def get_air_traffic(self, session_id: uuid.UUID, view: Optional[str], cursor: Optional[str] = None) -> tuple[dict, int]:
         if not view:
             return {"message": "A view bbox is necessary with four values: minx, miny, maxx and maxy"}, 400
         try:
@@ -107,6 +254,9 @@ class FlightFeedOperations:
             return {"message": "A incorrect view port bbox was provided"}, 400
 
         view_port_box = _build_view_port_box(view_port_coords=view_port)
+        if cursor is not None:
+            return await self._get_air_traffic_since_cursor(view_port_box, cursor)
+
         key = f"last_reading_for_{session_id}"
         if self.redis.exists(key):
             last_reading_time = self.redis.get(key)
@@ -116,9 +266,9 @@ class FlightFeedOperations:
 
         self.redis.set(key, arrow.now().isoformat())
         self.redis.expire(key, 300)
-        observation_rows = await self.repo.get_recent_flight_observations(after_datetime=after_datetime)
+        observation_rows = await self.repo.get_recent_flight_observations(after_datetime=after_datetime, bounds=view_port_box.bounds)
         all_observations = []
-        for row in observation_rows:
+        for row in _in_view_port(view_port_box, observation_rows, _orm_position):
             obs = FlightObservationSchema(
                 id=str(row.id),
                 session_id=str(row.session_id) if row.session_id else "",
@@ -132,8 +282,7 @@ class FlightFeedOperations:
                 updated_at=row.updated_at.isoformat(),
                 metadata=json.loads(row.raw_metadata),
             )
-            if shapely.contains(view_port_box, Point(obs.latitude_dd, obs.longitude_dd)):
-                all_observations.append(obs)
+            all_observations.append(obs)
 
         latest_observations: dict = {}
         for obs in all_observations:
@@ -158,6 +307,15 @@ class FlightFeedOperations:
 
         return {"observations": all_traffic}, 200
 
+    async def _get_air_traffic_since_cursor(self, view_port_box, cursor: str) -> tuple[dict, int]:
+        reader = self.cursor_reader or AirTrafficCursorReader()
+        try:
+            observations, next_cursor, resync = await asyncio.to_thread(reader.poll, cursor)
+        except ValueError:
+            return {"message": "An invalid cursor was provided, start again with an empty cursor"}, 400
+        in_view = [asdict(o) for o in _in_view_port(view_port_box, observations, attrgetter("lat_dd", "lon_dd"))]
+        return {"observations": in_view, "cursor": next_cursor, "resync": resync}, 200
+
     async def start_opensky_feed(self, view: Optional[str]) -> tuple[dict, int]:
         if not view:
             return {"message": "A view bbox is necessary with four values: minx, miny, maxx and maxy"}, 400
@@ -368,6 +526,13 @@ class ObservationReadOperations:
         self.view_port_box: shapely_box = view_port_box
         self.redis: Any = redis
 
+    @property
+    def _bounds(self) -> Optional[tuple[float, float, float, float]]:
+        return self.view_port_box.bounds if self.view_port_box else None
+
+    def _in_view(self, rows: list, position: Callable[[Any], tuple[float, float]]) -> list:
+        return _in_view_port(self.view_port_box, rows, position) if self.view_port_box else rows
+
     async def get_flight_observations(self, session_id: str) -> list[FlightObservationSchema]:
         key = f"last_reading_for_{session_id}"
         if self.redis.exists(key):
@@ -380,9 +545,9 @@ class ObservationReadOperations:
         self.redis.set(key, arrow.now().isoformat())
         self.redis.expire(key, 300)
         pending_messages = []
-        rows = await self.repo.get_recent_flight_observations(after_datetime=after_datetime)
+        rows = await self.repo.get_recent_flight_observations(after_datetime=after_datetime, bounds=self._bounds)
         logger.info("Retrieved all flight observations..")
-        for row in rows:
+        for row in self._in_view(rows, _orm_position):
             observation = FlightObservationSchema(
                 id=str(row.id),
                 session_id=str(row.session_id) if row.session_id else "",
@@ -396,18 +561,14 @@ class ObservationReadOperations:
                 updated_at=row.updated_at.isoformat(),
                 metadata=json.loads(row.raw_metadata),
             )
-            if self.view_port_box:
-                if shapely.contains(self.view_port_box, Point(observation.latitude_dd, observation.longitude_dd)):
-                    pending_messages.append(observation)
-            else:
-                pending_messages.append(observation)
+            pending_messages.append(observation)
         return pending_messages
 
     async def get_closest_observation_for_now(self, now: arrow.arrow.Arrow):
         all_observations = []
-        closest_observations = await self.repo.get_closest_flight_observation_for_now(now=now)
+        closest_observations = await self.repo.get_closest_flight_observation_for_now(now=now, bounds=self._bounds)
         logger.info("Retrieved closest_observations..")
-        for closest_observation in closest_observations:
+        for closest_observation in self._in_view(closest_observations, _orm_position):
             single_observation = FlightObservationSchema(
                 id=str(closest_observation.id),
                 session_id=str(closest_observation.session_id),
@@ -421,17 +582,13 @@ class ObservationReadOperations:
                 updated_at=closest_observation.updated_at.isoformat(),
                 metadata=json.loads(closest_observation.raw_metadata),
             )
-            if self.view_port_box:
-                if shapely.contains(self.view_port_box, Point(single_observation.latitude_dd, single_observation.longitude_dd)):
-                    all_observations.append(single_observation)
-            else:
-                all_observations.append(single_observation)
+            all_observations.append(single_observation)
         return all_observations
 
     async def get_all_flight_observations(self) -> list[FlightObservationSchema]:
         pending_messages = []
-        all_flight_observations = await self.repo.get_flight_observation_dicts()
-        for message in all_flight_observations:
+        all_flight_observations = await self.repo.get_flight_observation_dicts(bounds=self._bounds)
+        for message in self._in_view(all_flight_observations, _dict_position):
             observation = FlightObservationSchema(
                 id=message["id"],
                 session_id=message["session_id"],
@@ -445,11 +602,7 @@ class ObservationReadOperations:
                 updated_at=message["updated_at"],
                 metadata=json.loads(message["metadata"]),
             )
-            if self.view_port_box:
-                if shapely.contains(self.view_port_box, Point(observation.latitude_dd, observation.longitude_dd)):
-                    pending_messages.append(observation)
-            else:
-                pending_messages.append(observation)
+            pending_messages.append(observation)
         return pending_messages
 
     async def get_latest_flight_observation_by_flight_declaration_id(self, flight_declaration_id: str) -> FlightObservationSchema | None:
@@ -483,9 +636,9 @@ class ObservationReadOperations:
         self.redis.expire(key, 300)
         pending_messages = []
         all_flight_observations = await self.repo.get_temporal_flight_observations_by_session_dicts(
-            session_id=session_id, after_datetime=after_datetime
+            session_id=session_id, after_datetime=after_datetime, bounds=self._bounds
         )
-        for message in all_flight_observations:
+        for message in self._in_view(all_flight_observations, _dict_position):
             observation = FlightObservationSchema(
                 id=message["id"],
                 session_id=message["session_id"],
@@ -499,9 +652,5 @@ class ObservationReadOperations:
                 updated_at=message["updated_at"],
                 metadata=json.loads(message["metadata"]),
             )
-            if self.view_port_box:
-                if shapely.contains(self.view_port_box, Point(observation.latitude_dd, observation.longitude_dd)):
-                    pending_messages.append(observation)
-            else:
-                pending_messages.append(observation)
+            pending_messages.append(observation)
         return pending_messages
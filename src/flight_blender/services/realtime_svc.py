@@ -1,21 +1,168 @@
+import asyncio
+from typing import Any, Callable
+
 import redis.asyncio as aioredis
 from fastapi import WebSocket, WebSocketDisconnect
+from loguru import logger
 
+from flight_blender.auth.token_cache import get_async_pubsub_redis
 from flight_blender.config import settings
 
 
+def _default_redis_factory() -> aioredis.Redis:
+    return get_async_pubsub_redis()
+
+
+class RealtimeSubscription:
+    """One websocket client's view of a channel: a bounded queue that conflates to the latest messages.
+
+    Track and heartbeat messages are full snapshots, so a client that cannot keep up only needs the
+    newest ones. When the queue is full the oldest queued message is dropped to make room.
+    """
+
+    def __init__(self, channel_name: str, max_queued: int):
+        self.channel_name = channel_name
+        self.queue: asyncio.Queue[str] = asyncio.Queue(maxsize=max(1, max_queued))
+        self.dropped = 0
+
+    def offer(self, data: str) -> None:
+        if self.queue.full():
+            self.queue.get_nowait()
+            self.dropped += 1
+        self.queue.put_nowait(data)
+
+    async def get(self) -> str:
+        return await self.queue.get()
+
+
+class RealtimeHub:
+    """Per-process fan-out of Redis pub/sub channels to websocket clients.
+
+    The hub holds a single pub/sub connection for the whole process. A channel is subscribed on
+    Redis when its first client arrives and unsubscribed when its last client leaves; one reader
+    task copies every message into the queue of each client on that channel. The hub belongs to
+    the event loop that first used it and starts over if it is used from a new loop.
+    """
+
+    def __init__(self, redis_factory: Callable[[], aioredis.Redis] | None = None, max_queued: int | None = None):
+        self._redis_factory = redis_factory or _default_redis_factory
+        self.max_queued = settings.REALTIME_CLIENT_QUEUE_SIZE if max_queued is None else max_queued
+        self._subscribers: dict[str, set[RealtimeSubscription]] = {}
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._lock: asyncio.Lock | None = None
+        self._redis: aioredis.Redis | None = None
+        self._pubsub: Any = None
+        self._reader: asyncio.Task | None = None
+
+    def _bind_to_running_loop(self) -> None:
+        loop = asyncio.get_running_loop()
+        if self._loop is loop:
+            return
+        self._loop = loop
+        self._lock = asyncio.Lock()
+        self._subscribers = {}
+        self._redis = None
+        self._pubsub = None
+        self._reader = None
+
+    def subscriber_count(self, channel_name: str | None = None) -> int:
+        if channel_name is not None:
+            return len(self._subscribers.get(channel_name, ()))
+        return sum(len(subscribers) for subscribers in self._subscribers.values())
+
+    @property
+    def channels(self) -> set[str]:
+        return set(self._subscribers)
+
+    async def subscribe(self, channel_name: str) -> RealtimeSubscription:
+        self._bind_to_running_loop()
+        subscription = RealtimeSubscription(channel_name, self.max_queued)
+        async with self._lock:
+            subscribers = self._subscribers.setdefault(channel_name, set())
+            subscribers.add(subscription)
+            if len(subscribers) == 1:
+                if self._pubsub is None:
+                    self._redis = self._redis_factory()
+                    self._pubsub = self._redis.pubsub()
+                await self._pubsub.subscribe(channel_name)
+            if self._reader is None or self._reader.done():
+                self._reader = asyncio.create_task(self._read_messages())
+        return subscription
+
+    async def unsubscribe(self, subscription: RealtimeSubscription) -> None:
+        if self._lock is None or self._loop is not asyncio.get_running_loop():
+            return
+        async with self._lock:
+            subscribers = self._subscribers.get(subscription.channel_name)
+            if subscribers is None or subscription not in subscribers:
+                return
+            subscribers.discard(subscription)
+            if not subscribers:
+                del self._subscribers[subscription.channel_name]
+                try:
+                    await self._pubsub.unsubscribe(subscription.channel_name)
+                except Exception as exc:
+                    logger.warning(f"Failed to unsubscribe from realtime channel {subscription.channel_name}: {exc}")
+
+    async def _read_messages(self) -> None:
+        while True:
+            try:
+                message = await self._pubsub.get_message(ignore_subscribe_messages=True, timeout=1.0)
+            except asyncio.CancelledError:
+                raise
+            except Exception as exc:
+                logger.error(f"Realtime pub/sub reader error, retrying: {exc}")
+                await asyncio.sleep(1.0)
+                continue
+            if message is None or message.get("type") != "message":
+                continue
+            for subscription in tuple(self._subscribers.get(message["channel"], ())):
+                subscription.offer(message["data"])
+
+    async def close(self) -> None:
+        if self._loop is not asyncio.get_running_loop():
+            return
+        if self._reader is not None:
+            self._reader.cancel()
+            try:
+                await self._reader
+            except (asyncio.CancelledError, Exception):
+                pass
+        if self._pubsub is not None:
+            await self._pubsub.aclose()
+        if self._redis is not None:
+            await self._redis.aclose()
+        self._loop = None
+        self._bind_to_running_loop()
+
+
+realtime_hub = RealtimeHub()
+
+
+async def _forward_messages(websocket: WebSocket, subscription: RealtimeSubscription) -> None:
+    while True:
+        await websocket.send_text(await subscription.get())
+
+
+async def _wait_for_disconnect(websocket: WebSocket) -> None:
+    while (await websocket.receive())["type"] != "websocket.disconnect":
+        pass
+
+
 async def redis_pubsub_websocket(websocket: WebSocket, channel_name: str) -> None:
     await websocket.accept()
-    redis_client = await aioredis.from_url(settings.REDIS_BROKER_URL, decode_responses=True)
-    pubsub = redis_client.pubsub()
-    await pubsub.subscribe(channel_name)
+    subscription = await realtime_hub.subscribe(channel_name)
+    tasks = {asyncio.create_task(_forward_messages(websocket, subscription)), asyncio.create_task(_wait_for_disconnect(websocket))}
     try:
-        async for message in pubsub.listen():
-            if message["type"] == "message":
-                await websocket.send_text(message["data"])
-    except WebSocketDisconnect:
-        pass
+        done, pending = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+        for task in done:
+            exc = task.exception()
+            if exc is not None and not isinstance(exc, WebSocketDisconnect):
+                logger.warning(f"Realtime websocket on {channel_name} closed with error: {exc}")
     finally:
-        await pubsub.unsubscribe(channel_name)
-        await pubsub.aclose()
-        await redis_client.aclose()
+        for task in tasks:
+            task.cancel()
+        await realtime_hub.unsubscribe(subscription)
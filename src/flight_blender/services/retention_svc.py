@@ -0,0 +1,213 @@
+"""Data retention: deletes expired rows table by table, optionally rolling them up and archiving them first.
+
+Each table has a ``RetentionPolicy``: the timestamp column that decides expiry and how many days
+to keep. Expired rows are removed in batches of ``RETENTION_BATCH_SIZE``, one transaction per batch,
+so a run never holds long locks or builds one huge delete. Flight observations stored in daily
+partitions on Postgres (``FLIGHT_OBSERVATION_PARTITIONING_ENABLED``) lose whole expired days with a
+partition drop; the batched delete then only covers the part of the cutoff day that remains.
+
+Before a batch is deleted it can be archived, as gzipped JSON Lines under ``RETENTION_ARCHIVE_DIR``,
+and flight observations can be rolled up into per-track, per-minute summaries
+(``RETENTION_ROLLUP_OBSERVATIONS``). Archive files are written before the delete commits, so a batch
+whose delete fails is archived again on the next run. A dry run only counts what would be deleted.
+
+Progress is logged and kept per table in the ``data_retention_progress`` Redis hash, updated after
+every batch.
+"""
+
+import gzip
+import json
+import time
+from collections.abc import Callable
+from dataclasses import asdict, dataclass
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+from loguru import logger
+from sqlalchemy import inspect
+from sqlalchemy.orm import InstrumentedAttribute
+
+from flight_blender.auth.token_cache import get_redis
+from flight_blender.config import settings
+from flight_blender.db.session import async_task_session
+from flight_blender.domain_types.flight_feed import FlightObservationRollup
+from flight_blender.domain_types.retention import RetentionStats
+from flight_blender.models.conformance_orm import ConformanceRecordORM
+from flight_blender.models.flight_feed_orm import FlightObservationORM
+from flight_blender.models.surveillance_orm import SurveillanceHeartbeatEventORM, SurveillanceMetricsRollupORM, SurveillanceTrackEventORM
+from flight_blender.repositories.flight_feed_repo import SQLAlchemyFlightFeedRepository
+from flight_blender.repositories.retention_repo import SQLAlchemyRetentionRepository
+from flight_blender.utils.datetime_utils import as_utc
+
+RETENTION_PROGRESS_KEY = "data_retention_progress"
+
+
+@dataclass
+class RetentionPolicy:
+    column: InstrumentedAttribute
+    retention_days: int
+    archive: bool = False
+    rollup: bool = False
+    partitioned: bool = False
+
+    @property
+    def table(self) -> str:
+        return self.column.class_.__tablename__
+
+    @property
+    def needs_rows(self) -> bool:
+        """Archiving and rollups need every expired row read before it is deleted."""
+        return self.archive or self.rollup
+
+
+def default_retention_policies() -> list[RetentionPolicy]:
+    archive = bool(settings.RETENTION_ARCHIVE_DIR)
+    return [
+        RetentionPolicy(
+            FlightObservationORM.created_at,
+            settings.FLIGHT_OBSERVATION_RETENTION_DAYS,
+            archive=archive,
+            rollup=settings.RETENTION_ROLLUP_OBSERVATIONS,
+            partitioned=True,
+        ),
+        RetentionPolicy(SurveillanceHeartbeatEventORM.dispatched_at, settings.HEARTBEAT_RETENTION_DAYS, archive=archive),
+        RetentionPolicy(SurveillanceTrackEventORM.dispatched_at, settings.HEARTBEAT_RETENTION_DAYS, archive=archive),
+        RetentionPolicy(ConformanceRecordORM.created_at, settings.CONFORMANCE_RECORD_RETENTION_DAYS, archive=archive),
+        RetentionPolicy(SurveillanceMetricsRollupORM.minute_start, settings.SURVEILLANCE_METRICS_ROLLUP_RETENTION_DAYS),
+    ]
+
+
+def rollup_flight_observations(rows: list[FlightObservationORM]) -> list[FlightObservationRollup]:
+    """Summarise observations per track (session and ICAO address) and UTC minute of ``created_at``."""
+    groups: dict[tuple, list[FlightObservationORM]] = {}
+    for row in rows:
+        minute_start = as_utc(row.created_at).replace(second=0, microsecond=0)
+        groups.setdefault((str(row.session_id) if row.session_id else "", row.icao_address, minute_start), []).append(row)
+
+    rollups = []
+    for (session_id, icao_address, minute_start), observations in groups.items():
+        observed_at = [as_utc(o.created_at) for o in observations]
+        rollups.append(
+            FlightObservationRollup(
+                session_id=session_id,
+                icao_address=icao_address,
+                minute_start=minute_start,
+                observation_count=len(observations),
+                first_observed_at=min(observed_at),
+                last_observed_at=max(observed_at),
+                latitude_dd_avg=sum(o.latitude_dd for o in observations) / len(observations),
+                longitude_dd_avg=sum(o.longitude_dd for o in observations) / len(observations),
+                altitude_mm_min=min(o.altitude_mm for o in observations),
+                altitude_mm_max=max(o.altitude_mm for o in observations),
+            )
+        )
+    return rollups
+
+
+class RetentionArchiver:
+    """Appends expired rows to ``<archive_dir>/<table>/<table>-<run started>.jsonl.gz``, one gzip member per batch."""
+
+    def __init__(self, archive_dir: str | Path, run_started: datetime):
+        self.archive_dir = Path(archive_dir)
+        self.run_label = run_started.strftime("%Y%m%dT%H%M%SZ")
+
+    def path_for(self, table: str) -> Path:
+        return self.archive_dir / table / f"{table}-{self.run_label}.jsonl.gz"
+
+    def write(self, table: str, rows: list) -> int:
+        if not rows:
+            return 0
+        path = self.path_for(table)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with gzip.open(path, "at", encoding="utf-8") as archive:
+            for row in rows:
+                mapper = inspect(row).mapper
+                record = {attr.columns[0].name: getattr(row, attr.key) for attr in mapper.column_attrs}
+                archive.write(json.dumps(record, default=str) + "\n")
+        return len(rows)
+
+
+class DataRetentionService:
+    def __init__(
+        self,
+        policies: list[RetentionPolicy] | None = None,
+        batch_size: int | None = None,
+        dry_run: bool | None = None,
+        archive_dir: str | None = None,
+        redis_factory: Callable | None = None,
+    ):
+        self.policies = default_retention_policies() if policies is None else policies
+        self.batch_size = settings.RETENTION_BATCH_SIZE if batch_size is None else batch_size
+        self.dry_run = settings.RETENTION_DRY_RUN if dry_run is None else dry_run
+        self.archive_dir = settings.RETENTION_ARCHIVE_DIR if archive_dir is None else archive_dir
+        self.redis_factory = redis_factory or get_redis
+
+    async def run(self, now: datetime | None = None) -> list[RetentionStats]:
+        now = now or datetime.now(timezone.utc)
+        archiver = RetentionArchiver(self.archive_dir, now) if self.archive_dir else None
+        results = []
+        for policy in self.policies:
+            if policy.retention_days <= 0:
+                continue
+            stats = await self.apply_policy(policy, now - timedelta(days=policy.retention_days), archiver)
+            logger.bind(**asdict(stats)).info(
+                f"Retention {'dry run ' if stats.dry_run else ''}for {stats.table}: deleted {stats.deleted_rows} rows in "
+                f"{stats.batches} batches, dropped {stats.partitions_dropped} partitions, archived {stats.archived_rows}, "
+                f"rolled up into {stats.rollup_rows}, {stats.expired_rows} expired before {stats.cutoff} ({stats.elapsed_ms} ms)"
+            )
+            results.append(stats)
+        return results
+
+    async def apply_policy(self, policy: RetentionPolicy, cutoff: datetime, archiver: RetentionArchiver | None = None) -> RetentionStats:
+        stats = RetentionStats(table=policy.table, cutoff=cutoff.isoformat(), dry_run=self.dry_run)
+        started = time.monotonic()
+
+        if self.dry_run:
+            async with async_task_session() as db:
+                stats.expired_rows = await SQLAlchemyRetentionRepository(db).count_expired(policy.column, cutoff)
+            return self._progress(stats, started)
+
+        if policy.partitioned and not policy.needs_rows:
+            await self._drop_partitions(stats, cutoff)
+
+        while True:
+            async with async_task_session() as db:
+                retention = SQLAlchemyRetentionRepository(db)
+                if policy.needs_rows:
+                    rows = await retention.get_expired_rows(policy.column, cutoff, self.batch_size)
+                    if rows and policy.archive and archiver is not None:
+                        stats.archived_rows += archiver.write(policy.table, rows)
+                    if rows and policy.rollup:
+                        rollups = rollup_flight_observations(rows)
+                        stats.rollup_rows += await SQLAlchemyFlightFeedRepository(db).merge_flight_observation_rollups(rollups)
+                    ids = [row.id for row in rows]
+                else:
+                    ids = await retention.get_expired_ids(policy.column, cutoff, self.batch_size)
+                if not ids:
+                    break
+                stats.deleted_rows += await retention.delete_by_ids(policy.column, ids)
+            stats.batches += 1
+            self._progress(stats, started)
+            if len(ids) < self.batch_size:
+                break
+
+        if policy.partitioned and policy.needs_rows:
+            # The batches above emptied the expired days; their partitions can go now.
+            await self._drop_partitions(stats, cutoff)
+        return self._progress(stats, started)
+
+    async def _drop_partitions(self, stats: RetentionStats, cutoff: datetime) -> None:
+        async with async_task_session() as db:
+            dropped = await SQLAlchemyFlightFeedRepository(db).drop_flight_observation_partitions(cutoff.date())
+        stats.partitions_dropped += dropped or 0
+
+    def _progress(self, stats: RetentionStats, started: float) -> RetentionStats:
+        stats.elapsed_ms = int((time.monotonic() - started) * 1000)
+        logger.debug(f"Retention progress for {stats.table}: {stats.deleted_rows} rows deleted in {stats.batches} batches")
+        try:
+            redis = self.redis_factory()
+            redis.hset(RETENTION_PROGRESS_KEY, stats.table, json.dumps(asdict(stats)))
+            redis.expire(RETENTION_PROGRESS_KEY, 7 * 24 * 3600)
+        except Exception as exc:
+            logger.warning(f"Could not export retention progress for {stats.table}: {exc}")
+        return stats
@@ -1,16 +1,29 @@
+import asyncio
+import json
+import time
 import uuid
+from collections import deque
 from dataclasses import asdict
 from datetime import datetime, timedelta, timezone
-from typing import Any, List, Optional
+from typing import Any, Callable, List, Optional
 
 import arrow
+import numpy as np
+import shapely
+from arrow.constants import MAX_TIMESTAMP, MAX_TIMESTAMP_MS
 from loguru import logger
 from pyproj import Geod
+from redis.exceptions import RedisError, WatchError
 
+from flight_blender.auth.token_cache import get_async_redis, get_redis
 from flight_blender.clients.redis_client import RedisStreamOperations
+from flight_blender.config import settings
+from flight_blender.db.session import async_task_session
 from flight_blender.domain_types.flight_feed import SingleAirtrafficObservation
+from flight_blender.domain_types.plugin_protocols import ReusableTrafficDataFuserProtocol, TrafficDataFuserProtocol
 from flight_blender.domain_types.surveillance import (
     FLIGHT_OBSERVATION_TRAFFIC_SOURCE,
+    ActiveSurveillanceSensor,
     ActiveTrack,
     AggregateHealthMetrics,
     AircraftPosition,
@@ -20,17 +33,32 @@ from flight_blender.domain_types.surveillance import (
     HeartbeatRateMetric,
     LatLangAltPoint,
     SensorHealthMetrics,
+    SessionMetricCounts,
     SpeedAccuracy,
     SurveillanceMetrics,
     SurveillanceSensorDetail,
     SurveillanceSensorFailureNotificationDetail,
     SurveillanceStatus,
+    SurveillanceSubscription,
     TrackMessage,
     TrackUpdateProbability,
 )
-from flight_blender.repositories.flight_feed_repo import SQLAlchemyFlightFeedRepository
+from flight_blender.plugins.loader import load_plugin
+from flight_blender.plugins.registry import plugin_instances
 from flight_blender.repositories.surveillance_repo import SQLAlchemySurveillanceRepository
 from flight_blender.tasks.scheduler import TaskSchedulerService
+from flight_blender.utils.air_traffic_shards import AIR_TRAFFIC_STREAM, AirTrafficShardMap, shard_stream_name
+from flight_blender.utils.datetime_utils import as_utc
+
+SURVEILLANCE_METRICS_ROLLUP_WATERMARK_KEY = "surveillance_metrics_rollup_watermark"
+SURVEILLANCE_SENSORS_VERSION_KEY = "surveillance_sensors_version"
+# Session id of the shared track store the fusion pipeline keeps its active tracks under
+SURVEILLANCE_FUSED_TRACK_STORE = "fused"
+SURVEILLANCE_TRACK_PICTURE_KEY = "surveillance_fusion:track_picture"
+SURVEILLANCE_TRACK_PICTURE_GENERATION_KEY = "surveillance_fusion:generation"
+SURVEILLANCE_FUSION_AIRCRAFT_KEY_PREFIX = "surveillance_fusion:aircraft:"
+SURVEILLANCE_FUSION_LOCK_KEY = "surveillance_fusion:lock"
+SURVEILLANCE_FUSION_TRACK_OWNER_KEY_PREFIX = "surveillance_fusion:track_owner:"
 
 
 class SurveillanceOperations:
@@ -38,11 +66,11 @@ class SurveillanceOperations:
         self,
         repo: SQLAlchemySurveillanceRepository,
         scheduler: TaskSchedulerService,
-        flight_feed_repo: SQLAlchemyFlightFeedRepository | None = None,
+        redis_factory: Callable[[], Any] | None = None,
     ):
         self.repo = repo
         self.scheduler = scheduler
-        self.flight_feed_repo = flight_feed_repo
+        self._redis_factory = redis_factory or get_async_redis
 
     async def get_health(self) -> dict:
         active_sensors = await self.repo.get_active_surveillance_sensors()
@@ -68,7 +96,9 @@ class SurveillanceOperations:
         )
         return asdict(health_obj)
 
-    async def start_stop_surveillance_session(self, session_id: uuid.UUID, action: str) -> tuple[dict, int]:
+    async def start_stop_surveillance_session(
+        self, session_id: uuid.UUID, action: str, subscription: SurveillanceSubscription | None = None
+    ) -> tuple[dict, int]:
         if action == "start":
             existing = await self.repo.get_session_by_id(session_id)
             if existing is not None:
@@ -85,11 +115,12 @@ class SurveillanceOperations:
                 await self.repo.delete_session(session_id)
                 return {"error": "Failed to create surveillance monitoring heartbeat task"}, 500
 
-            track_ok = await self._create_track_task(str(session_id))
+            track_ok = await self._create_track_task(str(session_id), subscription or SurveillanceSubscription())
             if not track_ok:
                 await self.repo.delete_session(session_id)
                 return {"error": "Failed to create surveillance monitoring track task"}, 500
 
+            plugin_instances.start_session(str(session_id))
             return {"status": "Surveillance monitoring heartbeat started"}, 200
         else:
             session = await self.repo.get_session_by_id(session_id)
@@ -97,6 +128,7 @@ class SurveillanceOperations:
                 return {"error": f"Invalid surveillance_session_id provided: {session_id}"}, 400
 
             self.scheduler.cancel_session_tasks(str(session_id))
+            plugin_instances.stop_session(str(session_id))
             return {"status": "Surveillance monitoring tasks removed successfully"}, 200
 
     async def _create_heartbeat_task(self, session_id: str) -> bool:
@@ -106,9 +138,9 @@ class SurveillanceOperations:
             logger.exception("Failed to create heartbeat periodic task for session %s", session_id)
             return False
 
-    async def _create_track_task(self, session_id: str) -> bool:
+    async def _create_track_task(self, session_id: str, subscription: SurveillanceSubscription) -> bool:
         try:
-            return self.scheduler.schedule_surveillance_track(session_id)
+            return self.scheduler.schedule_surveillance_track(session_id, subscription)
         except Exception:
             logger.exception("Failed to create track periodic task for session %s", session_id)
             return False
@@ -150,37 +182,35 @@ class SurveillanceOperations:
             end_dt = arrow.get(end_date).datetime if end_date else now.datetime
         except arrow.parser.ParserError:
             return {"error": "Invalid date format. Use ISO8601 format."}, 400
+        try:
+            session_ids = [uuid.UUID(session_id)] if session_id else None
+        except ValueError:
+            return {"error": "Invalid session_id. Must be a UUID."}, 400
 
         active_sessions = await self.repo.get_all_active_sessions()
         active_session_count = len(active_sessions)
 
-        if session_id:
-            sessions_to_process = [session_id]
-        else:
-            sessions_in_window = await self.repo.get_sessions_with_events_in_window(start_time=start_dt, end_time=end_dt)
-            sessions_to_process = [str(s.id) for s in sessions_in_window]
-
-        heartbeat_rates = []
-        heartbeat_delivery_probabilities = []
-        track_update_probabilities = []
-
-        for sid in sessions_to_process:
-            sid_uuid = uuid.UUID(sid)
-            heartbeat_rates.append(await self._calculate_heartbeat_rate(sid_uuid, start_dt, end_dt))
-            heartbeat_delivery_probabilities.append(await self._calculate_heartbeat_delivery_probability(sid_uuid, start_dt, end_dt))
-            track_update_probabilities.append(await self._calculate_track_update_probability(sid, start_dt, end_dt))
+        counts = await self._get_session_metric_counts(start_dt.astimezone(timezone.utc), end_dt.astimezone(timezone.utc), session_ids)
+        sessions_to_process = [session_id] if session_id else sorted(counts)
+        session_counts = [counts.get(str(sid)) or SessionMetricCounts(session_id=str(sid)) for sid in sessions_to_process]
 
         active_sensors = await self.repo.get_active_surveillance_sensors()
-        per_sensor_health = []
-        for sensor in active_sensors:
-            per_sensor_health.append(await self._calculate_sensor_health_metrics(sensor.id, sensor.sensor_identifier, start_dt, end_dt))
+        sensor_ids = [sensor.id for sensor in active_sensors]
+        records = await self.repo.get_health_tracking_records_for_sensors(sensor_ids, start_dt, end_dt) if sensor_ids else {}
+        pre_window_statuses = await self.repo.get_sensor_statuses_before_time(sensor_ids, start_dt) if sensor_ids else {}
+        per_sensor_health = [
+            _sensor_health_metrics(
+                sensor.id, sensor.sensor_identifier, records.get(sensor.id, []), pre_window_statuses.get(sensor.id), start_dt, end_dt
+            )
+            for sensor in active_sensors
+        ]
 
         aggregate_health = _calculate_aggregate_health_metrics(per_sensor_health, start_dt, end_dt)
 
         metric_response = SurveillanceMetrics(
-            heartbeat_rates=heartbeat_rates,
-            heartbeat_delivery_probabilities=heartbeat_delivery_probabilities,
-            track_update_probabilities=track_update_probabilities,
+            heartbeat_rates=[_heartbeat_rate_metric(c, start_dt, end_dt) for c in session_counts],
+            heartbeat_delivery_probabilities=[_heartbeat_delivery_probability(c, start_dt, end_dt) for c in session_counts],
+            track_update_probabilities=[_track_update_probability(c, start_dt, end_dt) for c in session_counts],
             per_sensor_health=per_sensor_health,
             aggregate_health=aggregate_health,
             active_sessions=active_session_count,
@@ -189,123 +219,29 @@ class SurveillanceOperations:
         )
         return asdict(metric_response), 200
 
-    async def _calculate_heartbeat_rate(self, session_id: uuid.UUID, start_time: datetime, end_time: datetime) -> HeartbeatRateMetric:
-        events = await self.repo.get_heartbeat_events_for_session(session_id=session_id, start_time=start_time, end_time=end_time)
-        total = len(events)
-        if total >= 2:
-            span_seconds = (events[-1].dispatched_at - events[0].dispatched_at).total_seconds()
-            rate_hz = round((total - 1) / span_seconds, 2) if span_seconds > 0 else 0.0
-        else:
-            rate_hz = 0.0
-        return HeartbeatRateMetric(
-            measured_rate_hz=rate_hz,
-            target_rate_hz=1.0,
-            session_id=str(session_id),
-            window_start=start_time.isoformat(),
-            window_end=end_time.isoformat(),
-            total_heartbeats_in_window=total,
-        )
-
-    async def _calculate_heartbeat_delivery_probability(
-        self, session_id: uuid.UUID, start_time: datetime, end_time: datetime
-    ) -> HeartbeatDeliveryProbability:
-        events = await self.repo.get_heartbeat_events_for_session(session_id=session_id, start_time=start_time, end_time=end_time)
-        total = len(events)
-        on_time = sum(1 for e in events if e.delivered_on_time)
-        probability = round(on_time / total, 6) if total > 0 else 0.0
-        return HeartbeatDeliveryProbability(
-            probability=probability,
-            delivered_on_time=on_time,
-            total_expected=total,
-            session_id=str(session_id),
-            window_start=start_time.isoformat(),
-            window_end=end_time.isoformat(),
+    async def _get_session_metric_counts(
+        self, start_time: datetime, end_time: datetime, session_ids: Optional[list[uuid.UUID]]
+    ) -> dict[str, SessionMetricCounts]:
+        """Per-session counts over the window, from the per-minute rollups where they are complete and from events elsewhere."""
+        rolled_to = await self._get_rollup_watermark() if settings.SURVEILLANCE_METRICS_ROLLUP_ENABLED else None
+        rollup_start = _ceil_minute(start_time)
+        rollup_end = min(_floor_minute(end_time), rolled_to) if rolled_to else rollup_start
+        if rollup_end <= rollup_start:
+            return await self.repo.get_session_metric_counts(start_time, end_time, session_ids)
+
+        return _merge_session_metric_counts(
+            await self.repo.get_session_metric_counts(start_time, rollup_start, session_ids, include_end=False),
+            await self.repo.get_session_metric_rollup_counts(rollup_start, rollup_end, session_ids),
+            await self.repo.get_session_metric_counts(rollup_end, end_time, session_ids),
         )
 
-    async def _calculate_track_update_probability(self, session_id: str, start_time: datetime, end_time: datetime) -> TrackUpdateProbability:
-        total = 0
-        if self.flight_feed_repo is not None:
-            observations = await self.flight_feed_repo.get_all_flight_observations_in_window(start_time=start_time, end_time=end_time)
-            total = len(observations)
-        probability = round(total / total, 6) if total > 0 else 0.0
-        return TrackUpdateProbability(
-            probability=probability,
-            ticks_with_active_tracks=total,
-            total_ticks=total,
-            session_id=session_id,
-            window_start=start_time.isoformat(),
-            window_end=end_time.isoformat(),
-        )
-
-    async def _calculate_sensor_health_metrics(
-        self,
-        sensor_id: uuid.UUID,
-        sensor_identifier: str,
-        start_time: datetime,
-        end_time: datetime,
-    ) -> SensorHealthMetrics:
-        records = await self.repo.get_health_tracking_records_for_sensor(sensor_id=sensor_id, start_time=start_time, end_time=end_time)
-        pre_window_status = await self.repo.get_sensor_status_before_time(sensor_id=sensor_id, before_time=start_time)
-
-        failure_states = {"degraded", "outage"}
-        current_failure_onset: Optional[datetime] = None
-        operational_start: Optional[datetime] = None
-
-        if pre_window_status in failure_states:
-            current_failure_onset = start_time
-        elif pre_window_status == "operational":
-            operational_start = start_time
-
-        recovery_durations: list[float] = []
-        auto_recovery_durations: list[float] = []
-        operational_intervals: list[tuple[float, Optional[str]]] = []
-
-        for record in records:
-            status = record.status
-            rec_time: datetime = record.recorded_at
-
-            if status in failure_states:
-                if current_failure_onset is None:
-                    if operational_start is not None:
-                        interval_secs = (rec_time - operational_start).total_seconds()
-                        operational_intervals.append((interval_secs, None))
-                    current_failure_onset = rec_time
-                    operational_start = None
-            elif status == "operational":
-                if current_failure_onset is not None:
-                    duration = (rec_time - current_failure_onset).total_seconds()
-                    recovery_durations.append(duration)
-                    if record.recovery_type == "automatic":
-                        auto_recovery_durations.append(duration)
-                    operational_start = rec_time
-                    current_failure_onset = None
-                    if operational_intervals:
-                        last = operational_intervals[-1]
-                        operational_intervals[-1] = (last[0], record.recovery_type)
-                else:
-                    if operational_start is None:
-                        operational_start = rec_time
-
-        mttr = round(sum(recovery_durations) / len(recovery_durations), 2) if recovery_durations else None
-        avg_auto_recovery = round(sum(auto_recovery_durations) / len(auto_recovery_durations), 2) if auto_recovery_durations else None
-        auto_intervals = [d for d, rt in operational_intervals if rt == "automatic"]
-        mtbf_auto = round(sum(auto_intervals) / len(auto_intervals), 2) if auto_intervals else None
-        manual_intervals = [d for d, rt in operational_intervals if rt == "manual"]
-        mtbf_manual = round(sum(manual_intervals) / len(manual_intervals), 2) if manual_intervals else None
-
-        return SensorHealthMetrics(
-            sensor_id=str(sensor_id),
-            sensor_identifier=sensor_identifier,
-            mttr_seconds=mttr,
-            auto_recovery_time_seconds=avg_auto_recovery,
-            mtbf_with_auto_recovery_seconds=mtbf_auto,
-            mtbf_without_auto_recovery_seconds=mtbf_manual,
-            failure_count=len(recovery_durations),
-            auto_recovery_count=len(auto_recovery_durations),
-            manual_recovery_count=len(recovery_durations) - len(auto_recovery_durations),
-            window_start=start_time.isoformat(),
-            window_end=end_time.isoformat(),
-        )
+    async def _get_rollup_watermark(self) -> Optional[datetime]:
+        try:
+            watermark = await self._redis_factory().get(SURVEILLANCE_METRICS_ROLLUP_WATERMARK_KEY)
+        except RedisError as exc:
+            logger.warning(f"Could not read the surveillance metrics rollup watermark, using events only: {exc}")
+            return None
+        return datetime.fromisoformat(watermark.decode() if isinstance(watermark, bytes) else watermark) if watermark else None
 
     async def update_sensor_health(self, sensor_id: uuid.UUID, new_status: str, recovery_type: Optional[str]) -> tuple[dict, int]:
         valid_statuses = {"operational", "degraded", "outage"}
@@ -323,6 +259,7 @@ class SurveillanceOperations:
         )
         if not success:
             return {"error": f"Sensor {sensor_id} not found or update failed"}, 404
+        await surveillance_sensor_registry.invalidate()
 
         return {"status": "Sensor health updated", "sensor_id": str(sensor_id), "new_status": new_status}, 200
 
@@ -401,6 +338,594 @@ def _calculate_aggregate_health_metrics(
     )
 
 
+def _floor_minute(value: datetime) -> datetime:
+    return value.replace(second=0, microsecond=0)
+
+
+def _ceil_minute(value: datetime) -> datetime:
+    floor = _floor_minute(value)
+    return floor if floor == value else floor + timedelta(minutes=1)
+
+
+def _merge_session_metric_counts(*parts: dict[str, SessionMetricCounts]) -> dict[str, SessionMetricCounts]:
+    merged: dict[str, SessionMetricCounts] = {}
+    for part in parts:
+        for session_id, counts in part.items():
+            total = merged.setdefault(session_id, SessionMetricCounts(session_id=session_id))
+            total.heartbeat_count += counts.heartbeat_count
+            total.heartbeats_on_time += counts.heartbeats_on_time
+            total.track_ticks += counts.track_ticks
+            total.track_ticks_with_active_tracks += counts.track_ticks_with_active_tracks
+            firsts = [t for t in (total.first_heartbeat_at, counts.first_heartbeat_at) if t is not None]
+            lasts = [t for t in (total.last_heartbeat_at, counts.last_heartbeat_at) if t is not None]
+            total.first_heartbeat_at = min(firsts, default=None)
+            total.last_heartbeat_at = max(lasts, default=None)
+    return merged
+
+
+def _heartbeat_rate_metric(counts: SessionMetricCounts, start_time: datetime, end_time: datetime) -> HeartbeatRateMetric:
+    total = counts.heartbeat_count
+    if total >= 2:
+        span_seconds = (counts.last_heartbeat_at - counts.first_heartbeat_at).total_seconds()
+        rate_hz = round((total - 1) / span_seconds, 2) if span_seconds > 0 else 0.0
+    else:
+        rate_hz = 0.0
+    return HeartbeatRateMetric(
+        measured_rate_hz=rate_hz,
+        target_rate_hz=1.0,
+        session_id=counts.session_id,
+        window_start=start_time.isoformat(),
+        window_end=end_time.isoformat(),
+        total_heartbeats_in_window=total,
+    )
+
+
+def _heartbeat_delivery_probability(counts: SessionMetricCounts, start_time: datetime, end_time: datetime) -> HeartbeatDeliveryProbability:
+    total = counts.heartbeat_count
+    probability = round(counts.heartbeats_on_time / total, 6) if total > 0 else 0.0
+    return HeartbeatDeliveryProbability(
+        probability=probability,
+        delivered_on_time=counts.heartbeats_on_time,
+        total_expected=total,
+        session_id=counts.session_id,
+        window_start=start_time.isoformat(),
+        window_end=end_time.isoformat(),
+    )
+
+
+def _track_update_probability(counts: SessionMetricCounts, start_time: datetime, end_time: datetime) -> TrackUpdateProbability:
+    total = counts.track_ticks
+    probability = round(counts.track_ticks_with_active_tracks / total, 6) if total > 0 else 0.0
+    return TrackUpdateProbability(
+        probability=probability,
+        ticks_with_active_tracks=counts.track_ticks_with_active_tracks,
+        total_ticks=total,
+        session_id=counts.session_id,
+        window_start=start_time.isoformat(),
+        window_end=end_time.isoformat(),
+    )
+
+
+def _sensor_health_metrics(
+    sensor_id: uuid.UUID,
+    sensor_identifier: str,
+    records: list,
+    pre_window_status: Optional[str],
+    start_time: datetime,
+    end_time: datetime,
+) -> SensorHealthMetrics:
+    """Replay one sensor's health tracking records, in recorded order, into its recovery and failure figures."""
+    failure_states = {"degraded", "outage"}
+    current_failure_onset: Optional[datetime] = None
+    operational_start: Optional[datetime] = None
+
+    if pre_window_status in failure_states:
+        current_failure_onset = start_time
+    elif pre_window_status == "operational":
+        operational_start = start_time
+
+    recovery_durations: list[float] = []
+    auto_recovery_durations: list[float] = []
+    operational_intervals: list[tuple[float, Optional[str]]] = []
+
+    for record in records:
+        status = record.status
+        rec_time = as_utc(record.recorded_at)
+
+        if status in failure_states:
+            if current_failure_onset is None:
+                if operational_start is not None:
+                    interval_secs = (rec_time - operational_start).total_seconds()
+                    operational_intervals.append((interval_secs, None))
+                current_failure_onset = rec_time
+                operational_start = None
+        elif status == "operational":
+            if current_failure_onset is not None:
+                duration = (rec_time - current_failure_onset).total_seconds()
+                recovery_durations.append(duration)
+                if record.recovery_type == "automatic":
+                    auto_recovery_durations.append(duration)
+                operational_start = rec_time
+                current_failure_onset = None
+                if operational_intervals:
+                    last = operational_intervals[-1]
+                    operational_intervals[-1] = (last[0], record.recovery_type)
+            else:
+                if operational_start is None:
+                    operational_start = rec_time
+
+    mttr = round(sum(recovery_durations) / len(recovery_durations), 2) if recovery_durations else None
+    avg_auto_recovery = round(sum(auto_recovery_durations) / len(auto_recovery_durations), 2) if auto_recovery_durations else None
+    auto_intervals = [d for d, rt in operational_intervals if rt == "automatic"]
+    mtbf_auto = round(sum(auto_intervals) / len(auto_intervals), 2) if auto_intervals else None
+    manual_intervals = [d for d, rt in operational_intervals if rt == "manual"]
+    mtbf_manual = round(sum(manual_intervals) / len(manual_intervals), 2) if manual_intervals else None
+
+    return SensorHealthMetrics(
+        sensor_id=str(sensor_id),
+        sensor_identifier=sensor_identifier,
+        mttr_seconds=mttr,
+        auto_recovery_time_seconds=avg_auto_recovery,
+        mtbf_with_auto_recovery_seconds=mtbf_auto,
+        mtbf_without_auto_recovery_seconds=mtbf_manual,
+        failure_count=len(recovery_durations),
+        auto_recovery_count=len(auto_recovery_durations),
+        manual_recovery_count=len(recovery_durations) - len(auto_recovery_durations),
+        window_start=start_time.isoformat(),
+        window_end=end_time.isoformat(),
+    )
+
+
+class SurveillanceMetricsRollup:
+    """Keeps the per-minute surveillance metrics rollups up to date.
+
+    Each run rebuilds the minutes from the last completed one, less a minute for late events, up to
+    the current minute, then records how far the rollups are complete in Redis; get_service_metrics
+    reads rollups only up to that watermark.
+    """
+
+    def __init__(self, redis_factory: Callable[[], Any] | None = None):
+        self._redis_factory = redis_factory or get_async_redis
+
+    async def run(self, now: datetime | None = None) -> int:
+        to_minute = _floor_minute(now or datetime.now(timezone.utc))
+        redis = self._redis_factory()
+        watermark = await redis.get(SURVEILLANCE_METRICS_ROLLUP_WATERMARK_KEY)
+        async with async_task_session() as db:
+            repo = SQLAlchemySurveillanceRepository(db)
+            if watermark:
+                from_minute = datetime.fromisoformat(watermark.decode() if isinstance(watermark, bytes) else watermark) - timedelta(minutes=1)
+            else:
+                from_minute = await repo.get_latest_session_metric_rollup_minute() or to_minute - timedelta(days=settings.HEARTBEAT_RETENTION_DAYS)
+            written = await repo.rebuild_session_metric_rollups(from_minute, to_minute)
+        await redis.set(SURVEILLANCE_METRICS_ROLLUP_WATERMARK_KEY, to_minute.isoformat())
+        logger.info(f"Rolled up surveillance metrics from {from_minute.isoformat()} to {to_minute.isoformat()}: {written} session minutes")
+        return written
+
+
+class SurveillanceSensorRegistry:
+    """Process-local cache of the active surveillance sensors, read by every heartbeat tick.
+
+    Within ``ttl_secs`` of the last check the cached sensors are returned without touching Redis. After
+    that the version counter in Redis is read once: if it has moved on the sensors are reloaded from the
+    database, otherwise the cache is kept for another window. ``invalidate`` is write-through: it drops
+    this process's copy and bumps the counter so every other process reloads within one window.
+    """
+
+    def __init__(self, ttl_secs: float | None = None, redis_factory: Callable[[], Any] | None = None):
+        self.ttl_secs = settings.SURVEILLANCE_SENSOR_CACHE_TTL_SECS if ttl_secs is None else ttl_secs
+        self._redis_factory = redis_factory
+        self._sensors: list[ActiveSurveillanceSensor] | None = None
+        self._version: str | None = None
+        self._checked_at = float("-inf")
+
+    def _redis(self):
+        # Resolved per call: the module-level registry is created at import time
+        return (self._redis_factory or get_async_redis)()
+
+    async def get_active_sensors(self) -> list[ActiveSurveillanceSensor]:
+        if self._sensors is not None and time.monotonic() - self._checked_at < self.ttl_secs:
+            return self._sensors
+
+        try:
+            version = await self._redis().get(SURVEILLANCE_SENSORS_VERSION_KEY)
+        except RedisError as exc:
+            logger.warning(f"Could not read the surveillance sensors version, reloading the sensors: {exc}")
+            version, self._sensors = self._version, None
+        if self._sensors is not None and version == self._version:
+            self._checked_at = time.monotonic()
+            return self._sensors
+
+        async with async_task_session() as db:
+            sensors = await SQLAlchemySurveillanceRepository(db).get_active_surveillance_sensors()
+        self._sensors = [
+            ActiveSurveillanceSensor(
+                id=str(s.id),
+                sensor_identifier=s.sensor_identifier,
+                expected_latency_ms=s.expected_latency_ms,
+                horizontal_accuracy_m=s.horizontal_accuracy_m,
+            )
+            for s in sensors
+        ]
+        self._version, self._checked_at = version, time.monotonic()
+        return self._sensors
+
+    async def invalidate(self) -> None:
+        self._sensors = None
+        try:
+            await self._redis().incr(SURVEILLANCE_SENSORS_VERSION_KEY)
+        except RedisError as exc:
+            logger.warning(f"Could not bump the surveillance sensors version, other processes keep their cached sensors: {exc}")
+
+
+surveillance_sensor_registry = SurveillanceSensorRegistry()
+
+
+class SurveillanceEventBuffer:
+    """Collects the heartbeat and track events of every session in the process and writes them in batches.
+
+    Once ``start`` has run on the process's event loop, events are queued and written by a single
+    multi-row insert per table when ``flush_size`` events are waiting or the oldest has waited
+    ``flush_interval_secs``; ``stop`` cancels the background flush and writes what is left. A buffer
+    that was never started writes each event as it arrives. At most ``max_queued`` events wait: if
+    writes keep failing the oldest are dropped.
+    """
+
+    def __init__(self, flush_size: int | None = None, flush_interval_secs: float | None = None, max_queued: int | None = None):
+        self.flush_size = settings.SURVEILLANCE_EVENT_BUFFER_FLUSH_SIZE if flush_size is None else flush_size
+        self.flush_interval_secs = settings.SURVEILLANCE_EVENT_BUFFER_FLUSH_INTERVAL_SECS if flush_interval_secs is None else flush_interval_secs
+        self.max_queued = settings.SURVEILLANCE_EVENT_BUFFER_MAX_QUEUED if max_queued is None else max_queued
+        self.dropped = 0
+        self._queue: deque[tuple[str, dict]] = deque()
+        self._oldest_at: float | None = None
+        self._flusher: asyncio.Task | None = None
+
+    def __len__(self) -> int:
+        return len(self._queue)
+
+    @property
+    def is_started(self) -> bool:
+        return self._flusher is not None and not self._flusher.done()
+
+    async def start(self) -> None:
+        if not self.is_started:
+            self._flusher = asyncio.create_task(self._flush_periodically())
+
+    async def stop(self) -> None:
+        if self._flusher is not None:
+            self._flusher.cancel()
+            await asyncio.gather(self._flusher, return_exceptions=True)
+            self._flusher = None
+        await self.flush()
+
+    async def record_heartbeat_event(self, session_id: uuid.UUID, expected_at: datetime, delivered_on_time: bool) -> None:
+        await self._add("heartbeat", {"session_id": session_id, "expected_at": expected_at, "delivered_on_time": delivered_on_time})
+
+    async def record_track_event(self, session_id: uuid.UUID, expected_at: datetime, had_active_tracks: bool) -> None:
+        await self._add("track", {"session_id": session_id, "expected_at": expected_at, "had_active_tracks": had_active_tracks})
+
+    async def _add(self, kind: str, row: dict) -> None:
+        # Stamp the dispatch time now: the row is inserted later
+        self._queue.append((kind, {**row, "dispatched_at": datetime.now(timezone.utc)}))
+        if self._oldest_at is None:
+            self._oldest_at = time.monotonic()
+        self._trim()
+        if not self.is_started or len(self._queue) >= self.flush_size or time.monotonic() - self._oldest_at >= self.flush_interval_secs:
+            await self.flush()
+
+    def _trim(self) -> None:
+        overflow = len(self._queue) - self.max_queued
+        if overflow > 0:
+            for _ in range(overflow):
+                self._queue.popleft()
+            self.dropped += overflow
+            logger.warning(f"Surveillance event buffer is full, dropped the {overflow} oldest events ({self.dropped} in total)")
+
+    async def flush(self) -> int:
+        """Write every queued event; on failure they go back to the front of the queue. Returns the rows written."""
+        if not self._queue:
+            return 0
+        batch, oldest_at = list(self._queue), self._oldest_at
+        self._queue.clear()
+        self._oldest_at = None
+        heartbeats = [row for kind, row in batch if kind == "heartbeat"]
+        tracks = [row for kind, row in batch if kind == "track"]
+        try:
+            async with async_task_session() as db:
+                written_heartbeats, written_tracks = await SQLAlchemySurveillanceRepository(db).record_surveillance_events(heartbeats, tracks)
+        except Exception as exc:
+            logger.error(f"Could not write {len(batch)} surveillance events, keeping them for the next flush: {exc}")
+            self._queue.extendleft(reversed(batch))
+            self._oldest_at = oldest_at
+            self._trim()
+            return 0
+        logger.debug(f"Wrote {written_heartbeats} heartbeat and {written_tracks} track events")
+        return written_heartbeats + written_tracks
+
+    async def _flush_periodically(self) -> None:
+        while True:
+            await asyncio.sleep(self.flush_interval_secs)
+            await self.flush()
+
+
+surveillance_event_buffer = SurveillanceEventBuffer()
+
+
+class FusedTrackPicture:
+    """One generation of the shared track picture, indexed once for every session that reads it.
+
+    Each track message is JSON-encoded once and a session's payload joins the encoded tracks it
+    selects. Tracks with a known position sit in an STRtree, latitude as x like viewport boxes, so
+    an area of interest costs a tree query rather than a scan of every track.
+    """
+
+    def __init__(self, generation: int, tracks: list[dict], positions: list[list[float] | None], traffic_sources: list[int | None]):
+        self.generation = generation
+        self.encoded = [json.dumps(track) for track in tracks]
+        self.traffic_sources = np.array([-1 if source is None else source for source in traffic_sources], dtype=np.int64)
+        self._located = np.array([i for i, position in enumerate(positions) if position is not None], dtype=np.int64)
+        located_positions = np.array([positions[i] for i in self._located], dtype=float).reshape(-1, 2)
+        self._tree = shapely.STRtree(shapely.points(located_positions))
+
+    @classmethod
+    def from_json(cls, raw: str | bytes) -> "FusedTrackPicture":
+        data = json.loads(raw)
+        return cls(data["generation"], data["tracks"], data["positions"], data["traffic_sources"])
+
+    def __len__(self) -> int:
+        return len(self.encoded)
+
+    def select(self, subscription: SurveillanceSubscription) -> np.ndarray:
+        """Indices of the tracks the subscription receives, in picture order."""
+        if subscription.area_of_interest is None:
+            selected = np.arange(len(self.encoded))
+        else:
+            selected = np.sort(self._located[self._tree.query(shapely.box(*subscription.area_of_interest))])
+        if subscription.traffic_sources is not None:
+            selected = selected[np.isin(self.traffic_sources[selected], subscription.traffic_sources)]
+        return selected
+
+    def payload(self, selected: np.ndarray) -> str:
+        """The JSON array of the selected track messages."""
+        return "[" + ", ".join(self.encoded[i] for i in selected) + "]"
+
+
+class SurveillanceTrackPicture:
+    """The shared track picture as the sessions see it: the latest FusedTrackPicture of every fusion shard."""
+
+    def __init__(self, parts: list[FusedTrackPicture]):
+        self.parts = parts
+
+    def __len__(self) -> int:
+        return sum(len(part) for part in self.parts)
+
+    def select(self, subscription: SurveillanceSubscription) -> list[np.ndarray]:
+        """Per part, the indices of the tracks the subscription receives."""
+        return [part.select(subscription) for part in self.parts]
+
+    def payload(self, selection: list[np.ndarray]) -> str:
+        """The JSON array of the selected track messages of every part."""
+        return "[" + ", ".join(part.encoded[i] for part, selected in zip(self.parts, selection) for i in selected) + "]"
+
+
+def _shard_suffix(shard: int | None) -> str:
+    return "" if shard is None else f":{shard}"
+
+
+class SurveillanceFusionPipeline:
+    """Fuses the air traffic stream once for every surveillance session.
+
+    Each ``run`` drains the stream through the ``air_traffic_readers`` group, runs the traffic data
+    fuser plugin over a single shared track store and writes the resulting track picture to Redis
+    together with a new generation number. Alongside each track it keeps the position and traffic
+    source of the aircraft's latest observation, which the session views filter on. Exactly one
+    process should call ``run`` per interval: the tick scheduler's fusion job, or ``run_if_due``
+    from the Celery track tasks.
+
+    With a ``shard``, the pipeline fuses ``air_traffic_stream:{shard}`` into its own track store
+    and picture. Each aircraft is fused by the one shard recorded as its owner: a shard that
+    receives newer observations of an aircraft owned by another one takes the track over, history
+    included, and observations that are not newer than the owner's track are forwarded to the
+    owner's stream instead of starting a second track.
+    """
+
+    def __init__(self, shard: int | None = None, redis_factory: Callable[[], Any] | None = None):
+        self.shard = shard
+        self.stream_name = AIR_TRAFFIC_STREAM if shard is None else shard_stream_name(shard)
+        self.track_store = f"{SURVEILLANCE_FUSED_TRACK_STORE}{_shard_suffix(shard)}"
+        self.handoffs = 0
+        self._redis_factory = redis_factory
+
+    def _redis(self):
+        return (self._redis_factory or get_redis)()
+
+    def run(self) -> int:
+        """One fusion cycle; returns the number of tracks in the new picture."""
+        stream_ops = RedisStreamOperations()
+        raw_observations = stream_ops.drain_air_traffic_data(
+            stream_name=self.stream_name,
+            max_messages=settings.SURVEILLANCE_STREAM_DRAIN_MAX_MESSAGES,
+            budget_ms=settings.SURVEILLANCE_STREAM_DRAIN_BUDGET_MS,
+            batch_size=settings.SURVEILLANCE_STREAM_READ_BATCH_SIZE,
+            block_ms=settings.SURVEILLANCE_STREAM_BLOCK_MS,
+            claim_min_idle_ms=settings.SURVEILLANCE_STREAM_CLAIM_IDLE_MS,
+        )
+        logger.info(f"Received {len(raw_observations)} observations from '{self.stream_name}' for the shared surveillance track picture")
+        self._export_stream_lag_metrics(stream_ops)
+        if self.shard is not None:
+            raw_observations = self._settle_track_owners(stream_ops, raw_observations)
+
+        fuser_path = settings.FLIGHT_BLENDER_PLUGIN_TRAFFIC_DATA_FUSER
+        FuserClass = load_plugin(fuser_path, expected_protocol=TrafficDataFuserProtocol)
+        if isinstance(FuserClass, type) and issubclass(FuserClass, ReusableTrafficDataFuserProtocol):
+            # Shards may fuse concurrently in one process, so each keeps its own instance
+            traffic_data_fuser = plugin_instances.get(fuser_path, scope=self.track_store)
+            track_messages = traffic_data_fuser.fuse(session_id=self.track_store, raw_observations=raw_observations, track_store=stream_ops)
+        else:
+            traffic_data_fuser = FuserClass(session_id=self.track_store, raw_observations=raw_observations, track_store=stream_ops)
+            track_messages = traffic_data_fuser.generate_track_messages()
+        self._store_picture(track_messages, raw_observations)
+        return len(track_messages)
+
+    def run_if_due(self) -> int | None:
+        """Run a cycle unless another caller already did within the fusion interval."""
+        interval_ms = int(settings.SURVEILLANCE_FUSION_INTERVAL_SECS * 1000)
+        if not self._redis().set(f"{SURVEILLANCE_FUSION_LOCK_KEY}{_shard_suffix(self.shard)}", "1", nx=True, px=interval_ms):
+            return None
+        return self.run()
+
+    def _export_stream_lag_metrics(self, stream_ops: RedisStreamOperations) -> None:
+        """Log the air traffic stream lag for this cycle and keep the latest figures in Redis for dashboards."""
+        lag_metrics = asdict(stream_ops.get_stream_lag_metrics(stream_name=self.stream_name))
+        logger.bind(**lag_metrics).info(
+            f"Air traffic stream lag: length={lag_metrics['stream_length']} "
+            f"pending={lag_metrics['pending_count']} oldest_entry_age_ms={lag_metrics['oldest_entry_age_ms']}"
+        )
+        lag_key = f"air_traffic_stream_lag:{self.track_store}"
+        stream_ops.redis.hset(lag_key, mapping={k: v for k, v in lag_metrics.items() if k not in ("stream_name", "consumer_group")})
+        stream_ops.redis.expire(lag_key, 60)
+
+    def _settle_track_owners(
+        self, stream_ops: RedisStreamOperations, raw_observations: list[SingleAirtrafficObservation]
+    ) -> list[SingleAirtrafficObservation]:
+        """Claim or take over the aircraft observed on this shard; returns the observations this shard fuses."""
+        by_aircraft: dict[str, list[SingleAirtrafficObservation]] = {}
+        for observation in raw_observations:
+            by_aircraft.setdefault(observation.icao_address, []).append(observation)
+        if not by_aircraft:
+            return raw_observations
+
+        r = self._redis()
+        ttl_secs = settings.ACTIVE_TRACK_IDLE_TIMEOUT_SECS
+        identifiers = list(by_aircraft)
+        owner_keys = [f"{SURVEILLANCE_FUSION_TRACK_OWNER_KEY_PREFIX}{identifier}" for identifier in identifiers]
+        pipe = r.pipeline(transaction=False)
+        for key in owner_keys:
+            pipe.set(key, self.shard, nx=True, ex=ttl_secs)
+        pipe.mget(owner_keys)
+        owners = pipe.execute()[-1]
+
+        kept: list[str] = []
+        forwarded: dict[int, list[SingleAirtrafficObservation]] = {}
+        for identifier, owner in zip(identifiers, owners):
+            owner_shard = int(owner) if owner is not None else self.shard
+            newest_timestamp = max(o.timestamp for o in by_aircraft[identifier])
+            if owner_shard == self.shard or self._take_over_track(stream_ops, identifier, owner_shard, newest_timestamp):
+                kept.append(identifier)
+            else:
+                forwarded.setdefault(owner_shard, []).extend(by_aircraft[identifier])
+
+        pipe = r.pipeline(transaction=False)
+        for identifier in kept:
+            pipe.expire(f"{SURVEILLANCE_FUSION_TRACK_OWNER_KEY_PREFIX}{identifier}", ttl_secs)
+        for owner_shard, observations in forwarded.items():
+            RedisStreamOperations.queue_air_traffic_data_batch(
+                pipe, shard_stream_name(owner_shard), [{k: v for k, v in asdict(o).items() if v is not None} for o in observations]
+            )
+        pipe.execute()
+        if forwarded:
+            logger.debug(f"Shard {self.shard} forwarded observations of {sum(len(o) for o in forwarded.values())} entries to their owning shards")
+        return [observation for identifier in kept for observation in by_aircraft[identifier]]
+
+    def _take_over_track(self, stream_ops: RedisStreamOperations, identifier: str, owner_shard: int, newest_timestamp: int) -> bool:
+        """Move the track of ``identifier`` from ``owner_shard`` to this shard unless the owner has newer observations.
+
+        The move and the change of owner are one MULTI transaction watching the owner key and the owner's
+        track keys, so of two shards taking over the same track at once only one succeeds, and an append by
+        the owner between the read and the move aborts the handoff instead of being lost.
+        """
+        owner_key = f"{SURVEILLANCE_FUSION_TRACK_OWNER_KEY_PREFIX}{identifier}"
+        owner_store = f"{SURVEILLANCE_FUSED_TRACK_STORE}{_shard_suffix(owner_shard)}"
+        with self._redis().pipeline(transaction=True) as pipe:
+            try:
+                pipe.watch(owner_key, *stream_ops.active_track_keys(owner_store, identifier))
+                owner = pipe.get(owner_key)
+                if owner is not None and int(owner) != owner_shard:
+                    return False
+                active_track = stream_ops.get_active_track(owner_store, identifier)
+                if active_track is not None and active_track.observations and active_track.observations[-1]["timestamp"] >= newest_timestamp:
+                    return False
+                pipe.multi()
+                stream_ops.queue_active_track_move(pipe, owner_store, self.track_store, active_track, identifier)
+                pipe.set(owner_key, self.shard, ex=settings.ACTIVE_TRACK_IDLE_TIMEOUT_SECS)
+                pipe.execute()
+            except WatchError:
+                return False
+        self.handoffs += 1
+        logger.info(f"Track {identifier} handed off from shard {owner_shard} to shard {self.shard}")
+        return True
+
+    def _store_picture(self, track_messages: list[TrackMessage], raw_observations: list[SingleAirtrafficObservation]) -> None:
+        r = self._redis()
+        ttl_secs = settings.SURVEILLANCE_FUSION_PICTURE_TTL_SECS
+        # The latest observation of each aircraft outlives the cycle for as long as its track can stay active
+        latest = {o.icao_address: [o.lat_dd, o.lon_dd, o.traffic_source] for o in raw_observations}
+        identifiers = [track.unique_aircraft_identifier for track in track_messages]
+        pipe = r.pipeline(transaction=False)
+        for icao_address, fix in latest.items():
+            pipe.set(f"{SURVEILLANCE_FUSION_AIRCRAFT_KEY_PREFIX}{icao_address}", json.dumps(fix), ex=settings.ACTIVE_TRACK_IDLE_TIMEOUT_SECS)
+        if identifiers:
+            pipe.mget([f"{SURVEILLANCE_FUSION_AIRCRAFT_KEY_PREFIX}{identifier}" for identifier in identifiers])
+        results = pipe.execute()
+        fixes = [json.loads(raw) if raw else None for raw in results[-1]] if identifiers else []
+
+        # A clock-based generation stays unique when the keys expire and a new fusion job starts over
+        generation = time.time_ns()
+        picture = {
+            "generation": generation,
+            "generated_at": arrow.utcnow().isoformat(),
+            "tracks": [asdict(track) for track in track_messages],
+            "positions": [fix[:2] if fix else None for fix in fixes],
+            "traffic_sources": [fix[2] if fix else None for fix in fixes],
+        }
+        suffix = _shard_suffix(self.shard)
+        pipe = r.pipeline(transaction=True)
+        pipe.set(f"{SURVEILLANCE_TRACK_PICTURE_KEY}{suffix}", json.dumps(picture), ex=ttl_secs)
+        pipe.set(f"{SURVEILLANCE_TRACK_PICTURE_GENERATION_KEY}{suffix}", generation, ex=ttl_secs)
+        pipe.execute()
+
+
+surveillance_fusion_pipeline = SurveillanceFusionPipeline()
+
+
+class SurveillanceTrackPictureCache:
+    """The process's copy of the latest shared track picture.
+
+    ``get`` reads the generation number of every fusion shard on each call and only fetches and
+    indexes a shard's picture when it has moved on, so all the sessions a process serves share one
+    copy per generation. Once a fusion job stops, its generation key expires and its tracks drop
+    out of the picture.
+    """
+
+    def __init__(self, redis_factory: Callable[[], Any] | None = None):
+        self._redis_factory = redis_factory
+        self._parts: dict[int | None, FusedTrackPicture] = {}
+
+    def _redis(self):
+        # Resolved on use, so a client patched in after import is picked up
+        return (self._redis_factory or get_redis)()
+
+    def get(self) -> SurveillanceTrackPicture:
+        shard_ids = AirTrafficShardMap.from_settings().shard_ids
+        try:
+            r = self._redis()
+            generations = r.mget([f"{SURVEILLANCE_TRACK_PICTURE_GENERATION_KEY}{_shard_suffix(shard)}" for shard in shard_ids])
+            parts = {}
+            for shard, generation in zip(shard_ids, generations):
+                part = self._parts.get(shard)
+                if generation is not None and part is not None and part.generation == int(generation):
+                    parts[shard] = part
+                elif generation is not None and (raw := r.get(f"{SURVEILLANCE_TRACK_PICTURE_KEY}{_shard_suffix(shard)}")) is not None:
+                    parts[shard] = FusedTrackPicture.from_json(raw)
+            self._parts = parts
+        except RedisError as exc:
+            logger.warning(f"Could not read the shared track picture, serving the last one read: {exc}")
+        return SurveillanceTrackPicture(list(self._parts.values()))
+
+
+surveillance_track_picture = SurveillanceTrackPictureCache()
+
+
 class SurveillanceMetricCalculator:
     """Calculates ASTM F3623 SDSP surveillance metrics from database records."""
 
@@ -671,13 +1196,53 @@ class BaseTrafficDataFuser:
 
         return [speed_mts_per_sec, fwd_azimuth, vertical_speed_mps]
 
+    @staticmethod
+    def _normalize_epoch_seconds(timestamps: np.ndarray) -> np.ndarray:
+        """Vectorized ``arrow.util.normalize_timestamp``: convert millisecond / microsecond epochs to seconds."""
+        return np.where(
+            timestamps > MAX_TIMESTAMP,
+            np.where(timestamps < MAX_TIMESTAMP_MS, timestamps / 1000, timestamps / 1_000_000),
+            timestamps,
+        )
+
+    def _compute_track_kinematics(self, previous_fixes: np.ndarray, latest_fixes: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Calculate speed, bearing and vertical speed for many tracks in one geodetic call.
+
+        Columnar counterpart of ``_generate_flight_speed_bearing``.
+
+        Args:
+            previous_fixes: ``(n, 4)`` array of ``[lat, lng, alt_m, epoch_seconds]`` for the fix before the latest
+            latest_fixes: ``(n, 4)`` array of ``[lat, lng, alt_m, epoch_seconds]`` for the latest fix
+
+        Returns:
+            Tuple of arrays ``(horizontal_speed_m/s, bearing_degrees, vertical_speed_m/s)``
+        """
+        if len(previous_fixes) == 1:
+            # pyproj treats size-1 arrays as scalars, a conversion NumPy deprecates, so pass the one track as floats
+            azimuth, _back_azimuth, distance = self.geod.inv(
+                previous_fixes[0, 1].item(), previous_fixes[0, 0].item(), latest_fixes[0, 1].item(), latest_fixes[0, 0].item()
+            )
+            fwd_azimuth, distance_mts = np.array([azimuth]), np.array([distance])
+        else:
+            fwd_azimuth, _back_azimuth, distance_mts = self.geod.inv(
+                previous_fixes[:, 1], previous_fixes[:, 0], latest_fixes[:, 1], latest_fixes[:, 0]
+            )
+        fwd_azimuth = np.where(fwd_azimuth < 0, fwd_azimuth + 360, fwd_azimuth)
+
+        delta_time_secs = latest_fixes[:, 3] - previous_fixes[:, 3]
+        moving = delta_time_secs != 0
+        safe_delta = np.where(moving, delta_time_secs, 1.0)
+        speed_mts_per_sec = np.where(moving, np.round(distance_mts / safe_delta, 2), 0.0)
+        vertical_speed_mps = np.where(moving, np.round((latest_fixes[:, 2] - previous_fixes[:, 2]) / safe_delta, 2), 0.0)
+        return speed_mts_per_sec, fwd_azimuth, vertical_speed_mps
+
     def _generate_track_messages_impl(self, active_tracks: List[ActiveTrack]) -> List[TrackMessage]:
         """Internal implementation for converting active tracks to track messages.
 
-        This concrete method processes each active track to generate standardized
-        ASTM F3411 compliant track messages. For each track, it:
-        - Extracts the latest and previous observations
-        - Calculates speed, bearing, and vertical speed using geodetic methods
+        This concrete method processes all active tracks column-wise to generate
+        standardized ASTM F3411 compliant track messages:
+        - Gathers the latest and previous observation of every track into NumPy arrays
+        - Calculates speed, bearing, and vertical speed in a single geodetic call
         - Creates position and state objects with accuracy estimates
         - Assembles complete track messages with timestamps and identifiers
 
@@ -690,41 +1255,41 @@ class BaseTrafficDataFuser:
         Returns:
             List of track messages ready for distribution to consumers
         """
+        tracks = [track for track in active_tracks if track.observations]
+        if not tracks:
+            return []
+
+        # Columns are [lat, lng, alt_m, timestamp]; longitudes are negated to match the published position convention.
+        latest_rows = []
+        previous_rows = []
+        for track in tracks:
+            latest_observation = track.observations[-1]
+            one_before_latest_observation = track.observations[-2] if len(track.observations) > 1 else latest_observation
+            for rows, obs in ((latest_rows, latest_observation), (previous_rows, one_before_latest_observation)):
+                rows.append((obs["lat_dd"], -obs["lon_dd"], obs["altitude_mm"] / 1000.0, obs["timestamp"]))
+        latest_fixes = np.array(latest_rows, dtype=float)
+        previous_fixes = np.array(previous_rows, dtype=float)
+        latest_fixes[:, 3] = self._normalize_epoch_seconds(latest_fixes[:, 3])
+        previous_fixes[:, 3] = self._normalize_epoch_seconds(previous_fixes[:, 3])
+
+        speeds, bearings, vertical_speeds = self._compute_track_kinematics(previous_fixes, latest_fixes)
+
+        generated_at = arrow.utcnow().isoformat()
+        speed_accuracy = SpeedAccuracy("SA1mps")
         all_track_data = []
-        for track in active_tracks:
-            single_unique_aircraft_identifier = track.unique_aircraft_identifier
-            # Get the latest observation for this active track
-            fused_observations = [SingleAirtrafficObservation(**obs) for obs in track.observations]
-            # For simplicity, we take the last observation as the latest
-            latest_observation = fused_observations[-1]
-            one_before_latest_observation = fused_observations[-2] if len(fused_observations) > 1 else latest_observation
-            latest_observation_lat_lng_point = LatLangAltPoint(
-                lat=latest_observation.lat_dd, lng=-latest_observation.lon_dd, alt=latest_observation.altitude_mm / 1000.0
-            )
-            one_before_latest_observation_lat_lng_point = LatLangAltPoint(
-                lat=one_before_latest_observation.lat_dd,
-                lng=-one_before_latest_observation.lon_dd,
-                alt=one_before_latest_observation.altitude_mm / 1000.0,
-            )
-            # Calculate speed and bearing
-            speed_mps, bearing_degrees, vertical_speed_mps = self._generate_flight_speed_bearing(
-                adjacent_points=[
-                    one_before_latest_observation_lat_lng_point,
-                    latest_observation_lat_lng_point,
-                ],
-                delta_time_secs=(arrow.get(latest_observation.timestamp) - arrow.get(one_before_latest_observation.timestamp)).total_seconds(),
-            )
-            # Create AircraftPosition
+        for track, fix, speed_mps, bearing_degrees, vertical_speed_mps in zip(
+            tracks, latest_fixes.tolist(), speeds.tolist(), bearings.tolist(), vertical_speeds.tolist()
+        ):
+            altitude_mm = track.observations[-1]["altitude_mm"]
             aircraft_position = AircraftPosition(
-                lat=latest_observation.lat_dd,
-                lng=-latest_observation.lon_dd,
-                alt=latest_observation.altitude_mm,
+                lat=fix[0],
+                lng=fix[1],
+                alt=altitude_mm,
                 accuracy_h="SA1mps",
                 accuracy_v="SA3mps",
                 extrapolated=True,
-                pressure_altitude=latest_observation.altitude_mm,
+                pressure_altitude=altitude_mm,
             )
-            speed_accuracy = SpeedAccuracy("SA1mps")
             aircraft_state = AircraftState(
                 position=aircraft_position,
                 speed=speed_mps,
@@ -732,15 +1297,16 @@ class BaseTrafficDataFuser:
                 vertical_speed=vertical_speed_mps,
                 speed_accuracy=speed_accuracy,
             )
-            track_data = TrackMessage(
-                sdsdp_identifier=self.SDSP_IDENTIFIER,
-                unique_aircraft_identifier=single_unique_aircraft_identifier,
-                state=aircraft_state,
-                timestamp=arrow.utcnow().isoformat(),
-                source="FusedSource",
-                track_state="Active",
+            all_track_data.append(
+                TrackMessage(
+                    sdsdp_identifier=self.SDSP_IDENTIFIER,
+                    unique_aircraft_identifier=track.unique_aircraft_identifier,
+                    state=aircraft_state,
+                    timestamp=generated_at,
+                    source="FusedSource",
+                    track_state="Active",
+                )
             )
-            all_track_data.append(track_data)
 
         return all_track_data
 
@@ -808,44 +1374,36 @@ class BaseTrafficDataFuser:
 
 
 class TrafficDataFuser(BaseTrafficDataFuser):
-    """Default data fuser — generates track messages from raw observations."""
+    """Default data fuser — generates track messages from raw observations.
+
+    Constructed without arguments, it is kept between fusion cycles and given each cycle's
+    observations through ``fuse``.
+    """
 
     def __init__(
         self,
-        session_id: str,
-        raw_observations: List[SingleAirtrafficObservation],
+        session_id: str = "",
+        raw_observations: List[SingleAirtrafficObservation] | None = None,
         track_store: RedisStreamOperations | None = None,
     ):
-        self.raw_observations = raw_observations
+        self.raw_observations = raw_observations or []
         self.SDSP_IDENTIFIER = "SDSP123"
         self.session_id = session_id
         self.geod = Geod(ellps="WGS84")
         if track_store is not None:
             self.redis_stream_helper = track_store
 
+    def fuse(self, *, session_id: str, raw_observations: List[SingleAirtrafficObservation], track_store: RedisStreamOperations) -> List[TrackMessage]:
+        self.session_id = session_id
+        self.raw_observations = raw_observations
+        self.redis_stream_helper = track_store
+        return self.generate_track_messages()
+
     def _fuse_raw_observations(self) -> List[SingleAirtrafficObservation]:
         return self.raw_observations
 
     def _generate_active_tracks(self, fused_observations: List[SingleAirtrafficObservation]):
-        track_store = self.redis_stream_helper
-        active_tracks_in_session = {}
+        observations_by_track: dict[str, list[dict]] = {}
         for observation in fused_observations:
-            icao_address = observation.icao_address
-            if icao_address not in active_tracks_in_session:
-                active_tracks_in_session[icao_address] = []
-            active_tracks_in_session[icao_address].append(observation)
-        for icao_address, observations in active_tracks_in_session.items():
-            track_for_icao_address_exists = track_store.check_active_track_exists(session_id=self.session_id, unique_aircraft_identifier=icao_address)
-            if track_for_icao_address_exists:
-                existing_active_track = track_store.get_active_track(session_id=self.session_id, unique_aircraft_identifier=icao_address)
-                existing_active_track.observations.extend([asdict(obs) for obs in observations])
-                existing_active_track.last_updated_timestamp = arrow.utcnow().isoformat()
-                track_store.update_active_track(session_id=self.session_id, active_track=existing_active_track)
-            else:
-                active_track = ActiveTrack(
-                    session_id=self.session_id,
-                    unique_aircraft_identifier=icao_address,
-                    last_updated_timestamp=arrow.utcnow().isoformat(),
-                    observations=[asdict(obs) for obs in observations],
-                )
-                track_store.add_active_track_to_session(session_id=self.session_id, active_track=active_track)
+            observations_by_track.setdefault(observation.icao_address, []).append(asdict(observation))
+        self.redis_stream_helper.append_active_track_observations(session_id=self.session_id, observations_by_track=observations_by_track)
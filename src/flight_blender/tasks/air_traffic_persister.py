@@ -0,0 +1,127 @@
+"""Batched writer that persists directly ingested air traffic to the database.
+
+Usage:
+    python -m flight_blender.tasks.air_traffic_persister
+
+With ``FLIGHT_FEED_INGEST_MODE=direct`` the API writes observations straight to the air traffic
+stream instead of handing them to Celery, and a copy to ``air_traffic_persist_stream``, which is
+capped by length rather than by the air traffic stream's TTL. This service reads that copy with its
+own consumer group (``air_traffic_persisters``), writes each batch with one bulk insert and acknowledges the batch only
+after the commit, so a batch that fails or is interrupted stays pending and is reclaimed later.
+Several instances can run side by side as consumers of the same group.
+
+Each batch reports the end-to-end ingest latency, from the stream entry's ``ingested_at_ms`` to the
+commit, in the logs and in the ``air_traffic_ingest_latency`` Redis hash.
+"""
+
+import asyncio
+import signal
+import time
+from dataclasses import asdict
+
+from loguru import logger
+
+from flight_blender.auth.token_cache import redis_registry
+from flight_blender.clients.redis_client import AIR_TRAFFIC_PERSIST_STREAM, AIR_TRAFFIC_PERSISTER_GROUP, RedisStreamOperations
+from flight_blender.config import settings
+from flight_blender.db.session import async_task_session, bind_task_sessions_to_loop, create_pooled_task_engine, unbind_task_sessions
+from flight_blender.domain_types.flight_feed import IngestLatencyMetrics, SingleAirtrafficObservation
+from flight_blender.repositories.flight_feed_repo import SQLAlchemyFlightFeedRepository
+
+INGEST_LATENCY_KEY = "air_traffic_ingest_latency"
+
+
+def ingest_latency_metrics(observations: list[SingleAirtrafficObservation], now_ms: int) -> IngestLatencyMetrics:
+    latencies = sorted(max(now_ms - o.ingested_at_ms, 0) for o in observations if o.ingested_at_ms)
+    if not latencies:
+        return IngestLatencyMetrics(persisted_count=len(observations))
+    return IngestLatencyMetrics(
+        persisted_count=len(observations),
+        p50_ms=latencies[len(latencies) // 2],
+        p95_ms=latencies[min(int(len(latencies) * 0.95), len(latencies) - 1)],
+        max_ms=latencies[-1],
+    )
+
+
+class AirTrafficPersister:
+    def __init__(
+        self,
+        stream_ops: RedisStreamOperations | None = None,
+        batch_size: int | None = None,
+        block_ms: int | None = None,
+        consumer_id: str | None = None,
+    ):
+        self.stream_ops = stream_ops or RedisStreamOperations()
+        self.batch_size = settings.FLIGHT_FEED_PERSIST_BATCH_SIZE if batch_size is None else batch_size
+        self.block_ms = settings.FLIGHT_FEED_PERSIST_BLOCK_MS if block_ms is None else block_ms
+        self.consumer_id = consumer_id or RedisStreamOperations.get_worker_consumer_name()
+        self._stopped = False
+
+    def stop(self) -> None:
+        self._stopped = True
+
+    async def persist_once(self) -> IngestLatencyMetrics:
+        """Read one batch, persist it and acknowledge it; an empty stream blocks for up to ``block_ms``."""
+        message_ids, observations = await asyncio.to_thread(
+            self.stream_ops.read_air_traffic_batch,
+            stream_name=AIR_TRAFFIC_PERSIST_STREAM,
+            consumer_group=AIR_TRAFFIC_PERSISTER_GROUP,
+            consumer_id=self.consumer_id,
+            count=self.batch_size,
+            block_ms=self.block_ms,
+        )
+        if observations:
+            async with async_task_session() as db:
+                await SQLAlchemyFlightFeedRepository(db).bulk_write_flight_observations(observations)
+        self.stream_ops.acknowledge_air_traffic_entries(AIR_TRAFFIC_PERSIST_STREAM, AIR_TRAFFIC_PERSISTER_GROUP, message_ids)
+
+        metrics = ingest_latency_metrics(observations, int(time.time() * 1000))
+        if metrics.persisted_count:
+            self._export_latency(metrics)
+        return metrics
+
+    def _export_latency(self, metrics: IngestLatencyMetrics) -> None:
+        """Log the batch's ingest latency and keep the latest figures in Redis for dashboards."""
+        latency = asdict(metrics)
+        logger.bind(**latency).info(
+            f"Persisted {metrics.persisted_count} air traffic observations: ingest latency p50={metrics.p50_ms}ms "
+            f"p95={metrics.p95_ms}ms max={metrics.max_ms}ms"
+        )
+        self.stream_ops.redis.hset(INGEST_LATENCY_KEY, mapping=latency)
+        self.stream_ops.redis.expire(INGEST_LATENCY_KEY, 60)
+
+    async def run(self) -> None:
+        logger.info(f"Air traffic persister {self.consumer_id} started")
+        while not self._stopped:
+            try:
+                await self.persist_once()
+            except Exception as exc:
+                logger.error(f"Air traffic persister {self.consumer_id} failed to persist a batch, it stays pending: {exc}")
+                await asyncio.sleep(1.0)
+        logger.info(f"Air traffic persister {self.consumer_id} stopped")
+
+
+async def _serve() -> None:
+    loop = asyncio.get_running_loop()
+    bind_task_sessions_to_loop(loop, create_pooled_task_engine())
+    persister = AirTrafficPersister()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, persister.stop)
+    try:
+        await persister.run()
+    finally:
+        redis_registry.close()
+        task_engine = unbind_task_sessions()
+        if task_engine is not None:
+            await task_engine.dispose()
+
+
+def main() -> None:
+    if settings.FLIGHT_FEED_INGEST_MODE != "direct":
+        # In celery mode the ingest tasks already persist every observation; a persister would write them twice.
+        raise SystemExit("The air traffic persister only runs with FLIGHT_FEED_INGEST_MODE=direct")
+    asyncio.run(_serve())
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,3 @@
-import asyncio
-
 from loguru import logger
 
 from flight_blender.auth.token_cache import get_redis
@@ -10,12 +8,13 @@ from flight_blender.repositories.flight_feed_repo import SQLAlchemyFlightFeedRep
 from flight_blender.services import conformance_svc as custom_signals
 from flight_blender.services import flight_feed_svc as flight_stream_helper
 from flight_blender.services.conformance_svc import FlightBlenderConformanceEngine
+from flight_blender.tasks.worker_loop import run_coro
 
 
 # This method conducts flight conformance checks as a async tasks
 @app.task(name="check_flight_conformance")
 def check_flight_conformance(flight_declaration_id: str, session_id: str, dry_run: str = "1"):
-    asyncio.run(_async_check_flight_conformance(flight_declaration_id=flight_declaration_id, session_id=session_id, dry_run=dry_run))
+    run_coro(_async_check_flight_conformance(flight_declaration_id=flight_declaration_id, session_id=session_id, dry_run=dry_run))
 
 
 async def _async_check_flight_conformance(flight_declaration_id: str, session_id: str, dry_run: str = "1"):
@@ -48,7 +47,7 @@ async def _async_check_flight_conformance(flight_declaration_id: str, session_id
 # This method conducts flight telemetry checks
 @app.task(name="check_operation_telemetry_conformance")
 def check_operation_telemetry_conformance(flight_declaration_id: str, dry_run: str = "1"):
-    asyncio.run(_async_check_operation_telemetry_conformance(flight_declaration_id=flight_declaration_id, dry_run=dry_run))
+    run_coro(_async_check_operation_telemetry_conformance(flight_declaration_id=flight_declaration_id, dry_run=dry_run))
 
 
 async def _async_check_operation_telemetry_conformance(flight_declaration_id: str, dry_run: str = "1"):
@@ -1,4 +1,3 @@
-import asyncio
 import json
 import uuid
 
@@ -15,11 +14,12 @@ from flight_blender.domain_types.common import OPERATION_STATES
 from flight_blender.domain_types.notifications import FlightDeclarationUpdateMessage
 from flight_blender.domain_types.scd import NotifyPeerUSSPostPayload, OperationalIntentDetailsUSSResponse, OperationalIntentUSSDetails
 from flight_blender.repositories.flight_declarations_repo import SQLAlchemyFlightDeclarationRepository
+from flight_blender.tasks.worker_loop import run_coro
 
 
 @app.task(name="submit_flight_declaration_to_dss_async")
 def submit_flight_declaration_to_dss_async(flight_declaration_id: str):
-    asyncio.run(_async_submit_flight_declaration_to_dss(flight_declaration_id))
+    run_coro(_async_submit_flight_declaration_to_dss(flight_declaration_id))
 
 
 async def _async_submit_flight_declaration_to_dss(flight_declaration_id: str) -> None:
@@ -1,10 +1,9 @@
-import asyncio
 import json
 import time
 from dataclasses import asdict
+from datetime import timedelta
 
 import arrow
-import pandas as pd
 import requests
 from dacite import from_dict
 from dacite.exceptions import DaciteError, WrongTypeError
@@ -12,11 +11,13 @@ from loguru import logger
 from pyproj import Transformer
 
 from flight_blender.celery import app
+from flight_blender.clients.opensky_client import OpenSkyClient, OpenSkyReplaySource, opensky_states_to_observations
 from flight_blender.clients.redis_client import RedisStreamOperations
 from flight_blender.config import settings
 from flight_blender.db.session import async_task_session
 from flight_blender.domain_types.flight_feed import SingleAirtrafficObservation
 from flight_blender.repositories.flight_feed_repo import SQLAlchemyFlightFeedRepository
+from flight_blender.tasks.worker_loop import run_coro
 
 #### Airtraffic Endpoint
 
@@ -28,7 +29,7 @@ def bulk_write_incoming_air_traffic_data(observations_str: str):
     This function takes a JSON string representing a list of observations,
     parses it, writes it to the database in bulk, and then pushes to a Redis stream.
     """
-    asyncio.run(_async_bulk_write_incoming_air_traffic_data(observations_str))
+    run_coro(_async_bulk_write_incoming_air_traffic_data(observations_str))
 
 
 async def _async_bulk_write_incoming_air_traffic_data(observations_str: str) -> None:
@@ -54,8 +55,9 @@ async def _async_bulk_write_incoming_air_traffic_data(observations_str: str) ->
             await repo.bulk_write_flight_observations(parsed_observations)
 
         logger.info("Writing batch to Redis stream..")
-        for single_obs in parsed_observations:
-            my_redis_helper.add_air_traffic_data(stream_name="air_traffic_stream", observation=asdict(single_obs))
+        my_redis_helper.add_air_traffic_data_batch(
+            stream_name="air_traffic_stream", observations=[asdict(single_obs) for single_obs in parsed_observations]
+        )
 
 
 @app.task(name="write_incoming_air_traffic_data")
@@ -69,7 +71,7 @@ def write_incoming_air_traffic_data(observation: str):
     Returns:
         str: The message ID of the added observation.
     """
-    asyncio.run(_async_write_incoming_air_traffic_data(observation))
+    run_coro(_async_write_incoming_air_traffic_data(observation))
 
 
 async def _async_write_incoming_air_traffic_data(observation: str) -> None:
@@ -92,7 +94,33 @@ async def _async_write_incoming_air_traffic_data(observation: str) -> None:
         await repo.write_flight_observation(single_air_traffic_observation)
 
     logger.info("Writing to Redis stream..")
-    my_redis_helper.add_air_traffic_data(stream_name="air_traffic_stream", observation=asdict(single_air_traffic_observation))
+    my_redis_helper.add_air_traffic_data_batch(stream_name="air_traffic_stream", observations=[asdict(single_air_traffic_observation)])
+
+
+@app.task(name="maintain_flight_observation_partitions")
+def maintain_flight_observation_partitions() -> None:
+    run_coro(_async_maintain_flight_observation_partitions())
+
+
+async def _async_maintain_flight_observation_partitions() -> None:
+    """
+    Partition maintenance for flight observations on Postgres with FLIGHT_OBSERVATION_PARTITIONING_ENABLED.
+    Creates the daily partitions FLIGHT_OBSERVATION_PARTITION_PREMAKE_DAYS ahead so writes never land in
+    the default partition. Expired partitions are dropped by the run_data_retention task, after any
+    archiving or rollup of their rows. Scheduled hourly through the Celery beat schedule; creating a
+    partition that exists is a no-op.
+    """
+    today = arrow.utcnow().date()
+    async with async_task_session() as db:
+        repo = SQLAlchemyFlightFeedRepository(db)
+        created = await repo.create_flight_observation_partitions(
+            first_day=today, last_day=today + timedelta(days=settings.FLIGHT_OBSERVATION_PARTITION_PREMAKE_DAYS)
+        )
+
+    if created is None:
+        logger.info("maintain_flight_observation_partitions: flight observations are not partitioned, nothing to do")
+        return
+    logger.info(f"maintain_flight_observation_partitions: created {created} daily partitions")
 
 
 lonlat_to_webmercator = Transformer.from_crs("EPSG:4326", "EPSG:3857", always_xy=True)
@@ -103,26 +131,31 @@ def mercator_transform(lon, lat):
     return x, y
 
 
+_opensky_client: OpenSkyClient | None = None
+
+
+def _opensky_source() -> OpenSkyClient | OpenSkyReplaySource:
+    """The replay source when OPENSKY_REPLAY_PATH is set, otherwise the worker's OpenSky client, whose HTTP session outlives the task."""
+    global _opensky_client
+    if settings.OPENSKY_REPLAY_PATH:
+        return OpenSkyReplaySource(settings.OPENSKY_REPLAY_PATH)
+    if _opensky_client is None:
+        _opensky_client = OpenSkyClient()
+    return _opensky_client
+
+
 @app.task(name="start_opensky_network_stream")
 def start_opensky_network_stream(view_port: str, session_id: str):
     """
-    Starts streaming data from the OpenSky Network within the specified viewport.
+    Streams OpenSky Network state vectors within the viewport for one minute.
     Args:
         view_port (str): A JSON string representing the viewport coordinates in the format
                          [lng_min, lat_min, lng_max, lat_max].
-    The function performs the following steps:
-    1. Parses the viewport JSON string to extract the coordinates.
-    2. Calculates the minimum and maximum longitude and latitude values.
-    3. Sets a heartbeat interval for querying the OpenSky Network.
-    4. Queries the OpenSky Network API for flight data within the specified viewport for one minute.
-    5. Logs the API request URL and response data.
-    6. If the response is successful and contains flight data, loads the data into a pandas DataFrame.
-    7. Iterates over the DataFrame rows and creates SingleAirtrafficObservation objects.
-    8. Submits tasks to write the incoming air traffic data.
-    Note:
-        - The function uses environment variables for the OpenSky Network username and password.
-        - The function logs information and debug messages.
-        - The function sleeps for the specified heartbeat interval between API requests.
+    Every HEARTBEAT_RATE_SECS the source is polled for the viewport's states. Each new snapshot is
+    converted to observations in one pass and handed to bulk_write_incoming_air_traffic_data in
+    chunks of OPENSKY_INGEST_CHUNK_SIZE, so a poll costs a few Celery messages however busy the
+    region is. The source is the live API, polled conditionally over a reused HTTP session, or the
+    recorded responses under OPENSKY_REPLAY_PATH for offline load tests.
     """
     view_port = json.loads(view_port)
 
@@ -135,66 +168,30 @@ def start_opensky_network_stream(view_port: str, session_id: str):
 
     heartbeat = settings.HEARTBEAT_RATE_SECS
     end_time = arrow.now().shift(seconds=60)
+    source = _opensky_source()
+    dispatcher = CeleryFlightFeedTaskDispatcher()
 
     logger.info("Querying OpenSkies Network for one minute.. ")
 
     while arrow.now() < end_time:
-        url_data = f"https://opensky-network.org/api/states/all?lamin={lat_min}&lomin={lng_min}&lamax={lat_max}&lomax={lng_max}"
-        response = requests.get(
-            url_data,
-            auth=(settings.OPENSKY_NETWORK_USERNAME, settings.OPENSKY_NETWORK_PASSWORD),
-            timeout=30,
-        )
-        logger.info(url_data)
-        if response.status_code == 200:
-            response_data = response.json()
-            logger.debug(f"Response data: {response_data}")
-
-            if response_data.get("states"):
-                col_names = [
-                    "icao24",
-                    "callsign",
-                    "origin_country",
-                    "time_position",
-                    "last_contact",
-                    "long",
-                    "lat",
-                    "baro_altitude",
-                    "on_ground",
-                    "velocity",
-                    "true_track",
-                    "vertical_rate",
-                    "sensors",
-                    "geo_altitude",
-                    "squawk",
-                    "spi",
-                    "position_source",
-                ]
-                flight_df = pd.DataFrame(response_data["states"], columns=col_names).fillna("No Data")
-                flight_df["lat"] = flight_df["lat"].astype(float)
-                flight_df["long"] = flight_df["long"].astype(float)
-                flight_df["baro_altitude"] = flight_df["baro_altitude"].astype(float)
-
-                for _, row in flight_df.iterrows():
-                    so = SingleAirtrafficObservation(
-                        session_id=session_id,
-                        lat_dd=row["lat"],
-                        lon_dd=row["long"],
-                        altitude_mm=row["baro_altitude"],
-                        traffic_source=2,
-                        source_type=1,
-                        icao_address=str(row["icao24"]),
-                        metadata={"velocity": row["velocity"]},
-                    )
-                    write_incoming_air_traffic_data.delay(json.dumps(asdict(so)))
+        try:
+            response_data = source.fetch_states(lat_min=lat_min, lng_min=lng_min, lat_max=lat_max, lng_max=lng_max)
+        except requests.RequestException as e:
+            logger.warning(f"OpenSky Network poll failed: {e}")
+            response_data = None
+
+        if response_data and response_data.get("states"):
+            observations = opensky_states_to_observations(response_data["states"], session_id=session_id)
+            logger.info(f"Dispatching {len(observations)} OpenSky observations..")
+            dispatcher.dispatch_observations(observations, chunk_size=settings.OPENSKY_INGEST_CHUNK_SIZE)
 
         time.sleep(heartbeat)
 
 
 class CeleryFlightFeedTaskDispatcher:
-    def dispatch_observations(self, observations: list[dict]) -> None:
-        for i in range(0, len(observations), 250):
-            bulk_write_incoming_air_traffic_data.delay(json.dumps(observations[i : i + 250]))
+    def dispatch_observations(self, observations: list[dict], chunk_size: int = 250) -> None:
+        for i in range(0, len(observations), chunk_size):
+            bulk_write_incoming_air_traffic_data.delay(json.dumps(observations[i : i + chunk_size]))
 
     def start_opensky_network_stream(self, view_port: str, session_id: str) -> None:
         start_opensky_network_stream.delay(view_port=view_port, session_id=session_id)
@@ -1,4 +1,3 @@
-import asyncio
 import json
 from dataclasses import asdict
 
@@ -15,6 +14,7 @@ from flight_blender.db.session import async_task_session
 from flight_blender.domain_types.geo_fence import GeoAwarenessTestStatus
 from flight_blender.models.geo_fence_orm import GeoFenceORM
 from flight_blender.services.geo_fence_svc import GeoZoneParser
+from flight_blender.tasks.worker_loop import run_coro
 
 
 @app.task(name="download_geozone_source")
@@ -45,7 +45,7 @@ def download_geozone_source(geo_zone_url: str, geozone_source_id: str):
 
 @app.task(name="write_geo_zone")
 def write_geo_zone(geo_zone: str, test_harness_datasource: str = "0"):
-    asyncio.run(_async_write_geo_zone(geo_zone, test_harness_datasource))
+    run_coro(_async_write_geo_zone(geo_zone, test_harness_datasource))
 
 
 async def _async_write_geo_zone(geo_zone: str, test_harness_datasource: str = "0") -> None:
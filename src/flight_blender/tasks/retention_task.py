@@ -0,0 +1,22 @@
+from dataclasses import asdict
+
+from flight_blender.celery import app
+from flight_blender.services.retention_svc import DataRetentionService
+from flight_blender.tasks.worker_loop import run_coro
+
+
+@app.task(name="run_data_retention")
+def run_data_retention(dry_run: bool | None = None) -> list[dict]:
+    """
+    Data retention task. Applies the retention policies in services/retention_svc.py: flight
+    observations (FLIGHT_OBSERVATION_RETENTION_DAYS), heartbeat and track events
+    (HEARTBEAT_RETENTION_DAYS), conformance records (CONFORMANCE_RECORD_RETENTION_DAYS) and surveillance
+    metrics rollups (SURVEILLANCE_METRICS_ROLLUP_RETENTION_DAYS).
+    Scheduled daily through the Celery beat schedule; ``dry_run`` overrides RETENTION_DRY_RUN.
+    Returns the per-table statistics.
+    """
+    return run_coro(_async_run_data_retention(dry_run))
+
+
+async def _async_run_data_retention(dry_run: bool | None) -> list[dict]:
+    return [asdict(stats) for stats in await DataRetentionService(dry_run=dry_run).run()]
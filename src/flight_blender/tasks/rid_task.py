@@ -44,6 +44,7 @@ from flight_blender.services.rid_svc import (
     SingleObservationMetadata,
 )
 from flight_blender.tasks.flight_feed_task import write_incoming_air_traffic_data
+from flight_blender.tasks.worker_loop import run_coro
 
 
 def _parse_rid_timestamp_us(rid_ts_value, context: str) -> int:
@@ -66,7 +67,7 @@ def _parse_rid_timestamp_us(rid_ts_value, context: str) -> int:
 
 @app.task(name="write_operator_rid_notification")
 def write_operator_rid_notification(message: str, session_id: str):
-    asyncio.run(_async_write_operator_rid_notification(message, session_id))
+    run_coro(_async_write_operator_rid_notification(message, session_id))
 
 
 async def _async_write_operator_rid_notification(message: str, session_id: str) -> None:
@@ -282,7 +283,7 @@ def submit_dss_subscription(view, vertex_list, request_uuid):
 @app.task(name="run_ussp_polling_for_rid")
 def run_ussp_polling_for_rid(end_time: str, session_id: str):
     """This method is a wrapper for repeated polling of UTMSPs for Network RID information"""
-    asyncio.run(_async_run_ussp_polling_for_rid(end_time, session_id))
+    run_coro(_async_run_ussp_polling_for_rid(end_time, session_id))
 
 
 async def _async_run_ussp_polling_for_rid(end_time: str, session_id: str) -> None:
@@ -331,7 +332,7 @@ async def _async_run_ussp_polling_for_rid(end_time: str, session_id: str) -> Non
 
 @app.task(name="stream_rid_telemetry_data")
 def stream_rid_telemetry_data(rid_telemetry_observations):
-    asyncio.run(_async_stream_rid_telemetry_data(rid_telemetry_observations))
+    run_coro(_async_stream_rid_telemetry_data(rid_telemetry_observations))
 
 
 async def _async_stream_rid_telemetry_data(rid_telemetry_observations) -> None:
@@ -385,7 +386,7 @@ async def _async_stream_rid_telemetry_data(rid_telemetry_observations) -> None:
 
 @app.task(name="stream_rid_test_data")
 def stream_rid_test_data(requested_flights, test_id):
-    asyncio.run(_async_stream_rid_test_data(requested_flights, test_id))
+    run_coro(_async_stream_rid_test_data(requested_flights, test_id))
 
 
 async def _async_stream_rid_test_data(requested_flights, test_id) -> None:
@@ -569,7 +570,7 @@ async def _async_stream_rid_test_data(requested_flights, test_id) -> None:
 
 @app.task(name="check_rid_stream_conformance")
 def check_rid_stream_conformance(session_id: str, flight_declaration_id=None, dry_run: str = "1"):
-    asyncio.run(_async_check_rid_stream_conformance(session_id))
+    run_coro(_async_check_rid_stream_conformance(session_id))
 
 
 async def _async_check_rid_stream_conformance(session_id: str) -> None:
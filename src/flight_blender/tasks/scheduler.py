@@ -1,10 +1,13 @@
-"""Celery task scheduling without django_celery_beat.
+"""Periodic session task scheduling without django_celery_beat.
 
-Uses apply_async with countdown-based self-rescheduling tasks.
-Redis stop-signal keys are used for session cancellation.
+With TICK_SCHEDULER_ENABLED jobs are registered in Redis and run by the long-lived tick scheduler
+service (``flight_blender.tasks.tick_scheduler``), which must then be deployed. Otherwise, the
+default, they fall back to apply_async with countdown-based self-rescheduling Celery tasks. Redis stop-signal keys are used
+for session cancellation of the Celery tasks.
 """
 
 import uuid
+from dataclasses import asdict
 
 import arrow
 from loguru import logger
@@ -12,18 +15,45 @@ from loguru import logger
 from flight_blender.auth.token_cache import get_redis
 from flight_blender.celery import app
 from flight_blender.config import settings
+from flight_blender.domain_types.surveillance import SurveillanceSubscription
+from flight_blender.tasks.tick_jobs import (
+    FLIGHT_CONFORMANCE,
+    RID_STREAM_CONFORMANCE,
+    SURVEILLANCE_FUSION,
+    SURVEILLANCE_HEARTBEAT,
+    SURVEILLANCE_TRACK,
+    TickJobSpec,
+    register_job,
+    remove_session_jobs,
+    surveillance_fusion_session_id,
+)
+from flight_blender.utils.air_traffic_shards import AirTrafficShardMap
 
 
 class TaskSchedulerService:
     """
-    Stateless factory for scheduling periodic Celery tasks.
-    Uses apply_async(countdown=N) instead of django_celery_beat PeriodicTask rows.
+    Stateless front-end for scheduling periodic per-session tasks.
+    Registers jobs with the tick scheduler service, or uses apply_async(countdown=N) when it is disabled.
     """
 
+    @staticmethod
+    def _register_tick_job(kind: str, session_id: str, interval_secs: float, expires_iso: str, **kwargs) -> bool:
+        try:
+            spec = TickJobSpec.for_session(kind, session_id, interval_secs=interval_secs, expires_at=arrow.get(expires_iso).float_timestamp, **kwargs)
+            register_job(get_redis(), spec)
+            return True
+        except Exception as e:
+            logger.error("TaskSchedulerService: could not register %s tick job: %s" % (kind, e))
+            return False
+
     @staticmethod
     def schedule_conformance_check(flight_declaration_id: str, session_id: str, expires: str) -> bool:
         every = settings.HEARTBEAT_RATE_SECS
         logger.info("TaskSchedulerService: scheduling conformance check, expires at %s" % expires)
+        if settings.TICK_SCHEDULER_ENABLED:
+            return TaskSchedulerService._register_tick_job(
+                FLIGHT_CONFORMANCE, session_id, every, expires, flight_declaration_id=flight_declaration_id
+            )
         try:
             app.send_task(
                 "check_flight_conformance",
@@ -39,6 +69,8 @@ class TaskSchedulerService:
     @staticmethod
     def schedule_rid_stream_monitoring(session_id: str, end_datetime: str) -> bool:
         every = settings.HEARTBEAT_RATE_SECS
+        if settings.TICK_SCHEDULER_ENABLED:
+            return TaskSchedulerService._register_tick_job(RID_STREAM_CONFORMANCE, session_id, every, end_datetime)
         try:
             app.send_task(
                 "check_rid_stream_conformance",
@@ -56,6 +88,8 @@ class TaskSchedulerService:
         session_id = surveillance_session_id if surveillance_session_id else str(uuid.uuid4())
         expires = arrow.now().shift(minutes=1).isoformat()
         logger.info("TaskSchedulerService: scheduling surveillance heartbeat, expires at %s" % expires)
+        if settings.TICK_SCHEDULER_ENABLED:
+            return TaskSchedulerService._register_tick_job(SURVEILLANCE_HEARTBEAT, session_id, 1, expires)
         try:
             app.send_task(
                 "send_heartbeat_to_consumer",
@@ -69,16 +103,30 @@ class TaskSchedulerService:
             return False
 
     @staticmethod
-    def schedule_surveillance_track(surveillance_session_id: str) -> bool:
+    def schedule_surveillance_track(surveillance_session_id: str, subscription: SurveillanceSubscription | None = None) -> bool:
+        """Schedule the session's track view; with the tick scheduler this also keeps the shared fusion job registered until it expires."""
         session_id = surveillance_session_id if surveillance_session_id else str(uuid.uuid4())
+        subscription = subscription or SurveillanceSubscription()
+        every = subscription.update_interval_secs
         expires = arrow.now().shift(minutes=1).isoformat()
         logger.info("TaskSchedulerService: scheduling surveillance track task, expires at %s" % expires)
+        if settings.TICK_SCHEDULER_ENABLED:
+            # Every session starts later than the ones before it, so re-registering only extends the fusion jobs
+            fusion_ok = all(
+                TaskSchedulerService._register_tick_job(
+                    SURVEILLANCE_FUSION, surveillance_fusion_session_id(shard), settings.SURVEILLANCE_FUSION_INTERVAL_SECS, expires, shard=shard
+                )
+                for shard in AirTrafficShardMap.from_settings().shard_ids
+            )
+            return fusion_ok and TaskSchedulerService._register_tick_job(
+                SURVEILLANCE_TRACK, session_id, every, expires, subscription=asdict(subscription)
+            )
         try:
             app.send_task(
                 "send_and_generate_track_to_consumer",
                 args=[session_id],
-                kwargs={"expires_iso": expires},
-                countdown=1,
+                kwargs={"expires_iso": expires, "subscription": asdict(subscription)},
+                countdown=every,
             )
             return True
         except Exception as e:
@@ -87,6 +135,7 @@ class TaskSchedulerService:
 
     @staticmethod
     def cancel_session_tasks(session_id: str) -> None:
-        """Signal running tasks for session_id to stop via Redis stop-signal key."""
+        """Signal running tasks for session_id to stop: drop its tick jobs and set the Redis stop-signal key."""
         r = get_redis()
+        remove_session_jobs(r, session_id)
         r.set(f"stop_task_{session_id}", "1", ex=300)
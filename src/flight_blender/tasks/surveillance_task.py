@@ -5,39 +5,57 @@ from dataclasses import asdict
 
 import arrow
 import redis
+from celery.signals import worker_process_init
 from loguru import logger
 
-from flight_blender.auth.token_cache import get_redis
+from flight_blender.auth.token_cache import get_pubsub_redis, get_redis
 from flight_blender.celery import app
-from flight_blender.clients.redis_client import RedisStreamOperations
 from flight_blender.config import settings
 from flight_blender.db.session import async_task_session
-from flight_blender.domain_types.plugin_protocols import TrafficDataFuserProtocol
-from flight_blender.domain_types.surveillance import HeartbeatMessage
-from flight_blender.plugins.loader import load_plugin
+from flight_blender.domain_types.surveillance import HeartbeatMessage, SurveillanceSubscription
 from flight_blender.repositories.surveillance_repo import SQLAlchemySurveillanceRepository
-
-BROKER_URL = settings.REDIS_BROKER_URL
-FLIGHT_BLENDER_PLUGIN_TRAFFIC_DATA_FUSER = settings.FLIGHT_BLENDER_PLUGIN_TRAFFIC_DATA_FUSER
+from flight_blender.services.surveillance_svc import (
+    SurveillanceFusionPipeline,
+    SurveillanceMetricsRollup,
+    surveillance_event_buffer,
+    surveillance_fusion_pipeline,
+    surveillance_sensor_registry,
+    surveillance_track_picture,
+)
+from flight_blender.tasks.worker_loop import run_coro, worker_event_loop
+from flight_blender.utils.air_traffic_shards import AirTrafficShardMap
 
 _MAX_ACCEPTABLE_LATENCY_SECS = settings.HEARTBEAT_MAX_LATENCY_SECS
 
 
+@worker_process_init.connect
+def _start_surveillance_event_buffer(**kwargs) -> None:
+    # Runs after the worker event loop has started; the buffer flushes on that loop until shutdown
+    if worker_event_loop.is_running:
+        worker_event_loop.submit(surveillance_event_buffer.start())
+
+
+worker_event_loop.add_shutdown_hook(surveillance_event_buffer.stop)
+
+
+def _get_realtime_publisher() -> redis.Redis:
+    """A client on the process-wide pub/sub pool, so publishes reuse connections across ticks."""
+    return get_pubsub_redis()
+
+
 def _publish_realtime_message(channel_name: str, payload: object) -> None:
-    redis_client = redis.from_url(BROKER_URL, decode_responses=True)
-    try:
-        redis_client.publish(channel_name, json.dumps(payload))
-    finally:
-        redis_client.close()
+    _get_realtime_publisher().publish(channel_name, json.dumps(payload))
 
 
 @app.task(name="send_and_generate_track_to_consumer")
-def send_and_generate_track_to_consumer(session_id: str, flight_declaration_id: None | str = None, expires_iso: str | None = None) -> None:
-    asyncio.run(_async_send_and_generate_track_to_consumer(session_id, flight_declaration_id, expires_iso))
+def send_and_generate_track_to_consumer(
+    session_id: str, flight_declaration_id: None | str = None, expires_iso: str | None = None, subscription: dict | None = None
+) -> None:
+    run_coro(_async_send_and_generate_track_to_consumer(session_id, flight_declaration_id, expires_iso, subscription))
 
 
 async def _async_send_and_generate_track_to_consumer(
-    session_id: str, flight_declaration_id: None | str = None, expires_iso: str | None = None
+    session_id: str, flight_declaration_id: None | str = None, expires_iso: str | None = None, subscription: dict | None = None
 ) -> None:
     r = get_redis()
     if r.exists(f"stop_task_{session_id}"):
@@ -45,47 +63,64 @@ async def _async_send_and_generate_track_to_consumer(
     if expires_iso and arrow.utcnow() > arrow.get(expires_iso):
         return
 
-    surveillance_session_id = session_id
-    expected_at = arrow.utcnow().datetime
+    session_subscription = SurveillanceSubscription.from_dict(subscription)
+    # Without the tick scheduler there is no fusion job: whichever session task comes first in an interval fuses for all of them.
+    await asyncio.to_thread(_run_due_fusion)
+    await _async_track_tick(session_id, session_subscription)
 
-    stream_ops = RedisStreamOperations()
-    consumer_id = stream_ops.create_consumer_reader()
-    raw_observations = stream_ops.read_latest_air_traffic_data(stream_name="air_traffic_stream", consumer_id=consumer_id, count=20)
-    logger.info(f"Received {len(raw_observations)} observations for surveillance session id: {surveillance_session_id}")
-
-    FuserClass = load_plugin(FLIGHT_BLENDER_PLUGIN_TRAFFIC_DATA_FUSER, expected_protocol=TrafficDataFuserProtocol)
-    traffic_data_fuser = FuserClass(
-        session_id=surveillance_session_id,
-        raw_observations=raw_observations,
-        track_store=stream_ops,
+    send_and_generate_track_to_consumer.apply_async(
+        args=[session_id, flight_declaration_id],
+        kwargs={"expires_iso": expires_iso, "subscription": asdict(session_subscription)},
+        countdown=session_subscription.update_interval_secs,
     )
-    track_messages = traffic_data_fuser.generate_track_messages()
 
-    all_track_data = []
-    for track_message in track_messages:
-        all_track_data.append(asdict(track_message))
-        logger.debug(f"Fused track message: {asdict(track_message)}")
 
-    _publish_realtime_message(f"track_{surveillance_session_id}", all_track_data)
+_shard_fusion_pipelines: dict[int, SurveillanceFusionPipeline] = {}
 
-    async with async_task_session() as db:
-        repo = SQLAlchemySurveillanceRepository(db)
-        await repo.record_track_event(
-            session_id=uuid.UUID(surveillance_session_id),
-            expected_at=expected_at,
-            had_active_tracks=len(track_messages) > 0,
-        )
 
-    send_and_generate_track_to_consumer.apply_async(
-        args=[session_id, flight_declaration_id],
-        kwargs={"expires_iso": expires_iso},
-        countdown=1,
+def _fusion_pipeline(shard: int | None) -> SurveillanceFusionPipeline:
+    if shard is None:
+        return surveillance_fusion_pipeline
+    return _shard_fusion_pipelines.setdefault(shard, SurveillanceFusionPipeline(shard=shard))
+
+
+def _run_due_fusion() -> None:
+    for shard in AirTrafficShardMap.from_settings().shard_ids:
+        _fusion_pipeline(shard).run_if_due()
+
+
+async def _async_fusion_tick(shard: int | None = None) -> None:
+    """One cycle of the shared fusion pipeline of ``shard``, run by the tick scheduler's fusion job for that shard."""
+    # The drain blocks on XREADGROUP, so keep it off the event loop the sessions share.
+    track_count = await asyncio.to_thread(_fusion_pipeline(shard).run)
+    logger.debug(f"Shared track picture of shard {shard} holds {track_count} tracks")
+
+
+async def _async_track_tick(session_id: str, subscription: SurveillanceSubscription | None = None) -> None:
+    """One track update for a surveillance session, shared by the Celery task and the tick scheduler.
+
+    The session is a view on the shared track picture: the tracks its subscription selects are
+    published as they were encoded by the fusion pipeline, without fusing anything again.
+    """
+    surveillance_session_id = session_id
+    expected_at = arrow.utcnow().datetime
+
+    picture = surveillance_track_picture.get()
+    selection = picture.select(subscription or SurveillanceSubscription())
+    selected_count = sum(len(selected) for selected in selection)
+    logger.debug(f"Publishing {selected_count} of {len(picture)} tracks to surveillance session {surveillance_session_id}")
+    _get_realtime_publisher().publish(f"track_{surveillance_session_id}", picture.payload(selection))
+
+    await surveillance_event_buffer.record_track_event(
+        session_id=uuid.UUID(surveillance_session_id),
+        expected_at=expected_at,
+        had_active_tracks=selected_count > 0,
     )
 
 
 @app.task(name="send_heartbeat_to_consumer")
 def send_heartbeat_to_consumer(session_id: str, flight_declaration_id: None | str = None, expires_iso: str | None = None) -> None:
-    asyncio.run(_async_send_heartbeat_to_consumer(session_id, flight_declaration_id, expires_iso))
+    run_coro(_async_send_heartbeat_to_consumer(session_id, flight_declaration_id, expires_iso))
 
 
 async def _async_send_heartbeat_to_consumer(session_id: str, flight_declaration_id: None | str = None, expires_iso: str | None = None) -> None:
@@ -95,6 +130,17 @@ async def _async_send_heartbeat_to_consumer(session_id: str, flight_declaration_
     if expires_iso and arrow.utcnow() > arrow.get(expires_iso):
         return
 
+    await _async_heartbeat_tick(session_id)
+
+    send_heartbeat_to_consumer.apply_async(
+        args=[session_id, flight_declaration_id],
+        kwargs={"expires_iso": expires_iso},
+        countdown=1,
+    )
+
+
+async def _async_heartbeat_tick(session_id: str) -> None:
+    """One heartbeat for a surveillance session, shared by the Celery task and the tick scheduler."""
     surveillance_session_id = session_id
     logger.info(f"Preparing to send heartbeat for surveillance session with id: {surveillance_session_id}")
 
@@ -102,13 +148,11 @@ async def _async_send_heartbeat_to_consumer(session_id: str, flight_declaration_
     avg_latency_ms = 0
     h_accuracy_m = 0
 
-    async with async_task_session() as db:
-        repo = SQLAlchemySurveillanceRepository(db)
-        active_sensors = await repo.get_active_surveillance_sensors()
-        if active_sensors:
-            primary_sensor = active_sensors[0]
-            avg_latency_ms = primary_sensor.expected_latency_ms
-            h_accuracy_m = int(primary_sensor.horizontal_accuracy_m)
+    active_sensors = await surveillance_sensor_registry.get_active_sensors()
+    if active_sensors:
+        primary_sensor = active_sensors[0]
+        avg_latency_ms = primary_sensor.expected_latency_ms
+        h_accuracy_m = int(primary_sensor.horizontal_accuracy_m)
 
     heartbeat_data = HeartbeatMessage(
         surveillance_sdsp_name=surveillance_session_id,
@@ -131,24 +175,16 @@ async def _async_send_heartbeat_to_consumer(session_id: str, flight_declaration_
     latency_secs = abs((dispatch_at - expected_at).total_seconds())
     delivered_on_time = dispatch_succeeded and latency_secs <= _MAX_ACCEPTABLE_LATENCY_SECS
 
-    async with async_task_session() as db:
-        repo = SQLAlchemySurveillanceRepository(db)
-        await repo.record_heartbeat_event(
-            session_id=uuid.UUID(surveillance_session_id),
-            expected_at=expected_at,
-            delivered_on_time=delivered_on_time,
-        )
-
-    send_heartbeat_to_consumer.apply_async(
-        args=[session_id, flight_declaration_id],
-        kwargs={"expires_iso": expires_iso},
-        countdown=1,
+    await surveillance_event_buffer.record_heartbeat_event(
+        session_id=uuid.UUID(surveillance_session_id),
+        expected_at=expected_at,
+        delivered_on_time=delivered_on_time,
     )
 
 
 @app.task(name="cleanup_old_heartbeat_events")
 def cleanup_old_heartbeat_events() -> None:
-    asyncio.run(_async_cleanup_old_heartbeat_events())
+    run_coro(_async_cleanup_old_heartbeat_events())
 
 
 async def _async_cleanup_old_heartbeat_events() -> None:
@@ -163,9 +199,20 @@ async def _async_cleanup_old_heartbeat_events() -> None:
 
     async with async_task_session() as db:
         repo = SQLAlchemySurveillanceRepository(db)
-        deleted_heartbeats, deleted_tracks = await repo.cleanup_old_events(cutoff=cutoff)
+        deleted_heartbeats, deleted_tracks = await repo.cleanup_old_events(cutoff=cutoff, batch_size=settings.RETENTION_BATCH_SIZE)
 
     logger.info(
         f"cleanup_old_heartbeat_events: deleted {deleted_heartbeats} heartbeat events "
         f"and {deleted_tracks} track events older than {retention_days} days"
     )
+
+
+@app.task(name="rollup_surveillance_metrics")
+def rollup_surveillance_metrics() -> int:
+    """
+    Rebuilds the per-minute surveillance metrics rollups up to the current minute, for
+    get_service_metrics with SURVEILLANCE_METRICS_ROLLUP_ENABLED. Scheduled every
+    SURVEILLANCE_METRICS_ROLLUP_INTERVAL_SECS through the Celery beat schedule.
+    Returns the number of session minutes written.
+    """
+    return run_coro(SurveillanceMetricsRollup().run())
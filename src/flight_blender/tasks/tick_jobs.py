@@ -0,0 +1,110 @@
+"""Redis registry of the periodic per-session jobs run by the tick scheduler service.
+
+The API registers and removes jobs here through TaskSchedulerService; every tick scheduler
+instance watches the registry and runs the jobs it holds a lease for. Keys:
+
+    tick_scheduler:jobs                  hash of job_id -> TickJobSpec JSON
+    tick_scheduler:jobs_version          bumped on every registry change
+    tick_scheduler:session:<session_id>  set of the job ids belonging to a session
+    tick_scheduler:lease:<job_id>        id of the scheduler instance running the job (expires)
+"""
+
+import json
+from dataclasses import asdict, dataclass, field
+
+import redis
+import redis.asyncio as aioredis
+
+JOBS_KEY = "tick_scheduler:jobs"
+JOBS_VERSION_KEY = "tick_scheduler:jobs_version"
+SESSION_JOBS_KEY_PREFIX = "tick_scheduler:session:"
+LEASE_KEY_PREFIX = "tick_scheduler:lease:"
+
+SURVEILLANCE_HEARTBEAT = "surveillance_heartbeat"
+SURVEILLANCE_TRACK = "surveillance_track"
+SURVEILLANCE_FUSION = "surveillance_fusion"
+FLIGHT_CONFORMANCE = "flight_conformance"
+RID_STREAM_CONFORMANCE = "rid_stream_conformance"
+
+# The shared surveillance fusion jobs are not tied to a session; they are registered under this one, per shard.
+SURVEILLANCE_FUSION_SESSION_ID = "global"
+
+
+@dataclass(frozen=True)
+class TickJobSpec:
+    job_id: str
+    kind: str
+    session_id: str
+    interval_secs: float
+    expires_at: float | None = None
+    kwargs: dict = field(default_factory=dict)
+
+    @classmethod
+    def for_session(cls, kind: str, session_id: str, interval_secs: float, expires_at: float | None = None, **kwargs) -> "TickJobSpec":
+        return cls(job_id=f"{kind}:{session_id}", kind=kind, session_id=session_id, interval_secs=interval_secs, expires_at=expires_at, kwargs=kwargs)
+
+    def to_json(self) -> str:
+        return json.dumps(asdict(self))
+
+    @classmethod
+    def from_json(cls, raw: str) -> "TickJobSpec":
+        return cls(**json.loads(raw))
+
+    def is_expired(self, now_epoch: float) -> bool:
+        return self.expires_at is not None and now_epoch > self.expires_at
+
+
+def surveillance_fusion_session_id(shard: int | None) -> str:
+    return SURVEILLANCE_FUSION_SESSION_ID if shard is None else f"{SURVEILLANCE_FUSION_SESSION_ID}:{shard}"
+
+
+# Extends each lease in KEYS still held by ARGV[1] to ARGV[2] ms; returns 1 per renewed lease and 0 per lost one.
+RENEW_LEASES_SCRIPT = """
+local renewed = {}
+for i, key in ipairs(KEYS) do
+    if redis.call('GET', key) == ARGV[1] then
+        renewed[i] = redis.call('PEXPIRE', key, ARGV[2])
+    else
+        renewed[i] = 0
+    end
+end
+return renewed
+"""
+
+
+def lease_key(job_id: str) -> str:
+    return f"{LEASE_KEY_PREFIX}{job_id}"
+
+
+def register_job(r: redis.Redis, spec: TickJobSpec) -> None:
+    pipe = r.pipeline()
+    pipe.hset(JOBS_KEY, spec.job_id, spec.to_json())
+    pipe.sadd(f"{SESSION_JOBS_KEY_PREFIX}{spec.session_id}", spec.job_id)
+    pipe.incr(JOBS_VERSION_KEY)
+    pipe.execute()
+
+
+def remove_session_jobs(r: redis.Redis, session_id: str) -> int:
+    """Remove every job of ``session_id``; returns how many were registered."""
+    session_key = f"{SESSION_JOBS_KEY_PREFIX}{session_id}"
+    job_ids = list(r.smembers(session_key))
+    if not job_ids:
+        return 0
+    pipe = r.pipeline()
+    pipe.hdel(JOBS_KEY, *job_ids)
+    pipe.delete(session_key)
+    pipe.incr(JOBS_VERSION_KEY)
+    pipe.execute()
+    return len(job_ids)
+
+
+async def remove_jobs(r: aioredis.Redis, specs: list[TickJobSpec]) -> None:
+    """Async removal used by the tick scheduler for jobs that ran past ``expires_at``."""
+    if not specs:
+        return
+    pipe = r.pipeline()
+    pipe.hdel(JOBS_KEY, *(spec.job_id for spec in specs))
+    for spec in specs:
+        pipe.srem(f"{SESSION_JOBS_KEY_PREFIX}{spec.session_id}", spec.job_id)
+    pipe.incr(JOBS_VERSION_KEY)
+    await pipe.execute()
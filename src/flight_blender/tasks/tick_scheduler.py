@@ -0,0 +1,354 @@
+"""Long-lived asyncio service that runs the periodic per-session jobs registered by TaskSchedulerService.
+
+Usage:
+    python -m flight_blender.tasks.tick_scheduler
+
+Surveillance heartbeats, track generation, flight conformance and RID stream checks used to
+re-enqueue themselves through Celery every tick, paying a broker round trip, a fresh event loop and a
+fresh database connection each time. This service keeps one event loop, the pooled database engine
+and one Redis connection pool for its whole lifetime, and drives every job from a hashed timer wheel.
+
+Jobs live in the Redis registry described in ``tick_jobs``. Several instances can run side by side:
+an instance only runs a job while it holds the job's Redis lease, renews its leases every sync
+interval and stops running a job as soon as a renewal shows the lease has gone elsewhere. Leases
+are released on shutdown; if an instance dies, its jobs move to another one once the leases expire.
+
+Every instance runs fusion for the shards it holds, so each one tells its plugin instances when a
+surveillance session starts or stops, as its track job appears in or leaves the registry.
+"""
+
+import asyncio
+import math
+import os
+import signal
+import socket
+import time
+import uuid
+from typing import Awaitable, Callable
+
+import redis.asyncio as aioredis
+from loguru import logger
+
+from flight_blender.auth.token_cache import get_async_redis, redis_registry
+from flight_blender.config import settings
+from flight_blender.db.session import bind_task_sessions_to_loop, create_pooled_task_engine, unbind_task_sessions
+from flight_blender.domain_types.surveillance import SurveillanceSubscription
+from flight_blender.plugins.registry import plugin_instances
+from flight_blender.services.surveillance_svc import surveillance_event_buffer
+from flight_blender.tasks import conformance_task, rid_task, surveillance_task
+from flight_blender.tasks.tick_jobs import (
+    FLIGHT_CONFORMANCE,
+    JOBS_KEY,
+    JOBS_VERSION_KEY,
+    RENEW_LEASES_SCRIPT,
+    RID_STREAM_CONFORMANCE,
+    SURVEILLANCE_FUSION,
+    SURVEILLANCE_HEARTBEAT,
+    SURVEILLANCE_TRACK,
+    TickJobSpec,
+    lease_key,
+    remove_jobs,
+)
+
+TickJobHandler = Callable[[TickJobSpec], Awaitable[None]]
+
+
+class TimerWheel:
+    """Hashed timer wheel: O(1) ``schedule`` and ``cancel``, ``advance`` returns the keys that are due.
+
+    Time is split into ticks of ``resolution_secs``; a key lands in slot ``tick % slots`` and fires
+    once the wheel has advanced past its tick, never before the requested time.
+    """
+
+    def __init__(self, resolution_secs: float, slots: int = 1024, start: float | None = None):
+        self.resolution_secs = resolution_secs
+        self._slots: list[dict[str, int]] = [{} for _ in range(slots)]
+        self._ticks: dict[str, int] = {}
+        self._current_tick = self._floor_tick(time.monotonic() if start is None else start)
+
+    def _floor_tick(self, at: float) -> int:
+        # The epsilon keeps float error (0.3 / 0.1 == 2.9999999999999996) from shifting a tick boundary.
+        return math.floor(at / self.resolution_secs + 1e-9)
+
+    def schedule(self, key: str, at: float) -> None:
+        self.cancel(key)
+        tick = max(math.ceil(at / self.resolution_secs - 1e-9), self._current_tick + 1)
+        self._slots[tick % len(self._slots)][key] = tick
+        self._ticks[key] = tick
+
+    def cancel(self, key: str) -> None:
+        tick = self._ticks.pop(key, None)
+        if tick is not None:
+            self._slots[tick % len(self._slots)].pop(key, None)
+
+    def advance(self, now: float) -> list[str]:
+        now_tick = self._floor_tick(now)
+        due: list[str] = []
+        span = min(now_tick - self._current_tick, len(self._slots))
+        for tick in range(self._current_tick + 1, self._current_tick + 1 + span):
+            slot = self._slots[tick % len(self._slots)]
+            if not slot:
+                continue
+            ready = [key for key, key_tick in slot.items() if key_tick <= now_tick]
+            for key in ready:
+                del slot[key]
+                del self._ticks[key]
+            due.extend(ready)
+        self._current_tick = max(self._current_tick, now_tick)
+        return due
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._ticks
+
+    def __len__(self) -> int:
+        return len(self._ticks)
+
+
+async def _surveillance_heartbeat(spec: TickJobSpec) -> None:
+    await surveillance_task._async_heartbeat_tick(spec.session_id)
+
+
+async def _surveillance_track(spec: TickJobSpec) -> None:
+    await surveillance_task._async_track_tick(spec.session_id, SurveillanceSubscription.from_dict(spec.kwargs.get("subscription")))
+
+
+async def _surveillance_fusion(spec: TickJobSpec) -> None:
+    await surveillance_task._async_fusion_tick(spec.kwargs.get("shard"))
+
+
+async def _flight_conformance(spec: TickJobSpec) -> None:
+    await conformance_task._async_check_flight_conformance(flight_declaration_id=spec.kwargs["flight_declaration_id"], session_id=spec.session_id)
+
+
+async def _rid_stream_conformance(spec: TickJobSpec) -> None:
+    await rid_task._async_check_rid_stream_conformance(spec.session_id)
+
+
+DEFAULT_HANDLERS: dict[str, TickJobHandler] = {
+    SURVEILLANCE_HEARTBEAT: _surveillance_heartbeat,
+    SURVEILLANCE_TRACK: _surveillance_track,
+    SURVEILLANCE_FUSION: _surveillance_fusion,
+    FLIGHT_CONFORMANCE: _flight_conformance,
+    RID_STREAM_CONFORMANCE: _rid_stream_conformance,
+}
+
+
+class TickScheduler:
+    """Runs the leased jobs of the Redis registry on the current event loop."""
+
+    def __init__(
+        self,
+        redis_client: aioredis.Redis,
+        handlers: dict[str, TickJobHandler] | None = None,
+        instance_id: str | None = None,
+        resolution_secs: float | None = None,
+        sync_interval_secs: float | None = None,
+        lease_ttl_secs: float | None = None,
+    ):
+        self.redis = redis_client
+        self.handlers = DEFAULT_HANDLERS if handlers is None else handlers
+        self.instance_id = instance_id or f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self.resolution_secs = settings.TICK_SCHEDULER_RESOLUTION_MS / 1000 if resolution_secs is None else resolution_secs
+        self.sync_interval_secs = settings.TICK_SCHEDULER_SYNC_INTERVAL_SECS if sync_interval_secs is None else sync_interval_secs
+        self.lease_ttl_secs = settings.TICK_SCHEDULER_LEASE_TTL_SECS if lease_ttl_secs is None else lease_ttl_secs
+        self.wheel = TimerWheel(self.resolution_secs)
+        self._renew_leases = self.redis.register_script(RENEW_LEASES_SCRIPT)
+        self.runs = 0
+        self.skipped_overlaps = 0
+        self._registered: dict[str, TickJobSpec] = {}
+        self._registry_version: str | None = None
+        self._owned: dict[str, TickJobSpec] = {}
+        self._surveillance_sessions: set[str] = set()
+        self._lease_valid_until: dict[str, float] = {}
+        self._next_run: dict[str, float] = {}
+        self._running: dict[str, asyncio.Task] = {}
+        self._stop_event = asyncio.Event()
+
+    @property
+    def owned_job_ids(self) -> set[str]:
+        return set(self._owned)
+
+    def stop(self) -> None:
+        self._stop_event.set()
+
+    async def run(self) -> None:
+        self._stop_event.clear()
+        logger.info(f"Tick scheduler {self.instance_id} starting")
+        sync_task = asyncio.create_task(self._sync_loop())
+        try:
+            await self._tick_loop()
+        finally:
+            sync_task.cancel()
+            await asyncio.gather(sync_task, return_exceptions=True)
+            await asyncio.gather(*self._running.values(), return_exceptions=True)
+            await self.release_all()
+            logger.info(f"Tick scheduler {self.instance_id} stopped")
+
+    async def _tick_loop(self) -> None:
+        while not self._stop_event.is_set():
+            now = time.monotonic()
+            for job_id in self.wheel.advance(now):
+                self._launch(job_id, now)
+            await asyncio.sleep(self.resolution_secs)
+
+    async def _sync_loop(self) -> None:
+        while True:
+            try:
+                await self.sync_once()
+            except Exception as exc:
+                logger.error(f"Tick scheduler {self.instance_id} could not sync with the job registry: {exc}")
+            await asyncio.sleep(self.sync_interval_secs)
+
+    def _launch(self, job_id: str, now: float) -> None:
+        spec = self._owned.get(job_id)
+        if spec is None or self._lease_valid_until.get(job_id, 0.0) <= now:
+            # Not rescheduled: the next sync either confirms the lease and reschedules, or drops the job.
+            return
+        next_at = self._next_run.get(job_id, now) + spec.interval_secs
+        self._next_run[job_id] = next_at if next_at > now else now + spec.interval_secs
+        self.wheel.schedule(job_id, self._next_run[job_id])
+
+        running = self._running.get(job_id)
+        if running is not None and not running.done():
+            self.skipped_overlaps += 1
+            logger.debug(f"Tick job {job_id} is still running, skipping this tick")
+            return
+        self._running[job_id] = asyncio.create_task(self._run_job(spec))
+
+    async def _run_job(self, spec: TickJobSpec) -> None:
+        handler = self.handlers.get(spec.kind)
+        if handler is None:
+            logger.error(f"No tick handler registered for job kind {spec.kind}")
+            return
+        try:
+            await handler(spec)
+        except Exception:
+            logger.exception(f"Tick job {spec.job_id} failed")
+        finally:
+            self.runs += 1
+
+    def _adopt(self, spec: TickJobSpec, now: float) -> None:
+        self._owned[spec.job_id] = spec
+        self._next_run[spec.job_id] = now + spec.interval_secs
+        self.wheel.schedule(spec.job_id, self._next_run[spec.job_id])
+
+    def _drop(self, job_id: str) -> None:
+        self._owned.pop(job_id, None)
+        self._lease_valid_until.pop(job_id, None)
+        self._next_run.pop(job_id, None)
+        self.wheel.cancel(job_id)
+
+    async def sync_once(self) -> None:
+        """Reload the registry if it changed, expire finished jobs, renew owned leases and acquire free ones."""
+        now = time.monotonic()
+        lease_ms = int(self.lease_ttl_secs * 1000)
+        # A renewed lease is trusted for one sync interval less than its TTL.
+        valid_until = now + self.lease_ttl_secs - self.sync_interval_secs
+
+        version = await self.redis.get(JOBS_VERSION_KEY)
+        if self._registry_version is None or version != self._registry_version:
+            registered = {}
+            for job_id, raw in (await self.redis.hgetall(JOBS_KEY)).items():
+                try:
+                    registered[job_id] = TickJobSpec.from_json(raw)
+                except (TypeError, ValueError) as exc:
+                    logger.warning(f"Ignoring malformed tick job {job_id}: {exc}")
+            self._registered = registered
+            self._registry_version = version
+
+        now_epoch = time.time()
+        expired = [spec for spec in self._registered.values() if spec.is_expired(now_epoch)]
+        if expired:
+            await remove_jobs(self.redis, expired)
+            for spec in expired:
+                self._registered.pop(spec.job_id, None)
+
+        self._notify_surveillance_sessions()
+
+        removed = [job_id for job_id in self._owned if job_id not in self._registered]
+        for job_id in removed:
+            self._drop(job_id)
+        await self._release(removed)
+
+        owned_ids = list(self._owned)
+        if owned_ids:
+            # Compare and extend in one script, so a lease taken over in between is never extended.
+            renewed = await self._renew_leases(keys=[lease_key(job_id) for job_id in owned_ids], args=[self.instance_id, lease_ms])
+            kept = [job_id for job_id, ok in zip(owned_ids, renewed) if ok]
+            for job_id in set(owned_ids) - set(kept):
+                logger.warning(f"Tick scheduler {self.instance_id} lost the lease for {job_id}")
+                self._drop(job_id)
+            for job_id in kept:
+                self._owned[job_id] = self._registered[job_id]
+                self._lease_valid_until[job_id] = valid_until
+                if job_id not in self.wheel:
+                    self._next_run[job_id] = now
+                    self.wheel.schedule(job_id, now)
+
+        candidates = [spec for job_id, spec in self._registered.items() if job_id not in self._owned]
+        if candidates:
+            pipe = self.redis.pipeline(transaction=False)
+            for spec in candidates:
+                pipe.set(lease_key(spec.job_id), self.instance_id, nx=True, px=lease_ms)
+            acquired = await pipe.execute()
+            for spec, ok in zip(candidates, acquired):
+                if ok:
+                    self._lease_valid_until[spec.job_id] = valid_until
+                    self._adopt(spec, now)
+
+    def _notify_surveillance_sessions(self) -> None:
+        sessions = {spec.session_id for spec in self._registered.values() if spec.kind == SURVEILLANCE_TRACK}
+        for session_id in sorted(sessions - self._surveillance_sessions):
+            plugin_instances.start_session(session_id)
+        for session_id in sorted(self._surveillance_sessions - sessions):
+            plugin_instances.stop_session(session_id)
+        self._surveillance_sessions = sessions
+
+    async def _release(self, job_ids: list[str]) -> None:
+        if not job_ids:
+            return
+        pipe = self.redis.pipeline(transaction=False)
+        for job_id in job_ids:
+            pipe.get(lease_key(job_id))
+        holders = await pipe.execute()
+        ours = [lease_key(job_id) for job_id, holder in zip(job_ids, holders) if holder == self.instance_id]
+        if ours:
+            await self.redis.delete(*ours)
+
+    async def release_all(self) -> None:
+        """Hand every owned job back so another instance can pick it up without waiting for the TTL."""
+        job_ids = list(self._owned)
+        for job_id in job_ids:
+            self._drop(job_id)
+        try:
+            await self._release(job_ids)
+        except Exception as exc:
+            logger.warning(f"Tick scheduler {self.instance_id} could not release its leases: {exc}")
+
+
+async def _serve() -> None:
+    loop = asyncio.get_running_loop()
+    bind_task_sessions_to_loop(loop, create_pooled_task_engine())
+    redis_client = get_async_redis()
+    scheduler = TickScheduler(redis_client)
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, scheduler.stop)
+    await surveillance_event_buffer.start()
+    try:
+        await scheduler.run()
+    finally:
+        await surveillance_event_buffer.stop()
+        plugin_instances.teardown()
+        await redis_client.aclose()
+        await redis_registry.aclose()
+        task_engine = unbind_task_sessions()
+        if task_engine is not None:
+            await task_engine.dispose()
+
+
+def main() -> None:
+    asyncio.run(_serve())
+
+
+if __name__ == "__main__":
+    main()
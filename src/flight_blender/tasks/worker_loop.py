@@ -0,0 +1,119 @@
+"""Per-process event loop for Celery workers.
+
+``worker_process_init`` starts a long-lived event loop in a background thread of each worker
+process, together with a pooled async database engine and an async Redis client on the
+process-wide pool registry, and ``worker_process_shutdown`` tears them down, together with the
+process's long-lived plugin instances. Task bodies hand their coroutines to ``run_coro``, which
+runs them on that loop so consecutive tasks reuse the loop, the pooled database connections and
+the Redis connection pool instead of paying for ``asyncio.run`` and a fresh connection each time.
+Outside a bootstrapped worker process (eager mode, tests, scripts) ``run_coro`` falls back to
+``asyncio.run``.
+"""
+
+import asyncio
+import threading
+from collections.abc import Callable, Coroutine
+from typing import Any, TypeVar
+
+import redis.asyncio as aioredis
+from celery.signals import worker_process_init, worker_process_shutdown
+from loguru import logger
+
+from flight_blender.auth.token_cache import get_async_redis, redis_registry
+from flight_blender.db.session import bind_task_sessions_to_loop, create_pooled_task_engine, unbind_task_sessions
+from flight_blender.plugins.registry import plugin_instances
+
+T = TypeVar("T")
+
+
+class WorkerEventLoop:
+    """An event loop running forever in a daemon thread, with the pooled resources bound to it."""
+
+    def __init__(self):
+        self.loop: asyncio.AbstractEventLoop | None = None
+        self.redis: aioredis.Redis | None = None
+        self._thread: threading.Thread | None = None
+        self._shutdown_hooks: list[Callable[[], Coroutine[Any, Any, Any]]] = []
+
+    def add_shutdown_hook(self, hook: Callable[[], Coroutine[Any, Any, Any]]) -> None:
+        """Await ``hook()`` on the loop when it stops, before the pooled resources are closed."""
+        self._shutdown_hooks.append(hook)
+
+    @property
+    def is_running(self) -> bool:
+        return self.loop is not None and self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> None:
+        if self.is_running:
+            return
+        self.loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self.loop.run_forever, name="flight-blender-worker-loop", daemon=True)
+        self._thread.start()
+        bind_task_sessions_to_loop(self.loop, create_pooled_task_engine())
+        self.redis = asyncio.run_coroutine_threadsafe(self._open_redis(), self.loop).result()
+
+    def submit(self, coro: Coroutine[Any, Any, T]) -> T:
+        future = asyncio.run_coroutine_threadsafe(coro, self.loop)
+        try:
+            return future.result()
+        except BaseException:
+            # e.g. Celery's SoftTimeLimitExceeded raised in the waiting thread.
+            future.cancel()
+            raise
+
+    def stop(self, timeout_secs: float = 10.0) -> None:
+        if not self.is_running:
+            return
+        for hook in self._shutdown_hooks:
+            try:
+                asyncio.run_coroutine_threadsafe(hook(), self.loop).result(timeout_secs)
+            except Exception as exc:
+                logger.warning(f"Worker event loop shutdown hook {hook.__qualname__} failed: {exc}")
+        task_engine = unbind_task_sessions()
+        try:
+            asyncio.run_coroutine_threadsafe(self._close_resources(task_engine), self.loop).result(timeout_secs)
+        except Exception as exc:
+            logger.warning(f"Worker event loop resources did not close cleanly: {exc}")
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self._thread.join(timeout_secs)
+        self.loop.close()
+        self.loop, self.redis, self._thread = None, None, None
+
+    async def _open_redis(self) -> aioredis.Redis:
+        # Async pools belong to the loop they are opened on, so open it on the worker loop.
+        return get_async_redis()
+
+    async def _close_resources(self, task_engine) -> None:
+        current = asyncio.current_task()
+        pending = [task for task in asyncio.all_tasks() if task is not current]
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+        if self.redis is not None:
+            await self.redis.aclose()
+        await redis_registry.aclose()
+        if task_engine is not None:
+            await task_engine.dispose()
+
+
+worker_event_loop = WorkerEventLoop()
+
+
+def run_coro(coro: Coroutine[Any, Any, T]) -> T:
+    """Run a task coroutine to completion on the worker process loop, or with ``asyncio.run`` if there is none."""
+    if worker_event_loop.is_running and threading.current_thread() is not worker_event_loop._thread:
+        return worker_event_loop.submit(coro)
+    return asyncio.run(coro)
+
+
+@worker_process_init.connect
+def _start_worker_event_loop(**kwargs) -> None:
+    worker_event_loop.start()
+    logger.info("Started the worker process event loop")
+
+
+@worker_process_shutdown.connect
+def _stop_worker_event_loop(**kwargs) -> None:
+    plugin_instances.teardown()
+    worker_event_loop.stop()
+    redis_registry.close()
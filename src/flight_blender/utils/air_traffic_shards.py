@@ -0,0 +1,63 @@
+"""Routing of air traffic observations to the shards of the air traffic stream.
+
+With ``AIR_TRAFFIC_STREAM_SHARDS`` above 1, every observation written to ``air_traffic_stream`` is
+also written to ``air_traffic_stream:{shard}``, and each shard is fused by its own surveillance
+fusion job. ``AIR_TRAFFIC_SHARD_KEY`` picks what decides the shard: ``"tile"`` hashes the
+``AIR_TRAFFIC_SHARD_TILE_DEG`` grid tile holding the position, so an aircraft changes shard when it
+crosses into a tile of another shard, and ``"icao"`` hashes the ICAO address, so it never does.
+Keys are spread with a jump consistent hash, so changing the shard count only moves the keys that
+have to move.
+"""
+
+import hashlib
+import math
+from dataclasses import dataclass
+
+from flight_blender.config import settings
+
+AIR_TRAFFIC_STREAM = "air_traffic_stream"
+
+
+def shard_stream_name(shard: int) -> str:
+    return f"{AIR_TRAFFIC_STREAM}:{shard}"
+
+
+def jump_consistent_hash(key: int, buckets: int) -> int:
+    """Lamping and Veach's jump consistent hash of a 64-bit key into ``buckets`` buckets."""
+    bucket, candidate = -1, 0
+    while candidate < buckets:
+        bucket = candidate
+        key = (key * 2862933555777941757 + 1) & 0xFFFFFFFFFFFFFFFF
+        candidate = int((bucket + 1) * ((1 << 31) / ((key >> 33) + 1)))
+    return bucket
+
+
+@dataclass(frozen=True)
+class AirTrafficShardMap:
+    shards: int = 1
+    shard_key: str = "tile"
+    tile_deg: float = 1.0
+
+    @classmethod
+    def from_settings(cls) -> "AirTrafficShardMap":
+        return cls(shards=settings.AIR_TRAFFIC_STREAM_SHARDS, shard_key=settings.AIR_TRAFFIC_SHARD_KEY, tile_deg=settings.AIR_TRAFFIC_SHARD_TILE_DEG)
+
+    @property
+    def enabled(self) -> bool:
+        return self.shards > 1
+
+    @property
+    def shard_ids(self) -> list[int | None]:
+        """The shards fused separately; ``[None]`` stands for the unsharded stream."""
+        return list(range(self.shards)) if self.enabled else [None]
+
+    def tile_of(self, lat: float, lon: float) -> tuple[int, int]:
+        return math.floor(float(lat) / self.tile_deg), math.floor(float(lon) / self.tile_deg)
+
+    def shard_of(self, observation: dict) -> int:
+        if self.shard_key == "icao":
+            key = str(observation["icao_address"])
+        else:
+            row, col = self.tile_of(observation["lat_dd"], observation["lon_dd"])
+            key = f"{row}:{col}"
+        return jump_consistent_hash(int.from_bytes(hashlib.blake2b(key.encode(), digest_size=8).digest(), "big"), self.shards)
@@ -0,0 +1,274 @@
+"""Long-lived in-process 3D (lng, lat, time) RTree used for de-confliction."""
+
+from __future__ import annotations
+
+import threading
+import time
+from dataclasses import asdict, dataclass
+from datetime import datetime
+from typing import Any, Iterable, Sequence
+
+import arrow
+from rtree import index
+
+from flight_blender.domain_types.common import ACTIVE_OPERATIONAL_STATES
+from flight_blender.domain_types.flight_declarations import FlightDeclarationMetadata
+from flight_blender.domain_types.geo_fence import GeoFenceMetadata
+
+
+@dataclass(frozen=True)
+class IndexedGeoFence:
+    geo_fence_id: str
+    bounds: str
+    start_datetime: datetime
+    end_datetime: datetime
+
+
+@dataclass(frozen=True)
+class IndexedFlightDeclaration:
+    flight_declaration_id: str
+    bounds: str
+    start_datetime: datetime
+    end_datetime: datetime
+    state: int
+
+
+def snapshot_geo_fence(fence: Any) -> IndexedGeoFence:
+    return IndexedGeoFence(
+        geo_fence_id=str(fence.id),
+        bounds=fence.bounds,
+        start_datetime=fence.start_datetime,
+        end_datetime=fence.end_datetime,
+    )
+
+
+def snapshot_flight_declaration(declaration: Any) -> IndexedFlightDeclaration:
+    return IndexedFlightDeclaration(
+        flight_declaration_id=str(declaration.id),
+        bounds=declaration.bounds,
+        start_datetime=declaration.start_datetime,
+        end_datetime=declaration.end_datetime,
+        state=declaration.state,
+    )
+
+
+def _new_rtree() -> index.Index:
+    properties = index.Property()
+    properties.dimension = 3
+    return index.Index(properties=properties, interleaved=True)
+
+
+def _box(bounds: str, start_datetime: datetime, end_datetime: datetime) -> tuple[float, float, float, float, float, float]:
+    """``(min_lng, min_lat, t_start, max_lng, max_lat, t_end)`` from a ``"min_lng,min_lat,max_lng,max_lat"`` bounds string."""
+    min_lng, min_lat, max_lng, max_lat = (float(v) for v in bounds.split(","))
+    return (min_lng, min_lat, arrow.get(start_datetime).float_timestamp, max_lng, max_lat, arrow.get(end_datetime).float_timestamp)
+
+
+class _Layer:
+    """One RTree plus the bookkeeping needed to delete and replace its entries."""
+
+    def __init__(self):
+        self.rtree = _new_rtree()
+        self.entries: dict[str, tuple[int, tuple]] = {}
+        self.objects: dict[int, Any] = {}
+        self._next_id = 0
+
+    def upsert(self, key: str, box: tuple, obj: Any) -> None:
+        self.remove(key)
+        self._next_id += 1
+        self.rtree.insert(self._next_id, box)
+        self.entries[key] = (self._next_id, box)
+        self.objects[self._next_id] = obj
+
+    def remove(self, key: str) -> None:
+        existing = self.entries.pop(key, None)
+        if existing is not None:
+            self.rtree.delete(existing[0], existing[1])
+            del self.objects[existing[0]]
+
+    def intersection(self, box: tuple) -> list[Any]:
+        return [self.objects[entry_id] for entry_id in self.rtree.intersection(box)]
+
+
+def _upsert_geo_fence(layer: _Layer, fence: IndexedGeoFence) -> None:
+    layer.upsert(fence.geo_fence_id, _box(fence.bounds, fence.start_datetime, fence.end_datetime), fence)
+
+
+def _upsert_flight_declaration(layer: _Layer, declaration: IndexedFlightDeclaration) -> None:
+    if declaration.state not in ACTIVE_OPERATIONAL_STATES:
+        layer.remove(declaration.flight_declaration_id)
+        return
+    layer.upsert(declaration.flight_declaration_id, _box(declaration.bounds, declaration.start_datetime, declaration.end_datetime), declaration)
+
+
+def _pending_key(payload: Any) -> str:
+    if isinstance(payload, IndexedGeoFence):
+        return payload.geo_fence_id
+    if isinstance(payload, IndexedFlightDeclaration):
+        return payload.flight_declaration_id
+    return payload
+
+
+def _apply(geo_fence_layer: _Layer, declaration_layer: _Layer, op: str, payload: Any) -> None:
+    if op == "upsert_geo_fence":
+        _upsert_geo_fence(geo_fence_layer, payload)
+    elif op == "remove_geo_fence":
+        geo_fence_layer.remove(payload)
+    elif op == "upsert_flight_declaration":
+        _upsert_flight_declaration(declaration_layer, payload)
+    elif op == "remove_flight_declaration":
+        declaration_layer.remove(payload)
+
+
+class DeconflictionIndex:
+    """Geofences and active flight declarations indexed by bounding box and time window.
+
+    The index lives for the whole process. Writes are applied incrementally with the ``upsert_*`` /
+    ``remove_*`` methods and ``rebuild`` replaces the contents wholesale from a database snapshot.
+    Writes that land while a snapshot is being read are replayed on top of it, so a rebuild never
+    rolls back a newer incremental update. All access goes through a lock, so concurrent requests
+    and writers can share one instance.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._geo_fences = _Layer()
+        self._declarations = _Layer()
+        self._write_seq = 0
+        self._rebuilds_in_progress = 0
+        self._replay_log: list[tuple[int, str, Any]] = []
+        self.loaded_at: float | None = None
+        self.source_version: str | None = None
+
+    @property
+    def is_loaded(self) -> bool:
+        return self.loaded_at is not None
+
+    def age_seconds(self) -> float:
+        return float("inf") if self.loaded_at is None else time.monotonic() - self.loaded_at
+
+    def mark_stale(self) -> None:
+        """Force the next ``ensure`` call to rebuild from the database."""
+        with self._lock:
+            self.loaded_at = None
+
+    def begin_rebuild(self) -> int:
+        """Call before reading the database snapshot; pass the returned token to ``rebuild``."""
+        with self._lock:
+            self._rebuilds_in_progress += 1
+            return self._write_seq
+
+    def rebuild(
+        self,
+        geo_fences: Iterable[IndexedGeoFence],
+        declarations: Iterable[IndexedFlightDeclaration],
+        token: int,
+        source_version: str | None = None,
+    ) -> None:
+        """Replace the contents; ``source_version`` is the shared write version read before the snapshot."""
+        geo_fence_layer = _Layer()
+        for fence in geo_fences:
+            _upsert_geo_fence(geo_fence_layer, fence)
+        declaration_layer = _Layer()
+        for declaration in declarations:
+            _upsert_flight_declaration(declaration_layer, declaration)
+        with self._lock:
+            for seq, op, payload in self._replay_log:
+                if seq > token:
+                    _apply(geo_fence_layer, declaration_layer, op, payload)
+            self._rebuilds_in_progress -= 1
+            if self._rebuilds_in_progress == 0:
+                self._replay_log.clear()
+            self._geo_fences = geo_fence_layer
+            self._declarations = declaration_layer
+            self.loaded_at = time.monotonic()
+            self.source_version = source_version
+
+    def abort_rebuild(self) -> None:
+        with self._lock:
+            self._rebuilds_in_progress -= 1
+            if self._rebuilds_in_progress == 0:
+                self._replay_log.clear()
+
+    def _write(self, op: str, payload: Any) -> None:
+        with self._lock:
+            self._write_seq += 1
+            if self._rebuilds_in_progress:
+                self._replay_log.append((self._write_seq, op, payload))
+            _apply(self._geo_fences, self._declarations, op, payload)
+
+    def upsert_geo_fence(self, fence: IndexedGeoFence) -> None:
+        self._write("upsert_geo_fence", fence)
+
+    def remove_geo_fence(self, geo_fence_id: str) -> None:
+        self._write("remove_geo_fence", str(geo_fence_id))
+
+    def upsert_flight_declaration(self, declaration: IndexedFlightDeclaration) -> None:
+        self._write("upsert_flight_declaration", declaration)
+
+    def remove_flight_declaration(self, flight_declaration_id: str) -> None:
+        self._write("remove_flight_declaration", str(flight_declaration_id))
+
+    def _candidates(self, layer_name: str, query: tuple, pending: Sequence[tuple[str, Any]]) -> list[Any]:
+        """Index hits, overlaid with writes that are flushed but not yet committed in the caller's session."""
+        with self._lock:
+            hits = getattr(self, layer_name).intersection(query)
+        if not pending:
+            return hits
+        overlay_geo_fences, overlay_declarations = _Layer(), _Layer()
+        for op, payload in pending:
+            _apply(overlay_geo_fences, overlay_declarations, op, payload)
+        overlay = overlay_geo_fences if layer_name == "_geo_fences" else overlay_declarations
+        touched = {_pending_key(payload) for _op, payload in pending}
+        return [hit for hit in hits if _pending_key(hit) not in touched] + overlay.intersection(query)
+
+    def geo_fences_covering(
+        self,
+        view_box: list[float],
+        start_datetime: datetime,
+        end_datetime: datetime,
+        pending: Sequence[tuple[str, Any]] = (),
+    ) -> list[dict]:
+        """Geofences whose box intersects ``view_box`` and whose validity covers the whole time window."""
+        query = _box(",".join(str(v) for v in view_box), start_datetime, end_datetime)
+        candidates = self._candidates("_geo_fences", query, pending)
+        start_ts, end_ts = query[2], query[5]
+        return [
+            asdict(
+                GeoFenceMetadata(
+                    start_date=arrow.get(fence.start_datetime).isoformat(),
+                    end_date=arrow.get(fence.end_datetime).isoformat(),
+                    geo_fence_id=fence.geo_fence_id,
+                )
+            )
+            for fence in candidates
+            if arrow.get(fence.start_datetime).float_timestamp <= start_ts and arrow.get(fence.end_datetime).float_timestamp >= end_ts
+        ]
+
+    def flight_declarations_overlapping(
+        self,
+        view_box: list[float],
+        start_datetime: datetime,
+        end_datetime: datetime,
+        exclude_declaration_id: str | None = None,
+        pending: Sequence[tuple[str, Any]] = (),
+    ) -> list[FlightDeclarationMetadata]:
+        """Active flight declarations whose box and time window intersect the query."""
+        query = _box(",".join(str(v) for v in view_box), start_datetime, end_datetime)
+        candidates = self._candidates("_declarations", query, pending)
+        return [
+            FlightDeclarationMetadata(
+                start_date=arrow.get(declaration.start_datetime).isoformat(),
+                end_date=arrow.get(declaration.end_datetime).isoformat(),
+                flight_declaration_id=declaration.flight_declaration_id,
+            )
+            for declaration in candidates
+            if declaration.flight_declaration_id != exclude_declaration_id
+        ]
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._geo_fences.entries) + len(self._declarations.entries)
+
+
+deconfliction_index = DeconflictionIndex()
@@ -1,3 +1,5 @@
+from unittest.mock import AsyncMock
+
 import fakeredis
 import jwt
 import pytest
@@ -103,6 +105,39 @@ class _AsyncRedisAdapter:
     async def expire(self, *a, **kw):
         return self._r.expire(*a, **kw)
 
+    async def incr(self, *a, **kw):
+        return self._r.incr(*a, **kw)
+
+
+@pytest.fixture(autouse=True)
+def _fresh_deconfliction_index(monkeypatch):
+    """Each test gets its own database, so start every test from an empty, already-loaded
+    de-confliction index and skip the app startup warm-load from the shared sqlite file.
+    """
+    from flight_blender.services import deconfliction_engine
+    from flight_blender.utils.spatial_deconfliction import DeconflictionIndex
+
+    index = DeconflictionIndex()
+    index.rebuild([], [], token=index.begin_rebuild())
+    monkeypatch.setattr("flight_blender.utils.spatial_deconfliction.deconfliction_index", index)
+    monkeypatch.setattr(deconfliction_engine, "deconfliction_index", index)
+    monkeypatch.setattr(deconfliction_engine, "warm_load_deconfliction_index", AsyncMock())
+    return index
+
+
+@pytest.fixture(autouse=True)
+def _fresh_auth_caches(monkeypatch):
+    """Tests swap ``_fetch_jwks`` for their own keys, so never carry cached JWKS or verified tokens over."""
+    from flight_blender.auth import jwt_validator
+    from flight_blender.config import settings
+
+    monkeypatch.setattr(
+        jwt_validator,
+        "jwks_cache",
+        jwt_validator.JWKSCache(ttl_secs=settings.JWKS_CACHE_TTL_SECS, min_refresh_interval_secs=settings.JWKS_MIN_REFRESH_INTERVAL_SECS),
+    )
+    monkeypatch.setattr(jwt_validator, "verified_token_cache", jwt_validator.VerifiedTokenCache(max_entries=settings.VERIFIED_TOKEN_CACHE_MAX_ENTRIES))
+
 
 @pytest.fixture(autouse=True)
 def _mock_all_redis(monkeypatch):
@@ -120,6 +155,8 @@ def _mock_all_redis(monkeypatch):
 
     monkeypatch.setattr(auth_redis_helpers, "get_redis", lambda: fake)
     monkeypatch.setattr(auth_redis_helpers, "get_async_redis", lambda: fake_async)
+    monkeypatch.setattr(auth_redis_helpers, "get_pubsub_redis", lambda: fake)
+    monkeypatch.setattr(auth_redis_helpers, "get_stream_redis", lambda: fake)
 
     _patched_get_redis = lambda: fake
     _patched_get_async_redis = lambda: fake_async
@@ -140,6 +177,9 @@ def _mock_all_redis(monkeypatch):
         "flight_blender.tasks.geo_fence_task",
         "flight_blender.tasks.rid_task",
         "flight_blender.tasks.surveillance_task",
+        # New service paths
+        "flight_blender.services.surveillance_svc",
+        "flight_blender.services.deconfliction_engine",
         # Old task paths (still exist)
         "flight_blender.infrastructure.celery.tasks.conformance",
         "flight_blender.infrastructure.celery.tasks.geo_fence",
@@ -148,6 +188,7 @@ def _mock_all_redis(monkeypatch):
         # New client paths
         "flight_blender.clients.dss_rid_client",
         "flight_blender.clients.dss_scd_client",
+        "flight_blender.clients.redis_client",
         # New util paths
         "flight_blender.utils.spatial_flight_declarations",
         "flight_blender.utils.spatial_geo_fence",
@@ -168,6 +209,9 @@ def _mock_all_redis(monkeypatch):
             continue
         if hasattr(_mod, "get_redis"):
             monkeypatch.setattr(_mod, "get_redis", _patched_get_redis)
+        for _name in ("get_pubsub_redis", "get_stream_redis"):
+            if hasattr(_mod, _name):
+                monkeypatch.setattr(_mod, _name, _patched_get_redis)
         if hasattr(_mod, "get_async_redis"):
             monkeypatch.setattr(_mod, "get_async_redis", _patched_get_async_redis)
 
@@ -0,0 +1,189 @@
+"""Tests for cursor-based reads of get_air_traffic:
+- the first poll (empty cursor) returns a snapshot of the session's latest positions and a cursor
+- later polls return only the latest position per aircraft since the cursor, without a DB scan
+- trimmed entries after the cursor force a resync snapshot; resyncs continue from the stream head
+- the ICAO -> latest position hash, kept up to date on ingest (stale positions dropped)
+- the API: view filtering and invalid cursors
+"""
+
+import json
+import uuid
+from dataclasses import asdict
+
+import pytest
+
+from flight_blender.clients.redis_client import AIR_TRAFFIC_LATEST_STATE_KEY, RedisStreamOperations
+from flight_blender.domain_types.flight_feed import SingleAirtrafficObservation
+from flight_blender.repositories.flight_feed_repo import SQLAlchemyFlightFeedRepository
+from flight_blender.services.flight_feed_svc import AirTrafficCursorReader, decode_stream_cursor, encode_stream_cursor
+
+from .conftest import READ_SCOPE, fastapi_auth_header
+
+VIEW = "52.49,13.39,52.51,13.41"
+
+
+def _observation(icao_address: str, lat_dd: float = 52.5, lon_dd: float = 13.4, altitude_mm: float = 1000.0) -> dict:
+    return asdict(
+        SingleAirtrafficObservation(
+            lat_dd=lat_dd,
+            lon_dd=lon_dd,
+            altitude_mm=altitude_mm,
+            traffic_source=1,
+            source_type=1,
+            icao_address=icao_address,
+            session_id=str(uuid.uuid4()),
+        )
+    )
+
+
+def _publish(*observations: dict) -> list[str]:
+    return RedisStreamOperations().add_air_traffic_data_batch("air_traffic_stream", list(observations))
+
+
+@pytest.fixture
+def reader(fakeredis_server):
+    return AirTrafficCursorReader()
+
+
+# ---------------------------------------------------------------------------
+# AirTrafficCursorReader
+# ---------------------------------------------------------------------------
+
+
+class TestCursorReader:
+    def test_first_poll_returns_a_snapshot_and_a_cursor(self, reader):
+        ids = _publish(_observation("AAA111", altitude_mm=1.0), _observation("AAA111", altitude_mm=2.0), _observation("BBB222"))
+
+        observations, cursor, resync = reader.poll("")
+
+        assert resync
+        assert sorted((o.icao_address, o.altitude_mm) for o in observations) == [("AAA111", 2.0), ("BBB222", 1000.0)]
+        assert decode_stream_cursor(cursor) == ids[-1]
+
+    def test_resync_cursor_is_the_stream_head(self, fakeredis_server, monkeypatch):
+        ids = _publish(*(_observation(f"AAA{i:03d}") for i in range(5)))
+        reader = AirTrafficCursorReader(count=2)
+        monkeypatch.setattr(reader.stream_ops.redis, "xread", lambda *a, **k: pytest.fail("XREAD on resync"))
+
+        observations, cursor, resync = reader.poll("")
+
+        assert resync
+        assert len(observations) == 5
+        assert decode_stream_cursor(cursor) == ids[-1]
+
+    def test_first_poll_of_a_missing_stream(self, reader):
+        assert reader.poll("") == ([], encode_stream_cursor("0-0"), True)
+
+    def test_later_polls_return_only_the_delta(self, reader):
+        _publish(_observation("AAA111"), _observation("BBB222"))
+        _observations, cursor, _resync = reader.poll("")
+        _publish(_observation("BBB222", altitude_mm=5.0), _observation("BBB222", altitude_mm=6.0))
+
+        observations, next_cursor, resync = reader.poll(cursor)
+
+        assert not resync
+        assert [(o.icao_address, o.altitude_mm) for o in observations] == [("BBB222", 6.0)]
+        assert reader.poll(next_cursor)[:2] == ([], next_cursor)
+
+    def test_polls_do_not_read_the_database(self, reader, monkeypatch):
+        monkeypatch.setattr(SQLAlchemyFlightFeedRepository, "get_recent_flight_observations", lambda *a, **k: pytest.fail("DB scan"))
+        _publish(_observation("AAA111"))
+
+        _observations, cursor, _resync = reader.poll("")
+        _publish(_observation("AAA111"))
+        assert len(reader.poll(cursor)[0]) == 1
+
+    def test_trimmed_entries_after_the_cursor_force_a_resync(self, fakeredis_server, monkeypatch):
+        _publish(_observation("AAA111"))
+        stream_ops = RedisStreamOperations()
+        reader = AirTrafficCursorReader(stream_ops=stream_ops)
+        _observations, cursor, _resync = reader.poll("")
+        ids = _publish(_observation("BBB222"), _observation("CCC333"))
+
+        info = stream_ops.redis.xinfo_stream("air_traffic_stream")
+        monkeypatch.setattr(stream_ops.redis, "xinfo_stream", lambda name: {**info, "max-deleted-entry-id": ids[0]})
+        fakeredis_server.xdel("air_traffic_stream", ids[0])
+        monkeypatch.setattr(stream_ops.redis, "xread", lambda *a, **k: pytest.fail("XREAD on resync"))
+
+        observations, next_cursor, resync = reader.poll(cursor)
+
+        assert resync
+        # The snapshot comes from the latest-state hash, which holds the trimmed entry's position too
+        assert sorted(o.icao_address for o in observations) == ["AAA111", "BBB222", "CCC333"]
+        assert decode_stream_cursor(next_cursor) == ids[1]
+
+
+# ---------------------------------------------------------------------------
+# Latest-state hash
+# ---------------------------------------------------------------------------
+
+
+class TestLatestState:
+    def test_ingest_keeps_the_latest_position_per_aircraft(self, fakeredis_server):
+        _publish(_observation("AAA111", altitude_mm=100.0), _observation("AAA111", altitude_mm=200.0))
+        _publish({**_observation("BBB222"), "metadata": {"callsign": "BB22"}})
+
+        latest = {o.icao_address: o for o in RedisStreamOperations().get_air_traffic_latest_state(max_age_ms=20_000)}
+
+        assert latest["AAA111"].altitude_mm == 200.0
+        assert latest["BBB222"].metadata == {"callsign": "BB22"}
+        assert fakeredis_server.ttl(AIR_TRAFFIC_LATEST_STATE_KEY) > 0
+
+    def test_snapshot_does_not_depend_on_earlier_polls(self, fakeredis_server, reader):
+        _publish(_observation("AAA111"))
+        # Trimmed before any reader saw it
+        fakeredis_server.xtrim("air_traffic_stream", maxlen=0)
+
+        observations, _cursor, resync = reader.poll("")
+
+        assert resync
+        assert [o.icao_address for o in observations] == ["AAA111"]
+
+    def test_stale_positions_are_dropped(self, fakeredis_server):
+        state = {"updated_at_ms": 1000, "observation": asdict(SingleAirtrafficObservation(1.0, 1.0, 1.0, 1, 1, "OLD000"))}
+        fakeredis_server.hset(AIR_TRAFFIC_LATEST_STATE_KEY, "OLD000", json.dumps(state))
+
+        assert RedisStreamOperations().get_air_traffic_latest_state(max_age_ms=20_000) == []
+        assert not fakeredis_server.hexists(AIR_TRAFFIC_LATEST_STATE_KEY, "OLD000")
+
+
+class TestCursorEncoding:
+    def test_round_trip(self):
+        assert decode_stream_cursor(encode_stream_cursor("1775001600000-3")) == "1775001600000-3"
+
+    @pytest.mark.parametrize("cursor", ["not a cursor", encode_stream_cursor("abc-def"), "%%%"])
+    def test_invalid_cursors_are_rejected(self, cursor):
+        with pytest.raises(ValueError):
+            decode_stream_cursor(cursor)
+
+
+# ---------------------------------------------------------------------------
+# API
+# ---------------------------------------------------------------------------
+
+
+class TestGetAirTrafficWithCursor:
+    def test_polls_with_the_returned_cursor(self, fastapi_client, fakeredis_server):
+        session_id = uuid.uuid4()
+        _publish(_observation("INVIEW", lat_dd=52.5, lon_dd=13.4), _observation("OUTSIDE", lat_dd=48.0, lon_dd=11.0))
+
+        first = fastapi_client.get(f"/flight_stream/get_air_traffic/{session_id}?view={VIEW}&cursor=", headers=fastapi_auth_header(READ_SCOPE))
+
+        assert first.status_code == 200
+        body = first.json()
+        assert body["resync"] is True
+        assert [o["icao_address"] for o in body["observations"]] == ["INVIEW"]
+
+        _publish(_observation("INVIEW", altitude_mm=42.0))
+        second = fastapi_client.get(
+            f"/flight_stream/get_air_traffic/{session_id}?view={VIEW}&cursor={body['cursor']}", headers=fastapi_auth_header(READ_SCOPE)
+        ).json()
+
+        assert second["resync"] is False
+        assert [(o["icao_address"], o["altitude_mm"]) for o in second["observations"]] == [("INVIEW", 42.0)]
+        state = json.loads(fakeredis_server.hget(AIR_TRAFFIC_LATEST_STATE_KEY, "INVIEW"))
+        assert state["observation"]["altitude_mm"] == 42.0
+
+    def test_invalid_cursor(self, fastapi_client):
+        resp = fastapi_client.get(f"/flight_stream/get_air_traffic/{uuid.uuid4()}?view={VIEW}&cursor=bogus", headers=fastapi_auth_header(READ_SCOPE))
+        assert resp.status_code == 400
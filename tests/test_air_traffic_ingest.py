@@ -0,0 +1,257 @@
+"""Tests for the direct air traffic ingest path:
+- DirectAirTrafficIngestor (pipelined XADDs, 429 in-flight limit, 503 on persister delay or Redis errors)
+- set_air_traffic / bulk_set_air_traffic in direct mode, including Retry-After
+- AirTrafficPersister (batched DB writes, ack after commit, ingest latency from ingested_at_ms)
+"""
+
+import uuid
+from datetime import datetime
+from types import SimpleNamespace
+
+import fakeredis
+import fakeredis.aioredis
+import pytest
+from redis.exceptions import ConnectionError as RedisConnectionError
+
+from flight_blender.clients.redis_client import AIR_TRAFFIC_PERSIST_STREAM, AIR_TRAFFIC_PERSISTER_GROUP, RedisStreamOperations
+from flight_blender.config import settings
+from flight_blender.db.session import async_task_session
+from flight_blender.domain_types.flight_feed import SingleAirtrafficObservation
+from flight_blender.repositories.flight_feed_repo import SQLAlchemyFlightFeedRepository
+from flight_blender.services import flight_feed_svc
+from flight_blender.services.flight_feed_svc import DirectAirTrafficIngestor
+from flight_blender.tasks import air_traffic_persister
+from flight_blender.tasks.air_traffic_persister import AirTrafficPersister, ingest_latency_metrics
+
+from .conftest import WRITE_SCOPE, fastapi_auth_header
+
+OBSERVATION = {
+    "lat_dd": 52.5,
+    "lon_dd": 13.4,
+    "altitude_mm": 50000,
+    "traffic_source": 1,
+    "source_type": 1,
+    "icao_address": "ABC123",
+    "timestamp": 1717243200,
+}
+
+
+def _observations(count: int, session_id: str = "") -> list[dict]:
+    return [
+        {**OBSERVATION, "icao_address": f"ICAO{i:04d}", "metadata": {"seq": i}, "session_id": session_id or str(uuid.uuid4()), "ingested_at_ms": 0}
+        for i in range(count)
+    ]
+
+
+class _StreamOpsStub:
+    def __init__(self, oldest_entry_age_ms: int = 0):
+        self.oldest_entry_age_ms = oldest_entry_age_ms
+        self.checks = 0
+
+    def get_stream_lag_metrics(self, stream_name, consumer_group):
+        self.checks += 1
+        return SimpleNamespace(oldest_entry_age_ms=self.oldest_entry_age_ms)
+
+
+@pytest.fixture
+def async_redis_factory(fakeredis_server):
+    server = fakeredis_server.connection_pool.connection_kwargs["server"]
+    return lambda: fakeredis.aioredis.FakeRedis(server=server, decode_responses=True)
+
+
+@pytest.fixture
+def ingestor(async_redis_factory):
+    return DirectAirTrafficIngestor(redis_factory=async_redis_factory, stream_ops_factory=_StreamOpsStub, max_in_flight=100)
+
+
+# ---------------------------------------------------------------------------
+# DirectAirTrafficIngestor
+# ---------------------------------------------------------------------------
+
+
+class TestDirectAirTrafficIngestor:
+    async def test_writes_observations_to_the_stream(self, ingestor, fakeredis_server):
+        result, status = await ingestor.ingest(_observations(25))
+
+        assert status == 201
+        assert result == {"message": "OK", "status": 201}
+        entries = fakeredis_server.xrange("air_traffic_stream")
+        assert [fields["icao_address"] for _id, fields in entries] == [f"ICAO{i:04d}" for i in range(25)]
+        assert ingestor.in_flight == 0
+
+    async def test_rejects_with_429_when_in_flight_work_is_full(self, ingestor, fakeredis_server):
+        ingestor.in_flight = 90
+
+        _result, status = await ingestor.ingest(_observations(20))
+
+        assert status == 429
+        assert fakeredis_server.xlen("air_traffic_stream") == 0
+        assert ingestor.in_flight == 90
+
+    async def test_accepts_an_oversized_batch_when_idle(self, ingestor):
+        _result, status = await ingestor.ingest(_observations(150))
+        assert status == 201
+
+    async def test_rejects_with_503_when_the_persister_falls_behind(self, async_redis_factory, fakeredis_server):
+        ingestor = DirectAirTrafficIngestor(
+            redis_factory=async_redis_factory, stream_ops_factory=lambda: _StreamOpsStub(oldest_entry_age_ms=5000), max_persist_delay_ms=2000
+        )
+
+        _result, status = await ingestor.ingest(_observations(5))
+
+        assert status == 503
+        assert fakeredis_server.xlen("air_traffic_stream") == 0
+        assert ingestor.in_flight == 0
+
+    async def test_persister_delay_is_checked_once_per_interval(self, async_redis_factory):
+        stream_ops = _StreamOpsStub()
+        ingestor = DirectAirTrafficIngestor(
+            redis_factory=async_redis_factory, stream_ops_factory=lambda: stream_ops, persist_delay_check_interval_secs=60
+        )
+
+        for _ in range(10):
+            await ingestor.ingest(_observations(1))
+
+        assert stream_ops.checks == 1
+
+    async def test_rejects_with_503_when_redis_fails(self):
+        class _FailingPipeline:
+            def xadd(self, *args, **kwargs):
+                pass
+
+            def hset(self, *args, **kwargs):
+                pass
+
+            def expire(self, *args, **kwargs):
+                pass
+
+            async def execute(self):
+                raise RedisConnectionError("connection refused")
+
+        ingestor = DirectAirTrafficIngestor(
+            redis_factory=lambda: SimpleNamespace(pipeline=lambda transaction: _FailingPipeline()), stream_ops_factory=_StreamOpsStub
+        )
+
+        _result, status = await ingestor.ingest(_observations(3))
+
+        assert status == 503
+        assert ingestor.in_flight == 0
+
+
+# ---------------------------------------------------------------------------
+# API in direct mode
+# ---------------------------------------------------------------------------
+
+
+class TestDirectIngestAPI:
+    @pytest.fixture(autouse=True)
+    def _direct_mode(self, monkeypatch, ingestor):
+        monkeypatch.setattr(settings, "FLIGHT_FEED_INGEST_MODE", "direct")
+        monkeypatch.setattr(flight_feed_svc, "air_traffic_ingestor", ingestor)
+        monkeypatch.setattr(
+            "flight_blender.tasks.flight_feed_task.CeleryFlightFeedTaskDispatcher.dispatch_observations",
+            lambda *args: pytest.fail("direct mode must not dispatch to Celery"),
+        )
+
+    @pytest.mark.parametrize("endpoint", ["set_air_traffic", "bulk_set_air_traffic"])
+    def test_writes_to_the_stream_without_celery(self, fastapi_client, fakeredis_server, endpoint):
+        resp = fastapi_client.post(
+            f"/flight_stream/{endpoint}/{uuid.uuid4()}", json={"observations": [OBSERVATION, OBSERVATION]}, headers=fastapi_auth_header(WRITE_SCOPE)
+        )
+
+        assert resp.status_code == 201
+        assert fakeredis_server.xlen("air_traffic_stream") == 2
+
+    def test_backpressure_sets_retry_after(self, fastapi_client, ingestor):
+        ingestor.in_flight = ingestor.max_in_flight
+
+        resp = fastapi_client.post(
+            f"/flight_stream/set_air_traffic/{uuid.uuid4()}", json={"observations": [OBSERVATION]}, headers=fastapi_auth_header(WRITE_SCOPE)
+        )
+
+        assert resp.status_code == 429
+        assert resp.headers["Retry-After"] == str(settings.FLIGHT_FEED_INGEST_RETRY_AFTER_SECS)
+
+
+# ---------------------------------------------------------------------------
+# AirTrafficPersister
+# ---------------------------------------------------------------------------
+
+
+async def _persisted_icao_addresses(session_id: str) -> list[str]:
+    async with async_task_session() as db:
+        rows = await SQLAlchemyFlightFeedRepository(db).get_recent_flight_observations(after_datetime=datetime(2000, 1, 1))
+    return sorted(row.icao_address for row in rows if row.session_id == uuid.UUID(session_id))
+
+
+class TestAirTrafficPersister:
+    async def test_persists_a_batch_and_acknowledges_it(self, ingestor, fakeredis_server):
+        session_id = str(uuid.uuid4())
+        await ingestor.ingest(_observations(30, session_id=session_id))
+        persister = AirTrafficPersister(batch_size=100, block_ms=10, consumer_id="persister-1")
+
+        metrics = await persister.persist_once()
+
+        assert metrics.persisted_count == 30
+        assert metrics.max_ms >= metrics.p95_ms >= metrics.p50_ms >= 0
+        assert await _persisted_icao_addresses(session_id) == [f"ICAO{i:04d}" for i in range(30)]
+        assert fakeredis_server.xpending(AIR_TRAFFIC_PERSIST_STREAM, AIR_TRAFFIC_PERSISTER_GROUP)["pending"] == 0
+        assert int(fakeredis_server.hget(air_traffic_persister.INGEST_LATENCY_KEY, "persisted_count")) == 30
+
+    async def test_reads_in_batches(self, ingestor):
+        await ingestor.ingest(_observations(25))
+        persister = AirTrafficPersister(batch_size=10, block_ms=10, consumer_id="persister-1")
+
+        counts = [(await persister.persist_once()).persisted_count for _ in range(4)]
+
+        assert counts == [10, 10, 5, 0]
+
+    async def test_failed_batch_stays_pending(self, ingestor, fakeredis_server, monkeypatch):
+        await ingestor.ingest(_observations(5))
+
+        async def fail(self, observations):
+            raise RuntimeError("database unavailable")
+
+        monkeypatch.setattr(SQLAlchemyFlightFeedRepository, "bulk_write_flight_observations", fail)
+        persister = AirTrafficPersister(batch_size=100, block_ms=10, consumer_id="persister-1")
+
+        with pytest.raises(RuntimeError):
+            await persister.persist_once()
+
+        assert fakeredis_server.xpending(AIR_TRAFFIC_PERSIST_STREAM, AIR_TRAFFIC_PERSISTER_GROUP)["pending"] == 5
+
+    async def test_survives_trimming_of_the_air_traffic_stream(self, ingestor, fakeredis_server):
+        session_id = str(uuid.uuid4())
+        await ingestor.ingest(_observations(5, session_id=session_id))
+        # The fusion TTL trims the air traffic stream before the persister gets to it
+        fakeredis_server.xtrim("air_traffic_stream", maxlen=0)
+
+        metrics = await AirTrafficPersister(batch_size=100, block_ms=10, consumer_id="persister-1").persist_once()
+
+        assert metrics.persisted_count == 5
+        assert await _persisted_icao_addresses(session_id) == [f"ICAO{i:04d}" for i in range(5)]
+
+    async def test_does_not_consume_the_surveillance_group(self, ingestor):
+        await ingestor.ingest(_observations(3))
+        await AirTrafficPersister(batch_size=100, block_ms=10, consumer_id="persister-1").persist_once()
+
+        drained = RedisStreamOperations().drain_air_traffic_data(stream_name="air_traffic_stream", consumer_group="air_traffic_readers", block_ms=10)
+
+        assert len(drained) == 3
+
+    def test_refuses_to_start_outside_direct_mode(self, monkeypatch):
+        monkeypatch.setattr(settings, "FLIGHT_FEED_INGEST_MODE", "celery")
+        with pytest.raises(SystemExit):
+            air_traffic_persister.main()
+
+
+class TestIngestLatencyMetrics:
+    def test_percentiles_from_ingested_at_ms(self):
+        observations = [SingleAirtrafficObservation(0, 0, 0, 0, 0, f"A{i}", ingested_at_ms=10_000 - i * 10) for i in range(100)]
+
+        metrics = ingest_latency_metrics(observations, now_ms=10_000)
+
+        assert metrics.persisted_count == 100
+        assert metrics.p50_ms == 500
+        assert metrics.p95_ms == 950
+        assert metrics.max_ms == 990
@@ -0,0 +1,232 @@
+"""Tests for the sharded air traffic stream in utils/air_traffic_shards.py and services/surveillance_svc.py:
+- routing observations to shards by grid tile or ICAO address
+- writing each observation to the main stream and the stream of its shard
+- handing a track off between shard fusion pipelines when an aircraft crosses into another shard's tile
+- merging the shard pictures for the sessions
+- scheduling one fusion job per shard
+"""
+
+import json
+from dataclasses import asdict
+
+import pytest
+
+from flight_blender.clients.redis_client import RedisStreamOperations
+from flight_blender.config import settings
+from flight_blender.domain_types.flight_feed import SingleAirtrafficObservation
+from flight_blender.domain_types.surveillance import SurveillanceSubscription
+from flight_blender.services.surveillance_svc import (
+    SURVEILLANCE_FUSION_TRACK_OWNER_KEY_PREFIX,
+    SurveillanceFusionPipeline,
+    SurveillanceTrackPictureCache,
+)
+from flight_blender.tasks.scheduler import TaskSchedulerService
+from flight_blender.tasks.tick_jobs import JOBS_KEY, TickJobSpec
+from flight_blender.utils.air_traffic_shards import AirTrafficShardMap, jump_consistent_hash
+
+FUSER = "flight_blender.services.surveillance_svc.TrafficDataFuser"
+SHARD_MAP = AirTrafficShardMap(shards=2, shard_key="tile", tile_deg=1.0)
+
+
+def _tiles_of_both_shards() -> tuple[tuple[float, float], tuple[float, float]]:
+    """A position in a tile of shard 0 and one in the neighbouring tile to the east of shard 1."""
+    for lon in range(-180, 179):
+        west, east = (46.5, lon + 0.9), (46.5, lon + 1.1)
+        if SHARD_MAP.shard_of({"lat_dd": west[0], "lon_dd": west[1]}) == 0 and SHARD_MAP.shard_of({"lat_dd": east[0], "lon_dd": east[1]}) == 1:
+            return west, east
+    raise AssertionError("no neighbouring tiles in different shards")
+
+
+def _add_observation(icao_address: str, position: tuple[float, float], timestamp: int) -> None:
+    observation = SingleAirtrafficObservation(
+        lat_dd=position[0],
+        lon_dd=position[1],
+        altitude_mm=1_000_000.0,
+        traffic_source=0,
+        source_type=1,
+        icao_address=icao_address,
+        timestamp=timestamp,
+        session_id="",
+    )
+    RedisStreamOperations().add_air_traffic_data("air_traffic_stream", asdict(observation))
+
+
+def _track_timestamps(shard: int, icao_address: str) -> list[int] | None:
+    active_track = RedisStreamOperations().get_active_track(f"fused:{shard}", icao_address)
+    return None if active_track is None else [o["timestamp"] for o in active_track.observations]
+
+
+@pytest.fixture
+def sharded(monkeypatch):
+    monkeypatch.setattr(settings, "AIR_TRAFFIC_STREAM_SHARDS", SHARD_MAP.shards)
+    monkeypatch.setattr(settings, "AIR_TRAFFIC_SHARD_KEY", SHARD_MAP.shard_key)
+    monkeypatch.setattr(settings, "AIR_TRAFFIC_SHARD_TILE_DEG", SHARD_MAP.tile_deg)
+    monkeypatch.setattr(settings, "FLIGHT_BLENDER_PLUGIN_TRAFFIC_DATA_FUSER", FUSER)
+
+
+# ---------------------------------------------------------------------------
+# AirTrafficShardMap
+# ---------------------------------------------------------------------------
+
+
+class TestAirTrafficShardMap:
+    def test_positions_in_one_tile_share_a_shard(self):
+        shard_map = AirTrafficShardMap(shards=8, tile_deg=0.5)
+        shards = {shard_map.shard_of({"lat_dd": 46.5 + i / 100, "lon_dd": 7.0 + i / 100}) for i in range(50)}
+        assert len(shards) == 1
+
+    def test_icao_key_ignores_the_position(self):
+        shard_map = AirTrafficShardMap(shards=8, shard_key="icao")
+        shards = {shard_map.shard_of({"icao_address": "4b1805", "lat_dd": lat, "lon_dd": 7.0}) for lat in range(-80, 80, 5)}
+        assert len(shards) == 1
+
+    def test_unsharded(self):
+        assert AirTrafficShardMap().shard_ids == [None]
+        assert AirTrafficShardMap(shards=3).shard_ids == [0, 1, 2]
+
+    def test_adding_a_shard_only_moves_keys_to_it(self):
+        for key in range(1000):
+            before, after = jump_consistent_hash(key, 4), jump_consistent_hash(key, 5)
+            assert 0 <= before < 4
+            assert after in (before, 4)
+
+
+# ---------------------------------------------------------------------------
+# Routing
+# ---------------------------------------------------------------------------
+
+
+class TestRouting:
+    def test_observations_are_copied_to_their_shard_stream(self, fakeredis_server, sharded):
+        west, east = _tiles_of_both_shards()
+        _add_observation("AAA", west, 100)
+        _add_observation("BBB", east, 100)
+
+        assert fakeredis_server.xlen("air_traffic_stream") == 2
+        [(_, shard_0)] = fakeredis_server.xrange("air_traffic_stream:0")
+        [(_, shard_1)] = fakeredis_server.xrange("air_traffic_stream:1")
+        assert (shard_0["icao_address"], shard_1["icao_address"]) == ("AAA", "BBB")
+
+    def test_unsharded_writes_only_the_main_stream(self, fakeredis_server):
+        _add_observation("AAA", (46.5, 7.5), 100)
+        assert fakeredis_server.keys("air_traffic_stream:*") == []
+
+
+# ---------------------------------------------------------------------------
+# Handoff
+# ---------------------------------------------------------------------------
+
+
+class TestHandoff:
+    def test_track_moves_with_the_aircraft(self, fakeredis_server, sharded):
+        west, east = _tiles_of_both_shards()
+        shard_0, shard_1 = SurveillanceFusionPipeline(shard=0), SurveillanceFusionPipeline(shard=1)
+        _add_observation("AAA", west, 100)
+        shard_0.run()
+        assert fakeredis_server.get(f"{SURVEILLANCE_FUSION_TRACK_OWNER_KEY_PREFIX}AAA") == "0"
+
+        _add_observation("AAA", east, 101)
+        assert shard_1.run() == 1
+        assert shard_0.run() == 0
+
+        assert fakeredis_server.get(f"{SURVEILLANCE_FUSION_TRACK_OWNER_KEY_PREFIX}AAA") == "1"
+        assert _track_timestamps(1, "AAA") == [100, 101]
+        assert _track_timestamps(0, "AAA") is None
+        assert (shard_0.handoffs, shard_1.handoffs) == (0, 1)
+
+    def test_late_observations_are_forwarded_to_the_owner(self, fakeredis_server, sharded):
+        west, east = _tiles_of_both_shards()
+        shard_0, shard_1 = SurveillanceFusionPipeline(shard=0), SurveillanceFusionPipeline(shard=1)
+        _add_observation("AAA", east, 105)
+        shard_1.run()
+
+        # An observation from before the aircraft left the west tile arrives late on shard 0
+        _add_observation("AAA", west, 100)
+        assert shard_0.run() == 0
+        assert fakeredis_server.get(f"{SURVEILLANCE_FUSION_TRACK_OWNER_KEY_PREFIX}AAA") == "1"
+        [(_, forwarded)] = fakeredis_server.xrevrange("air_traffic_stream:1", count=1)
+        assert (forwarded["icao_address"], forwarded["timestamp"]) == ("AAA", "100")
+
+        shard_1.run()
+        assert _track_timestamps(1, "AAA") == [105, 100]
+        assert shard_0.handoffs == 0
+
+    def test_concurrent_takeover_loses(self, fakeredis_server, sharded, monkeypatch):
+        west, east = _tiles_of_both_shards()
+        shard_0, shard_1 = SurveillanceFusionPipeline(shard=0), SurveillanceFusionPipeline(shard=1)
+        _add_observation("AAA", west, 100)
+        shard_0.run()
+
+        # Another shard takes the track over between shard 1's read of the owner's track and its MULTI
+        get_active_track = RedisStreamOperations.get_active_track
+
+        def racing_get_active_track(self, session_id, identifier):
+            fakeredis_server.set(f"{SURVEILLANCE_FUSION_TRACK_OWNER_KEY_PREFIX}{identifier}", 2)
+            return get_active_track(self, session_id, identifier)
+
+        monkeypatch.setattr(RedisStreamOperations, "get_active_track", racing_get_active_track)
+        _add_observation("AAA", east, 101)
+        assert shard_1.run() == 0
+
+        assert shard_1.handoffs == 0
+        assert fakeredis_server.get(f"{SURVEILLANCE_FUSION_TRACK_OWNER_KEY_PREFIX}AAA") == "2"
+        # The observation goes back to the owner shard 1 knew of, which passes it on in turn
+        assert fakeredis_server.xlen("air_traffic_stream:0") == 2
+
+
+    def test_append_by_the_owner_aborts_the_takeover(self, fakeredis_server, sharded, monkeypatch):
+        west, east = _tiles_of_both_shards()
+        shard_0, shard_1 = SurveillanceFusionPipeline(shard=0), SurveillanceFusionPipeline(shard=1)
+        _add_observation("AAA", west, 100)
+        shard_0.run()
+
+        # Shard 0 appends to its track between shard 1's read of that track and its MULTI
+        get_active_track = RedisStreamOperations.get_active_track
+
+        def racing_get_active_track(self, session_id, identifier):
+            monkeypatch.setattr(RedisStreamOperations, "get_active_track", get_active_track)
+            active_track = get_active_track(self, session_id, identifier)
+            self.append_active_track_observations(session_id, {identifier: [{**active_track.observations[-1], "timestamp": 100}]})
+            return active_track
+
+        monkeypatch.setattr(RedisStreamOperations, "get_active_track", racing_get_active_track)
+        _add_observation("AAA", east, 101)
+        assert shard_1.run() == 0
+
+        assert shard_1.handoffs == 0
+        assert fakeredis_server.get(f"{SURVEILLANCE_FUSION_TRACK_OWNER_KEY_PREFIX}AAA") == "0"
+        assert _track_timestamps(0, "AAA") == [100, 100]
+        assert _track_timestamps(1, "AAA") is None
+
+# ---------------------------------------------------------------------------
+# Session picture
+# ---------------------------------------------------------------------------
+
+
+class TestShardedPicture:
+    def test_sessions_see_the_tracks_of_every_shard(self, fakeredis_server, sharded):
+        west, east = _tiles_of_both_shards()
+        _add_observation("AAA", west, 100)
+        _add_observation("BBB", east, 100)
+        for shard in SHARD_MAP.shard_ids:
+            SurveillanceFusionPipeline(shard=shard).run()
+
+        picture = SurveillanceTrackPictureCache().get()
+        assert len(picture.parts) == 2
+        tracks = json.loads(picture.payload(picture.select(SurveillanceSubscription())))
+        assert sorted(t["unique_aircraft_identifier"] for t in tracks) == ["AAA", "BBB"]
+
+
+# ---------------------------------------------------------------------------
+# Scheduling
+# ---------------------------------------------------------------------------
+
+
+class TestScheduling:
+    def test_one_fusion_job_per_shard(self, fakeredis_server, sharded, monkeypatch):
+        monkeypatch.setattr(settings, "TICK_SCHEDULER_ENABLED", True)
+        assert TaskSchedulerService.schedule_surveillance_track("session-1") is True
+
+        jobs = {job_id: TickJobSpec.from_json(raw) for job_id, raw in fakeredis_server.hgetall(JOBS_KEY).items()}
+        fusion_jobs = {job_id: spec.kwargs["shard"] for job_id, spec in jobs.items() if job_id.startswith("surveillance_fusion:")}
+        assert fusion_jobs == {"surveillance_fusion:global:0": 0, "surveillance_fusion:global:1": 1}
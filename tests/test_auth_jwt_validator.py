@@ -0,0 +1,276 @@
+"""Tests for auth/jwt_validator.py:
+- JWKSCache (TTL, single-flight refresh, unknown-kid refresh, parsed key reuse)
+- VerifiedTokenCache (LRU bound, exp and key-rotation eviction)
+- validate_token against a local JWKS stub, counting outbound fetches under concurrent load
+"""
+
+import asyncio
+import time
+from datetime import datetime, timedelta, timezone
+from unittest.mock import patch
+
+import jwt
+import pytest
+from cryptography.hazmat.primitives.asymmetric import rsa
+from fastapi import HTTPException
+from jwt.algorithms import RSAAlgorithm
+
+from flight_blender.auth import jwt_validator
+from flight_blender.auth.jwt_validator import JWKSCache, VerifiedTokenCache, validate_token
+
+PASSPORT_JWKS_URL = "http://passport.test/.well-known/jwks.json"
+DSS_JWKS_URL = "http://dss.test/.well-known/jwks.json"
+SCOPE = "flightblender.read"
+
+
+def _private_key():
+    return rsa.generate_private_key(public_exponent=65537, key_size=2048)
+
+
+def _token(private_key, kid: str, scopes=(SCOPE,), expires_in=timedelta(minutes=5), sub="test-user") -> str:
+    payload = {
+        "sub": sub,
+        "iss": "https://passport.example.test",
+        "aud": "testflight.flightblender.com",
+        "scope": " ".join(scopes),
+        "exp": datetime.now(timezone.utc) + expires_in,
+    }
+    return jwt.encode(payload, private_key, algorithm="RS256", headers={"kid": kid})
+
+
+class _JWKSStub:
+    """Stands in for the JWKS endpoints: serves the registered keys and counts fetches per URL."""
+
+    def __init__(self, latency_secs: float = 0.01):
+        self.latency_secs = latency_secs
+        self.keys: dict[str, dict[str, dict]] = {}
+        self.fetches: dict[str, int] = {}
+        self.fail = False
+
+    def add_key(self, url: str, kid: str, private_key) -> None:
+        jwk = RSAAlgorithm.to_jwk(private_key.public_key(), as_dict=True)
+        jwk["kid"] = kid
+        self.keys.setdefault(url, {})[kid] = jwk
+
+    def remove_key(self, url: str, kid: str) -> None:
+        self.keys[url].pop(kid)
+
+    @property
+    def total_fetches(self) -> int:
+        return sum(self.fetches.values())
+
+    async def fetch(self, url: str) -> dict:
+        self.fetches[url] = self.fetches.get(url, 0) + 1
+        await asyncio.sleep(self.latency_secs)
+        if self.fail:
+            return {}
+        return {"keys": list(self.keys.get(url, {}).values())}
+
+
+@pytest.fixture
+def jwks_stub(monkeypatch):
+    monkeypatch.setattr("flight_blender.config.settings.BYPASS_AUTH_TOKEN_VERIFICATION", False)
+    monkeypatch.setattr("flight_blender.config.settings.PASSPORT_JWKS_URL", PASSPORT_JWKS_URL)
+    monkeypatch.setattr("flight_blender.config.settings.DSS_AUTH_JWKS_ENDPOINT", DSS_JWKS_URL)
+    stub = _JWKSStub()
+    monkeypatch.setattr(jwt_validator, "_fetch_jwks", stub.fetch)
+    return stub
+
+
+def _use_jwks_cache(monkeypatch, ttl_secs=300, min_refresh_interval_secs=10.0) -> JWKSCache:
+    cache = JWKSCache(ttl_secs=ttl_secs, min_refresh_interval_secs=min_refresh_interval_secs)
+    monkeypatch.setattr(jwt_validator, "jwks_cache", cache)
+    return cache
+
+
+# ---------------------------------------------------------------------------
+# JWKSCache through validate_token
+# ---------------------------------------------------------------------------
+
+
+class TestJWKSCaching:
+    @pytest.mark.asyncio
+    async def test_concurrent_requests_share_one_fetch_per_url(self, jwks_stub):
+        key = _private_key()
+        jwks_stub.add_key(PASSPORT_JWKS_URL, "passport-key", key)
+        tokens = [_token(key, "passport-key", sub=f"user-{i}") for i in range(50)]
+
+        results = await asyncio.gather(*(validate_token(token, [SCOPE]) for token in tokens * 4))
+
+        assert len(results) == 200
+        assert jwks_stub.fetches == {PASSPORT_JWKS_URL: 1, DSS_JWKS_URL: 1}
+
+    @pytest.mark.asyncio
+    async def test_same_url_for_passport_and_dss_is_fetched_once(self, jwks_stub, monkeypatch):
+        monkeypatch.setattr("flight_blender.config.settings.DSS_AUTH_JWKS_ENDPOINT", PASSPORT_JWKS_URL)
+        key = _private_key()
+        jwks_stub.add_key(PASSPORT_JWKS_URL, "passport-key", key)
+
+        await validate_token(_token(key, "passport-key"), [SCOPE])
+
+        assert jwks_stub.fetches == {PASSPORT_JWKS_URL: 1}
+
+    @pytest.mark.asyncio
+    async def test_keys_from_both_endpoints_are_accepted(self, jwks_stub):
+        passport_key, dss_key = _private_key(), _private_key()
+        jwks_stub.add_key(PASSPORT_JWKS_URL, "passport-key", passport_key)
+        jwks_stub.add_key(DSS_JWKS_URL, "dss-key", dss_key)
+
+        await validate_token(_token(passport_key, "passport-key"), [SCOPE])
+        await validate_token(_token(dss_key, "dss-key"), [SCOPE])
+
+        assert jwks_stub.total_fetches == 2
+
+    @pytest.mark.asyncio
+    async def test_ttl_expiry_refetches(self, jwks_stub, monkeypatch):
+        cache = _use_jwks_cache(monkeypatch, ttl_secs=300, min_refresh_interval_secs=0)
+        key = _private_key()
+        jwks_stub.add_key(PASSPORT_JWKS_URL, "passport-key", key)
+        await validate_token(_token(key, "passport-key"), [SCOPE])
+        assert jwks_stub.total_fetches == 2
+
+        cache._loaded_at -= 301
+        await validate_token(_token(key, "passport-key", sub="another-user"), [SCOPE])
+        assert jwks_stub.total_fetches == 4
+
+    @pytest.mark.asyncio
+    async def test_unknown_kid_triggers_single_immediate_refresh(self, jwks_stub, monkeypatch):
+        _use_jwks_cache(monkeypatch, min_refresh_interval_secs=0)
+        old_key, new_key = _private_key(), _private_key()
+        jwks_stub.add_key(PASSPORT_JWKS_URL, "old-key", old_key)
+        await validate_token(_token(old_key, "old-key"), [SCOPE])
+        assert jwks_stub.total_fetches == 2
+
+        jwks_stub.add_key(PASSPORT_JWKS_URL, "new-key", new_key)
+        tokens = [_token(new_key, "new-key", sub=f"user-{i}") for i in range(20)]
+        await asyncio.gather(*(validate_token(token, [SCOPE]) for token in tokens))
+
+        assert jwks_stub.total_fetches == 4
+
+    @pytest.mark.asyncio
+    async def test_unknown_kid_refreshes_are_rate_limited(self, jwks_stub):
+        key = _private_key()
+        jwks_stub.add_key(PASSPORT_JWKS_URL, "passport-key", key)
+        await validate_token(_token(key, "passport-key"), [SCOPE])
+
+        forged = [_token(key, f"forged-{i}") for i in range(100)]
+        results = await asyncio.gather(*(validate_token(token, [SCOPE]) for token in forged), return_exceptions=True)
+
+        assert all(isinstance(r, HTTPException) and r.status_code == 401 for r in results)
+        assert jwks_stub.total_fetches == 2
+
+    @pytest.mark.asyncio
+    async def test_failed_refresh_keeps_previous_keys(self, jwks_stub, monkeypatch):
+        cache = _use_jwks_cache(monkeypatch, min_refresh_interval_secs=0)
+        key = _private_key()
+        jwks_stub.add_key(PASSPORT_JWKS_URL, "passport-key", key)
+        await validate_token(_token(key, "passport-key"), [SCOPE])
+
+        jwks_stub.fail = True
+        cache._loaded_at -= 301
+        decoded = await validate_token(_token(key, "passport-key", sub="another-user"), [SCOPE])
+
+        assert decoded["sub"] == "another-user"
+        assert jwks_stub.total_fetches == 4
+
+    @pytest.mark.asyncio
+    async def test_no_keys_returns_400(self, jwks_stub):
+        jwks_stub.fail = True
+        with pytest.raises(HTTPException) as exc_info:
+            await validate_token(_token(_private_key(), "passport-key"), [SCOPE])
+        assert exc_info.value.status_code == 400
+
+    @pytest.mark.asyncio
+    async def test_unchanged_jwks_are_not_parsed_again(self, jwks_stub, monkeypatch):
+        cache = _use_jwks_cache(monkeypatch, min_refresh_interval_secs=0)
+        key = _private_key()
+        jwks_stub.add_key(PASSPORT_JWKS_URL, "passport-key", key)
+
+        with patch.object(RSAAlgorithm, "from_jwk", wraps=RSAAlgorithm.from_jwk) as from_jwk:
+            await cache.refresh()
+            first = cache.current_key("passport-key")
+            await cache.refresh()
+            jwks_stub.add_key(PASSPORT_JWKS_URL, "second-key", _private_key())
+            await cache.refresh()
+
+        assert from_jwk.call_count == 2
+        assert cache.current_key("passport-key") is first
+
+
+# ---------------------------------------------------------------------------
+# VerifiedTokenCache
+# ---------------------------------------------------------------------------
+
+
+class TestVerifiedTokenCache:
+    def test_lru_is_bounded(self):
+        cache = VerifiedTokenCache(max_entries=2)
+        key = object()
+        exp = time.time() + 60
+        cache.put("a", key, {"exp": exp})
+        cache.put("b", key, {"exp": exp})
+        assert cache.get("a", key) is not None
+        cache.put("c", key, {"exp": exp})
+        assert len(cache) == 2
+        assert cache.get("b", key) is None
+        assert cache.get("a", key) is not None
+
+    def test_expired_entries_are_not_served(self):
+        cache = VerifiedTokenCache(max_entries=10)
+        key = object()
+        cache.put("expired", key, {"exp": time.time() - 1})
+        assert cache.get("expired", key) is None
+        assert len(cache) == 0
+
+    def test_entries_verified_with_another_key_are_not_served(self):
+        cache = VerifiedTokenCache(max_entries=10)
+        cache.put("token", object(), {"exp": time.time() + 60})
+        assert cache.get("token", object()) is None
+
+    @pytest.mark.asyncio
+    async def test_repeat_token_skips_signature_verification(self, jwks_stub):
+        key = _private_key()
+        jwks_stub.add_key(PASSPORT_JWKS_URL, "passport-key", key)
+        token = _token(key, "passport-key")
+
+        with patch.object(jwt_validator.jwt, "decode", wraps=jwt.decode) as decode:
+            for _ in range(10):
+                decoded = await validate_token(token, [SCOPE])
+
+        assert decode.call_count == 1
+        assert decoded["sub"] == "test-user"
+
+    @pytest.mark.asyncio
+    async def test_scopes_are_checked_on_cached_tokens(self, jwks_stub):
+        key = _private_key()
+        jwks_stub.add_key(PASSPORT_JWKS_URL, "passport-key", key)
+        token = _token(key, "passport-key")
+        await validate_token(token, [SCOPE])
+
+        with pytest.raises(HTTPException) as exc_info:
+            await validate_token(token, ["flightblender.write"])
+        assert exc_info.value.status_code == 403
+
+    @pytest.mark.asyncio
+    async def test_returned_claims_do_not_alias_the_cache(self, jwks_stub):
+        key = _private_key()
+        jwks_stub.add_key(PASSPORT_JWKS_URL, "passport-key", key)
+        token = _token(key, "passport-key")
+        (await validate_token(token, [SCOPE]))["sub"] = "tampered"
+        assert (await validate_token(token, [SCOPE]))["sub"] == "test-user"
+
+    @pytest.mark.asyncio
+    async def test_token_from_rotated_out_key_is_rejected(self, jwks_stub, monkeypatch):
+        cache = _use_jwks_cache(monkeypatch, min_refresh_interval_secs=0)
+        key = _private_key()
+        jwks_stub.add_key(PASSPORT_JWKS_URL, "passport-key", key)
+        token = _token(key, "passport-key")
+        await validate_token(token, [SCOPE])
+
+        jwks_stub.remove_key(PASSPORT_JWKS_URL, "passport-key")
+        jwks_stub.add_key(PASSPORT_JWKS_URL, "rotated-key", _private_key())
+        cache._loaded_at -= 301
+
+        with pytest.raises(HTTPException) as exc_info:
+            await validate_token(token, [SCOPE])
+        assert exc_info.value.status_code == 401
@@ -77,6 +77,53 @@ class TestAddAirTrafficData:
         ops.add_air_traffic_data("test-meta-stream", obs)
 
 
+class TestAddAirTrafficDataBatch:
+    @staticmethod
+    def _obs(icao: str) -> dict:
+        return {
+            "icao_address": icao,
+            "lat_dd": "51.5",
+            "lon_dd": "-0.1",
+            "altitude_mm": "100.0",
+            "traffic_source": "1",
+            "source_type": "0",
+            "timestamp": "1700000000",
+            "metadata": {"key": "value"},
+        }
+
+    def test_adds_all_observations_in_one_pipeline(self):
+        ops = _fresh_ops()
+        message_ids = ops.add_air_traffic_data_batch("test-batch-1", [self._obs(f"B{i:04d}") for i in range(25)])
+        assert len(message_ids) == 25
+        entries = ops.redis.xrange("test-batch-1")
+        assert [fields["icao_address"] for _, fields in entries] == [f"B{i:04d}" for i in range(25)]
+        assert json.loads(entries[0][1]["metadata"]) == {"key": "value"}
+
+    def test_empty_batch_is_noop(self):
+        ops = _fresh_ops()
+        assert ops.add_air_traffic_data_batch("test-batch-empty", []) == []
+        assert not ops.redis.exists("test-batch-empty")
+
+    def test_stream_key_has_no_expiry(self):
+        ops = _fresh_ops()
+        ops.add_air_traffic_data_batch("test-batch-ttl", [self._obs("C0001")])
+        assert ops.redis.pttl("test-batch-ttl") == -1
+
+    def test_entries_older_than_ttl_are_trimmed(self):
+        ops = _fresh_ops()
+        ops.redis.xadd("test-batch-trim", {"icao_address": "OLD"}, id="1000-0")
+        ops.add_air_traffic_data_batch("test-batch-trim", [self._obs("NEW")])
+        entries = ops.redis.xrange("test-batch-trim")
+        assert [fields["icao_address"] for _, fields in entries] == ["NEW"]
+
+    def test_maxlen_used_when_ttl_disabled(self, monkeypatch):
+        import flight_blender.clients.redis_client as redis_client
+
+        monkeypatch.setattr(redis_client, "AIR_TRAFFIC_STREAM_TTL_MS", 0)
+        monkeypatch.setattr(redis_client, "AIR_TRAFFIC_STREAM_MAX_LEN", 5)
+        assert RedisStreamOperations._stream_trim_kwargs() == {"maxlen": 5, "approximate": True}
+
+
 # ---------------------------------------------------------------------------
 # Consumer group management
 # ---------------------------------------------------------------------------
@@ -197,6 +244,39 @@ class TestActiveTrackManagement:
         assert len(tracks) == 3
 
 
+    def test_append_active_track_observations_creates_and_extends(self):
+        ops = _fresh_ops()
+        ops.append_active_track_observations("sess-6", {"ICAO0006": [{"timestamp": 1}, {"timestamp": 2}]})
+        ops.append_active_track_observations("sess-6", {"ICAO0006": [{"timestamp": 3}], "ICAO0007": [{"timestamp": 3}]})
+        track = ops.get_active_track("sess-6", "ICAO0006")
+        assert [o["timestamp"] for o in track.observations] == [1, 2, 3]
+        assert len(ops.get_all_active_tracks_in_session("sess-6")) == 2
+
+    def test_append_active_track_observations_caps_history(self, monkeypatch):
+        import flight_blender.clients.redis_client as redis_client
+
+        monkeypatch.setattr(redis_client, "ACTIVE_TRACK_MAX_OBSERVATIONS", 3)
+        ops = _fresh_ops()
+        for ts in range(10):
+            ops.append_active_track_observations("sess-7", {"ICAO0008": [{"timestamp": ts}]})
+        track = ops.get_active_track("sess-7", "ICAO0008")
+        assert [o["timestamp"] for o in track.observations] == [7, 8, 9]
+
+    def test_idle_tracks_are_expired_from_session(self):
+        ops = _fresh_ops()
+        ops.append_active_track_observations("sess-8", {"LIVE": [{"timestamp": 1}], "IDLE": [{"timestamp": 1}]})
+        ops.redis.zadd("active_tracks:sess-8", {"IDLE": 0})
+        tracks = ops.get_all_active_tracks_in_session("sess-8")
+        assert [t.unique_aircraft_identifier for t in tracks] == ["LIVE"]
+        assert not ops.check_active_track_exists("sess-8", "IDLE")
+
+    def test_track_keys_have_idle_ttl(self):
+        ops = _fresh_ops()
+        ops.append_active_track_observations("sess-9", {"ICAO0009": [{"timestamp": 1}]})
+        assert ops.redis.ttl("active_track:sess-9:ICAO0009") > 0
+        assert ops.redis.ttl("active_track_observations:sess-9:ICAO0009") > 0
+
+
 # ---------------------------------------------------------------------------
 # Consumer reader
 # ---------------------------------------------------------------------------
@@ -210,6 +290,61 @@ class TestConsumerReader:
         assert len(reader_id) == 36  # UUID format
 
 
+class TestDrainAirTrafficData:
+    @staticmethod
+    def _fill(ops, stream_name: str, count: int) -> None:
+        for i in range(count):
+            ops.redis.xadd(stream_name, {"icao_address": f"D{i:04d}", "lat_dd": "1.0", "lon_dd": "2.0", "timestamp": str(i)})
+
+    def test_drains_beyond_single_batch(self):
+        ops = _fresh_ops()
+        self._fill(ops, "test-drain-1", 45)
+        observations = ops.drain_air_traffic_data("test-drain-1", consumer_id="c1", batch_size=10, block_ms=10)
+        assert len(observations) == 45
+        assert ops.redis.xpending("test-drain-1", "air_traffic_readers")["pending"] == 0
+
+    def test_respects_max_messages(self):
+        ops = _fresh_ops()
+        self._fill(ops, "test-drain-2", 30)
+        first = ops.drain_air_traffic_data("test-drain-2", consumer_id="c1", max_messages=20, batch_size=7, block_ms=10)
+        second = ops.drain_air_traffic_data("test-drain-2", consumer_id="c1", max_messages=20, batch_size=7, block_ms=10)
+        assert len(first) == 20
+        assert len(second) == 10
+
+    def test_reclaims_stale_pending_entries(self):
+        ops = _fresh_ops()
+        self._fill(ops, "test-drain-3", 5)
+        ops.create_consumer_group("test-drain-3", "air_traffic_readers")
+        ops.redis.xreadgroup("air_traffic_readers", "dead-worker", {"test-drain-3": ">"}, count=5)
+        observations = ops.drain_air_traffic_data("test-drain-3", consumer_id="c1", claim_min_idle_ms=0, block_ms=10)
+        assert len(observations) == 5
+        assert ops.redis.xpending("test-drain-3", "air_traffic_readers")["pending"] == 0
+
+    def test_worker_consumer_name_is_stable(self):
+        assert RedisStreamOperations.get_worker_consumer_name() == RedisStreamOperations.get_worker_consumer_name()
+
+
+class TestStreamLagMetrics:
+    def test_reports_pending_and_undelivered(self):
+        ops = _fresh_ops()
+        for i in range(4):
+            ops.redis.xadd("test-lag-1", {"icao_address": f"L{i}"})
+        ops.create_consumer_group("test-lag-1", "air_traffic_readers")
+        ops.redis.xreadgroup("air_traffic_readers", "c1", {"test-lag-1": ">"}, count=1)
+        metrics = ops.get_stream_lag_metrics("test-lag-1")
+        assert metrics.stream_length == 4
+        assert metrics.pending_count == 1
+        assert metrics.undelivered_count == 3
+        assert metrics.oldest_entry_age_ms >= 0
+
+    def test_missing_group_reports_only_length(self):
+        ops = _fresh_ops()
+        ops.redis.xadd("test-lag-2", {"icao_address": "L0"})
+        metrics = ops.get_stream_lag_metrics("test-lag-2")
+        assert metrics.stream_length == 1
+        assert metrics.pending_count == 0
+
+
 # ---------------------------------------------------------------------------
 # Parse stream message
 # ---------------------------------------------------------------------------
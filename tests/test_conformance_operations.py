@@ -6,23 +6,30 @@
 - operator_conformance_notifications.py
 """
 
+import json
 import uuid
 from unittest.mock import AsyncMock, MagicMock, patch
 
 import arrow
 import pytest
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 
+from flight_blender.db.session import Base
 from flight_blender.domain_types.scd import LatLngPoint
+from flight_blender.repositories.geo_fence_repo import SQLAlchemyGeoFenceRepository
 from flight_blender.services.conformance_svc import (
     AcceptedState,
     ActivatedState,
+    ActiveGeofenceIndex,
     CancelledState,
+    CompiledOperationalIntentGeometry,
     ConformanceChecksList,
     ContingentState,
     EndedState,
     FlightBlenderConformanceEngine,
     FlightOperationStateMachine,
     NonconformingState,
+    OperationalIntentGeometryCache,
     OperationConformanceNotification,
     ProcessingNotSubmittedToDss,
     RejectedState,
@@ -30,6 +37,7 @@ from flight_blender.services.conformance_svc import (
     get_status,
     is_time_between,
     match_state,
+    operational_intent_geometry_cache,
     set_conformance_deps,
 )
 from flight_blender.tasks.conformance_task import check_flight_conformance, check_operation_telemetry_conformance
@@ -241,6 +249,276 @@ class TestFlightBlenderConformanceEngineC2C3:
         assert result == ConformanceChecksList.C2
 
 
+def _square_volume(min_lng, min_lat, size, alt_lower, alt_upper, time_start, time_end):
+    vertices = [
+        {"lat": min_lat, "lng": min_lng},
+        {"lat": min_lat, "lng": min_lng + size},
+        {"lat": min_lat + size, "lng": min_lng + size},
+        {"lat": min_lat + size, "lng": min_lng},
+        {"lat": min_lat, "lng": min_lng},
+    ]
+    return {
+        "volume": {
+            "outline_polygon": {"vertices": vertices},
+            "altitude_lower": {"value": alt_lower, "reference": "W84", "units": "M"},
+            "altitude_upper": {"value": alt_upper, "reference": "W84", "units": "M"},
+        },
+        "time_start": {"format": "RFC3339", "value": time_start},
+        "time_end": {"format": "RFC3339", "value": time_end},
+    }
+
+
+def _two_volume_operational_intent() -> str:
+    now = arrow.utcnow()
+    return json.dumps(
+        {
+            "volumes": [
+                _square_volume(0.0, 51.0, 0.1, 0, 100, now.shift(hours=-1).isoformat(), now.shift(hours=1).isoformat()),
+                _square_volume(1.0, 51.0, 0.1, 200, 300, now.shift(hours=1).isoformat(), now.shift(hours=2).isoformat()),
+            ]
+        }
+    )
+
+
+def _activated_declaration(operational_intent: str, updated_at=None):
+    now = arrow.utcnow()
+    return MagicMock(
+        id=uuid.uuid4(),
+        aircraft_id="TEST-UAV",
+        state=2,
+        start_datetime=now.shift(hours=-1).isoformat(),
+        end_datetime=now.shift(hours=1).isoformat(),
+        operational_intent=operational_intent,
+        updated_at=updated_at or now.datetime,
+    )
+
+
+class TestCompiledOperationalIntentGeometry:
+    def test_contains_any_volume(self):
+        compiled = CompiledOperationalIntentGeometry.from_operational_intent(_two_volume_operational_intent())
+        assert compiled.contains(0.05, 51.05)
+        assert compiled.contains(1.05, 51.05)
+        assert not compiled.contains(0.5, 51.05)
+
+    def test_shared_edge_is_outside(self):
+        now = arrow.utcnow()
+        start, end = now.shift(hours=-1).isoformat(), now.shift(hours=1).isoformat()
+        adjacent = json.dumps({"volumes": [_square_volume(0.0, 51.0, 0.1, 0, 100, start, end), _square_volume(0.1, 51.0, 0.1, 0, 100, start, end)]})
+        compiled = CompiledOperationalIntentGeometry.from_operational_intent(adjacent)
+        assert not compiled.contains(0.1, 51.05)
+        assert compiled.contains(0.15, 51.05)
+
+    def test_altitude_within_any_volume(self):
+        compiled = CompiledOperationalIntentGeometry.from_operational_intent(_two_volume_operational_intent())
+        assert compiled.altitude_within_any_volume(50.0)
+        assert compiled.altitude_within_any_volume(250.0)
+        assert not compiled.altitude_within_any_volume(150.0)
+
+    def test_volumes_at_filters_by_location_and_time(self):
+        compiled = CompiledOperationalIntentGeometry.from_operational_intent(_two_volume_operational_intent())
+        assert compiled.volumes_at(0.05, 51.05) == [0]
+        assert compiled.volumes_at(1.05, 51.05) == [1]
+        assert compiled.volumes_at(1.05, 51.05, at_time=arrow.utcnow()) == []
+        assert compiled.volumes_at(1.05, 51.05, at_time=arrow.utcnow().shift(minutes=90)) == [1]
+
+
+class TestOperationalIntentGeometryCache:
+    def test_reuses_compiled_geometry_until_declaration_is_updated(self):
+        cache = OperationalIntentGeometryCache()
+        declaration = _activated_declaration(_two_volume_operational_intent())
+        first = cache.get(declaration)
+        assert cache.get(declaration) is first
+
+        declaration.updated_at = arrow.utcnow().shift(seconds=1).datetime
+        assert cache.get(declaration) is not first
+
+    def test_invalidate_drops_entry(self):
+        cache = OperationalIntentGeometryCache()
+        declaration = _activated_declaration(_two_volume_operational_intent())
+        first = cache.get(declaration)
+        cache.invalidate(str(declaration.id))
+        assert cache.get(declaration) is not first
+
+    def test_evicts_least_recently_used(self):
+        cache = OperationalIntentGeometryCache(max_entries=2)
+        operational_intent = _two_volume_operational_intent()
+        declarations = [_activated_declaration(operational_intent) for _ in range(3)]
+        compiled = [cache.get(d) for d in declarations]
+        assert cache.get(declarations[2]) is compiled[2]
+        assert cache.get(declarations[0]) is not compiled[0]
+
+
+class TestFlightBlenderConformanceEngineC7:
+    @pytest.fixture(autouse=True)
+    def _clear_geometry_cache(self):
+        operational_intent_geometry_cache.clear()
+        yield
+        operational_intent_geometry_cache.clear()
+
+    async def _check(self, declaration, lat, lng, altitude, geofence_index=None):
+        engine = FlightBlenderConformanceEngine(db=MagicMock())
+        with (
+            patch.object(FlightBlenderConformanceEngine, "_get_flight_declaration", new_callable=AsyncMock, return_value=declaration),
+            patch.object(FlightBlenderConformanceEngine, "_get_active_geofence_index", new_callable=AsyncMock, return_value=geofence_index or ActiveGeofenceIndex()),
+        ):
+            return await engine.is_operation_conformant_via_telemetry(
+                flight_declaration_id=str(declaration.id),
+                aircraft_id="TEST-UAV",
+                telemetry_location=LatLngPoint(lat=lat, lng=lng),
+                altitude_m_wgs_84=altitude,
+            )
+
+    @pytest.mark.asyncio
+    async def test_conformant_telemetry(self):
+        declaration = _activated_declaration(_two_volume_operational_intent())
+        assert await self._check(declaration, 51.05, 0.05, 50.0) == 100
+
+    @pytest.mark.asyncio
+    async def test_outside_volumes_returns_c7a(self):
+        declaration = _activated_declaration(_two_volume_operational_intent())
+        assert await self._check(declaration, 51.05, 0.5, 50.0) == ConformanceChecksList.C7a
+
+    @pytest.mark.asyncio
+    async def test_outside_altitudes_returns_c7b(self):
+        declaration = _activated_declaration(_two_volume_operational_intent())
+        assert await self._check(declaration, 51.05, 0.05, 150.0) == ConformanceChecksList.C7b
+
+    @pytest.mark.asyncio
+    async def test_repeated_checks_compile_once(self):
+        declaration = _activated_declaration(_two_volume_operational_intent())
+        with patch.object(
+            CompiledOperationalIntentGeometry,
+            "from_operational_intent",
+            wraps=CompiledOperationalIntentGeometry.from_operational_intent,
+        ) as compile_spy:
+            for _ in range(3):
+                assert await self._check(declaration, 51.05, 0.05, 50.0) == 100
+        assert compile_spy.call_count == 1
+
+
+def _geofence(min_lng, min_lat, size, start=None, end=None, multipolygon=False, updated_at=None):
+    now = arrow.utcnow()
+    ring = [[min_lng, min_lat], [min_lng + size, min_lat], [min_lng + size, min_lat + size], [min_lng, min_lat + size], [min_lng, min_lat]]
+    geometry = {"type": "MultiPolygon", "coordinates": [[ring]]} if multipolygon else {"type": "Polygon", "coordinates": [ring]}
+    return MagicMock(
+        id=uuid.uuid4(),
+        raw_geo_fence=json.dumps({"type": "FeatureCollection", "features": [{"type": "Feature", "geometry": geometry, "properties": {}}]}),
+        lower_limit=0,
+        upper_limit=100,
+        start_datetime=(start or now.shift(hours=-1)).datetime,
+        end_datetime=(end or now.shift(hours=1)).datetime,
+        updated_at=updated_at or now.datetime,
+    )
+
+
+def _synced_index(geofences) -> ActiveGeofenceIndex:
+    index = ActiveGeofenceIndex()
+    index.sync(("fp", len(geofences)), {str(g.id): g.updated_at for g in geofences}, geofences)
+    return index
+
+
+class TestActiveGeofenceIndex:
+    def test_point_inside_polygon_and_multipolygon(self):
+        polygon_fence = _geofence(0.0, 51.0, 0.1)
+        multipolygon_fence = _geofence(1.0, 51.0, 0.1, multipolygon=True)
+        index = _synced_index([polygon_fence, multipolygon_fence])
+        assert [g.geofence_id for g in index.breached_geofences(0.05, 51.05)] == [str(polygon_fence.id)]
+        assert [g.geofence_id for g in index.breached_geofences(1.05, 51.05)] == [str(multipolygon_fence.id)]
+        assert index.breached_geofences(0.5, 51.05) == []
+
+    def test_time_filter_excludes_expired_and_future_geofences(self):
+        now = arrow.utcnow()
+        expired = _geofence(0.0, 51.0, 0.1, start=now.shift(hours=-2), end=now.shift(hours=-1))
+        upcoming = _geofence(0.0, 51.0, 0.1, start=now.shift(hours=1), end=now.shift(hours=2))
+        index = _synced_index([expired, upcoming])
+        assert len(index.breached_geofences(0.05, 51.05)) == 2
+        assert index.breached_geofences(0.05, 51.05, at_time=now) == []
+
+    def test_sync_recompiles_only_changed_geofences(self):
+        kept = _geofence(0.0, 51.0, 0.1)
+        removed = _geofence(1.0, 51.0, 0.1)
+        index = _synced_index([kept, removed])
+        kept_compiled = index.breached_geofences(0.05, 51.05)[0]
+
+        added = _geofence(2.0, 51.0, 0.1)
+        versions = {str(kept.id): kept.updated_at, str(added.id): added.updated_at}
+        assert index.stale_ids(versions) == [str(added.id)]
+        index.sync(("fp", 2), versions, [added])
+
+        assert index.version == 2
+        assert len(index) == 2
+        assert index.breached_geofences(0.05, 51.05)[0] is kept_compiled
+        assert index.breached_geofences(1.05, 51.05) == []
+        assert len(index.breached_geofences(2.05, 51.05)) == 1
+
+    def test_updated_geofence_is_stale(self):
+        geofence = _geofence(0.0, 51.0, 0.1)
+        index = _synced_index([geofence])
+        assert index.stale_ids({str(geofence.id): arrow.utcnow().shift(seconds=1).datetime}) == [str(geofence.id)]
+
+
+class TestFlightBlenderConformanceEngineC8:
+    @pytest.fixture
+    async def db(self):
+        engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        async with async_sessionmaker(engine, expire_on_commit=False)() as session:
+            yield session
+        await engine.dispose()
+
+    @pytest.mark.asyncio
+    async def test_index_follows_geofence_writes(self, db, monkeypatch):
+        monkeypatch.setattr("flight_blender.services.conformance_svc.active_geofence_index", ActiveGeofenceIndex())
+        repo = SQLAlchemyGeoFenceRepository(db)
+        engine = FlightBlenderConformanceEngine(db=db)
+        now = arrow.utcnow()
+        fence_fields = {
+            "upper_limit": 100,
+            "lower_limit": 0,
+            "name": "Test",
+            "bounds": "0,51,0.1,51.1",
+            "start_datetime": now.shift(hours=-1).datetime,
+            "end_datetime": now.shift(hours=1).datetime,
+        }
+
+        first = await repo.create(raw_geo_fence=_geofence(0.0, 51.0, 0.1).raw_geo_fence, **fence_fields)
+        index = await engine._get_active_geofence_index()
+        assert len(index.breached_geofences(0.05, 51.05)) == 1
+
+        assert await engine._get_active_geofence_index() is index
+        assert index.version == 1
+
+        await repo.create(raw_geo_fence=_geofence(1.0, 51.0, 0.1).raw_geo_fence, **fence_fields)
+        await repo.delete(first.id)
+        index = await engine._get_active_geofence_index()
+        assert index.version == 2
+        assert index.breached_geofences(0.05, 51.05) == []
+        assert len(index.breached_geofences(1.05, 51.05)) == 1
+
+    @pytest.mark.asyncio
+    async def test_breach_returns_c8(self):
+        operational_intent_geometry_cache.clear()
+        declaration = _activated_declaration(_two_volume_operational_intent())
+        engine = FlightBlenderConformanceEngine(db=MagicMock())
+        with (
+            patch.object(FlightBlenderConformanceEngine, "_get_flight_declaration", new_callable=AsyncMock, return_value=declaration),
+            patch.object(
+                FlightBlenderConformanceEngine,
+                "_get_active_geofence_index",
+                new_callable=AsyncMock,
+                return_value=_synced_index([_geofence(0.04, 51.04, 0.02)]),
+            ),
+        ):
+            result = await engine.is_operation_conformant_via_telemetry(
+                flight_declaration_id=str(declaration.id),
+                aircraft_id="TEST-UAV",
+                telemetry_location=LatLngPoint(lat=51.05, lng=0.05),
+                altitude_m_wgs_84=50.0,
+            )
+        assert result == ConformanceChecksList.C8
+
+
 class TestCheckFlightOperationalIntentReferenceConformance:
     @pytest.mark.asyncio
     async def test_nonexistent_declaration_returns_c11(self):
@@ -0,0 +1,258 @@
+"""Tests for the data retention job in services/retention_svc.py:
+- batched deletes of expired rows, leaving recent rows alone
+- dry-run counts without deleting
+- per-track, per-minute rollups, merged across batches and runs
+- gzipped JSON Lines archives of expired rows
+- partition drops before or after the batches, and progress in Redis
+- SQLAlchemySurveillanceRepository.cleanup_old_events behind cleanup_old_heartbeat_events
+"""
+
+import gzip
+import json
+import uuid
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import select
+
+from flight_blender.db.session import async_task_session
+from flight_blender.models.conformance_orm import ConformanceRecordORM
+from flight_blender.models.flight_feed_orm import FlightObservationORM, FlightObservationRollupORM
+from flight_blender.models.surveillance_orm import SurveillanceHeartbeatEventORM, SurveillanceTrackEventORM
+from flight_blender.repositories.flight_feed_repo import SQLAlchemyFlightFeedRepository
+from flight_blender.repositories.surveillance_repo import SQLAlchemySurveillanceRepository
+from flight_blender.services.retention_svc import RETENTION_PROGRESS_KEY, DataRetentionService, RetentionPolicy, rollup_flight_observations
+
+NOW = datetime(2026, 10, 18, 12, 0, tzinfo=timezone.utc)
+EXPIRED = datetime(2026, 9, 1, 8, 30, tzinfo=timezone.utc)
+
+
+def _observation(session_id: uuid.UUID, created_at: datetime, icao_address: str = "ABC123", altitude_mm: float = 1000.0) -> FlightObservationORM:
+    return FlightObservationORM(
+        session_id=session_id,
+        latitude_dd=46.0,
+        longitude_dd=7.0,
+        altitude_mm=altitude_mm,
+        traffic_source=1,
+        source_type=1,
+        icao_address=icao_address,
+        raw_metadata="{}",
+        created_at=created_at,
+        updated_at=created_at,
+    )
+
+
+async def _add(*rows) -> None:
+    async with async_task_session() as db:
+        db.add_all(rows)
+
+
+async def _observations_for(session_id: uuid.UUID) -> list[FlightObservationORM]:
+    async with async_task_session() as db:
+        result = await db.execute(select(FlightObservationORM).where(FlightObservationORM.session_id == session_id))
+        return list(result.scalars())
+
+
+def _utc_created(row: FlightObservationORM) -> datetime:
+    return row.created_at.replace(tzinfo=timezone.utc)
+
+
+async def _rollups_for(session_id: uuid.UUID) -> list[FlightObservationRollupORM]:
+    async with async_task_session() as db:
+        result = await db.execute(
+            select(FlightObservationRollupORM)
+            .where(FlightObservationRollupORM.session_id == session_id)
+            .order_by(FlightObservationRollupORM.minute_start)
+        )
+        return list(result.scalars())
+
+
+def _service(**kwargs) -> DataRetentionService:
+    policy = RetentionPolicy(
+        FlightObservationORM.created_at,
+        retention_days=30,
+        archive=kwargs.pop("archive", False),
+        rollup=kwargs.pop("rollup", False),
+        partitioned=kwargs.pop("partitioned", False),
+    )
+    return DataRetentionService(policies=[policy], **{"batch_size": 100, "dry_run": False, "archive_dir": "", **kwargs})
+
+
+# ---------------------------------------------------------------------------
+# Batched deletes
+# ---------------------------------------------------------------------------
+
+
+class TestBatchedDeletes:
+    async def test_deletes_expired_rows_in_batches(self):
+        session_id = uuid.uuid4()
+        await _add(*[_observation(session_id, EXPIRED + timedelta(seconds=i)) for i in range(7)], _observation(session_id, NOW))
+
+        [stats] = await _service(batch_size=3).run(now=NOW)
+
+        assert stats.deleted_rows == 7
+        assert stats.batches == 3
+        assert [_utc_created(row) for row in await _observations_for(session_id)] == [NOW]
+
+    async def test_dry_run_only_counts(self):
+        session_id = uuid.uuid4()
+        await _add(*[_observation(session_id, EXPIRED) for _ in range(4)])
+
+        [stats] = await _service(dry_run=True).run(now=NOW)
+
+        assert stats.dry_run and stats.expired_rows >= 4
+        assert stats.deleted_rows == 0
+        assert len(await _observations_for(session_id)) == 4
+        await _service().run(now=NOW)
+
+    async def test_zero_retention_skips_the_table(self):
+        service = DataRetentionService(policies=[RetentionPolicy(FlightObservationORM.created_at, retention_days=0)], dry_run=False)
+        assert await service.run(now=NOW) == []
+
+    async def test_defaults_keep_observations_and_conformance_records(self):
+        session_id = uuid.uuid4()
+        await _add(_observation(session_id, EXPIRED))
+
+        stats = await DataRetentionService(dry_run=False).run(now=NOW)
+
+        assert {s.table for s in stats}.isdisjoint({FlightObservationORM.__tablename__, ConformanceRecordORM.__tablename__})
+        assert len(await _observations_for(session_id)) == 1
+        await _service().run(now=NOW)
+
+    async def test_progress_is_exported_to_redis(self, fakeredis_server):
+        await _add(_observation(uuid.uuid4(), EXPIRED))
+
+        await _service().run(now=NOW)
+
+        progress = json.loads(fakeredis_server.hget(RETENTION_PROGRESS_KEY, FlightObservationORM.__tablename__))
+        assert progress["deleted_rows"] == 1
+        assert progress["cutoff"] == (NOW - timedelta(days=30)).isoformat()
+
+
+# ---------------------------------------------------------------------------
+# Rollups
+# ---------------------------------------------------------------------------
+
+
+class TestRollups:
+    def test_groups_per_track_and_minute(self):
+        session_id = uuid.uuid4()
+        rows = [
+            _observation(session_id, EXPIRED + timedelta(seconds=5), altitude_mm=1000.0),
+            _observation(session_id, EXPIRED + timedelta(seconds=50), altitude_mm=3000.0),
+            _observation(session_id, EXPIRED + timedelta(seconds=65)),
+            _observation(session_id, EXPIRED + timedelta(seconds=10), icao_address="DEF456"),
+        ]
+
+        rollups = {(r.icao_address, r.minute_start): r for r in rollup_flight_observations(rows)}
+
+        first = rollups[("ABC123", EXPIRED)]
+        assert first.observation_count == 2
+        assert (first.altitude_mm_min, first.altitude_mm_max) == (1000.0, 3000.0)
+        assert first.last_observed_at == EXPIRED + timedelta(seconds=50)
+        assert rollups[("ABC123", EXPIRED + timedelta(minutes=1))].observation_count == 1
+        assert rollups[("DEF456", EXPIRED)].session_id == str(session_id)
+
+    async def test_minutes_split_across_batches_are_merged(self):
+        session_id = uuid.uuid4()
+        await _add(*[_observation(session_id, EXPIRED + timedelta(seconds=i), altitude_mm=100.0 * i) for i in range(5)])
+
+        [stats] = await _service(rollup=True, batch_size=2).run(now=NOW)
+
+        assert stats.deleted_rows == 5
+        [rollup] = await _rollups_for(session_id)
+        assert rollup.observation_count == 5
+        assert (rollup.altitude_mm_min, rollup.altitude_mm_max) == (0.0, 400.0)
+        assert rollup.latitude_dd_avg == pytest.approx(46.0)
+        assert await _observations_for(session_id) == []
+
+    async def test_later_runs_add_to_existing_rollups(self):
+        session_id = uuid.uuid4()
+        await _add(_observation(session_id, EXPIRED))
+        await _service(rollup=True).run(now=NOW)
+        await _add(_observation(session_id, EXPIRED + timedelta(seconds=30)))
+
+        await _service(rollup=True).run(now=NOW)
+
+        [rollup] = await _rollups_for(session_id)
+        assert rollup.observation_count == 2
+        assert rollup.last_observed_at.replace(tzinfo=timezone.utc) == EXPIRED + timedelta(seconds=30)
+
+
+# ---------------------------------------------------------------------------
+# Archives
+# ---------------------------------------------------------------------------
+
+
+class TestArchive:
+    async def test_expired_rows_are_archived_before_deletion(self, tmp_path):
+        session_id = uuid.uuid4()
+        await _add(*[_observation(session_id, EXPIRED, icao_address=f"ICAO{i}") for i in range(3)])
+
+        [stats] = await _service(archive=True, archive_dir=str(tmp_path), batch_size=2).run(now=NOW)
+
+        table = FlightObservationORM.__tablename__
+        [archive] = (tmp_path / table).iterdir()
+        assert archive.name == f"{table}-20261018T120000Z.jsonl.gz"
+        with gzip.open(archive, "rt") as f:
+            records = [json.loads(line) for line in f]
+        ours = [r for r in records if r["session_id"] == str(session_id)]
+        assert sorted(r["icao_address"] for r in ours) == ["ICAO0", "ICAO1", "ICAO2"]
+        assert "metadata" in ours[0]
+        assert stats.archived_rows == stats.deleted_rows == len(records)
+
+
+# ---------------------------------------------------------------------------
+# Partitions
+# ---------------------------------------------------------------------------
+
+
+class TestPartitionDrops:
+    @pytest.fixture
+    def drop_calls(self, monkeypatch):
+        calls = []
+
+        async def drop(repo, before_day):
+            calls.append(before_day)
+            return 4
+
+        monkeypatch.setattr(SQLAlchemyFlightFeedRepository, "drop_flight_observation_partitions", drop)
+        return calls
+
+    async def test_partitions_are_dropped_for_expired_days(self, drop_calls):
+        [stats] = await _service(partitioned=True).run(now=NOW)
+
+        assert drop_calls == [(NOW - timedelta(days=30)).date()]
+        assert stats.partitions_dropped == 4
+
+    async def test_rolled_up_rows_are_read_before_the_partition_drop(self, drop_calls):
+        session_id = uuid.uuid4()
+        await _add(_observation(session_id, EXPIRED))
+
+        [stats] = await _service(partitioned=True, rollup=True).run(now=NOW)
+
+        assert stats.rollup_rows == 1 and stats.partitions_dropped == 4
+        assert len(await _rollups_for(session_id)) == 1
+
+
+# ---------------------------------------------------------------------------
+# Heartbeat and track events
+# ---------------------------------------------------------------------------
+
+
+class TestCleanupOldEvents:
+    async def test_deletes_old_heartbeat_and_track_events(self):
+        session_id = uuid.uuid4()
+        await _add(
+            *[SurveillanceHeartbeatEventORM(session_id=session_id, dispatched_at=EXPIRED, expected_at=EXPIRED) for _ in range(3)],
+            SurveillanceHeartbeatEventORM(session_id=session_id, dispatched_at=NOW, expected_at=NOW),
+            *[SurveillanceTrackEventORM(session_id=session_id, dispatched_at=EXPIRED, expected_at=EXPIRED) for _ in range(2)],
+        )
+
+        async with async_task_session() as db:
+            deleted = await SQLAlchemySurveillanceRepository(db).cleanup_old_events(cutoff=NOW - timedelta(days=30), batch_size=2)
+
+        assert deleted == (3, 2)
+        async with async_task_session() as db:
+            result = await db.execute(select(SurveillanceHeartbeatEventORM).where(SurveillanceHeartbeatEventORM.session_id == session_id))
+            assert len(list(result.scalars())) == 1
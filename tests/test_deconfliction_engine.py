@@ -0,0 +1,281 @@
+"""Tests for services/deconfliction_engine.py and utils/spatial_deconfliction.py:
+- DeconflictionIndex (3D lng/lat/time RTree, incremental writes, rebuild replay)
+- ORM write hooks keeping the process-wide index in step with commits
+- DefaultDeconflictionEngine decisions and rebuild-from-DB fallback
+- rebuilding when another process changed the database
+"""
+
+import threading
+import uuid
+
+import arrow
+import pytest
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from flight_blender.db.session import Base
+from flight_blender.domain_types.flight_declarations import DeconflictionRequest
+from flight_blender.repositories.flight_declarations_repo import SQLAlchemyFlightDeclarationRepository
+from flight_blender.repositories.geo_fence_repo import SQLAlchemyGeoFenceRepository
+from flight_blender.services.deconfliction_engine import DefaultDeconflictionEngine, ensure_deconfliction_index, rebuild_deconfliction_index
+from flight_blender.utils.spatial_deconfliction import DeconflictionIndex, IndexedFlightDeclaration, IndexedGeoFence
+
+BOUNDS = "7.40,46.90,7.50,47.00"
+VIEW_BOX = [7.45, 46.95, 7.55, 47.05]
+FAR_VIEW_BOX = [8.45, 47.95, 8.55, 48.05]
+
+
+def _window(start_hours=1, end_hours=2):
+    now = arrow.utcnow()
+    return now.shift(hours=start_hours).datetime, now.shift(hours=end_hours).datetime
+
+
+def _declaration(bounds=BOUNDS, state=1, start_hours=1, end_hours=2, declaration_id=None):
+    start, end = _window(start_hours, end_hours)
+    return IndexedFlightDeclaration(
+        flight_declaration_id=declaration_id or str(uuid.uuid4()),
+        bounds=bounds,
+        start_datetime=start,
+        end_datetime=end,
+        state=state,
+    )
+
+
+def _loaded_index() -> DeconflictionIndex:
+    index = DeconflictionIndex()
+    index.rebuild([], [], token=index.begin_rebuild())
+    return index
+
+
+@pytest.fixture
+async def db():
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    async with async_sessionmaker(engine, expire_on_commit=False)() as session:
+        yield session
+    await engine.dispose()
+
+
+async def _create_declaration(db, bounds=BOUNDS, state=1):
+    start, end = _window()
+    return await SQLAlchemyFlightDeclarationRepository(db).create(
+        operational_intent="{}",
+        bounds=bounds,
+        aircraft_id="TEST-UAV",
+        state=state,
+        start_datetime=start,
+        end_datetime=end,
+    )
+
+
+def _request(view_box=VIEW_BOX, declaration_id=None):
+    start, end = _window()
+    return DeconflictionRequest(
+        start_datetime=start,
+        end_datetime=end,
+        view_box=view_box,
+        ussp_network_enabled=0,
+        declaration_id=declaration_id,
+    )
+
+
+# ---------------------------------------------------------------------------
+# DeconflictionIndex
+# ---------------------------------------------------------------------------
+
+
+class TestDeconflictionIndex:
+    def test_declaration_conflicts_in_space_and_time(self):
+        index = _loaded_index()
+        declaration = _declaration()
+        index.upsert_flight_declaration(declaration)
+        start, end = _window()
+        hits = index.flight_declarations_overlapping(VIEW_BOX, start, end)
+        assert [h.flight_declaration_id for h in hits] == [declaration.flight_declaration_id]
+        assert index.flight_declarations_overlapping(FAR_VIEW_BOX, start, end) == []
+
+    def test_no_conflict_outside_time_window(self):
+        index = _loaded_index()
+        index.upsert_flight_declaration(_declaration(start_hours=5, end_hours=6))
+        start, end = _window()
+        assert index.flight_declarations_overlapping(VIEW_BOX, start, end) == []
+
+    def test_exclude_own_declaration(self):
+        index = _loaded_index()
+        declaration = _declaration()
+        index.upsert_flight_declaration(declaration)
+        start, end = _window()
+        assert index.flight_declarations_overlapping(VIEW_BOX, start, end, exclude_declaration_id=declaration.flight_declaration_id) == []
+
+    def test_inactive_state_removes_declaration(self):
+        index = _loaded_index()
+        declaration = _declaration()
+        index.upsert_flight_declaration(declaration)
+        index.upsert_flight_declaration(_declaration(state=8, declaration_id=declaration.flight_declaration_id))
+        start, end = _window()
+        assert index.flight_declarations_overlapping(VIEW_BOX, start, end) == []
+        assert len(index) == 0
+
+    def test_geo_fence_must_cover_the_time_window(self):
+        index = _loaded_index()
+        start, end = _window()
+        covering = IndexedGeoFence("covering", BOUNDS, arrow.get(start).shift(hours=-1).datetime, arrow.get(end).shift(hours=1).datetime)
+        partial = IndexedGeoFence("partial", BOUNDS, arrow.get(start).shift(minutes=30).datetime, arrow.get(end).shift(hours=1).datetime)
+        index.upsert_geo_fence(covering)
+        index.upsert_geo_fence(partial)
+        assert [f["geo_fence_id"] for f in index.geo_fences_covering(VIEW_BOX, start, end)] == ["covering"]
+
+    def test_rebuild_replays_writes_made_while_snapshot_was_read(self):
+        index = _loaded_index()
+        token = index.begin_rebuild()
+        late = _declaration()
+        index.upsert_flight_declaration(late)
+        index.rebuild([], [], token=token)
+        start, end = _window()
+        assert [h.flight_declaration_id for h in index.flight_declarations_overlapping(VIEW_BOX, start, end)] == [late.flight_declaration_id]
+
+    def test_pending_writes_overlay_index(self):
+        index = _loaded_index()
+        committed = _declaration()
+        index.upsert_flight_declaration(committed)
+        pending_new = _declaration()
+        pending = [
+            ("upsert_flight_declaration", pending_new),
+            ("remove_flight_declaration", committed.flight_declaration_id),
+        ]
+        start, end = _window()
+        hits = index.flight_declarations_overlapping(VIEW_BOX, start, end, pending=pending)
+        assert [h.flight_declaration_id for h in hits] == [pending_new.flight_declaration_id]
+
+    def test_concurrent_writers_and_readers(self):
+        index = _loaded_index()
+        start, end = _window()
+        errors = []
+
+        def writer():
+            try:
+                for _ in range(200):
+                    declaration = _declaration()
+                    index.upsert_flight_declaration(declaration)
+                    index.remove_flight_declaration(declaration.flight_declaration_id)
+            except Exception as exc:  # pragma: no cover - surfaced by the assertion below
+                errors.append(exc)
+
+        def reader():
+            try:
+                for _ in range(200):
+                    index.flight_declarations_overlapping(VIEW_BOX, start, end)
+            except Exception as exc:  # pragma: no cover
+                errors.append(exc)
+
+        threads = [threading.Thread(target=writer) for _ in range(4)] + [threading.Thread(target=reader) for _ in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        assert errors == []
+        assert len(index) == 0
+
+
+# ---------------------------------------------------------------------------
+# DefaultDeconflictionEngine with write hooks
+# ---------------------------------------------------------------------------
+
+
+class TestDefaultDeconflictionEngine:
+    @pytest.mark.asyncio
+    async def test_committed_declaration_is_indexed(self, db, _fresh_deconfliction_index):
+        existing = await _create_declaration(db)
+        await db.commit()
+        assert len(_fresh_deconfliction_index) == 1
+
+        result = await DefaultDeconflictionEngine().check_deconfliction(_request(), db)
+        assert result.is_approved is False
+        assert result.declaration_state == 8
+        assert [d.flight_declaration_id for d in result.all_relevant_declarations] == [str(existing.id)]
+
+        result = await DefaultDeconflictionEngine().check_deconfliction(_request(view_box=FAR_VIEW_BOX), db)
+        assert result.is_approved is True
+        assert result.declaration_state == 1
+
+    @pytest.mark.asyncio
+    async def test_rolled_back_declaration_is_not_indexed(self, db, _fresh_deconfliction_index):
+        await _create_declaration(db)
+        await db.rollback()
+        assert len(_fresh_deconfliction_index) == 0
+
+    @pytest.mark.asyncio
+    async def test_uncommitted_declarations_in_same_session_conflict(self, db):
+        first = await _create_declaration(db)
+        second = await _create_declaration(db)
+        result = await DefaultDeconflictionEngine().check_deconfliction(_request(declaration_id=str(second.id)), db)
+        assert [d.flight_declaration_id for d in result.all_relevant_declarations] == [str(first.id)]
+
+    @pytest.mark.asyncio
+    async def test_deleted_and_rejected_declarations_leave_the_index(self, db, _fresh_deconfliction_index):
+        repo = SQLAlchemyFlightDeclarationRepository(db)
+        rejected = await _create_declaration(db)
+        deleted = await _create_declaration(db)
+        await db.commit()
+        assert len(_fresh_deconfliction_index) == 2
+
+        await repo.update(rejected.id, state=8)
+        await repo.delete(deleted.id)
+        await db.commit()
+        assert len(_fresh_deconfliction_index) == 0
+
+    @pytest.mark.asyncio
+    async def test_geo_fence_rejects_declaration(self, db):
+        start, end = _window()
+        await SQLAlchemyGeoFenceRepository(db).create(
+            raw_geo_fence="{}",
+            upper_limit=100,
+            lower_limit=0,
+            name="Test",
+            bounds=BOUNDS,
+            start_datetime=arrow.get(start).shift(hours=-1).datetime,
+            end_datetime=arrow.get(end).shift(hours=1).datetime,
+        )
+        await db.commit()
+        result = await DefaultDeconflictionEngine().check_deconfliction(_request(), db)
+        assert result.is_approved is False
+        assert len(result.all_relevant_fences) == 1
+
+    @pytest.mark.asyncio
+    async def test_rebuild_from_database(self, db, _fresh_deconfliction_index):
+        await _create_declaration(db)
+        await _create_declaration(db, state=8)
+        await db.commit()
+
+        index = DeconflictionIndex()
+        assert not index.is_loaded
+        await rebuild_deconfliction_index(db, index)
+        assert index.is_loaded
+        assert len(index) == 1
+
+    @pytest.mark.asyncio
+    async def test_writes_from_other_processes_are_picked_up(self, db):
+        # The write hooks only reach the process-wide index, so this one stands for another process's index
+        index = await ensure_deconfliction_index(db, DeconflictionIndex())
+        assert len(index) == 0
+
+        created = await _create_declaration(db, state=0)
+        await db.commit()
+        await SQLAlchemyFlightDeclarationRepository(db).update(created.id, state=1)
+        await db.commit()
+        assert len(await ensure_deconfliction_index(db, index)) == 1
+
+        await SQLAlchemyFlightDeclarationRepository(db).update(created.id, state=8)
+        await db.commit()
+        assert len(await ensure_deconfliction_index(db, index)) == 0
+
+    @pytest.mark.asyncio
+    async def test_unchanged_database_is_not_queried(self, db, monkeypatch):
+        index = await ensure_deconfliction_index(db, DeconflictionIndex())
+
+        async def fail(*args, **kwargs):
+            pytest.fail("the tables must not be read while the write version is unchanged")
+
+        monkeypatch.setattr(SQLAlchemyFlightDeclarationRepository, "get_active_declarations_ending_after", fail)
+        monkeypatch.setattr(SQLAlchemyGeoFenceRepository, "get_geofences_ending_after", fail)
+        assert await ensure_deconfliction_index(db, index) is index
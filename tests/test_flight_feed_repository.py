@@ -0,0 +1,165 @@
+"""Tests for the Core bulk insert in repositories/flight_feed_repo.py:
+- executemany INSERT writing every column, including sensor_timestamp, and returning the IDs
+- the Postgres path handing the same rows to asyncpg's copy_records_to_table
+- daily partition creation and dropping: skipped off Postgres, delegated to the plpgsql functions on Postgres
+"""
+
+import json
+import uuid
+from datetime import date, datetime, timezone
+from types import SimpleNamespace
+
+from sqlalchemy import select
+
+from flight_blender.db.session import async_task_session
+from flight_blender.domain_types.flight_feed import SingleAirtrafficObservation
+from flight_blender.models.flight_feed_orm import FlightObservationORM
+from flight_blender.repositories.flight_feed_repo import _OBSERVATION_COLUMNS, SQLAlchemyFlightFeedRepository
+
+SESSION_ID = str(uuid.uuid4())
+
+
+def _observations(count: int) -> list[SingleAirtrafficObservation]:
+    return [
+        SingleAirtrafficObservation(
+            lat_dd=46.0 + i / 1000,
+            lon_dd=7.0,
+            altitude_mm=1000.0 * i,
+            traffic_source=11,
+            source_type=1,
+            icao_address=f"ICAO{i:04d}",
+            timestamp=1_775_001_600_000 + i,
+            metadata={"seq": i},
+            session_id=SESSION_ID,
+        )
+        for i in range(count)
+    ]
+
+
+class _CopyRecorder:
+    def __init__(self):
+        self.calls = []
+        self.in_transaction = False
+
+    async def copy_records_to_table(self, table_name, records, columns):
+        assert self.in_transaction, "COPY must run inside the session's transaction"
+        self.calls.append((table_name, list(records), columns))
+
+
+class _PostgresSessionStub:
+    def __init__(self, driver_connection):
+        self._driver_connection = driver_connection
+
+    def get_bind(self):
+        return SimpleNamespace(dialect=SimpleNamespace(name="postgresql"))
+
+    async def connection(self):
+        driver_connection = self._driver_connection
+
+        class _Connection:
+            async def exec_driver_sql(self, statement):
+                driver_connection.in_transaction = True
+
+            async def get_raw_connection(self):
+                return SimpleNamespace(driver_connection=driver_connection)
+
+        return _Connection()
+
+
+class _PartitionedPostgresSessionStub(_PostgresSessionStub):
+    def __init__(self, partitioned: bool = True):
+        super().__init__(driver_connection=None)
+        self.partitioned = partitioned
+        self.calls = []
+
+    async def execute(self, statement, params=None):
+        self.calls.append((str(statement), params))
+        if "pg_partitioned_table" in str(statement):
+            return SimpleNamespace(scalar=lambda: self.partitioned)
+        return SimpleNamespace(scalar_one=lambda: 2)
+
+
+# ---------------------------------------------------------------------------
+# executemany INSERT
+# ---------------------------------------------------------------------------
+
+
+class TestBulkInsert:
+    async def test_writes_every_column_and_returns_ids(self):
+        async with async_task_session() as db:
+            ids = await SQLAlchemyFlightFeedRepository(db).bulk_write_flight_observations(_observations(50))
+
+        async with async_task_session() as db:
+            result = await db.execute(select(FlightObservationORM).where(FlightObservationORM.session_id == uuid.UUID(SESSION_ID)))
+            rows = {row.id: row for row in result.scalars()}
+
+        assert list(rows) and set(rows) == set(ids)
+        first = rows[ids[0]]
+        assert first.icao_address == "ICAO0000"
+        assert first.session_id == uuid.UUID(SESSION_ID)
+        assert json.loads(first.raw_metadata) == {"seq": 0}
+        assert first.sensor_timestamp.replace(tzinfo=timezone.utc) == datetime.fromtimestamp(1_775_001_600.0, tz=timezone.utc)
+        assert first.created_at is not None and first.updated_at is not None
+        assert rows[ids[49]].altitude_mm == 49_000.0
+
+    async def test_empty_batch_is_a_no_op(self):
+        async with async_task_session() as db:
+            assert await SQLAlchemyFlightFeedRepository(db).bulk_write_flight_observations([]) == []
+
+
+# ---------------------------------------------------------------------------
+# Postgres COPY
+# ---------------------------------------------------------------------------
+
+
+class TestPostgresCopy:
+    async def test_rows_are_copied_with_every_column(self):
+        recorder = _CopyRecorder()
+
+        ids = await SQLAlchemyFlightFeedRepository(_PostgresSessionStub(recorder)).bulk_write_flight_observations(_observations(3))
+
+        [(table_name, records, columns)] = recorder.calls
+        assert table_name == FlightObservationORM.__tablename__
+        assert columns == list(_OBSERVATION_COLUMNS)
+        assert [record[columns.index("id")] for record in records] == ids
+        assert all(record[columns.index("sensor_timestamp")] is not None for record in records)
+        assert records[2][columns.index("icao_address")] == "ICAO0002"
+
+
+# ---------------------------------------------------------------------------
+# Partition maintenance
+# ---------------------------------------------------------------------------
+
+
+class TestPartitionMaintenance:
+    async def test_skipped_outside_postgres(self):
+        async with async_task_session() as db:
+            repo = SQLAlchemyFlightFeedRepository(db)
+            assert await repo.create_flight_observation_partitions(date(2026, 10, 18), date(2026, 10, 21)) is None
+            assert await repo.drop_flight_observation_partitions(date(2026, 9, 18)) is None
+
+    async def test_skipped_when_the_table_is_not_partitioned(self):
+        db = _PartitionedPostgresSessionStub(partitioned=False)
+
+        assert await SQLAlchemyFlightFeedRepository(db).create_flight_observation_partitions(date(2026, 10, 18), date(2026, 10, 21)) is None
+        assert len(db.calls) == 1
+
+    async def test_creates_daily_partitions(self):
+        db = _PartitionedPostgresSessionStub()
+
+        created = await SQLAlchemyFlightFeedRepository(db).create_flight_observation_partitions(date(2026, 10, 18), date(2026, 10, 21))
+
+        assert created == 2
+        _check, (sql, params) = db.calls
+        assert "flight_observation_create_partitions" in sql
+        assert params == {"first_day": date(2026, 10, 18), "last_day": date(2026, 10, 21)}
+
+    async def test_drops_partitions_before_a_day(self):
+        db = _PartitionedPostgresSessionStub()
+
+        dropped = await SQLAlchemyFlightFeedRepository(db).drop_flight_observation_partitions(date(2026, 9, 18))
+
+        assert dropped == 2
+        _check, (sql, params) = db.calls
+        assert "flight_observation_drop_partitions" in sql
+        assert params == {"before_day": date(2026, 9, 18)}
@@ -0,0 +1,187 @@
+"""Query-plan tests for the flight observation indexes, on a SQLite database seeded with one million rows:
+- per-session lookups use the (session_id, created_at DESC) index
+- per-aircraft lookups use the (icao_address, created_at DESC) index
+- latest-first lookups read the index in order instead of sorting
+- time-window scans keep using the created_at index
+- viewport queries without a time window search the (latitude_dd, longitude_dd) index
+
+The repository methods run against the seeded file; every statement they send is captured and put
+through EXPLAIN QUERY PLAN with its parameters, so the plans are those of the real queries.
+"""
+
+import sqlite3
+import uuid
+from datetime import datetime, timezone
+
+import arrow
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from flight_blender.db.session import Base
+from flight_blender.models.flight_feed_orm import FlightObservationORM
+from flight_blender.repositories.flight_feed_repo import SQLAlchemyFlightFeedRepository
+
+SEEDED_ROWS = 1_000_000
+SESSIONS = 1000
+AIRCRAFT = 5000
+# One observation per second, round-robin over sessions and aircraft
+FIRST_CREATED_AT = 1_775_001_600
+
+TABLE = FlightObservationORM.__tablename__
+SESSION_INDEX = "ix_flightobservation_session_id_created_at"
+ICAO_INDEX = "ix_flightobservation_icao_address_created_at"
+CREATED_AT_INDEX = "ix_flight_feed_operations_flightobservation_created_at"
+POSITION_INDEX = "ix_flightobservation_latitude_dd_longitude_dd"
+
+SEED_SQL = f"""
+WITH RECURSIVE seq(n) AS (SELECT 0 UNION ALL SELECT n + 1 FROM seq WHERE n < {SEEDED_ROWS - 1})
+INSERT INTO {TABLE} (
+    id, session_id, latitude_dd, longitude_dd, altitude_mm, traffic_source, source_type,
+    icao_address, metadata, sensor_timestamp, created_at, updated_at
+)
+SELECT
+    printf('%032x', n + {SESSIONS}), printf('%032x', n % {SESSIONS}), 46.0 + (n % 1000) / 10000.0, 7.0, 100000.0, n % 12, 1,
+    printf('ICAO%05d', n % {AIRCRAFT}), '{{}}', NULL,
+    strftime('%Y-%m-%d %H:%M:%f000', {FIRST_CREATED_AT} + n, 'unixepoch'),
+    strftime('%Y-%m-%d %H:%M:%f000', {FIRST_CREATED_AT} + n, 'unixepoch')
+FROM seq
+"""
+
+
+def _session_id(k: int) -> uuid.UUID:
+    return uuid.UUID(int=k)
+
+
+def _at(offset_secs: int) -> arrow.Arrow:
+    return arrow.get(datetime.fromtimestamp(FIRST_CREATED_AT + offset_secs, tz=timezone.utc))
+
+
+@pytest.fixture(scope="module")
+def seeded_database(tmp_path_factory):
+    path = tmp_path_factory.mktemp("query_plans") / "observations.sqlite3"
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(engine, tables=[FlightObservationORM.__table__])
+    engine.dispose()
+
+    with sqlite3.connect(path) as conn:
+        conn.execute(SEED_SQL)
+        conn.execute("ANALYZE")
+    return path
+
+
+@pytest.fixture
+async def captured_plans(seeded_database):
+    """Run a repository call against the seeded database and return the EXPLAIN QUERY PLAN of each statement it sent."""
+    engine = create_async_engine(f"sqlite+aiosqlite:///{seeded_database}")
+    statements = []
+
+    @event.listens_for(engine.sync_engine, "before_cursor_execute")
+    def _capture(conn, cursor, statement, parameters, context, executemany):
+        statements.append((statement, parameters))
+
+    session_factory = async_sessionmaker(engine, expire_on_commit=False)
+
+    async def run(query):
+        statements.clear()
+        async with session_factory() as db:
+            await query(SQLAlchemyFlightFeedRepository(db))
+        with sqlite3.connect(seeded_database) as conn:
+            return [
+                " | ".join(row[3] for row in conn.execute(f"EXPLAIN QUERY PLAN {statement}", parameters))
+                for statement, parameters in statements
+                if TABLE in statement
+            ]
+
+    yield run
+    await engine.dispose()
+
+
+def test_seeded_database_has_a_million_rows(seeded_database):
+    with sqlite3.connect(seeded_database) as conn:
+        assert conn.execute(f"SELECT count(*) FROM {TABLE}").fetchone()[0] == SEEDED_ROWS
+
+
+# ---------------------------------------------------------------------------
+# (session_id, created_at DESC)
+# ---------------------------------------------------------------------------
+
+
+class TestSessionIndex:
+    @pytest.mark.parametrize(
+        "query",
+        [
+            pytest.param(lambda repo: repo.get_latest_flight_observation_by_session(_session_id(7)), id="latest_by_session"),
+            pytest.param(lambda repo: repo.get_flight_observations_by_session(_session_id(7), _at(SEEDED_ROWS - 60)), id="by_session"),
+            pytest.param(
+                lambda repo: repo.get_active_rid_observations_for_session_between_interval(
+                    str(_session_id(7)), _at(SEEDED_ROWS - 3600), _at(SEEDED_ROWS - 60)
+                ),
+                id="session_between_interval",
+            ),
+            pytest.param(
+                lambda repo: repo.get_temporal_flight_observations_by_session_dicts(str(_session_id(7)), _at(SEEDED_ROWS - 60)),
+                id="temporal_by_session",
+            ),
+        ],
+    )
+    async def test_session_lookups_search_the_session_index(self, captured_plans, query):
+        [plan] = await captured_plans(query)
+
+        assert f"USING INDEX {SESSION_INDEX}" in plan
+        assert "USE TEMP B-TREE" not in plan
+
+    async def test_latest_by_session_reads_the_newest_entry(self, captured_plans):
+        rows = []
+
+        async def query(repo):
+            rows.append(await repo.get_latest_flight_observation_by_session(_session_id(7)))
+
+        await captured_plans(query)
+
+        [latest] = rows
+        assert latest.created_at.replace(tzinfo=timezone.utc) == _at(SEEDED_ROWS - SESSIONS + 7).datetime
+
+
+# ---------------------------------------------------------------------------
+# (icao_address, created_at DESC)
+# ---------------------------------------------------------------------------
+
+
+class TestIcaoAddressIndex:
+    async def test_latest_by_aircraft_searches_the_icao_index(self, captured_plans):
+        [plan] = await captured_plans(lambda repo: repo.get_latest_flight_observation_by_icao_address("ICAO00042"))
+
+        assert f"USING INDEX {ICAO_INDEX}" in plan
+        assert "USE TEMP B-TREE" not in plan
+
+
+# ---------------------------------------------------------------------------
+# created_at
+# ---------------------------------------------------------------------------
+
+
+class TestCreatedAtIndex:
+    @pytest.mark.parametrize(
+        "query",
+        [
+            pytest.param(lambda repo: repo.get_recent_flight_observations(_at(SEEDED_ROWS - 60)), id="recent"),
+            pytest.param(lambda repo: repo.get_closest_flight_observation_for_now(_at(SEEDED_ROWS - 60)), id="closest_for_now"),
+        ],
+    )
+    async def test_time_windows_search_the_created_at_index(self, captured_plans, query):
+        [plan] = await captured_plans(query)
+
+        assert f"USING INDEX {CREATED_AT_INDEX}" in plan
+
+
+# ---------------------------------------------------------------------------
+# (latitude_dd, longitude_dd)
+# ---------------------------------------------------------------------------
+
+
+class TestPositionIndex:
+    async def test_viewport_without_a_time_window_searches_the_position_index(self, captured_plans):
+        [plan] = await captured_plans(lambda repo: repo.get_flight_observation_dicts(bounds=(46.010, 6.9, 46.011, 7.1)))
+
+        assert f"USING INDEX {POSITION_INDEX}" in plan
@@ -0,0 +1,172 @@
+"""Tests for the OpenSky Network ingest in clients/opensky_client.py and tasks/flight_feed_task.py:
+- converting /states/all states to observations column by column
+- conditional polling over one reused HTTP session
+- replaying recorded responses from JSON, JSON Lines and directories
+- start_opensky_network_stream dispatching one bulk write per chunk instead of one task per aircraft
+"""
+
+import json
+from types import SimpleNamespace
+
+import pytest
+from dacite import from_dict
+
+from flight_blender.clients.opensky_client import OpenSkyClient, OpenSkyReplaySource, opensky_states_to_observations
+from flight_blender.config import settings
+from flight_blender.domain_types.flight_feed import SingleAirtrafficObservation
+from flight_blender.tasks import flight_feed_task
+
+SESSION_ID = "8b1c5f84-7b8a-4d36-a1ce-5f3a4c1d2e90"
+
+
+def _state(icao24: str, lat, lng, baro_altitude=1000.0, geo_altitude=1100.0, velocity=120.5, extended: bool = False) -> list:
+    state = [icao24, "DLH123 ", "Germany", 1_775_001_600, 1_775_001_601, lng, lat, baro_altitude, False, velocity, 90.0, 0.0, None]
+    state += [geo_altitude, "1000", False, 0]
+    return state + [4] if extended else state
+
+
+def _snapshot(time: int, states: list[list]) -> dict:
+    return {"time": time, "states": states}
+
+
+# ---------------------------------------------------------------------------
+# Conversion
+# ---------------------------------------------------------------------------
+
+
+class TestStatesToObservations:
+    def test_converts_states_to_observation_dicts(self):
+        [observation] = opensky_states_to_observations([_state("3c6444", 52.5, 13.4)], session_id=SESSION_ID)
+
+        expected = SingleAirtrafficObservation(
+            lat_dd=52.5,
+            lon_dd=13.4,
+            altitude_mm=1000.0,
+            traffic_source=2,
+            source_type=1,
+            icao_address="3c6444",
+            timestamp=1_775_001_600,
+            metadata={"velocity": 120.5},
+            session_id=SESSION_ID,
+        )
+        assert from_dict(SingleAirtrafficObservation, json.loads(json.dumps(observation))) == expected
+
+    def test_drops_states_without_a_position_and_fills_missing_values(self):
+        states = [
+            _state("nopos1", None, 13.4),
+            _state("ground", 52.5, 13.4, baro_altitude=None, velocity=None),
+            _state("noalt1", 52.5, 13.4, baro_altitude=None, geo_altitude=None, extended=True),
+        ]
+
+        observations = {o["icao_address"]: o for o in opensky_states_to_observations(states, session_id=SESSION_ID)}
+
+        assert sorted(observations) == ["ground", "noalt1"]
+        assert observations["ground"]["altitude_mm"] == 1100.0
+        assert observations["ground"]["metadata"] == {"velocity": None}
+        assert observations["noalt1"]["altitude_mm"] == 0.0
+
+    def test_empty(self):
+        assert opensky_states_to_observations([], session_id=SESSION_ID) == []
+
+
+# ---------------------------------------------------------------------------
+# Live client
+# ---------------------------------------------------------------------------
+
+
+class _Session:
+    def __init__(self, *responses):
+        self.responses = list(responses)
+        self.requests = []
+        self.auth = None
+
+    def get(self, url, params, headers, timeout):
+        self.requests.append(dict(headers))
+        status_code, body, response_headers = self.responses.pop(0)
+        return SimpleNamespace(status_code=status_code, headers=response_headers, json=lambda: body, url=url)
+
+
+class TestOpenSkyClient:
+    def test_polls_are_conditional(self):
+        session = _Session(
+            (200, _snapshot(100, [_state("3c6444", 52.5, 13.4)]), {"ETag": '"abc"', "Last-Modified": "Sat, 17 Oct 2026 12:00:00 GMT"}),
+            (304, None, {}),
+        )
+        client = OpenSkyClient(url="https://opensky.example/api/states/all", session=session)
+
+        assert client.fetch_states(52.0, 13.0, 53.0, 14.0)["time"] == 100
+        assert client.fetch_states(52.0, 13.0, 53.0, 14.0) is None
+        assert session.requests == [{}, {"If-None-Match": '"abc"', "If-Modified-Since": "Sat, 17 Oct 2026 12:00:00 GMT"}]
+
+    def test_an_unchanged_snapshot_is_not_returned_again(self):
+        session = _Session(*[(200, _snapshot(t, []), {}) for t in (100, 100, 105)])
+        client = OpenSkyClient(url="https://opensky.example/api/states/all", session=session)
+
+        assert [client.fetch_states(52.0, 13.0, 53.0, 14.0) for _ in range(3)] == [_snapshot(100, []), None, _snapshot(105, [])]
+
+    def test_errors_are_reported_as_nothing_new(self):
+        client = OpenSkyClient(url="https://opensky.example/api/states/all", session=_Session((429, None, {})))
+        assert client.fetch_states(52.0, 13.0, 53.0, 14.0) is None
+
+
+# ---------------------------------------------------------------------------
+# Replay
+# ---------------------------------------------------------------------------
+
+
+class TestOpenSkyReplaySource:
+    def test_replays_json_lines_in_order_and_loops(self, tmp_path):
+        path = tmp_path / "recording.jsonl"
+        path.write_text("\n".join(json.dumps(_snapshot(t, [_state(f"icao{t}", 52.5, 13.4)])) for t in (1, 2)) + "\n")
+        source = OpenSkyReplaySource(path)
+
+        assert [source.fetch_states(52.0, 13.0, 53.0, 14.0)["time"] for _ in range(3)] == [1, 2, 1]
+
+    def test_reads_a_directory_of_json_files_and_stops_without_loop(self, tmp_path):
+        (tmp_path / "b.json").write_text(json.dumps(_snapshot(2, [])))
+        (tmp_path / "a.json").write_text(json.dumps([_snapshot(1, [])]))
+        source = OpenSkyReplaySource(tmp_path, loop=False)
+
+        assert [source.fetch_states(52.0, 13.0, 53.0, 14.0) for _ in range(3)] == [_snapshot(1, []), _snapshot(2, []), None]
+
+    def test_drops_states_outside_the_box(self, tmp_path):
+        path = tmp_path / "recording.json"
+        path.write_text(json.dumps(_snapshot(1, [_state("inside", 52.5, 13.4), _state("outside", 48.1, 11.6), _state("nopos1", None, None)])))
+
+        [state] = OpenSkyReplaySource(path).fetch_states(52.0, 13.0, 53.0, 14.0)["states"]
+        assert state[0] == "inside"
+
+
+# ---------------------------------------------------------------------------
+# start_opensky_network_stream
+# ---------------------------------------------------------------------------
+
+
+class TestStartOpenSkyNetworkStream:
+    @pytest.fixture
+    def fake_clock(self, monkeypatch):
+        """Each heartbeat sleep moves the clock on 25 seconds, so the one-minute stream polls three times."""
+        clock = [flight_feed_task.arrow.get(1_775_001_600)]
+        monkeypatch.setattr(flight_feed_task.arrow, "now", lambda *args: clock[0])
+        monkeypatch.setattr(flight_feed_task.time, "sleep", lambda secs: clock.__setitem__(0, clock[0].shift(seconds=25)))
+
+    @pytest.fixture
+    def dispatched(self, monkeypatch):
+        batches = []
+        monkeypatch.setattr(flight_feed_task.bulk_write_incoming_air_traffic_data, "delay", lambda payload: batches.append(json.loads(payload)))
+        monkeypatch.setattr(flight_feed_task.write_incoming_air_traffic_data, "delay", lambda payload: pytest.fail("per-row dispatch"))
+        return batches
+
+    def test_replayed_polls_are_dispatched_in_chunks(self, tmp_path, monkeypatch, fake_clock, dispatched):
+        states = [_state(f"{i:06x}", 52.0 + i / 10000, 13.4) for i in range(2500)]
+        path = tmp_path / "recording.json"
+        path.write_text(json.dumps([_snapshot(1, states), _snapshot(2, [])]))
+        monkeypatch.setattr(settings, "OPENSKY_REPLAY_PATH", str(path))
+        monkeypatch.setattr(settings, "OPENSKY_INGEST_CHUNK_SIZE", 1000)
+
+        flight_feed_task.start_opensky_network_stream(view_port=json.dumps([13.0, 52.0, 14.0, 53.0]), session_id=SESSION_ID)
+
+        # Polls replay snapshot 1, the empty snapshot 2, then snapshot 1 again
+        assert [len(batch) for batch in dispatched] == [1000, 1000, 500] * 2
+        assert {o["session_id"] for batch in dispatched for o in batch} == {SESSION_ID}
+        assert dispatched[0][0]["icao_address"] == "000000"
@@ -5,6 +5,7 @@ Covers:
 - ``DeconflictionResult`` backward-compat alias (``IntersectionCheckResult``)
 - ``DeconflictionRequest`` defaults and field assignment
 - Plugin settings (new prefix, backward-compat fallback)
+- ``PluginInstanceRegistry`` keeping plugin instances and calling their lifecycle hooks
 """
 
 from datetime import datetime, timezone
@@ -18,6 +19,7 @@ from flight_blender.domain_types.plugin_protocols import (
     Volume4DGeneratorProtocol,
 )
 from flight_blender.plugins.loader import load_plugin
+from flight_blender.plugins.registry import PluginInstanceRegistry
 from flight_blender.domain_types.flight_declarations import (
     DeconflictionRequest,
     DeconflictionResult,
@@ -128,6 +130,86 @@ class LoadPluginTests(TestCase):
         self.assertEqual(info.misses, 0)
 
 
+# ---------------------------------------------------------------------------
+# PluginInstanceRegistry
+# ---------------------------------------------------------------------------
+
+
+class LifecyclePlugin:
+    """A plugin implementing every optional hook, recording the calls."""
+
+    fail_setup = False
+
+    def __init__(self, label: str = ""):
+        self.label = label
+        self.calls: list[str] = []
+
+    def setup(self):
+        if self.fail_setup:
+            raise RuntimeError("setup failed")
+        self.calls.append("setup")
+
+    def teardown(self):
+        self.calls.append("teardown")
+
+    def on_session_start(self, session_id):
+        self.calls.append(f"start:{session_id}")
+
+    def on_session_stop(self, session_id):
+        self.calls.append(f"stop:{session_id}")
+
+
+class PlainPlugin:
+    pass
+
+
+LIFECYCLE_PLUGIN = f"{__name__}.LifecyclePlugin"
+PLAIN_PLUGIN = f"{__name__}.PlainPlugin"
+
+
+class PluginInstanceRegistryTests(TestCase):
+    """Tests for flight_blender.plugins.registry.PluginInstanceRegistry."""
+
+    def setUp(self):
+        self.registry = PluginInstanceRegistry()
+
+    def test_instance_is_kept_per_path_and_scope(self):
+        first = self.registry.get(LIFECYCLE_PLUGIN, label="a")
+        self.assertIs(self.registry.get(LIFECYCLE_PLUGIN, label="ignored"), first)
+        self.assertEqual(first.label, "a")
+        self.assertIsNot(self.registry.get(LIFECYCLE_PLUGIN, scope="shard-1"), first)
+        self.assertIsInstance(self.registry.get(PLAIN_PLUGIN), PlainPlugin)
+
+    def test_setup_runs_once_and_teardown_forgets_instances(self):
+        plugin = self.registry.get(LIFECYCLE_PLUGIN)
+        self.registry.get(LIFECYCLE_PLUGIN)
+        self.registry.get(PLAIN_PLUGIN)
+        self.registry.teardown()
+
+        self.assertEqual(plugin.calls, ["setup", "teardown"])
+        self.assertIsNot(self.registry.get(LIFECYCLE_PLUGIN), plugin)
+
+    def test_failed_setup_is_retried(self):
+        LifecyclePlugin.fail_setup = True
+        try:
+            with self.assertRaises(RuntimeError):
+                self.registry.get(LIFECYCLE_PLUGIN)
+        finally:
+            LifecyclePlugin.fail_setup = False
+        self.assertEqual(self.registry.get(LIFECYCLE_PLUGIN).calls, ["setup"])
+
+    def test_session_hooks_reach_session_aware_instances(self):
+        plugin = self.registry.get(LIFECYCLE_PLUGIN)
+        self.registry.get(PLAIN_PLUGIN)
+        self.registry.start_session("session-1")
+        self.registry.stop_session("session-1")
+        self.assertEqual(plugin.calls, ["setup", "start:session-1", "stop:session-1"])
+
+    def test_protocol_mismatch_raises_type_error(self):
+        with self.assertRaises(TypeError):
+            self.registry.get(PLAIN_PLUGIN, expected_protocol=DeconflictionEngineProtocol)
+
+
 # ---------------------------------------------------------------------------
 # DeconflictionEngine protocol
 # ---------------------------------------------------------------------------
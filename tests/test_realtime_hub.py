@@ -0,0 +1,208 @@
+"""Tests for services/realtime_svc.py:
+- RealtimeSubscription (bounded queue, conflation to the latest messages)
+- RealtimeHub (one pub/sub connection, reference-counted channel subscriptions)
+- redis_pubsub_websocket under load from 1,000 simulated websocket clients
+- the pooled publisher in tasks/surveillance_task.py
+"""
+
+import asyncio
+import json
+
+import fakeredis
+import pytest
+
+from flight_blender.services import realtime_svc
+from flight_blender.services.realtime_svc import RealtimeHub, RealtimeSubscription
+from flight_blender.tasks import surveillance_task
+
+
+class _CountingRedisFactory:
+    def __init__(self, server: fakeredis.FakeServer):
+        self.server = server
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        return fakeredis.aioredis.FakeRedis(server=self.server, decode_responses=True)
+
+
+class _SimulatedWebSocket:
+    """Just enough of starlette's WebSocket for redis_pubsub_websocket."""
+
+    def __init__(self, send_delay_secs: float = 0.0):
+        self.received: list[str] = []
+        self.send_delay_secs = send_delay_secs
+        self._disconnected = asyncio.Event()
+        self._new_message = asyncio.Event()
+
+    async def accept(self):
+        pass
+
+    async def send_text(self, data: str):
+        if self.send_delay_secs:
+            await asyncio.sleep(self.send_delay_secs)
+        self.received.append(data)
+        self._new_message.set()
+
+    async def receive(self):
+        await self._disconnected.wait()
+        return {"type": "websocket.disconnect", "code": 1000}
+
+    def disconnect(self):
+        self._disconnected.set()
+
+    async def wait_for(self, data: str, timeout: float = 5.0):
+        async def _wait():
+            while not self.received or self.received[-1] != data:
+                self._new_message.clear()
+                await self._new_message.wait()
+
+        await asyncio.wait_for(_wait(), timeout)
+
+
+@pytest.fixture
+def redis_server():
+    return fakeredis.FakeServer()
+
+
+@pytest.fixture
+def publisher(redis_server):
+    return fakeredis.FakeRedis(server=redis_server, decode_responses=True)
+
+
+@pytest.fixture
+def redis_factory(redis_server):
+    return _CountingRedisFactory(redis_server)
+
+
+@pytest.fixture
+async def hub(redis_factory, monkeypatch):
+    hub = RealtimeHub(redis_factory=redis_factory, max_queued=4)
+    monkeypatch.setattr(realtime_svc, "realtime_hub", hub)
+    yield hub
+    await hub.close()
+
+
+async def _until(predicate, timeout: float = 5.0):
+    async def _wait():
+        while not predicate():
+            await asyncio.sleep(0.01)
+
+    await asyncio.wait_for(_wait(), timeout)
+
+
+# ---------------------------------------------------------------------------
+# RealtimeSubscription
+# ---------------------------------------------------------------------------
+
+
+class TestRealtimeSubscription:
+    def test_full_queue_conflates_to_latest_messages(self):
+        subscription = RealtimeSubscription("track_1", max_queued=2)
+        for i in range(5):
+            subscription.offer(str(i))
+        assert subscription.queue.qsize() == 2
+        assert subscription.dropped == 3
+        assert [subscription.queue.get_nowait(), subscription.queue.get_nowait()] == ["3", "4"]
+
+
+# ---------------------------------------------------------------------------
+# RealtimeHub
+# ---------------------------------------------------------------------------
+
+
+class TestRealtimeHub:
+    @pytest.mark.asyncio
+    async def test_channel_subscriptions_are_reference_counted(self, hub, publisher, redis_factory):
+        first = await hub.subscribe("track_1")
+        second = await hub.subscribe("track_1")
+        assert publisher.pubsub_numsub("track_1") == [("track_1", 1)]
+
+        await hub.unsubscribe(first)
+        assert hub.channels == {"track_1"}
+        assert publisher.pubsub_numsub("track_1") == [("track_1", 1)]
+
+        await hub.unsubscribe(second)
+        assert hub.channels == set()
+        await _until(lambda: publisher.pubsub_numsub("track_1") == [("track_1", 0)])
+        assert redis_factory.calls == 1
+
+    @pytest.mark.asyncio
+    async def test_messages_reach_only_their_channel(self, hub, publisher):
+        track = await hub.subscribe("track_1")
+        heartbeat = await hub.subscribe("heartbeat_1")
+        publisher.publish("track_1", "t")
+        assert await asyncio.wait_for(track.get(), 5) == "t"
+        assert heartbeat.queue.empty()
+
+    @pytest.mark.asyncio
+    async def test_unsubscribe_is_idempotent(self, hub):
+        subscription = await hub.subscribe("track_1")
+        await hub.unsubscribe(subscription)
+        await hub.unsubscribe(subscription)
+        assert hub.subscriber_count() == 0
+
+
+# ---------------------------------------------------------------------------
+# redis_pubsub_websocket
+# ---------------------------------------------------------------------------
+
+
+class TestRealtimeWebsocketLoad:
+    @pytest.mark.asyncio
+    async def test_thousand_clients_share_one_connection(self, hub, publisher, redis_factory):
+        channels = [f"track_session-{i}" for i in range(10)]
+        clients = [(channels[i % len(channels)], _SimulatedWebSocket()) for i in range(1000)]
+        handlers = [asyncio.create_task(realtime_svc.redis_pubsub_websocket(ws, channel)) for channel, ws in clients]
+        await _until(lambda: hub.subscriber_count() == 1000)
+
+        for tick in range(5):
+            for channel in channels:
+                publisher.publish(channel, json.dumps({"channel": channel, "tick": tick}))
+        await asyncio.gather(*(ws.wait_for(json.dumps({"channel": channel, "tick": 4})) for channel, ws in clients))
+
+        assert redis_factory.calls == 1
+        assert all(count == 1 for _channel, count in publisher.pubsub_numsub(*channels))
+
+        for _channel, ws in clients:
+            ws.disconnect()
+        await asyncio.wait_for(asyncio.gather(*handlers), 10)
+        assert hub.subscriber_count() == 0
+        await _until(lambda: all(count == 0 for _channel, count in publisher.pubsub_numsub(*channels)))
+
+    @pytest.mark.asyncio
+    async def test_slow_client_gets_latest_without_unbounded_queue(self, hub, publisher):
+        slow = _SimulatedWebSocket(send_delay_secs=0.05)
+        fast = _SimulatedWebSocket()
+        handlers = [
+            asyncio.create_task(realtime_svc.redis_pubsub_websocket(slow, "track_1")),
+            asyncio.create_task(realtime_svc.redis_pubsub_websocket(fast, "track_1")),
+        ]
+        await _until(lambda: hub.subscriber_count("track_1") == 2)
+
+        for i in range(50):
+            publisher.publish("track_1", str(i))
+            await fast.wait_for(str(i))
+        await slow.wait_for("49")
+
+        assert fast.received == [str(i) for i in range(50)]
+        assert len(slow.received) < 50
+        slow.disconnect()
+        fast.disconnect()
+        await asyncio.gather(*handlers)
+
+
+# ---------------------------------------------------------------------------
+# Pooled publisher
+# ---------------------------------------------------------------------------
+
+
+class TestRealtimePublisher:
+    def test_publishes_go_through_the_pubsub_pool(self, fakeredis_server):
+        assert surveillance_task._get_realtime_publisher() is fakeredis_server
+
+        pubsub = fakeredis_server.pubsub()
+        pubsub.subscribe("heartbeat_1")
+        surveillance_task._publish_realtime_message("heartbeat_1", {"ok": True})
+        messages = [m for m in iter(lambda: pubsub.get_message(timeout=0.1), None) if m["type"] == "message"]
+        assert [json.loads(m["data"]) for m in messages] == [{"ok": True}]
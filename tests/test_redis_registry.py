@@ -0,0 +1,162 @@
+"""Tests for the process-wide Redis pool registry in auth/token_cache.py:
+- connection count staying constant across 10,000 operations (sync, threaded and async)
+- separate pools for default commands, pub/sub and blocking stream reads
+- fork safety and async pools following the running event loop
+"""
+
+import asyncio
+import threading
+
+import fakeredis
+import fakeredis.aioredis
+import pytest
+import redis
+
+from flight_blender.auth.token_cache import DEFAULT_POOL, PUBSUB_POOL, STREAM_POOL, RedisConnectionRegistry
+
+_REAL_REDIS = redis.Redis
+
+OPERATIONS = 10_000
+
+
+@pytest.fixture
+def registry(monkeypatch):
+    # conftest swaps redis.Redis for the shared fakeredis; these tests need real clients on real pools.
+    monkeypatch.setattr(redis, "Redis", _REAL_REDIS)
+    server = fakeredis.FakeServer()
+    registry = RedisConnectionRegistry(
+        connection_kwargs={"connection_class": fakeredis.FakeRedisConnection, "server": server},
+        # fakeredis' async connection does not answer the health-check PING.
+        async_connection_kwargs={"connection_class": fakeredis.aioredis.FakeAsyncRedisConnection, "server": server, "health_check_interval": 0},
+    )
+    yield registry
+    registry.close()
+
+
+def _open_sync_connections(pool) -> int:
+    return len(pool._connections)
+
+
+def _open_async_connections(pool) -> int:
+    return len(pool._available_connections) + len(pool._in_use_connections)
+
+
+# ---------------------------------------------------------------------------
+# Connection reuse
+# ---------------------------------------------------------------------------
+
+
+class TestConnectionReuse:
+    def test_sync_connection_count_is_constant(self, registry):
+        for i in range(OPERATIONS):
+            r = registry.client()
+            r.set("counter", i)
+            assert r.get("counter") == str(i)
+        assert _open_sync_connections(registry.sync_pool()) == 1
+
+    def test_threads_share_a_bounded_pool(self, registry):
+        workers = 8
+        errors = []
+
+        def run():
+            try:
+                for _ in range(OPERATIONS // workers):
+                    registry.client().incr("counter")
+            except Exception as exc:  # pragma: no cover - surfaced through the assertion below
+                errors.append(exc)
+
+        threads = [threading.Thread(target=run) for _ in range(workers)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert errors == []
+        assert registry.client().get("counter") == str(OPERATIONS)
+        assert _open_sync_connections(registry.sync_pool()) <= workers
+
+    async def test_async_connection_count_is_constant(self, registry):
+        for i in range(OPERATIONS):
+            r = registry.async_client()
+            await r.set("counter", i)
+        assert await registry.async_client().get("counter") == str(OPERATIONS - 1)
+        assert _open_async_connections(registry.async_pool()) == 1
+        await registry.aclose()
+
+
+# ---------------------------------------------------------------------------
+# Pool layout
+# ---------------------------------------------------------------------------
+
+
+class TestPoolLayout:
+    def test_purposes_get_separate_pools(self, registry):
+        pools = {purpose: registry.sync_pool(purpose) for purpose in (DEFAULT_POOL, PUBSUB_POOL, STREAM_POOL)}
+        assert len({id(pool) for pool in pools.values()}) == 3
+        assert registry.client(STREAM_POOL).connection_pool is pools[STREAM_POOL]
+
+    def test_pools_are_blocking_with_health_checks(self, registry):
+        pool = registry.sync_pool()
+        assert isinstance(pool, redis.BlockingConnectionPool)
+        assert pool.connection_kwargs["health_check_interval"] > 0
+
+    def test_blocking_stream_reads_do_not_hold_default_connections(self, registry):
+        registry.client().xgroup_create("stream", "readers", id="0", mkstream=True)
+        registry.client(STREAM_POOL).xreadgroup("readers", "c1", {"stream": ">"}, count=1, block=10)
+        assert _open_sync_connections(registry.sync_pool(STREAM_POOL)) == 1
+        assert _open_sync_connections(registry.sync_pool(DEFAULT_POOL)) == 1
+
+
+# ---------------------------------------------------------------------------
+# Process and event loop ownership
+# ---------------------------------------------------------------------------
+
+
+class TestOwnership:
+    def test_forked_child_builds_its_own_pools(self, registry, monkeypatch):
+        registry.client().ping()
+        parent_pool = registry.sync_pool()
+
+        monkeypatch.setattr("flight_blender.auth.token_cache.os.getpid", lambda: -1)
+        child_pool = registry.sync_pool()
+
+        assert child_pool is not parent_pool
+        assert _open_sync_connections(parent_pool) == 1
+
+    def test_async_pool_follows_the_running_loop(self, registry):
+        async def current_pool():
+            return registry.async_pool()
+
+        first = asyncio.run(current_pool())
+        second = asyncio.run(current_pool())
+        assert first is not second
+
+    def test_replaced_async_pool_is_disconnected_on_its_loop(self, registry):
+        old_loop = asyncio.new_event_loop()
+        thread = threading.Thread(target=old_loop.run_forever, daemon=True)
+        thread.start()
+
+        async def pool_in_use():
+            await registry.async_client().ping()
+            return registry.async_pool()
+
+        async def current_pool():
+            return registry.async_pool()
+
+        try:
+            old_pool = asyncio.run_coroutine_threadsafe(pool_in_use(), old_loop).result(timeout=5)
+            assert any(connection.is_connected for connection in old_pool._available_connections)
+
+            assert asyncio.run(current_pool()) is not old_pool
+            # Let the old loop run the disconnect scheduled on it
+            asyncio.run_coroutine_threadsafe(asyncio.sleep(0.05), old_loop).result(timeout=5)
+
+            assert not any(connection.is_connected for connection in old_pool._available_connections)
+        finally:
+            old_loop.call_soon_threadsafe(old_loop.stop)
+            thread.join()
+            old_loop.close()
+
+    async def test_async_pool_is_shared_within_a_loop(self, registry):
+        assert registry.async_pool() is registry.async_pool()
+        assert registry.async_client().connection_pool is registry.async_client().connection_pool
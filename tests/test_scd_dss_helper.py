@@ -9,17 +9,24 @@ Covers the pure-logic classes that do not require a live DSS:
   - OperationalIntentReferenceHelper.parse_volume_to_volume4D
   - OperationalIntentReferenceHelper.parse_operational_intent_details
   - OperationalIntentReferenceHelper.parse_operational_intent_reference_from_dss
+  - SCDOperations.get_nearby_operational_intents (against an httpx mock transport)
 """
 
+import asyncio
+from contextlib import asynccontextmanager
+
 import arrow
+import httpx
 import pytest
 
 from flight_blender.config import settings
+import flight_blender.clients.dss_scd_client as dss_scd_client
 from flight_blender.clients.dss_scd_client import (
     FlightPlanningDataValidator,
     OperationalIntentReferenceHelper,
     OperationalIntentValidator,
     PeerOperationalIntentValidator,
+    SCDOperations,
     VolumesConverter,
     VolumesValidator,
 )
@@ -486,3 +493,133 @@ class TestOperationalIntentReferenceHelperParsing:
         assert ref.id == "ref-001"
         assert ref.version == 3
         assert ref.state == "Accepted"
+
+
+# ---------------------------------------------------------------------------
+# SCDOperations.get_nearby_operational_intents
+# ---------------------------------------------------------------------------
+
+DSS_BASE_URL = "http://dss.example/"
+PEER_BASE_URL = "http://peer.example"
+
+
+def _peer_volume() -> dict:
+    now = arrow.utcnow()
+    return {
+        "volume": {
+            "outline_polygon": {"vertices": [{"lat": 46.9, "lng": 7.4}, {"lat": 46.9, "lng": 7.5}, {"lat": 47.0, "lng": 7.5}]},
+            "altitude_lower": {"value": 0, "reference": "W84", "units": "M"},
+            "altitude_upper": {"value": 120, "reference": "W84", "units": "M"},
+        },
+        "time_start": {"format": "RFC3339", "value": now.isoformat()},
+        "time_end": {"format": "RFC3339", "value": now.shift(hours=1).isoformat()},
+    }
+
+
+def _dss_reference(ref_id: str, uss_base_url: str = PEER_BASE_URL) -> dict:
+    now = arrow.utcnow()
+    return {
+        "id": ref_id,
+        "manager": "peer",
+        "uss_availability": "Normal",
+        "version": 1,
+        "state": "Accepted",
+        "ovn": f"ovn-{ref_id}",
+        "time_start": {"format": "RFC3339", "value": now.isoformat()},
+        "time_end": {"format": "RFC3339", "value": now.shift(hours=1).isoformat()},
+        "uss_base_url": uss_base_url,
+        "subscription_id": "sub-1",
+    }
+
+
+class _MockUSSNetwork:
+    """httpx handler playing both the DSS and a peer USS, recording request counts and peer concurrency."""
+
+    def __init__(self, references: dict[str, dict], peer_delay: float = 0.0):
+        self.references = references
+        self.peer_delay = peer_delay
+        self.calls: dict[str, int] = {"query": 0, "dss_get": 0, "peer_get": 0}
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def __call__(self, request: httpx.Request) -> httpx.Response:
+        path = request.url.path
+        if path.endswith("/operational_intent_references/query"):
+            self.calls["query"] += 1
+            return httpx.Response(200, json={"operational_intent_references": list(self.references.values())})
+        ref_id = path.rsplit("/", 1)[-1]
+        if "/dss/v1/operational_intent_references/" in path:
+            self.calls["dss_get"] += 1
+            return httpx.Response(200, json={"operational_intent_reference": self.references[ref_id]})
+        self.calls["peer_get"] += 1
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(self.peer_delay)
+        finally:
+            self.in_flight -= 1
+        details = {"volumes": [_peer_volume()], "off_nominal_volumes": [], "priority": 0}
+        return httpx.Response(200, json={"operational_intent": {"reference": self.references[ref_id], "details": details}})
+
+
+def _scd_operations(network: _MockUSSNetwork) -> SCDOperations:
+    ops = SCDOperations(http_transport=httpx.MockTransport(network))
+    ops.dss_base_url = DSS_BASE_URL
+    ops.get_auth_token = lambda audience="": {"access_token": "token"}
+    return ops
+
+
+class TestGetNearbyOperationalIntents:
+    @pytest.mark.asyncio
+    async def test_references_shared_by_volumes_are_fetched_once(self):
+        network = _MockUSSNetwork({f"ref-{i}": _dss_reference(f"ref-{i}") for i in range(3)})
+        ops = _scd_operations(network)
+        volumes = [_make_volume4d(), _make_volume4d(minutes_ahead=10)]
+
+        result = await ops.get_nearby_operational_intents(volumes=volumes)
+
+        assert [r.reference.id for r in result] == ["ref-0", "ref-1", "ref-2"]
+        assert network.calls == {"query": 2, "dss_get": 3, "peer_get": 3}
+
+    @pytest.mark.asyncio
+    async def test_peer_requests_respect_per_host_limit(self, monkeypatch):
+        monkeypatch.setattr(settings, "SCD_PEER_MAX_CONCURRENCY_PER_HOST", 2)
+        network = _MockUSSNetwork({f"ref-{i}": _dss_reference(f"ref-{i}") for i in range(6)}, peer_delay=0.02)
+        result = await _scd_operations(network).get_nearby_operational_intents(volumes=[_make_volume4d()])
+        assert len(result) == 6
+        assert network.max_in_flight == 2
+
+    @pytest.mark.asyncio
+    async def test_peer_over_deadline_raises_connection_error(self, monkeypatch):
+        monkeypatch.setattr(settings, "SCD_PEER_REQUEST_DEADLINE_SECS", 0.05)
+        network = _MockUSSNetwork({"ref-0": _dss_reference("ref-0")}, peer_delay=1.0)
+        with pytest.raises(ConnectionError):
+            await _scd_operations(network).get_nearby_operational_intents(volumes=[_make_volume4d()])
+
+    @pytest.mark.asyncio
+    async def test_own_operational_intents_resolved_in_one_session(self, monkeypatch):
+        monkeypatch.setattr(settings, "FLIGHTBLENDER_FQDN", "http://flight-blender.example")
+        own_ids = [f"00000000-0000-0000-0000-00000000000{i}" for i in range(3)]
+        network = _MockUSSNetwork({ref_id: _dss_reference(ref_id, "http://flight-blender.example") for ref_id in own_ids})
+        sessions = []
+
+        @asynccontextmanager
+        async def _session():
+            sessions.append(object())
+            yield sessions[-1]
+
+        class _Repo:
+            def __init__(self, db):
+                pass
+
+            async def get_opint_reference_by_id(self, ref_id):
+                return None
+
+        monkeypatch.setattr(dss_scd_client, "async_task_session", _session)
+        monkeypatch.setattr(dss_scd_client, "SQLAlchemyFlightDeclarationRepository", _Repo)
+
+        result = await _scd_operations(network).get_nearby_operational_intents(volumes=[_make_volume4d()])
+
+        assert result == []
+        assert len(sessions) == 1
+        assert network.calls["peer_get"] == 0
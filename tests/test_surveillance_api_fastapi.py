@@ -99,6 +99,22 @@ class TestSurveillanceSessionFastAPI:
         )
         assert resp.status_code == 422
 
+    def test_start_session_with_subscription(self, fastapi_client):
+        resp = fastapi_client.put(
+            f"/surveillance_monitoring_ops/start_stop_surveillance_heartbeat_track/{uuid.uuid4()}",
+            json={"action": "start", "area_of_interest": [46.5, 7.0, 47.5, 8.0], "update_interval_secs": 2, "traffic_sources": [0, 1]},
+            headers=_auth(WRITE_SCOPE),
+        )
+        assert resp.status_code == 200
+
+    def test_start_session_with_inverted_area_of_interest(self, fastapi_client):
+        resp = fastapi_client.put(
+            f"/surveillance_monitoring_ops/start_stop_surveillance_heartbeat_track/{uuid.uuid4()}",
+            json={"action": "start", "area_of_interest": [47.5, 7.0, 46.5, 8.0]},
+            headers=_auth(WRITE_SCOPE),
+        )
+        assert resp.status_code == 422
+
 
 class TestServiceMetricsFastAPI:
     def test_service_metrics_unauthenticated(self, fastapi_client):
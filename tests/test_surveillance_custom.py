@@ -1,12 +1,14 @@
 """Tests for flight_blender.surveillance custom_utils, custom_signals, and utils."""
 
+import warnings
 from dataclasses import asdict
 from unittest.mock import MagicMock
 
+import arrow
 import pytest
 
 from flight_blender.domain_types.flight_feed import SingleAirtrafficObservation
-from flight_blender.domain_types.surveillance import ActiveTrack
+from flight_blender.domain_types.surveillance import ActiveTrack, LatLangAltPoint
 from flight_blender.services.surveillance_svc import SpecializedTrafficDataFuser, TrafficDataFuser
 
 
@@ -62,55 +64,121 @@ class TestTrafficDataFuserInstantiation:
         result = fuser._fuse_raw_observations()
         assert result == [obs]
 
-    def test_generate_active_tracks_new_track(self):
-        obs = SingleAirtrafficObservation(
-            icao_address="AABBCC",
-            traffic_source=1,
-            source_type=0,
-            lat_dd=51.5,
-            lon_dd=-0.1,
-            altitude_mm=100.0,
-            timestamp=0,
-            metadata={},
-        )
+    def test_generate_active_tracks_groups_observations_by_icao(self):
+        obs = [
+            SingleAirtrafficObservation(
+                icao_address=icao,
+                traffic_source=1,
+                source_type=0,
+                lat_dd=51.5,
+                lon_dd=-0.1,
+                altitude_mm=100.0,
+                timestamp=ts,
+                metadata={},
+            )
+            for icao, ts in (("AABBCC", 0), ("DDEEFF", 0), ("AABBCC", 1))
+        ]
 
         mock_redis = MagicMock()
-        mock_redis.check_active_track_exists.return_value = False
 
         fuser = TrafficDataFuser(
             session_id="test-session",
-            raw_observations=[obs],
+            raw_observations=obs,
             track_store=mock_redis,
         )
-        fuser._generate_active_tracks([obs])
-        mock_redis.add_active_track_to_session.assert_called_once()
-
-    def test_generate_active_tracks_existing_track(self):
-        obs = SingleAirtrafficObservation(
-            icao_address="AABBCC",
-            traffic_source=1,
-            source_type=0,
-            lat_dd=51.5,
-            lon_dd=-0.1,
-            altitude_mm=100.0,
-            timestamp=0,
-            metadata={},
+        fuser._generate_active_tracks(obs)
+        mock_redis.append_active_track_observations.assert_called_once_with(
+            session_id="test-session",
+            observations_by_track={
+                "AABBCC": [asdict(obs[0]), asdict(obs[2])],
+                "DDEEFF": [asdict(obs[1])],
+            },
         )
 
-        existing_track = ActiveTrack(
+    def test_generate_active_tracks_keeps_bounded_history(self, fakeredis_server):
+        from flight_blender.clients.redis_client import ACTIVE_TRACK_MAX_OBSERVATIONS, RedisStreamOperations
+
+        track_store = RedisStreamOperations()
+        for tick in range(ACTIVE_TRACK_MAX_OBSERVATIONS + 5):
+            obs = SingleAirtrafficObservation(
+                icao_address="AABBCC",
+                traffic_source=1,
+                source_type=0,
+                lat_dd=51.5,
+                lon_dd=-0.1,
+                altitude_mm=100.0,
+                timestamp=tick,
+                metadata={},
+            )
+            fuser = TrafficDataFuser(session_id="test-session", raw_observations=[obs], track_store=track_store)
+            fuser._generate_active_tracks([obs])
+
+        (track,) = track_store.get_all_active_tracks_in_session("test-session")
+        assert len(track.observations) == ACTIVE_TRACK_MAX_OBSERVATIONS
+        assert track.observations[-1]["timestamp"] == ACTIVE_TRACK_MAX_OBSERVATIONS + 4
+
+
+class TestTrackMessageKinematics:
+    @staticmethod
+    def _track(icao: str, fixes: list[tuple[float, float, float, int]]) -> ActiveTrack:
+        return ActiveTrack(
             session_id="test-session",
-            unique_aircraft_identifier="AABBCC",
+            unique_aircraft_identifier=icao,
             last_updated_timestamp="2026-01-01T00:00:00Z",
-            observations=[asdict(obs)],
+            observations=[
+                asdict(
+                    SingleAirtrafficObservation(
+                        icao_address=icao,
+                        traffic_source=1,
+                        source_type=0,
+                        lat_dd=lat,
+                        lon_dd=lon,
+                        altitude_mm=alt_mm,
+                        timestamp=ts,
+                        metadata={},
+                    )
+                )
+                for lat, lon, alt_mm, ts in fixes
+            ],
         )
-        mock_redis = MagicMock()
-        mock_redis.check_active_track_exists.return_value = True
-        mock_redis.get_active_track.return_value = existing_track
 
-        fuser = TrafficDataFuser(
-            session_id="test-session",
-            raw_observations=[obs],
-            track_store=mock_redis,
-        )
-        fuser._generate_active_tracks([obs])
-        mock_redis.update_active_track.assert_called_once()
+    def test_columnar_path_matches_scalar_calculation(self):
+        fuser = TrafficDataFuser(session_id="test-session", raw_observations=[], track_store=MagicMock())
+        tracks = [
+            self._track("AAA111", [(46.97, 7.47, 100000.0, 1700000000), (46.9705, 7.4712, 106000.0, 1700000002)]),
+            self._track("BBB222", [(51.50, -0.10, 50000.0, 1700000000000), (51.4990, -0.1010, 40000.0, 1700000004000)]),
+            self._track("CCC333", [(10.0, 20.0, 0.0, 1700000000)]),
+        ]
+        messages = fuser._generate_track_messages_impl(tracks)
+
+        assert [m.unique_aircraft_identifier for m in messages] == ["AAA111", "BBB222", "CCC333"]
+        for track, message in zip(tracks, messages):
+            previous, latest = track.observations[-2:] if len(track.observations) > 1 else track.observations * 2
+            delta_secs = (arrow.get(latest["timestamp"]) - arrow.get(previous["timestamp"])).total_seconds()
+            speed, bearing, vertical_speed = fuser._generate_flight_speed_bearing(
+                adjacent_points=[
+                    LatLangAltPoint(lat=previous["lat_dd"], lng=-previous["lon_dd"], alt=previous["altitude_mm"] / 1000.0),
+                    LatLangAltPoint(lat=latest["lat_dd"], lng=-latest["lon_dd"], alt=latest["altitude_mm"] / 1000.0),
+                ],
+                delta_time_secs=delta_secs,
+            )
+            assert message.state.speed == pytest.approx(speed)
+            assert message.state.track == pytest.approx(bearing)
+            assert message.state.vertical_speed == pytest.approx(vertical_speed)
+            assert message.state.position.lat == latest["lat_dd"]
+            assert message.state.position.lng == -latest["lon_dd"]
+
+    def test_single_track(self):
+        fuser = TrafficDataFuser(session_id="test-session", raw_observations=[], track_store=MagicMock())
+        track = self._track("AAA111", [(46.97, 7.47, 100000.0, 1700000000), (46.9705, 7.4712, 106000.0, 1700000002)])
+
+        with warnings.catch_warnings():
+            warnings.simplefilter("error", DeprecationWarning)
+            [message] = fuser._generate_track_messages_impl([track])
+
+        assert message.state.speed > 0
+        assert message.state.vertical_speed == pytest.approx(3.0)
+
+    def test_tracks_without_observations_are_skipped(self):
+        fuser = TrafficDataFuser(session_id="test-session", raw_observations=[], track_store=MagicMock())
+        assert fuser._generate_track_messages_impl([self._track("EMPTY", [])]) == []
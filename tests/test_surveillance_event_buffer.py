@@ -0,0 +1,216 @@
+"""Tests for the surveillance event buffer and sensor registry in services/surveillance_svc.py:
+- heartbeat and track events written in batches on size and age, and on stop
+- write-through behaviour before start, unknown sessions, and the bounded queue when writes fail
+- the active sensor cache, its once-per-TTL version check and the write-through invalidation shared through Redis
+"""
+
+import asyncio
+import uuid
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import func, select
+
+from flight_blender.db.session import async_task_session
+from flight_blender.models.surveillance_orm import (
+    SurveillanceHeartbeatEventORM,
+    SurveillanceSensorORM,
+    SurveillanceSessionORM,
+    SurveillanceTrackEventORM,
+)
+from flight_blender.services import surveillance_svc
+from flight_blender.services.surveillance_svc import SurveillanceEventBuffer, SurveillanceSensorRegistry
+
+
+@pytest.fixture
+async def session_id():
+    session_id = uuid.uuid4()
+    async with async_task_session() as db:
+        db.add(SurveillanceSessionORM(id=session_id, valid_until=datetime.now(timezone.utc) + timedelta(hours=1)))
+    return session_id
+
+
+async def _event_counts(session_id: uuid.UUID) -> tuple[int, int]:
+    async with async_task_session() as db:
+        heartbeats = await db.scalar(select(func.count()).where(SurveillanceHeartbeatEventORM.session_id == session_id))
+        tracks = await db.scalar(select(func.count()).where(SurveillanceTrackEventORM.session_id == session_id))
+    return heartbeats, tracks
+
+
+async def _record(buffer: SurveillanceEventBuffer, session_id: uuid.UUID, heartbeats: int, tracks: int = 0) -> None:
+    now = datetime.now(timezone.utc)
+    for _ in range(heartbeats):
+        await buffer.record_heartbeat_event(session_id=session_id, expected_at=now, delivered_on_time=True)
+    for _ in range(tracks):
+        await buffer.record_track_event(session_id=session_id, expected_at=now, had_active_tracks=False)
+
+
+# ---------------------------------------------------------------------------
+# Event buffer
+# ---------------------------------------------------------------------------
+
+
+class TestSurveillanceEventBuffer:
+    async def test_events_are_written_once_the_batch_is_full(self, session_id):
+        buffer = SurveillanceEventBuffer(flush_size=5, flush_interval_secs=60)
+        await buffer.start()
+        try:
+            await _record(buffer, session_id, heartbeats=3, tracks=1)
+            assert len(buffer) == 4
+            assert await _event_counts(session_id) == (0, 0)
+
+            await _record(buffer, session_id, heartbeats=0, tracks=1)
+            assert len(buffer) == 0
+            assert await _event_counts(session_id) == (3, 2)
+        finally:
+            await buffer.stop()
+
+    async def test_events_older_than_the_interval_are_written(self, session_id):
+        buffer = SurveillanceEventBuffer(flush_size=100, flush_interval_secs=0.05)
+        await buffer.start()
+        try:
+            await _record(buffer, session_id, heartbeats=2)
+            assert await _event_counts(session_id) == (0, 0)
+
+            await asyncio.sleep(0.2)
+            assert await _event_counts(session_id) == (2, 0)
+        finally:
+            await buffer.stop()
+
+    async def test_stop_writes_what_is_left(self, session_id):
+        buffer = SurveillanceEventBuffer(flush_size=100, flush_interval_secs=60)
+        await buffer.start()
+        await _record(buffer, session_id, heartbeats=1, tracks=1)
+
+        await buffer.stop()
+
+        assert not buffer.is_started
+        assert await _event_counts(session_id) == (1, 1)
+
+    async def test_writes_through_until_started(self, session_id):
+        buffer = SurveillanceEventBuffer(flush_size=100, flush_interval_secs=60)
+
+        await _record(buffer, session_id, heartbeats=1)
+
+        assert len(buffer) == 0
+        assert await _event_counts(session_id) == (1, 0)
+
+    async def test_dispatch_time_is_taken_when_the_event_is_recorded(self, session_id):
+        buffer = SurveillanceEventBuffer(flush_size=100, flush_interval_secs=60)
+        await buffer.start()
+        before = datetime.now(timezone.utc)
+        await _record(buffer, session_id, heartbeats=1)
+        after = datetime.now(timezone.utc)
+        await asyncio.sleep(0.05)
+        await buffer.stop()
+
+        async with async_task_session() as db:
+            dispatched_at = await db.scalar(
+                select(SurveillanceHeartbeatEventORM.dispatched_at).where(SurveillanceHeartbeatEventORM.session_id == session_id)
+            )
+        assert before <= dispatched_at.replace(tzinfo=timezone.utc) <= after
+
+    async def test_events_of_unknown_sessions_are_dropped(self, session_id):
+        unknown = uuid.uuid4()
+        buffer = SurveillanceEventBuffer(flush_size=100, flush_interval_secs=60)
+        await buffer.start()
+        await _record(buffer, session_id, heartbeats=1)
+        await _record(buffer, unknown, heartbeats=1, tracks=1)
+
+        assert await buffer.flush() == 1
+        await buffer.stop()
+        assert await _event_counts(session_id) == (1, 0)
+        assert await _event_counts(unknown) == (0, 0)
+
+    async def test_failed_writes_are_kept_up_to_the_queue_bound(self, session_id, monkeypatch):
+        async def failing_write(self, heartbeat_events, track_events):
+            raise ConnectionError("database unavailable")
+
+        monkeypatch.setattr(surveillance_svc.SQLAlchemySurveillanceRepository, "record_surveillance_events", failing_write)
+        buffer = SurveillanceEventBuffer(flush_size=2, flush_interval_secs=60, max_queued=3)
+        await buffer.start()
+        try:
+            await _record(buffer, session_id, heartbeats=5)
+            assert (len(buffer), buffer.dropped) == (3, 2)
+        finally:
+            monkeypatch.undo()
+            await buffer.stop()
+
+        assert await _event_counts(session_id) == (3, 0)
+
+
+# ---------------------------------------------------------------------------
+# Sensor registry
+# ---------------------------------------------------------------------------
+
+
+class TestSurveillanceSensorRegistry:
+    @pytest.fixture
+    def repo_calls(self, monkeypatch):
+        calls = []
+        original = surveillance_svc.SQLAlchemySurveillanceRepository.get_active_surveillance_sensors
+
+        async def counting(self):
+            calls.append(1)
+            return await original(self)
+
+        monkeypatch.setattr(surveillance_svc.SQLAlchemySurveillanceRepository, "get_active_surveillance_sensors", counting)
+        return calls
+
+    @pytest.fixture
+    def redis_gets(self, monkeypatch):
+        gets = []
+        redis = surveillance_svc.get_async_redis()
+        original = redis.get
+
+        async def counting(*args, **kwargs):
+            gets.append(args)
+            return await original(*args, **kwargs)
+
+        monkeypatch.setattr(redis, "get", counting)
+        return gets
+
+    async def test_sensors_are_loaded_once(self, repo_calls, redis_gets):
+        identifier = f"registry-{uuid.uuid4()}"
+        async with async_task_session() as db:
+            db.add(SurveillanceSensorORM(sensor_identifier=identifier, expected_latency_ms=250, horizontal_accuracy_m=7.5))
+        registry = SurveillanceSensorRegistry(ttl_secs=60)
+
+        first = await registry.get_active_sensors()
+        second = await registry.get_active_sensors()
+
+        assert first is second
+        assert len(repo_calls) == 1
+        # The version is only read when the cache is empty or its window has passed
+        assert len(redis_gets) == 1
+        [sensor] = [s for s in first if s.sensor_identifier == identifier]
+        assert (sensor.expected_latency_ms, sensor.horizontal_accuracy_m) == (250, 7.5)
+
+    async def test_expired_entries_are_kept_while_the_version_is_unchanged(self, repo_calls, redis_gets):
+        registry = SurveillanceSensorRegistry(ttl_secs=0)
+
+        await registry.get_active_sensors()
+        await registry.get_active_sensors()
+
+        assert len(repo_calls) == 1
+        assert len(redis_gets) == 2
+
+    async def test_invalidation_reaches_other_processes(self, repo_calls):
+        writer = SurveillanceSensorRegistry(ttl_secs=60)
+        reader = SurveillanceSensorRegistry(ttl_secs=0)
+        await reader.get_active_sensors()
+
+        await writer.invalidate()
+        await reader.get_active_sensors()
+        await reader.get_active_sensors()
+
+        assert len(repo_calls) == 2
+
+    async def test_invalidation_reloads_this_process_at_once(self, repo_calls):
+        registry = SurveillanceSensorRegistry(ttl_secs=60)
+        await registry.get_active_sensors()
+
+        await registry.invalidate()
+        await registry.get_active_sensors()
+
+        assert len(repo_calls) == 2
@@ -0,0 +1,206 @@
+"""Tests for the shared surveillance fusion in services/surveillance_svc.py and tasks/surveillance_task.py:
+- selecting a subscription's tracks from one generation of the track picture
+- the fusion pipeline draining the air traffic stream once into the picture, with one fuser kept between cycles
+- the per-process picture cache fetching each generation once
+- concurrent sessions receiving their own views of tracks fused once
+- scheduling a session's subscription next to the shared fusion job
+"""
+
+import json
+import time
+import uuid
+from dataclasses import asdict
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from flight_blender.clients.redis_client import RedisStreamOperations
+from flight_blender.config import settings
+from flight_blender.domain_types.flight_feed import SingleAirtrafficObservation
+from flight_blender.domain_types.surveillance import SurveillanceSubscription
+from flight_blender.plugins.registry import PluginInstanceRegistry
+from flight_blender.services import surveillance_svc
+from flight_blender.services.surveillance_svc import (
+    SURVEILLANCE_TRACK_PICTURE_GENERATION_KEY,
+    SURVEILLANCE_TRACK_PICTURE_KEY,
+    FusedTrackPicture,
+    SurveillanceFusionPipeline,
+    SurveillanceTrackPictureCache,
+)
+from flight_blender.tasks import surveillance_task
+from flight_blender.tasks.scheduler import TaskSchedulerService
+from flight_blender.tasks.tick_jobs import JOBS_KEY, TickJobSpec
+
+FUSER = "flight_blender.services.surveillance_svc.TrafficDataFuser"
+
+
+def _track(identifier: str) -> dict:
+    return {"unique_aircraft_identifier": identifier}
+
+
+def _picture(generation: int = 1) -> FusedTrackPicture:
+    # AAA and BBB are 1090ES tracks in and north of the Bern area, CCC a UAT track in it, DDD has no known position
+    return FusedTrackPicture(
+        generation=generation,
+        tracks=[_track("AAA"), _track("BBB"), _track("CCC"), _track("DDD")],
+        positions=[[46.9, 7.4], [48.1, 7.4], [46.95, 7.45], None],
+        traffic_sources=[0, 0, 1, None],
+    )
+
+
+def _identifiers(picture: FusedTrackPicture, subscription: SurveillanceSubscription) -> list[str]:
+    return [track["unique_aircraft_identifier"] for track in json.loads(picture.payload(picture.select(subscription)))]
+
+
+def _add_observation(icao_address: str, lat_dd: float, lon_dd: float, traffic_source: int = 0) -> None:
+    observation = SingleAirtrafficObservation(
+        lat_dd=lat_dd,
+        lon_dd=lon_dd,
+        altitude_mm=1_000_000.0,
+        traffic_source=traffic_source,
+        source_type=1,
+        icao_address=icao_address,
+        timestamp=int(time.time()),
+        session_id="",
+    )
+    RedisStreamOperations().add_air_traffic_data("air_traffic_stream", asdict(observation))
+
+
+@pytest.fixture
+def default_fuser(monkeypatch):
+    monkeypatch.setattr(settings, "FLIGHT_BLENDER_PLUGIN_TRAFFIC_DATA_FUSER", FUSER)
+
+
+# ---------------------------------------------------------------------------
+# FusedTrackPicture
+# ---------------------------------------------------------------------------
+
+
+class TestFusedTrackPicture:
+    def test_no_filter_selects_every_track(self):
+        assert _identifiers(_picture(), SurveillanceSubscription()) == ["AAA", "BBB", "CCC", "DDD"]
+
+    def test_area_of_interest_selects_located_tracks_inside(self):
+        subscription = SurveillanceSubscription(area_of_interest=(46.5, 7.0, 47.5, 8.0))
+        assert _identifiers(_picture(), subscription) == ["AAA", "CCC"]
+
+    def test_traffic_sources_filter(self):
+        assert _identifiers(_picture(), SurveillanceSubscription(traffic_sources=(1,))) == ["CCC"]
+        subscription = SurveillanceSubscription(area_of_interest=(46.5, 7.0, 48.5, 8.0), traffic_sources=(0,))
+        assert _identifiers(_picture(), subscription) == ["AAA", "BBB"]
+
+    def test_empty_picture(self):
+        picture = FusedTrackPicture(generation=1, tracks=[], positions=[], traffic_sources=[])
+        assert picture.payload(picture.select(SurveillanceSubscription(area_of_interest=(46.5, 7.0, 47.5, 8.0)))) == "[]"
+
+
+# ---------------------------------------------------------------------------
+# SurveillanceFusionPipeline and SurveillanceTrackPictureCache
+# ---------------------------------------------------------------------------
+
+
+class TestSurveillanceFusionPipeline:
+    def test_run_fuses_the_stream_into_the_picture(self, fakeredis_server, default_fuser):
+        _add_observation("AAA", 46.9, 7.4, traffic_source=0)
+        _add_observation("BBB", 48.1, 7.4, traffic_source=1)
+
+        assert SurveillanceFusionPipeline().run() == 2
+
+        picture = FusedTrackPicture.from_json(fakeredis_server.get(SURVEILLANCE_TRACK_PICTURE_KEY))
+        assert picture.generation == int(fakeredis_server.get(SURVEILLANCE_TRACK_PICTURE_GENERATION_KEY))
+        assert sorted(_identifiers(picture, SurveillanceSubscription())) == ["AAA", "BBB"]
+        assert _identifiers(picture, SurveillanceSubscription(traffic_sources=(1,))) == ["BBB"]
+        assert fakeredis_server.xpending("air_traffic_stream", "air_traffic_readers")["pending"] == 0
+
+    def test_tracks_keep_their_last_position_between_cycles(self, fakeredis_server, default_fuser):
+        _add_observation("AAA", 46.9, 7.4)
+        pipeline = SurveillanceFusionPipeline()
+        pipeline.run()
+        pipeline.run()
+
+        picture = FusedTrackPicture.from_json(fakeredis_server.get(SURVEILLANCE_TRACK_PICTURE_KEY))
+        assert _identifiers(picture, SurveillanceSubscription(area_of_interest=(46.5, 7.0, 47.5, 8.0))) == ["AAA"]
+
+    def test_default_fuser_is_kept_between_cycles(self, fakeredis_server, default_fuser, monkeypatch):
+        monkeypatch.setattr(surveillance_svc, "plugin_instances", PluginInstanceRegistry())
+        pipeline = SurveillanceFusionPipeline()
+        with patch.object(surveillance_svc, "Geod", wraps=surveillance_svc.Geod) as geod:
+            _add_observation("AAA", 46.9, 7.4)
+            pipeline.run()
+            _add_observation("BBB", 48.1, 7.4)
+            assert pipeline.run() == 2
+        geod.assert_called_once()
+
+    def test_run_if_due_runs_once_per_interval(self, fakeredis_server, monkeypatch):
+        monkeypatch.setattr(settings, "SURVEILLANCE_FUSION_INTERVAL_SECS", 60.0)
+        pipeline = SurveillanceFusionPipeline()
+        with patch.object(pipeline, "run", return_value=0) as run:
+            assert pipeline.run_if_due() == 0
+            assert pipeline.run_if_due() is None
+        run.assert_called_once()
+
+
+class TestSurveillanceTrackPictureCache:
+    def test_fetches_each_generation_once(self, fakeredis_server):
+        fakeredis_server.set(SURVEILLANCE_TRACK_PICTURE_GENERATION_KEY, 1)
+        fakeredis_server.set(SURVEILLANCE_TRACK_PICTURE_KEY, json.dumps({"generation": 1, "tracks": [_track("AAA")], "positions": [None], "traffic_sources": [0]}))
+        cache = SurveillanceTrackPictureCache()
+
+        first = cache.get()
+        fakeredis_server.delete(SURVEILLANCE_TRACK_PICTURE_KEY)
+        [part] = cache.get().parts
+        assert part is first.parts[0]
+        assert len(first) == 1
+
+    def test_empty_once_the_generation_expires(self, fakeredis_server):
+        assert len(SurveillanceTrackPictureCache().get()) == 0
+
+
+# ---------------------------------------------------------------------------
+# Session views
+# ---------------------------------------------------------------------------
+
+
+class TestSessionViews:
+    async def test_sessions_share_one_fusion(self, fakeredis_server, default_fuser, monkeypatch):
+        monkeypatch.setattr(surveillance_task, "surveillance_fusion_pipeline", SurveillanceFusionPipeline())
+        monkeypatch.setattr(surveillance_task, "surveillance_track_picture", SurveillanceTrackPictureCache())
+        monkeypatch.setattr(surveillance_task, "surveillance_event_buffer", MagicMock(record_track_event=AsyncMock()))
+        publisher = MagicMock()
+        monkeypatch.setattr(surveillance_task, "_get_realtime_publisher", lambda: publisher)
+        _add_observation("AAA", 46.9, 7.4)
+        _add_observation("BBB", 48.1, 7.4)
+        bern, zurich = str(uuid.uuid4()), str(uuid.uuid4())
+
+        with patch.object(surveillance_svc, "load_plugin", wraps=surveillance_svc.load_plugin) as load_plugin:
+            await surveillance_task._async_fusion_tick()
+            await surveillance_task._async_track_tick(bern, SurveillanceSubscription(area_of_interest=(46.5, 7.0, 47.5, 8.0)))
+            await surveillance_task._async_track_tick(zurich, SurveillanceSubscription(area_of_interest=(47.5, 7.0, 48.5, 8.0)))
+            await surveillance_task._async_track_tick(str(uuid.uuid4()), SurveillanceSubscription(traffic_sources=(3,)))
+        load_plugin.assert_called_once()
+
+        published = {channel: json.loads(payload) for channel, payload in (c.args for c in publisher.publish.call_args_list)}
+        assert [t["unique_aircraft_identifier"] for t in published[f"track_{bern}"]] == ["AAA"]
+        assert [t["unique_aircraft_identifier"] for t in published[f"track_{zurich}"]] == ["BBB"]
+        had_active_tracks = [c.kwargs["had_active_tracks"] for c in surveillance_task.surveillance_event_buffer.record_track_event.call_args_list]
+        assert had_active_tracks == [True, True, False]
+
+
+# ---------------------------------------------------------------------------
+# Scheduling
+# ---------------------------------------------------------------------------
+
+
+class TestScheduling:
+    def test_track_job_carries_the_subscription(self, fakeredis_server, monkeypatch):
+        monkeypatch.setattr(settings, "TICK_SCHEDULER_ENABLED", True)
+        subscription = SurveillanceSubscription(area_of_interest=(46.5, 7.0, 47.5, 8.0), update_interval_secs=2.0, traffic_sources=(0, 1))
+        assert TaskSchedulerService.schedule_surveillance_track("session-1", subscription) is True
+        assert TaskSchedulerService.schedule_surveillance_track("session-2") is True
+
+        jobs = {job_id: TickJobSpec.from_json(raw) for job_id, raw in fakeredis_server.hgetall(JOBS_KEY).items()}
+        track = jobs["surveillance_track:session-1"]
+        assert track.interval_secs == 2.0
+        assert SurveillanceSubscription.from_dict(track.kwargs["subscription"]) == subscription
+        assert jobs["surveillance_fusion:global"].interval_secs == settings.SURVEILLANCE_FUSION_INTERVAL_SECS
+        assert len(jobs) == 3
@@ -0,0 +1,255 @@
+"""Tests for the set-based service metrics in services/surveillance_svc.py and repositories/surveillance_repo.py:
+- per-session heartbeat and track tick counts from GROUP BY queries, and the metrics built from them
+- batched sensor health queries, including the last status before the window
+- per-minute rollups: rebuilding, the watermark, and metrics served from rollups plus raw edges
+"""
+
+import uuid
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from flight_blender.config import settings
+from flight_blender.db.session import async_task_session
+from flight_blender.models.surveillance_orm import (
+    SurveillanceHeartbeatEventORM,
+    SurveillanceSensorHealthTrackingORM,
+    SurveillanceSensorORM,
+    SurveillanceSessionORM,
+    SurveillanceTrackEventORM,
+)
+from flight_blender.repositories.surveillance_repo import SQLAlchemySurveillanceRepository
+from flight_blender.services.surveillance_svc import (
+    SURVEILLANCE_METRICS_ROLLUP_WATERMARK_KEY,
+    SurveillanceMetricsRollup,
+    SurveillanceOperations,
+    _sensor_health_metrics,
+)
+
+from .conftest import _AsyncRedisAdapter
+
+# Events stay inside HEARTBEAT_RETENTION_DAYS so the cleanup tests do not count them; each class has its own day.
+_THIS_MINUTE = datetime.now(timezone.utc).replace(second=0, microsecond=0)
+
+
+async def _seed_session(base: datetime, heartbeat_secs: list[float], track_secs: list[float], late_every: int = 2) -> uuid.UUID:
+    """A session with heartbeats and track ticks at the given offsets from ``base``; every ``late_every``-th heartbeat
+    is late and every other track tick has no active tracks, starting with the second."""
+    session_id = uuid.uuid4()
+    async with async_task_session() as db:
+        db.add(SurveillanceSessionORM(id=session_id, valid_until=base + timedelta(days=1)))
+        await db.flush()
+        for i, secs in enumerate(heartbeat_secs):
+            at = base + timedelta(seconds=secs)
+            db.add(SurveillanceHeartbeatEventORM(session_id=session_id, dispatched_at=at, expected_at=at, delivered_on_time=i % late_every != 1))
+        for i, secs in enumerate(track_secs):
+            at = base + timedelta(seconds=secs)
+            db.add(SurveillanceTrackEventORM(session_id=session_id, dispatched_at=at, expected_at=at, had_active_tracks=i % 2 == 0))
+    return session_id
+
+
+async def _service_metrics(start: datetime, end: datetime, session_id: uuid.UUID | None = None, redis=None) -> dict:
+    async with async_task_session() as db:
+        ops = SurveillanceOperations(repo=SQLAlchemySurveillanceRepository(db), scheduler=None, redis_factory=lambda: redis)
+        body, status = await ops.get_service_metrics(start.isoformat(), end.isoformat(), str(session_id) if session_id else None)
+    assert status == 200
+    return body
+
+
+def _session_metrics(body: dict, session_id: uuid.UUID) -> tuple[dict, dict, dict]:
+    [rate] = [m for m in body["heartbeat_rates"] if m["session_id"] == str(session_id)]
+    [delivery] = [m for m in body["heartbeat_delivery_probabilities"] if m["session_id"] == str(session_id)]
+    [track] = [m for m in body["track_update_probabilities"] if m["session_id"] == str(session_id)]
+    return rate, delivery, track
+
+
+# ---------------------------------------------------------------------------
+# GROUP BY counts
+# ---------------------------------------------------------------------------
+
+
+class TestSessionMetricCounts:
+    BASE = _THIS_MINUTE - timedelta(days=3)
+
+    async def test_counts_are_grouped_per_session(self):
+        first = await _seed_session(self.BASE, [0, 1, 2, 3], [0, 1, 2])
+        second = await _seed_session(self.BASE, [10], [])
+
+        async with async_task_session() as db:
+            counts = await SQLAlchemySurveillanceRepository(db).get_session_metric_counts(
+                self.BASE, self.BASE + timedelta(minutes=1), session_ids=[first, second]
+            )
+
+        assert counts.keys() == {str(first), str(second)}
+        assert (counts[str(first)].heartbeat_count, counts[str(first)].heartbeats_on_time) == (4, 2)
+        assert (counts[str(first)].track_ticks, counts[str(first)].track_ticks_with_active_tracks) == (3, 2)
+        assert counts[str(first)].first_heartbeat_at == self.BASE
+        assert counts[str(first)].last_heartbeat_at == self.BASE + timedelta(seconds=3)
+        assert (counts[str(second)].heartbeat_count, counts[str(second)].track_ticks) == (1, 0)
+
+    async def test_window_end_can_be_exclusive(self):
+        session_id = await _seed_session(self.BASE, [0, 30, 60], [60])
+
+        async with async_task_session() as db:
+            repo = SQLAlchemySurveillanceRepository(db)
+            inclusive = await repo.get_session_metric_counts(self.BASE, self.BASE + timedelta(minutes=1), [session_id])
+            exclusive = await repo.get_session_metric_counts(self.BASE, self.BASE + timedelta(minutes=1), [session_id], include_end=False)
+
+        assert (inclusive[str(session_id)].heartbeat_count, inclusive[str(session_id)].track_ticks) == (3, 1)
+        assert (exclusive[str(session_id)].heartbeat_count, exclusive[str(session_id)].track_ticks) == (2, 0)
+
+    async def test_service_metrics_from_counts(self):
+        session_id = await _seed_session(self.BASE, [0, 1, 2, 3, 4], [0, 1, 2, 3])
+
+        body = await _service_metrics(self.BASE - timedelta(minutes=1), self.BASE + timedelta(minutes=1))
+        rate, delivery, track = _session_metrics(body, session_id)
+
+        assert (rate["measured_rate_hz"], rate["total_heartbeats_in_window"]) == (1.0, 5)
+        assert (delivery["probability"], delivery["delivered_on_time"], delivery["total_expected"]) == (0.6, 3, 5)
+        assert (track["probability"], track["ticks_with_active_tracks"], track["total_ticks"]) == (0.5, 2, 4)
+
+    async def test_a_requested_session_without_events_reports_zeroes(self):
+        session_id = uuid.uuid4()
+
+        body = await _service_metrics(self.BASE, self.BASE + timedelta(minutes=1), session_id=session_id)
+
+        rate, delivery, track = _session_metrics(body, session_id)
+        assert (rate["measured_rate_hz"], delivery["probability"], track["total_ticks"]) == (0.0, 0.0, 0)
+
+    async def test_an_invalid_session_id_is_rejected(self):
+        async with async_task_session() as db:
+            ops = SurveillanceOperations(repo=SQLAlchemySurveillanceRepository(db), scheduler=None)
+            _, status = await ops.get_service_metrics(None, None, "not-a-uuid")
+
+        assert status == 400
+
+
+# ---------------------------------------------------------------------------
+# Sensor health
+# ---------------------------------------------------------------------------
+
+
+class TestSensorHealth:
+    BASE = _THIS_MINUTE - timedelta(days=4)
+
+    @pytest.fixture
+    async def sensor_ids(self):
+        """One sensor operational before the window that fails and recovers automatically, one already in outage."""
+        sensors = [SurveillanceSensorORM(sensor_identifier=f"metrics-{uuid.uuid4()}") for _ in range(2)]
+        history = [
+            (0, -60, "operational", None),
+            (0, 60, "degraded", None),
+            (0, 120, "operational", "automatic"),
+            (0, 300, "outage", None),
+            (0, 330, "operational", "manual"),
+            (1, -10, "outage", None),
+            (1, 30, "operational", "manual"),
+        ]
+        async with async_task_session() as db:
+            db.add_all(sensors)
+            await db.flush()
+            for index, secs, status, recovery_type in history:
+                db.add(
+                    SurveillanceSensorHealthTrackingORM(
+                        sensor_id=sensors[index].id, status=status, recorded_at=self.BASE + timedelta(seconds=secs), recovery_type=recovery_type
+                    )
+                )
+        return [sensor.id for sensor in sensors]
+
+    async def test_batched_queries(self, sensor_ids):
+        async with async_task_session() as db:
+            repo = SQLAlchemySurveillanceRepository(db)
+            records = await repo.get_health_tracking_records_for_sensors(sensor_ids, self.BASE, self.BASE + timedelta(hours=1))
+            before = await repo.get_sensor_statuses_before_time(sensor_ids, self.BASE)
+
+        assert [r.status for r in records[sensor_ids[0]]] == ["degraded", "operational", "outage", "operational"]
+        assert [r.status for r in records[sensor_ids[1]]] == ["operational"]
+        assert before == {sensor_ids[0]: "operational", sensor_ids[1]: "outage"}
+
+    async def test_metrics_follow_the_state_machine(self, sensor_ids):
+        end = self.BASE + timedelta(hours=1)
+        async with async_task_session() as db:
+            repo = SQLAlchemySurveillanceRepository(db)
+            records = await repo.get_health_tracking_records_for_sensors(sensor_ids, self.BASE, end)
+            before = await repo.get_sensor_statuses_before_time(sensor_ids, self.BASE)
+
+        failing = _sensor_health_metrics(sensor_ids[0], "a", records[sensor_ids[0]], before[sensor_ids[0]], self.BASE, end)
+        recovering = _sensor_health_metrics(sensor_ids[1], "b", records[sensor_ids[1]], before[sensor_ids[1]], self.BASE, end)
+
+        assert (failing.failure_count, failing.auto_recovery_count, failing.manual_recovery_count) == (2, 1, 1)
+        assert (failing.mttr_seconds, failing.auto_recovery_time_seconds) == (45.0, 60.0)
+        assert (failing.mtbf_with_auto_recovery_seconds, failing.mtbf_without_auto_recovery_seconds) == (60.0, 180.0)
+        assert (recovering.failure_count, recovering.mttr_seconds) == (1, 30.0)
+
+
+# ---------------------------------------------------------------------------
+# Per-minute rollups
+# ---------------------------------------------------------------------------
+
+
+class TestMetricsRollups:
+    BASE = _THIS_MINUTE - timedelta(days=5)
+
+    @pytest.fixture
+    def redis(self, fakeredis_server):
+        return _AsyncRedisAdapter(fakeredis_server)
+
+    async def _rollups(self, session_id: uuid.UUID, from_minute: datetime, to_minute: datetime) -> dict:
+        async with async_task_session() as db:
+            return await SQLAlchemySurveillanceRepository(db).get_session_metric_rollup_counts(from_minute, to_minute, [session_id])
+
+    async def test_rebuild_is_idempotent(self):
+        session_id = await _seed_session(self.BASE, [5, 35, 65, 95, 125], [5, 65, 125])
+        end = self.BASE + timedelta(minutes=3)
+
+        for _ in range(2):
+            async with async_task_session() as db:
+                written = await SQLAlchemySurveillanceRepository(db).rebuild_session_metric_rollups(self.BASE, end)
+            assert written >= 3
+
+        [counts] = (await self._rollups(session_id, self.BASE, end)).values()
+        assert (counts.heartbeat_count, counts.heartbeats_on_time, counts.track_ticks, counts.track_ticks_with_active_tracks) == (5, 3, 3, 2)
+        assert (counts.first_heartbeat_at, counts.last_heartbeat_at) == (self.BASE + timedelta(seconds=5), self.BASE + timedelta(seconds=125))
+
+    async def test_run_records_the_watermark_and_resumes_from_it(self, redis):
+        base = self.BASE + timedelta(hours=1)
+        session_id = await _seed_session(base, [10, 70], [10])
+        await redis.set(SURVEILLANCE_METRICS_ROLLUP_WATERMARK_KEY, base.isoformat())
+
+        await SurveillanceMetricsRollup(redis_factory=lambda: redis).run(now=base + timedelta(minutes=1, seconds=30))
+
+        assert await redis.get(SURVEILLANCE_METRICS_ROLLUP_WATERMARK_KEY) == (base + timedelta(minutes=1)).isoformat()
+        [counts] = (await self._rollups(session_id, base, base + timedelta(hours=1))).values()
+        assert (counts.heartbeat_count, counts.track_ticks) == (1, 1)
+
+        await SurveillanceMetricsRollup(redis_factory=lambda: redis).run(now=base + timedelta(minutes=2))
+
+        [counts] = (await self._rollups(session_id, base, base + timedelta(hours=1))).values()
+        assert counts.heartbeat_count == 2
+
+    async def test_metrics_from_rollups_match_the_events(self, redis, monkeypatch):
+        base = self.BASE + timedelta(hours=2)
+        session_id = await _seed_session(base, [s * 7.5 for s in range(40)], [s * 10 for s in range(30)], late_every=3)
+        await redis.set(SURVEILLANCE_METRICS_ROLLUP_WATERMARK_KEY, base.isoformat())
+        await SurveillanceMetricsRollup(redis_factory=lambda: redis).run(now=base + timedelta(minutes=3, seconds=20))
+        # A window with part minutes at both ends and events past the watermark
+        start, end = base + timedelta(seconds=20), base + timedelta(minutes=5, seconds=10)
+
+        monkeypatch.setattr(settings, "SURVEILLANCE_METRICS_ROLLUP_ENABLED", False)
+        from_events = await _service_metrics(start, end, session_id)
+        monkeypatch.setattr(settings, "SURVEILLANCE_METRICS_ROLLUP_ENABLED", True)
+        from_rollups = await _service_metrics(start, end, session_id, redis=redis)
+
+        assert _session_metrics(from_rollups, session_id) == _session_metrics(from_events, session_id)
+        rate, _, track = _session_metrics(from_rollups, session_id)
+        assert (rate["total_heartbeats_in_window"], track["total_ticks"]) == (37, 28)
+
+    async def test_without_a_watermark_metrics_come_from_events(self, redis, monkeypatch):
+        base = self.BASE + timedelta(hours=3)
+        session_id = await _seed_session(base, [0, 1, 2], [])
+        monkeypatch.setattr(settings, "SURVEILLANCE_METRICS_ROLLUP_ENABLED", True)
+        await redis.set(SURVEILLANCE_METRICS_ROLLUP_WATERMARK_KEY, "")
+
+        rate, _, _ = _session_metrics(await _service_metrics(base, base + timedelta(minutes=5), session_id, redis=redis), session_id)
+
+        assert rate["total_heartbeats_in_window"] == 3
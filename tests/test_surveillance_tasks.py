@@ -14,7 +14,7 @@ import arrow
 
 from flight_blender.config import settings
 
-from flight_blender.services.surveillance_svc import SurveillanceMetricCalculator
+from flight_blender.services.surveillance_svc import SURVEILLANCE_FUSED_TRACK_STORE, SurveillanceMetricCalculator
 from flight_blender.tasks.surveillance_task import (
     cleanup_old_heartbeat_events,
     send_and_generate_track_to_consumer,
@@ -254,9 +254,6 @@ class TestSensorHealthMetrics:
 def _mock_sa_repo():
     """Return a mock SQLAlchemySurveillanceRepository."""
     repo = MagicMock()
-    repo.get_active_surveillance_sensors = AsyncMock(return_value=[])
-    repo.record_heartbeat_event = AsyncMock(return_value=True)
-    repo.record_track_event = AsyncMock(return_value=True)
     repo.cleanup_old_events = AsyncMock(return_value=(0, 0))
     return repo
 
@@ -266,60 +263,109 @@ def _sa_repo_patch(mock_repo):
     return patch("flight_blender.tasks.surveillance_task.SQLAlchemySurveillanceRepository", return_value=mock_repo)
 
 
+def _mock_event_buffer():
+    """Return a mock SurveillanceEventBuffer."""
+    buffer = MagicMock()
+    buffer.record_heartbeat_event = AsyncMock()
+    buffer.record_track_event = AsyncMock()
+    return buffer
+
+
+def _event_buffer_patch(mock_buffer):
+    return patch("flight_blender.tasks.surveillance_task.surveillance_event_buffer", mock_buffer)
+
+
+def _sensor_registry_patch(sensors):
+    registry = MagicMock()
+    registry.get_active_sensors = AsyncMock(return_value=sensors)
+    return patch("flight_blender.tasks.surveillance_task.surveillance_sensor_registry", registry)
+
+
 class TestSendHeartbeatToConsumer:
     def test_heartbeat_sent_successfully(self):
         """send_heartbeat_to_consumer should record event when Redis publish succeeds."""
-        mock_repo = _mock_sa_repo()
+        mock_buffer = _mock_event_buffer()
         sensor_mock = MagicMock()
         sensor_mock.expected_latency_ms = 100
         sensor_mock.horizontal_accuracy_m = 5
-        mock_repo.get_active_surveillance_sensors.return_value = [sensor_mock]
         session_id = str(uuid.uuid4())
-        with patch("flight_blender.tasks.surveillance_task.redis.from_url") as mock_from_url:
-            mock_from_url.return_value.publish.return_value = 1
+        with patch("flight_blender.tasks.surveillance_task._get_realtime_publisher") as mock_publisher:
+            mock_publisher.return_value.publish.return_value = 1
             with patch.object(send_heartbeat_to_consumer, "apply_async") as mock_apply_async:
-                with _sa_repo_patch(mock_repo):
+                with _event_buffer_patch(mock_buffer), _sensor_registry_patch([sensor_mock]):
                     send_heartbeat_to_consumer(session_id=session_id)
-        mock_repo.record_heartbeat_event.assert_awaited_once()
-        mock_from_url.return_value.publish.assert_called_once()
+        mock_buffer.record_heartbeat_event.assert_awaited_once()
+        mock_publisher.return_value.publish.assert_called_once()
         mock_apply_async.assert_called_once()
 
     def test_heartbeat_channel_error_still_records(self):
         """send_heartbeat_to_consumer records the event even when Redis publish fails."""
-        mock_repo = _mock_sa_repo()
+        mock_buffer = _mock_event_buffer()
         session_id = str(uuid.uuid4())
-        with patch("flight_blender.tasks.surveillance_task.redis.from_url") as mock_from_url:
-            mock_from_url.return_value.publish.side_effect = Exception("redis unavailable")
+        with patch("flight_blender.tasks.surveillance_task._get_realtime_publisher") as mock_publisher:
+            mock_publisher.return_value.publish.side_effect = Exception("redis unavailable")
             with patch.object(send_heartbeat_to_consumer, "apply_async") as mock_apply_async:
-                with _sa_repo_patch(mock_repo):
+                with _event_buffer_patch(mock_buffer), _sensor_registry_patch([]):
                     send_heartbeat_to_consumer(session_id=session_id)
         # Even on error, we record the heartbeat
-        mock_repo.record_heartbeat_event.assert_awaited_once()
+        mock_buffer.record_heartbeat_event.assert_awaited_once()
         mock_apply_async.assert_called_once()
-        kwargs = mock_repo.record_heartbeat_event.call_args.kwargs
+        kwargs = mock_buffer.record_heartbeat_event.call_args.kwargs
         assert kwargs.get("delivered_on_time") is False
 
 
 class TestSendAndGenerateTrackToConsumer:
     def test_track_consumer_runs(self):
         """send_and_generate_track_to_consumer calls record_track_event."""
-        mock_repo = _mock_sa_repo()
+        mock_buffer = _mock_event_buffer()
         session_id = str(uuid.uuid4())
-        with patch("flight_blender.tasks.surveillance_task.redis.from_url") as mock_from_url:
-            mock_from_url.return_value.publish.return_value = 1
-            with patch.object(RedisStreamOperations, "create_consumer_reader", return_value="consumer-1"):
-                with patch.object(RedisStreamOperations, "read_latest_air_traffic_data", return_value=[]):
-                    with patch("flight_blender.tasks.surveillance_task.load_plugin") as mock_load:
+        with patch("flight_blender.tasks.surveillance_task._get_realtime_publisher") as mock_publisher:
+            mock_publisher.return_value.publish.return_value = 1
+            with patch.object(RedisStreamOperations, "get_worker_consumer_name", return_value="consumer-1"):
+                with patch.object(RedisStreamOperations, "drain_air_traffic_data", return_value=[]):
+                    with patch("flight_blender.services.surveillance_svc.load_plugin") as mock_load:
                         mock_fuser = MagicMock()
                         mock_fuser.return_value.generate_track_messages.return_value = []
                         mock_load.return_value = mock_fuser
                         with patch.object(send_and_generate_track_to_consumer, "apply_async") as mock_apply_async:
-                            with _sa_repo_patch(mock_repo):
+                            with _event_buffer_patch(mock_buffer):
                                 send_and_generate_track_to_consumer(session_id=session_id)
-        mock_repo.record_track_event.assert_awaited_once()
-        mock_from_url.return_value.publish.assert_called_once()
+        mock_buffer.record_track_event.assert_awaited_once()
+        mock_publisher.return_value.publish.assert_called_once()
         mock_apply_async.assert_called_once()
 
+    def test_track_consumer_exports_stream_lag(self, fakeredis_server):
+        """The fusion run by the first track task of an interval stores the air traffic stream lag metrics."""
+        mock_buffer = _mock_event_buffer()
+        session_id = str(uuid.uuid4())
+        fakeredis_server.xadd("air_traffic_stream", {"icao_address": "ABC123", "lat_dd": "1.0", "lon_dd": "2.0", "timestamp": "0"})
+        with patch("flight_blender.tasks.surveillance_task._get_realtime_publisher"):
+            with patch("flight_blender.services.surveillance_svc.load_plugin") as mock_load:
+                mock_load.return_value.return_value.generate_track_messages.return_value = []
+                with patch.object(send_and_generate_track_to_consumer, "apply_async"):
+                    with _event_buffer_patch(mock_buffer):
+                        send_and_generate_track_to_consumer(session_id=session_id)
+        raw_observations = mock_load.return_value.call_args.kwargs["raw_observations"]
+        assert [o.icao_address for o in raw_observations] == ["ABC123"]
+        lag = fakeredis_server.hgetall(f"air_traffic_stream_lag:{SURVEILLANCE_FUSED_TRACK_STORE}")
+        assert lag["stream_length"] == "1"
+        assert lag["pending_count"] == "0"
+
+    def test_track_consumer_reschedules_at_the_subscription_rate(self):
+        mock_buffer = _mock_event_buffer()
+        subscription = {"area_of_interest": [46.0, 7.0, 47.0, 8.0], "update_interval_secs": 5.0, "traffic_sources": [1]}
+        with patch("flight_blender.tasks.surveillance_task._get_realtime_publisher"):
+            with patch("flight_blender.tasks.surveillance_task.surveillance_fusion_pipeline"):
+                with patch.object(send_and_generate_track_to_consumer, "apply_async") as mock_apply_async:
+                    with _event_buffer_patch(mock_buffer):
+                        send_and_generate_track_to_consumer(session_id=str(uuid.uuid4()), subscription=subscription)
+        assert mock_apply_async.call_args.kwargs["countdown"] == 5.0
+        assert mock_apply_async.call_args.kwargs["kwargs"]["subscription"] == {
+            "area_of_interest": (46.0, 7.0, 47.0, 8.0),
+            "update_interval_secs": 5.0,
+            "traffic_sources": (1,),
+        }
+
 
 class TestCleanupOldHeartbeatEvents:
     def test_cleanup_deletes_old_records(self):
@@ -0,0 +1,321 @@
+"""Tests for the tick scheduler service:
+- TimerWheel (O(1) schedule/cancel, never fires early, catches up after a stall)
+- TaskSchedulerService registering and cancelling jobs in the Redis registry
+- TickScheduler running jobs on one event loop, with leases across instances
+"""
+
+import asyncio
+import time
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import arrow
+import fakeredis
+import pytest
+
+from flight_blender.tasks import tick_jobs
+from flight_blender.tasks.scheduler import TaskSchedulerService
+from flight_blender.tasks.tick_jobs import JOBS_KEY, SURVEILLANCE_HEARTBEAT, SURVEILLANCE_TRACK, TickJobSpec, lease_key, register_job
+from flight_blender.tasks.tick_scheduler import TickScheduler, TimerWheel
+
+TEST_KIND = "test_job"
+
+
+@pytest.fixture
+def redis_server():
+    return fakeredis.FakeServer()
+
+
+@pytest.fixture
+def sync_redis(redis_server):
+    return fakeredis.FakeRedis(server=redis_server, decode_responses=True)
+
+
+def _async_redis(redis_server):
+    return fakeredis.aioredis.FakeRedis(server=redis_server, decode_responses=True)
+
+
+class _RecordingHandler:
+    def __init__(self, duration_secs: float = 0.0):
+        self.duration_secs = duration_secs
+        self.calls: list[tuple[str, str]] = []
+        self.concurrent = 0
+        self.max_concurrent_per_job: dict[str, int] = {}
+        self._active: dict[str, int] = {}
+
+    def for_instance(self, instance_id: str):
+        async def handler(spec: TickJobSpec) -> None:
+            self._active[spec.job_id] = self._active.get(spec.job_id, 0) + 1
+            self.max_concurrent_per_job[spec.job_id] = max(self.max_concurrent_per_job.get(spec.job_id, 0), self._active[spec.job_id])
+            try:
+                self.calls.append((instance_id, spec.job_id))
+                if self.duration_secs:
+                    await asyncio.sleep(self.duration_secs)
+            finally:
+                self._active[spec.job_id] -= 1
+
+        return handler
+
+    def runs_of(self, job_id: str) -> int:
+        return sum(1 for _instance, called in self.calls if called == job_id)
+
+
+def _scheduler(redis_server, handler: _RecordingHandler, instance_id: str, lease_ttl_secs: float = 2.0) -> TickScheduler:
+    return TickScheduler(
+        _async_redis(redis_server),
+        handlers={TEST_KIND: handler.for_instance(instance_id)},
+        instance_id=instance_id,
+        resolution_secs=0.01,
+        sync_interval_secs=0.05,
+        lease_ttl_secs=lease_ttl_secs,
+    )
+
+
+def _job(session_id: str, interval_secs: float = 0.05, expires_in_secs: float | None = 60) -> TickJobSpec:
+    expires_at = None if expires_in_secs is None else time.time() + expires_in_secs
+    return TickJobSpec.for_session(TEST_KIND, session_id, interval_secs=interval_secs, expires_at=expires_at)
+
+
+async def _run_for(seconds: float, *schedulers: TickScheduler) -> None:
+    tasks = [asyncio.create_task(s.run()) for s in schedulers]
+    await asyncio.sleep(seconds)
+    for s in schedulers:
+        s.stop()
+    await asyncio.gather(*tasks)
+
+
+# ---------------------------------------------------------------------------
+# TimerWheel
+# ---------------------------------------------------------------------------
+
+
+class TestTimerWheel:
+    def test_keys_fire_in_their_tick_and_not_before(self):
+        wheel = TimerWheel(resolution_secs=0.1, slots=8, start=0.0)
+        wheel.schedule("a", 0.25)
+        wheel.schedule("b", 0.5)
+        assert wheel.advance(0.2) == []
+        assert wheel.advance(0.3) == ["a"]
+        assert wheel.advance(0.6) == ["b"]
+        assert len(wheel) == 0
+
+    def test_keys_beyond_one_revolution_wait_for_their_round(self):
+        wheel = TimerWheel(resolution_secs=0.1, slots=4, start=0.0)
+        wheel.schedule("later", 1.05)
+        for step in range(1, 11):
+            assert wheel.advance(step / 10) == []
+        assert wheel.advance(1.1) == ["later"]
+
+    def test_cancel_and_reschedule(self):
+        wheel = TimerWheel(resolution_secs=0.1, slots=8, start=0.0)
+        wheel.schedule("a", 0.2)
+        wheel.cancel("a")
+        assert wheel.advance(0.5) == []
+        wheel.schedule("a", 0.6)
+        wheel.schedule("a", 0.9)
+        assert wheel.advance(0.7) == []
+        assert wheel.advance(0.9) == ["a"]
+
+    def test_stall_longer_than_a_revolution_releases_everything_due(self):
+        wheel = TimerWheel(resolution_secs=0.1, slots=4, start=0.0)
+        for i in range(10):
+            wheel.schedule(f"k{i}", 0.1 * (i + 1))
+        wheel.schedule("future", 50.0)
+        assert sorted(wheel.advance(5.0)) == sorted(f"k{i}" for i in range(10))
+        assert "future" in wheel
+
+    def test_past_times_fire_on_the_next_tick(self):
+        wheel = TimerWheel(resolution_secs=0.1, slots=8, start=1.0)
+        wheel.schedule("late", 0.2)
+        assert wheel.advance(1.1) == ["late"]
+
+
+# ---------------------------------------------------------------------------
+# TaskSchedulerService front-end
+# ---------------------------------------------------------------------------
+
+
+class TestTaskSchedulerServiceRegistry:
+    @pytest.fixture(autouse=True)
+    def _tick_scheduler_enabled(self, monkeypatch):
+        monkeypatch.setattr("flight_blender.config.settings.TICK_SCHEDULER_ENABLED", True)
+
+    def test_surveillance_jobs_are_registered(self, fakeredis_server):
+        assert TaskSchedulerService.schedule_surveillance_heartbeat("session-1") is True
+        assert TaskSchedulerService.schedule_surveillance_track("session-1") is True
+
+        jobs = {job_id: TickJobSpec.from_json(raw) for job_id, raw in fakeredis_server.hgetall(JOBS_KEY).items()}
+        assert set(jobs) == {f"{SURVEILLANCE_HEARTBEAT}:session-1", f"{SURVEILLANCE_TRACK}:session-1", "surveillance_fusion:global"}
+        heartbeat = jobs[f"{SURVEILLANCE_HEARTBEAT}:session-1"]
+        assert heartbeat.interval_secs == 1
+        assert heartbeat.expires_at == pytest.approx(arrow.now().shift(minutes=1).float_timestamp, abs=5)
+
+    def test_conformance_job_carries_declaration_id(self, fakeredis_server):
+        expires = arrow.now().shift(minutes=30).isoformat()
+        assert TaskSchedulerService.schedule_conformance_check("declaration-1", "session-2", expires) is True
+        spec = TickJobSpec.from_json(fakeredis_server.hget(JOBS_KEY, "flight_conformance:session-2"))
+        assert spec.kwargs == {"flight_declaration_id": "declaration-1"}
+
+    def test_cancel_removes_session_jobs_and_sets_stop_key(self, fakeredis_server):
+        TaskSchedulerService.schedule_surveillance_heartbeat("session-1")
+        TaskSchedulerService.schedule_surveillance_track("session-1")
+        TaskSchedulerService.schedule_surveillance_heartbeat("session-2")
+        version = fakeredis_server.get(tick_jobs.JOBS_VERSION_KEY)
+
+        TaskSchedulerService.cancel_session_tasks("session-1")
+
+        assert set(fakeredis_server.hkeys(JOBS_KEY)) == {f"{SURVEILLANCE_HEARTBEAT}:session-2", "surveillance_fusion:global"}
+        assert fakeredis_server.get(tick_jobs.JOBS_VERSION_KEY) != version
+        assert fakeredis_server.exists("stop_task_session-1")
+
+    def test_disabled_tick_scheduler_falls_back_to_celery(self, monkeypatch, fakeredis_server):
+        monkeypatch.setattr("flight_blender.config.settings.TICK_SCHEDULER_ENABLED", False)
+        with patch("flight_blender.tasks.scheduler.app.send_task") as send_task:
+            assert TaskSchedulerService.schedule_surveillance_heartbeat("session-1") is True
+        send_task.assert_called_once()
+        assert fakeredis_server.hlen(JOBS_KEY) == 0
+
+
+# ---------------------------------------------------------------------------
+# TickScheduler
+# ---------------------------------------------------------------------------
+
+
+class TestTickScheduler:
+    @pytest.mark.asyncio
+    async def test_runs_registered_jobs_periodically(self, redis_server, sync_redis):
+        register_job(sync_redis, _job("a", interval_secs=0.05))
+        register_job(sync_redis, _job("b", interval_secs=0.1))
+        handler = _RecordingHandler()
+
+        await _run_for(0.6, _scheduler(redis_server, handler, "one"))
+
+        assert 6 <= handler.runs_of(f"{TEST_KIND}:a") <= 13
+        assert 3 <= handler.runs_of(f"{TEST_KIND}:b") <= 7
+
+    @pytest.mark.asyncio
+    async def test_thousands_of_jobs_share_one_loop(self, redis_server, sync_redis):
+        for i in range(2000):
+            register_job(sync_redis, _job(f"s{i}", interval_secs=0.2))
+        handler = _RecordingHandler()
+
+        await _run_for(0.7, _scheduler(redis_server, handler, "one"))
+
+        assert {job_id for _instance, job_id in handler.calls} == {f"{TEST_KIND}:s{i}" for i in range(2000)}
+
+    @pytest.mark.asyncio
+    async def test_slow_job_never_overlaps_itself(self, redis_server, sync_redis):
+        register_job(sync_redis, _job("slow", interval_secs=0.02))
+        handler = _RecordingHandler(duration_secs=0.1)
+        scheduler = _scheduler(redis_server, handler, "one")
+
+        await _run_for(0.5, scheduler)
+
+        assert handler.max_concurrent_per_job[f"{TEST_KIND}:slow"] == 1
+        assert scheduler.skipped_overlaps > 0
+
+    @pytest.mark.asyncio
+    async def test_cancelled_session_stops_running(self, redis_server, sync_redis):
+        register_job(sync_redis, _job("a"))
+        handler = _RecordingHandler()
+        scheduler = _scheduler(redis_server, handler, "one")
+        task = asyncio.create_task(scheduler.run())
+        await asyncio.sleep(0.3)
+
+        tick_jobs.remove_session_jobs(sync_redis, "a")
+        await asyncio.sleep(0.15)
+        runs_after_cancel = handler.runs_of(f"{TEST_KIND}:a")
+        await asyncio.sleep(0.3)
+        scheduler.stop()
+        await task
+
+        assert runs_after_cancel > 0
+        assert handler.runs_of(f"{TEST_KIND}:a") == runs_after_cancel
+        assert not sync_redis.exists(lease_key(f"{TEST_KIND}:a"))
+
+    @pytest.mark.asyncio
+    async def test_expired_jobs_are_removed_from_the_registry(self, redis_server, sync_redis):
+        register_job(sync_redis, _job("old", expires_in_secs=-1))
+        handler = _RecordingHandler()
+
+        await _run_for(0.2, _scheduler(redis_server, handler, "one"))
+
+        assert handler.calls == []
+        assert sync_redis.hlen(JOBS_KEY) == 0
+
+
+class TestTickSchedulerSessionHooks:
+    @pytest.mark.asyncio
+    async def test_every_instance_notifies_its_plugins(self, redis_server, sync_redis, monkeypatch):
+        calls = []
+        plugins = SimpleNamespace(
+            start_session=lambda session_id: calls.append(("start", session_id)), stop_session=lambda session_id: calls.append(("stop", session_id))
+        )
+        monkeypatch.setattr("flight_blender.tasks.tick_scheduler.plugin_instances", plugins)
+        schedulers = [_scheduler(redis_server, _RecordingHandler(), instance_id) for instance_id in ("one", "two")]
+        register_job(sync_redis, TickJobSpec.for_session(SURVEILLANCE_TRACK, "s1", interval_secs=60))
+        register_job(sync_redis, TickJobSpec.for_session(SURVEILLANCE_HEARTBEAT, "s1", interval_secs=60))
+        for scheduler in schedulers:
+            await scheduler.sync_once()
+            await scheduler.sync_once()
+
+        tick_jobs.remove_session_jobs(sync_redis, "s1")
+        for scheduler in schedulers:
+            await scheduler.sync_once()
+
+        assert calls == [("start", "s1"), ("start", "s1"), ("stop", "s1"), ("stop", "s1")]
+
+
+class TestTickSchedulerLeases:
+    @pytest.mark.asyncio
+    async def test_two_instances_never_run_the_same_job(self, redis_server, sync_redis):
+        for i in range(50):
+            register_job(sync_redis, _job(f"s{i}"))
+        handler = _RecordingHandler()
+        first, second = _scheduler(redis_server, handler, "first"), _scheduler(redis_server, handler, "second")
+
+        await _run_for(0.5, first, second)
+
+        runners: dict[str, set[str]] = {}
+        for instance_id, job_id in handler.calls:
+            runners.setdefault(job_id, set()).add(instance_id)
+        assert len(runners) == 50
+        assert all(len(instances) == 1 for instances in runners.values())
+
+    @pytest.mark.asyncio
+    async def test_jobs_move_to_survivor_after_lease_expiry(self, redis_server, sync_redis):
+        register_job(sync_redis, _job("a"))
+        handler = _RecordingHandler()
+        crashed = _scheduler(redis_server, handler, "crashed", lease_ttl_secs=0.3)
+        await crashed.sync_once()
+        assert crashed.owned_job_ids == {f"{TEST_KIND}:a"}
+
+        survivor = _scheduler(redis_server, handler, "survivor", lease_ttl_secs=0.3)
+        await _run_for(0.8, survivor)
+
+        assert ("survivor", f"{TEST_KIND}:a") in handler.calls
+        assert ("crashed", f"{TEST_KIND}:a") not in handler.calls
+
+    @pytest.mark.asyncio
+    async def test_graceful_stop_hands_jobs_over_immediately(self, redis_server, sync_redis):
+        register_job(sync_redis, _job("a"))
+        handler = _RecordingHandler()
+        first = _scheduler(redis_server, handler, "first", lease_ttl_secs=30)
+        await _run_for(0.2, first)
+        assert not sync_redis.exists(lease_key(f"{TEST_KIND}:a"))
+
+        second = _scheduler(redis_server, handler, "second", lease_ttl_secs=30)
+        await second.sync_once()
+        assert second.owned_job_ids == {f"{TEST_KIND}:a"}
+
+    @pytest.mark.asyncio
+    async def test_lost_lease_stops_the_job(self, redis_server, sync_redis):
+        register_job(sync_redis, _job("a"))
+        handler = _RecordingHandler()
+        scheduler = _scheduler(redis_server, handler, "one")
+        await scheduler.sync_once()
+
+        sync_redis.set(lease_key(f"{TEST_KIND}:a"), "someone-else")
+        await scheduler.sync_once()
+
+        assert scheduler.owned_job_ids == set()
@@ -0,0 +1,139 @@
+"""Tests for the viewport prefilter of flight observation queries:
+- repository queries restricted to a bounding box in SQL, inclusive of its edges
+- the exact, vectorized viewport test in services/flight_feed_svc.py, excluding points on the edge
+- ObservationReadOperations and get_air_traffic passing the viewport bounds down to the repository
+"""
+
+import uuid
+from datetime import datetime, timedelta, timezone
+from operator import itemgetter
+
+import arrow
+import pytest
+from shapely.geometry import box
+
+from flight_blender.db.session import async_task_session
+from flight_blender.models.flight_feed_orm import FlightObservationORM
+from flight_blender.repositories.flight_feed_repo import SQLAlchemyFlightFeedRepository
+from flight_blender.services.flight_feed_svc import FlightFeedOperations, ObservationReadOperations, _in_view_port
+
+# An area no other test writes observations to; latitude is x in viewport boxes.
+VIEW = (-33.90, 151.20, -33.80, 151.30)
+VIEW_BOX = box(*VIEW)
+
+
+def _observation(session_id: uuid.UUID, lat: float, lon: float, icao_address: str) -> FlightObservationORM:
+    now = datetime.now(timezone.utc)
+    return FlightObservationORM(
+        session_id=session_id,
+        latitude_dd=lat,
+        longitude_dd=lon,
+        altitude_mm=1000.0,
+        traffic_source=1,
+        source_type=1,
+        icao_address=icao_address,
+        raw_metadata="{}",
+        created_at=now,
+        updated_at=now,
+    )
+
+
+@pytest.fixture
+async def session_id():
+    """Observations inside the view, on its edge, inside its bounding rectangle's longitude band only, and far away."""
+    session_id = uuid.uuid4()
+    async with async_task_session() as db:
+        db.add_all(
+            [
+                _observation(session_id, -33.85, 151.25, "INSIDE"),
+                _observation(session_id, -33.80, 151.25, "EDGE"),
+                _observation(session_id, -33.70, 151.25, "NORTH"),
+                _observation(session_id, 52.50, 13.40, "FAR"),
+            ]
+        )
+    return session_id
+
+
+def _icao_addresses(observations) -> list[str]:
+    return sorted(o.icao_address if hasattr(o, "icao_address") else o["icao_address"] for o in observations)
+
+
+# ---------------------------------------------------------------------------
+# SQL bounding box
+# ---------------------------------------------------------------------------
+
+
+class TestRepositoryBounds:
+    async def test_recent_observations_are_cut_to_the_bounds(self, session_id):
+        async with async_task_session() as db:
+            rows = await SQLAlchemyFlightFeedRepository(db).get_recent_flight_observations(
+                after_datetime=datetime.now(timezone.utc) - timedelta(minutes=1), bounds=VIEW
+            )
+
+        assert _icao_addresses(r for r in rows if r.session_id == session_id) == ["EDGE", "INSIDE"]
+
+    async def test_session_observations_are_cut_to_the_bounds(self, session_id):
+        async with async_task_session() as db:
+            rows = await SQLAlchemyFlightFeedRepository(db).get_temporal_flight_observations_by_session_dicts(
+                str(session_id), arrow.now().shift(minutes=-1), bounds=VIEW
+            )
+
+        assert _icao_addresses(rows) == ["EDGE", "INSIDE"]
+
+    async def test_no_bounds_returns_everything(self, session_id):
+        async with async_task_session() as db:
+            rows = await SQLAlchemyFlightFeedRepository(db).get_temporal_flight_observations_by_session_dicts(
+                str(session_id), arrow.now().shift(minutes=-1)
+            )
+
+        assert _icao_addresses(rows) == ["EDGE", "FAR", "INSIDE", "NORTH"]
+
+
+# ---------------------------------------------------------------------------
+# Exact viewport test
+# ---------------------------------------------------------------------------
+
+
+class TestInViewPort:
+    def test_keeps_rows_strictly_inside(self):
+        rows = [
+            {"latitude_dd": -33.85, "longitude_dd": 151.25, "icao_address": "INSIDE"},
+            {"latitude_dd": -33.80, "longitude_dd": 151.25, "icao_address": "EDGE"},
+            {"latitude_dd": 151.25, "longitude_dd": -33.85, "icao_address": "SWAPPED"},
+        ]
+
+        assert _in_view_port(VIEW_BOX, rows, itemgetter("latitude_dd", "longitude_dd")) == rows[:1]
+
+    def test_empty(self):
+        assert _in_view_port(VIEW_BOX, [], itemgetter("latitude_dd", "longitude_dd")) == []
+
+
+# ---------------------------------------------------------------------------
+# Services
+# ---------------------------------------------------------------------------
+
+
+class TestServices:
+    async def test_read_operations_return_only_observations_in_view(self, session_id, fakeredis_server):
+        async with async_task_session() as db:
+            ops = ObservationReadOperations(SQLAlchemyFlightFeedRepository(db), fakeredis_server, view_port_box=VIEW_BOX)
+            observations = await ops.get_temporal_flight_observations_by_session(str(session_id))
+
+        assert _icao_addresses(observations) == ["INSIDE"]
+
+    async def test_get_air_traffic_passes_the_bounds_to_sql(self, session_id, fakeredis_server):
+        calls = []
+
+        class _Repo:
+            async def get_recent_flight_observations(self, after_datetime, bounds=None):
+                calls.append(bounds)
+                async with async_task_session() as db:
+                    return await SQLAlchemyFlightFeedRepository(db).get_recent_flight_observations(after_datetime, bounds=bounds)
+
+        ops = FlightFeedOperations(repo=_Repo(), dispatcher=None, telemetry_validator=None, redis=fakeredis_server)
+        body, status = await ops.get_air_traffic(uuid.uuid4(), ",".join(map(str, VIEW)))
+
+        assert status == 200
+        assert calls == [VIEW]
+        assert "INSIDE" in _icao_addresses(body["observations"])
+        assert not {"EDGE", "NORTH", "FAR"} & set(_icao_addresses(body["observations"]))
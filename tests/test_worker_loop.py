@@ -0,0 +1,130 @@
+"""Tests for tasks/worker_loop.py and the loop-bound pooled sessions in db/session.py:
+- run_coro on the persistent worker loop vs the asyncio.run fallback
+- async_task_session reusing pooled connections only on the bound loop
+- worker_process_init / worker_process_shutdown bootstrap and shutdown hooks
+"""
+
+import asyncio
+
+import pytest
+from sqlalchemy import event, text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from flight_blender.db.session import async_task_session
+from flight_blender.tasks import worker_loop
+from flight_blender.tasks.worker_loop import WorkerEventLoop, run_coro
+
+
+class _ConnectionCounter:
+    def __init__(self, engine):
+        self.count = 0
+        event.listen(engine.sync_engine, "connect", self._on_connect)
+
+    def _on_connect(self, *args):
+        self.count += 1
+
+
+@pytest.fixture
+def pooled_engine(tmp_path, monkeypatch):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'worker.sqlite3'}")
+    monkeypatch.setattr(worker_loop, "create_pooled_task_engine", lambda: engine)
+    return engine
+
+
+@pytest.fixture
+def started_loop(pooled_engine, monkeypatch):
+    loop = WorkerEventLoop()
+    monkeypatch.setattr(worker_loop, "worker_event_loop", loop)
+    loop.start()
+    yield loop
+    loop.stop()
+
+
+async def _select_one() -> int:
+    async with async_task_session() as db:
+        return (await db.execute(text("SELECT 1"))).scalar_one()
+
+
+# ---------------------------------------------------------------------------
+# run_coro
+# ---------------------------------------------------------------------------
+
+
+class TestRunCoro:
+    def test_falls_back_to_asyncio_run_without_worker_loop(self):
+        loops = set()
+
+        async def record():
+            loops.add(asyncio.get_running_loop())
+            return "ok"
+
+        assert run_coro(record()) == "ok"
+        assert run_coro(record()) == "ok"
+        assert len(loops) == 2
+
+    def test_tasks_share_the_worker_loop(self, started_loop):
+        async def current_loop():
+            return asyncio.get_running_loop()
+
+        assert run_coro(current_loop()) is started_loop.loop
+        assert run_coro(current_loop()) is started_loop.loop
+
+    def test_exceptions_propagate(self, started_loop):
+        async def fail():
+            raise ValueError("boom")
+
+        with pytest.raises(ValueError, match="boom"):
+            run_coro(fail())
+        assert started_loop.is_running
+
+
+# ---------------------------------------------------------------------------
+# Pooled task sessions
+# ---------------------------------------------------------------------------
+
+
+class TestPooledTaskSessions:
+    def test_worker_loop_reuses_one_pooled_connection(self, started_loop, pooled_engine):
+        counter = _ConnectionCounter(pooled_engine)
+        for _ in range(20):
+            assert run_coro(_select_one()) == 1
+        assert counter.count == 1
+
+    def test_other_loops_do_not_use_the_pooled_engine(self, started_loop, pooled_engine):
+        counter = _ConnectionCounter(pooled_engine)
+        assert asyncio.run(_select_one()) == 1
+        assert counter.count == 0
+
+
+# ---------------------------------------------------------------------------
+# Worker signals
+# ---------------------------------------------------------------------------
+
+
+class TestWorkerProcessSignals:
+    def test_init_starts_and_shutdown_stops_the_loop(self, pooled_engine, monkeypatch):
+        loop = WorkerEventLoop()
+        monkeypatch.setattr(worker_loop, "worker_event_loop", loop)
+
+        worker_loop._start_worker_event_loop()
+        assert loop.is_running
+        assert loop.redis is not None
+        thread = loop._thread
+
+        worker_loop._stop_worker_event_loop()
+        assert not loop.is_running
+        assert not thread.is_alive()
+        assert run_coro(asyncio.sleep(0, result="fallback")) == "fallback"
+
+    def test_shutdown_hooks_run_on_the_loop_while_sessions_are_bound(self, pooled_engine):
+        loop = WorkerEventLoop()
+        results = []
+
+        async def hook():
+            results.append(await _select_one())
+
+        loop.add_shutdown_hook(hook)
+        loop.start()
+        loop.stop()
+
+        assert results == [1]